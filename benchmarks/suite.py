@@ -0,0 +1,245 @@
+"""
+Benchmark suite for the main processing paths of pyosmium.
+
+A synthetic PBF file is created in a temporary directory (see synthetic.py)
+and each benchmark is run on it in a fresh process. For each benchmark,
+the throughput in OSM objects per second and the peak resident memory
+of the process are reported.
+
+Use '--save' to write the results to a JSON file and '--compare' to
+compare the current run against such a file, e.g. from an earlier release.
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import osmium
+import osmium.version
+
+from synthetic import create_test_file
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    """ Register a benchmark function. The function receives the name of
+        the input file and a directory for temporary output.
+    """
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+class PythonCounter(osmium.SimpleHandler):
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def node(self, _):
+        self.count += 1
+
+    def way(self, _):
+        self.count += 1
+
+    def relation(self, _):
+        self.count += 1
+
+
+def location_handler():
+    lh = osmium.NodeLocationsForWays(osmium.index.create_map('flex_mem'))
+    lh.ignore_errors()
+    return lh
+
+
+@benchmark
+def apply_native(infile, _):
+    osmium.apply(infile, osmium.filter.KeyFilter('amenity'))
+
+
+@benchmark
+def apply_python(infile, _):
+    PythonCounter().apply_file(infile)
+
+
+@benchmark
+def apply_locations(infile, _):
+    osmium.apply(infile, location_handler())
+
+
+@benchmark
+def file_processor(infile, _):
+    for _ in osmium.FileProcessor(infile):
+        pass
+
+
+@benchmark
+def file_processor_recycled(infile, _):
+    for _ in osmium.FileProcessor(infile).with_recycled_objects():
+        pass
+
+
+@benchmark
+def file_processor_batches(infile, _):
+    for batch in osmium.FileProcessor(infile).iter_batches():
+        for _ in batch:
+            pass
+
+
+@benchmark
+def file_processor_locations(infile, _):
+    for _ in osmium.FileProcessor(infile).with_locations():
+        pass
+
+
+@benchmark
+def file_processor_areas(infile, _):
+    for _ in osmium.FileProcessor(infile).with_areas():
+        pass
+
+
+def _filter_benchmark(filters):
+    def _run(infile, _):
+        osmium.apply(infile, *filters())
+    return _run
+
+
+FILTERS = {
+    'empty_tag': lambda: [osmium.filter.EmptyTagFilter()],
+    'key': lambda: [osmium.filter.KeyFilter('amenity', 'building')],
+    'tag': lambda: [osmium.filter.TagFilter(('highway', 'residential'),
+                                            ('amenity', 'bench'))],
+    'key_large': lambda: [osmium.filter.KeyFilter(*(f'key{i}' for i in range(500)),
+                                                  'amenity')],
+    'tag_large': lambda: [osmium.filter.TagFilter(*((f'key{i // 10}', f'value{i}')
+                                                    for i in range(500)),
+                                                  ('amenity', 'bench'))],
+    'entity': lambda: [osmium.filter.EntityFilter(osmium.osm.WAY)],
+    'id': lambda: [osmium.filter.IdFilter(range(1, 1000000, 7))],
+    'tag_expression': lambda: [osmium.filter.TagExpressionFilter(
+                                   '(highway in (primary, residential) and name~"^Street 1")'
+                                   ' or (amenity=bench and not tourism)')],
+    # The synthetic objects have no timestamp and uid 0, so all of
+    # them pass and both conditions are checked for every object.
+    'attribute': lambda: [osmium.filter.AttributeFilter(since='1970-01-01T00:00:00Z',
+                                                        uids=range(0, 100000, 3))],
+    'geometry': lambda: [location_handler(),
+                         osmium.filter.GeometryFilter(
+                             'POLYGON((0 0, 0.5 0.01, 1 0, 0.9 0.05, 1 0.1,'
+                             ' 0.5 0.09, 0 0.1, 0.1 0.05, 0 0))')],
+    'geo_interface': lambda: [location_handler(), osmium.filter.GeoInterfaceFilter()],
+    'geo_interface_numpy': lambda: [location_handler(),
+                                    osmium.filter.GeoInterfaceFilter(coordinates='numpy')],
+}
+
+for _name, _filters in FILTERS.items():
+    BENCHMARKS[f'filter_{_name}'] = _filter_benchmark(_filters)
+
+
+@benchmark
+def simple_writer(infile, tmpdir):
+    with osmium.SimpleWriter(str(Path(tmpdir) / 'simple_writer.osm.pbf'),
+                             overwrite=True) as writer:
+        osmium.apply(infile, writer)
+
+
+@benchmark
+def merge_input_reader(infile, _):
+    mir = osmium.MergeInputReader()
+    mir.add_file(str(infile))
+    mir.apply(osmium.filter.KeyFilter('amenity'))
+
+
+@benchmark
+def back_reference_writer(infile, tmpdir):
+    with osmium.BackReferenceWriter(Path(tmpdir) / 'back_ref.osm.pbf', ref_src=infile,
+                                    overwrite=True) as writer:
+        for obj in osmium.FileProcessor(infile)\
+                         .with_filter(osmium.filter.KeyFilter('amenity', 'building')):
+            writer.add(obj)
+
+
+def _peak_rss():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return rss * 1024 if sys.platform != 'darwin' else rss
+
+
+def _run_child(name, infile, tmpdir, queue):
+    start = time.perf_counter()
+    BENCHMARKS[name](infile, tmpdir)
+    queue.put((time.perf_counter() - start, _peak_rss()))
+
+
+def run_benchmark(name, infile, tmpdir):
+    """ Run a single benchmark in a new process. Returns a tuple of
+        runtime in seconds and peak RSS in bytes.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_child, args=(name, infile, tmpdir, queue))
+    proc.start()
+    proc.join()
+    if proc.exitcode != 0:
+        raise RuntimeError(f"Benchmark '{name}' failed.")
+    return queue.get()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nodes', type=int, default=1_000_000,
+                        help='Number of nodes in the synthetic file')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Run each benchmark multiple times and report the best result')
+    parser.add_argument('--save', metavar='FILE',
+                        help='Save the results as JSON')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='Compare results with a JSON file from an earlier run')
+    parser.add_argument('benchmarks', nargs='*', metavar='BENCHMARK',
+                        help=f"Benchmarks to run (default: all). One of: {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"Unknown benchmark '{name}'.")
+
+    baseline = {}
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())['results']
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        infile = str(Path(tmpdir) / 'bench.osm.pbf')
+        num_objects = create_test_file(infile, args.nodes)
+        print(f"Input: {num_objects} objects, "
+              f"{Path(infile).stat().st_size / 1024 / 1024:.1f} MB, "
+              f"pyosmium {osmium.version.pyosmium_release}")
+
+        print(f"{'benchmark':28} {'time (s)':>9} {'objects/s':>12} {'peak RSS (MB)':>14}"
+              + ('  vs. baseline' if baseline else ''))
+        for name in args.benchmarks or BENCHMARKS:
+            runs = [run_benchmark(name, infile, tmpdir) for _ in range(args.repeat)]
+            elapsed = min(r[0] for r in runs)
+            rss = max(r[1] for r in runs)
+            rate = num_objects / elapsed
+            results[name] = {'time': elapsed, 'objects_per_second': rate, 'peak_rss': rss}
+
+            line = f"{name:28} {elapsed:9.2f} {rate:12.0f} {rss / 1024 / 1024:14.1f}"
+            if name in baseline:
+                line += f"  {rate / baseline[name]['objects_per_second']:12.2f}x"
+            print(line)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps({'nodes': args.nodes,
+                                               'objects': num_objects,
+                                               'version': osmium.version.pyosmium_release,
+                                               'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Generator for synthetic OSM test files used by the benchmarks.
+
+The data is laid out on a regular grid. Each grid cell contains ten
+nodes arranged in a circle. There is one way for each cell connecting
+its nodes. Every fourth way is closed and tagged as a building, the others
+are tagged as roads. Every hundredth building is also the outer way of a
+multipolygon relation and every hundredth road is part of a route relation.
+"""
+import math
+
+import osmium
+
+NODES_PER_WAY = 10
+CELLS_PER_ROW = 1000
+CELL_SIZE = 0.001
+
+
+def _node_location(nid):
+    cell, pos = divmod(nid - 1, NODES_PER_WAY)
+    row, col = divmod(cell, CELLS_PER_ROW)
+    angle = 2 * math.pi * pos / NODES_PER_WAY
+    return (col * CELL_SIZE + 0.4 * CELL_SIZE * math.cos(angle),
+            row * CELL_SIZE + 0.4 * CELL_SIZE * math.sin(angle))
+
+
+def create_test_file(filename, num_nodes):
+    """ Write a synthetic OSM file with roughly _num_nodes_ nodes.
+        Returns the total number of objects written.
+    """
+    num_ways = num_nodes // NODES_PER_WAY
+    num_nodes = num_ways * NODES_PER_WAY
+    count = 0
+
+    with osmium.SimpleWriter(filename, overwrite=True) as writer:
+        for nid in range(1, num_nodes + 1):
+            if nid % 10 == 0:
+                tags = {'amenity': 'bench'}
+            elif nid % 25 == 0:
+                tags = {'name': f'Node {nid}', 'tourism': 'viewpoint'}
+            else:
+                tags = {}
+            writer.add_node(osmium.osm.mutable.Node(
+                id=nid, version=1, location=_node_location(nid), tags=tags))
+            count += 1
+
+        for wid in range(1, num_ways + 1):
+            nodes = list(range(NODES_PER_WAY * (wid - 1) + 1, NODES_PER_WAY * wid + 1))
+            if wid % 4 == 0:
+                nodes.append(nodes[0])
+                tags = {'building': 'yes'}
+            else:
+                tags = {'highway': 'residential', 'name': f'Street {wid}'}
+            writer.add_way(osmium.osm.mutable.Way(id=wid, version=1, nodes=nodes, tags=tags))
+            count += 1
+
+        rid = 0
+        for wid in range(400, num_ways + 1, 400):
+            rid += 1
+            writer.add_relation(osmium.osm.mutable.Relation(
+                id=rid, version=1, members=[('w', wid, 'outer')],
+                tags={'type': 'multipolygon', 'landuse': 'grass'}))
+            rid += 1
+            writer.add_relation(osmium.osm.mutable.Relation(
+                id=rid, version=1,
+                members=[('w', w, '') for w in range(wid - 99, wid, 4)],
+                tags={'type': 'route', 'route': 'bus'}))
+            count += 2
+
+    return count
@@ -0,0 +1,74 @@
+"""
+Measure how osmium.apply() scales when run from multiple Python threads.
+
+A synthetic PBF file is created in a temporary directory and then processed
+with a chain of native handlers, once sequentially and then from an increasing
+number of threads in parallel. With a purely native handler chain, apply()
+releases the GIL, so that the total runtime should stay roughly constant
+until the number of cores is exhausted.
+
+Pass '--python' to add a trivial Python handler to the chain for comparison.
+"""
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import osmium
+
+from synthetic import create_test_file
+
+
+class PythonCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def node(self, _):
+        self.count += 1
+
+
+def run_job(filename, with_python):
+    handlers = [osmium.NodeLocationsForWays(osmium.index.create_map('flex_mem')),
+                osmium.filter.KeyFilter('amenity')]
+    if with_python:
+        handlers.append(PythonCounter())
+    osmium.apply(filename, *handlers)
+
+
+def run_threaded(filename, num_threads, with_python):
+    threads = [threading.Thread(target=run_job, args=(filename, with_python))
+               for _ in range(num_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nodes', type=int, default=2_000_000,
+                        help='Number of nodes in the synthetic file')
+    parser.add_argument('--max-threads', type=int, default=4,
+                        help='Maximum number of parallel jobs')
+    parser.add_argument('--python', action='store_true',
+                        help='Add a Python handler to the handler chain')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = str(Path(tmpdir) / 'bench.osm.pbf')
+        create_test_file(filename, args.nodes)
+
+        single = run_threaded(filename, 1, args.python)
+        print("threads  jobs  time (s)  speedup vs. sequential")
+        for num in range(1, args.max_threads + 1):
+            elapsed = run_threaded(filename, num, args.python)
+            print(f"{num:7d}  {num:4d}  {elapsed:8.2f}  {single * num / elapsed:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
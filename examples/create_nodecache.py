@@ -1,3 +1,6 @@
+"""
+Create a persistent node location cache for an OSM file.
+"""
 import osmium
 import sys
 
@@ -5,11 +8,15 @@ if len(sys.argv) != 3:
     print("Usage: python create_nodecache.py <osm file> <node cache>")
     exit(-1)
 
-reader = osmium.io.Reader(sys.argv[1], osmium.osm.osm_entity_bits.NODE)
+with osmium.index.LocationCache(sys.argv[2], mode='w') as cache:
+    cache.source = sys.argv[1]
+    header = osmium.io.Reader(sys.argv[1], osmium.osm.NOTHING).header()
+    seq = header.get('osmosis_replication_sequence_number')
+    if seq:
+        cache.sequence = int(seq)
+    ts = header.get('osmosis_replication_timestamp')
+    if ts:
+        cache.timestamp = ts
 
-idx = osmium.index.create_map("sparse_file_array," + sys.argv[2])
-lh = osmium.NodeLocationsForWays(idx)
-
-osmium.apply(reader, lh)
-
-reader.close()
+    osmium.apply(osmium.io.Reader(sys.argv[1], osmium.osm.osm_entity_bits.NODE),
+                 osmium.NodeLocationsForWays(cache))
@@ -4,29 +4,15 @@ Iterate over all ways (and ways only) using node cache to obtain geometries
 import osmium
 import sys
 
-
-class WayHandler:
-
-    def __init__(self, idx):
-        self.idx = idx
-
-    def way(self, w):
-        locations = []
-        for n in w.nodes:
-            locations.append(idx.get(n.ref))  # note that cache is used here
-        print(w.id, len(w.nodes), locations)
-
-
 if len(sys.argv) != 3:
     print("Usage: python use_nodecache.py <osm file> <node cache>")
     exit()
 
-reader = osmium.io.Reader(sys.argv[1], osmium.osm.osm_entity_bits.WAY)
-
-idx = osmium.index.create_map("sparse_file_array," + sys.argv[2])
-lh = osmium.NodeLocationsForWays(idx)
-lh.ignore_errors()
+cache = osmium.index.LocationCache(sys.argv[2])
+print(f"Using cache for {cache.source} (sequence: {cache.sequence}, "
+      f"timestamp: {cache.timestamp})")
 
-osmium.apply(reader, lh, WayHandler(idx))
+for w in osmium.FileProcessor(sys.argv[1], osmium.osm.WAY).with_locations(cache):
+    print(w.id, len(w.nodes), [n.location for n in w.nodes])
 
-reader.close()
+cache.close()
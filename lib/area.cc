@@ -73,6 +73,8 @@ public:
         });
     }
 
+    bool needs_python() const override { return m_handlers.needs_python(); }
+
 private:
     py::args m_args;
     pyosmium::HandlerChain m_handlers;
@@ -0,0 +1,139 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+#include <optional>
+#include <string>
+#include <string_view>
+#include <unordered_set>
+#include <vector>
+
+#include <osmium/osm.hpp>
+
+#include "base_filter.h"
+#include "cast.h"
+
+namespace py = pybind11;
+
+namespace {
+
+template <typename T>
+std::optional<std::unordered_set<T>> make_set(py::object const &values, char const *name)
+{
+    if (values.is_none()) {
+        return std::nullopt;
+    }
+
+    std::unordered_set<T> result;
+    for (auto const &v: py::iter(values)) {
+        if (!py::isinstance<py::int_>(v)) {
+            throw py::type_error{std::string("'") + name + "' must contain integers."};
+        }
+        result.insert(v.cast<T>());
+    }
+    return result;
+}
+
+
+class AttributeFilter : public pyosmium::BaseFilter
+{
+public:
+    AttributeFilter(std::optional<osmium::Timestamp> since,
+                    std::optional<osmium::Timestamp> until,
+                    std::optional<osmium::object_version_type> min_version,
+                    std::optional<osmium::object_version_type> max_version,
+                    py::object const &changesets, py::object const &uids,
+                    py::object const &users, std::optional<bool> visible)
+    : m_since(since), m_until(until),
+      m_min_version(min_version), m_max_version(max_version),
+      m_changesets(make_set<osmium::changeset_id_type>(changesets, "changesets")),
+      m_uids(make_set<osmium::user_id_type>(uids, "uids")),
+      m_visible(visible)
+    {
+        if (!users.is_none()) {
+            for (auto const &u: py::iter(users)) {
+                if (!py::isinstance<py::str>(u)) {
+                    throw py::type_error{"'users' must contain strings."};
+                }
+                m_user_names.push_back(u.cast<std::string>());
+            }
+            // Views must only be taken once m_user_names is complete.
+            m_users.emplace();
+            for (auto const &u: m_user_names) {
+                m_users->emplace(u);
+            }
+        }
+
+        if (!m_since && !m_until && !m_min_version && !m_max_version
+            && !m_changesets && !m_uids && !m_users && !m_visible) {
+            throw py::type_error{"Need attributes to filter on."};
+        }
+    }
+
+    bool filter(osmium::OSMObject const *o) override
+    {
+        return !(matches_timestamp(o->timestamp())
+                 && (!m_min_version || o->version() >= *m_min_version)
+                 && (!m_max_version || o->version() <= *m_max_version)
+                 && (!m_changesets || m_changesets->count(o->changeset()))
+                 && matches_user(o->uid(), o->user())
+                 && (!m_visible || o->visible() == *m_visible));
+    }
+
+    bool filter_changeset(pyosmium::PyOSMChangeset &o) override
+    {
+        auto const *c = o.get();
+        return !(matches_timestamp(c->created_at())
+                 && (!m_changesets || m_changesets->count(c->id()))
+                 && matches_user(c->uid(), c->user()));
+    }
+
+private:
+    bool matches_timestamp(osmium::Timestamp ts) const
+    {
+        return (!m_since || ts >= *m_since) && (!m_until || ts < *m_until);
+    }
+
+    bool matches_user(osmium::user_id_type uid, char const *user) const
+    {
+        return (!m_uids || m_uids->count(uid)) && (!m_users || m_users->count(user));
+    }
+
+    std::optional<osmium::Timestamp> m_since;
+    std::optional<osmium::Timestamp> m_until;
+    std::optional<osmium::object_version_type> m_min_version;
+    std::optional<osmium::object_version_type> m_max_version;
+    std::optional<std::unordered_set<osmium::changeset_id_type>> m_changesets;
+    std::optional<std::unordered_set<osmium::user_id_type>> m_uids;
+    std::vector<std::string> m_user_names;
+    std::optional<std::unordered_set<std::string_view>> m_users;
+    std::optional<bool> m_visible;
+};
+
+} // namespace
+
+namespace pyosmium {
+
+void init_attribute_filter(pybind11::module &m)
+{
+    py::class_<AttributeFilter, pyosmium::BaseFilter, BaseHandler>(m, "AttributeFilter")
+        .def(py::init<std::optional<osmium::Timestamp>, std::optional<osmium::Timestamp>,
+                      std::optional<osmium::object_version_type>,
+                      std::optional<osmium::object_version_type>,
+                      py::object const &, py::object const &, py::object const &,
+                      std::optional<bool>>(),
+             py::kw_only(),
+             py::arg("since") = py::none(), py::arg("until") = py::none(),
+             py::arg("min_version") = py::none(), py::arg("max_version") = py::none(),
+             py::arg("changesets") = py::none(), py::arg("uids") = py::none(),
+             py::arg("users") = py::none(), py::arg("visible") = py::none())
+    ;
+}
+
+} // namespace
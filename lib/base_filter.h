@@ -70,6 +70,9 @@ void init_tag_filter(pybind11::module &m);
 void init_id_filter(pybind11::module &m);
 void init_entity_filter(pybind11::module &m);
 void init_geo_interface_filter(pybind11::module &m);
+void init_tag_expression_filter(pybind11::module &m);
+void init_geometry_filter(pybind11::module &m);
+void init_attribute_filter(pybind11::module &m);
 
 } // namespace
 
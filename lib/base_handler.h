@@ -32,6 +32,11 @@ public:
 
     virtual void flush() {}
 
+    // Returns true when the handler needs to call into Python while
+    // processing objects. Purely native handlers can be run without
+    // holding the GIL.
+    virtual bool needs_python() const { return false; }
+
     bool is_enabled_for(osmium::osm_entity_bits::type types) const
     {
         return types & m_enabled_for;
@@ -7,6 +7,7 @@
  */
 #ifndef PYOSMIUM_BUFFER_ITERATOR_H
 #define PYOSMIUM_BUFFER_ITERATOR_H
+#include <memory>
 #include <queue>
 
 #include <pybind11/pybind11.h>
@@ -14,6 +15,7 @@
 #include "osmium_module.h"
 #include "osm_base_objects.h"
 #include "handler_chain.h"
+#include "object_batch.h"
 
 namespace pyosmium {
 
@@ -30,12 +32,24 @@ public:
             m_current_it = buf.begin();
         }
 
-        m_buffers.push(std::move(buf));
+        m_buffers.push(std::make_shared<osmium::memory::Buffer>(std::move(buf)));
     }
 
     bool empty() const
     { return m_buffers.empty(); }
 
+    void set_recycle_objects(bool enable)
+    {
+        m_current.emplace<bool>(false);
+        if (enable) {
+            if (!m_pool) {
+                m_pool = std::make_unique<WrapperPool>();
+            }
+        } else {
+            m_pool.reset();
+        }
+    }
+
     pybind11::object next()
     {
         m_current.emplace<bool>(false);
@@ -45,12 +59,12 @@ public:
         }
 
         while (true) {
-            while (m_current_it == m_buffers.front().end()) {
+            while (m_current_it == m_buffers.front()->end()) {
                 m_buffers.pop();
                 if (m_buffers.empty()) {
                     throw pybind11::stop_iteration();
                 }
-                m_current_it = m_buffers.front().begin();
+                m_current_it = m_buffers.front()->begin();
             }
 
             osmium::OSMEntity *entity = &*m_current_it;
@@ -59,7 +73,7 @@ public:
             switch (entity->type()) {
                 case osmium::item_type::node:
                 {
-                    auto &obj = m_current.emplace<PyOSMNode>(entity);
+                    auto &obj = m_current.emplace<PyOSMNode>(entity, m_pool.get());
                     if (!m_handler.node(obj)) {
                         return obj.get_or_create_python_object();
                     }
@@ -67,7 +81,7 @@ public:
                 }
                 case osmium::item_type::way:
                 {
-                    auto &obj = m_current.emplace<PyOSMWay>(entity);
+                    auto &obj = m_current.emplace<PyOSMWay>(entity, m_pool.get());
                     if (!m_handler.way(obj)) {
                         return obj.get_or_create_python_object();
                     }
@@ -75,7 +89,7 @@ public:
                 }
                 case osmium::item_type::relation:
                 {
-                    auto &obj = m_current.emplace<PyOSMRelation>(entity);
+                    auto &obj = m_current.emplace<PyOSMRelation>(entity, m_pool.get());
                     if (!m_handler.relation(obj)) {
                         return obj.get_or_create_python_object();
                     }
@@ -83,7 +97,7 @@ public:
                 }
                 case osmium::item_type::area:
                 {
-                    auto &obj = m_current.emplace<PyOSMArea>(entity);
+                    auto &obj = m_current.emplace<PyOSMArea>(entity, m_pool.get());
                     if (!m_handler.area(obj)) {
                         return obj.get_or_create_python_object();
                     }
@@ -91,7 +105,7 @@ public:
                 }
                 case osmium::item_type::changeset:
                 {
-                    auto &obj = m_current.emplace<PyOSMChangeset>(entity);
+                    auto &obj = m_current.emplace<PyOSMChangeset>(entity, m_pool.get());
                     if (!m_handler.changeset(obj)) {
                         return obj.get_or_create_python_object();
                     }
@@ -105,13 +119,59 @@ public:
         return pybind11::object();
     }
 
+    std::shared_ptr<ObjectBatch> next_batch(std::size_t max_size,
+                                            bool invalidate_previous)
+    {
+        m_current.emplace<bool>(false);
+        if (m_batch) {
+            m_batch->invalidate();
+            m_batch.reset();
+        }
+
+        while (!m_buffers.empty()) {
+            auto batch = std::make_shared<ObjectBatch>(m_buffers.front());
+            while (m_current_it != m_buffers.front()->end()) {
+                osmium::OSMEntity *entity = &*m_current_it;
+                ++m_current_it;
+
+                auto *obj = batch->add(entity);
+                if (!obj) {
+                    continue;
+                }
+                if (handle_object(*obj, m_handler)) {
+                    batch->remove_last();
+                } else if (max_size > 0 && batch->size() >= max_size) {
+                    break;
+                }
+            }
+
+            if (m_current_it == m_buffers.front()->end()) {
+                m_buffers.pop();
+                if (!m_buffers.empty()) {
+                    m_current_it = m_buffers.front()->begin();
+                }
+            }
+
+            if (batch->size() > 0) {
+                if (invalidate_previous) {
+                    m_batch = batch;
+                }
+                return batch;
+            }
+        }
+
+        return nullptr;
+    }
 
 private:
     HandlerChain m_handler;
 
-    std::queue<osmium::memory::Buffer> m_buffers;
+    std::queue<std::shared_ptr<osmium::memory::Buffer>> m_buffers;
     osmium::memory::Buffer::iterator m_current_it;
+    // The pool must be destroyed after the current object.
+    std::unique_ptr<WrapperPool> m_pool;
     PyOSMAny m_current = false;
+    std::shared_ptr<ObjectBatch> m_batch;
 };
 
 } // namespace
@@ -0,0 +1,307 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+
+#include <osmium/osm.hpp>
+
+#include <cstdint>
+#include <cstring>
+#include <memory>
+#include <string>
+#include <vector>
+
+#include "base_handler.h"
+#include "osmium_module.h"
+
+namespace py = pybind11;
+
+namespace {
+
+/**
+ * Hand over the content of a vector to a numpy array without copying.
+ */
+template <typename T>
+py::array_t<T> to_array(std::vector<T> &&vec)
+{
+    auto *data = new std::vector<T>(std::move(vec));
+    py::capsule owner(data, [](void *p) { delete static_cast<std::vector<T> *>(p); });
+    return py::array_t<T>(static_cast<py::ssize_t>(data->size()), data->data(), owner);
+}
+
+
+/**
+ * Column of strings in Arrow-compatible layout: the concatenated UTF-8
+ * data and an offset array pointing to the start of each string.
+ */
+class StringColumn
+{
+public:
+    StringColumn() { m_offsets.push_back(0); }
+
+    void add(char const *str)
+    {
+        m_data.insert(m_data.end(), str, str + std::strlen(str));
+        m_offsets.push_back(static_cast<std::int64_t>(m_data.size()));
+    }
+
+    void take(py::dict &out, std::string const &name)
+    {
+        out[py::str(name + "_offsets")] = to_array(std::move(m_offsets));
+        out[py::str(name + "_data")] = to_array(std::move(m_data));
+        m_offsets.assign(1, 0);
+        m_data.clear();
+    }
+
+private:
+    std::vector<std::int64_t> m_offsets;
+    std::vector<std::uint8_t> m_data;
+};
+
+
+/**
+ * Complete tag lists of all objects, saved as list of key-value pairs.
+ */
+class TagListColumn
+{
+public:
+    TagListColumn() { m_offsets.push_back(0); }
+
+    void add(osmium::TagList const &tags)
+    {
+        for (auto const &tag: tags) {
+            m_keys.add(tag.key());
+            m_values.add(tag.value());
+        }
+        m_offsets.push_back(m_offsets.back() + static_cast<std::int64_t>(tags.size()));
+    }
+
+    void take(py::dict &out)
+    {
+        out["tag_offsets"] = to_array(std::move(m_offsets));
+        m_offsets.assign(1, 0);
+        m_keys.take(out, "tag_key");
+        m_values.take(out, "tag_value");
+    }
+
+private:
+    std::vector<std::int64_t> m_offsets;
+    StringColumn m_keys;
+    StringColumn m_values;
+};
+
+
+/**
+ * Values of a fixed set of tag keys, one string column per key.
+ * Objects without the tag get an empty string and are marked as
+ * missing in the validity column.
+ */
+class TagColumns
+{
+public:
+    explicit TagColumns(std::vector<std::string> const &keys)
+    : m_keys(keys), m_values(keys.size()), m_valid(keys.size())
+    {}
+
+    void add(osmium::TagList const &tags)
+    {
+        for (std::size_t i = 0; i < m_keys.size(); ++i) {
+            char const *value = tags.get_value_by_key(m_keys[i].c_str());
+            m_valid[i].push_back(value != nullptr);
+            m_values[i].add(value ? value : "");
+        }
+    }
+
+    py::dict take()
+    {
+        py::dict out;
+        for (std::size_t i = 0; i < m_keys.size(); ++i) {
+            m_values[i].take(out, m_keys[i]);
+            out[py::str(m_keys[i] + "_valid")] = to_bool_array(std::move(m_valid[i]));
+            m_valid[i].clear();
+        }
+
+        return out;
+    }
+
+private:
+    static py::array to_bool_array(std::vector<std::uint8_t> &&vec)
+    {
+        auto *data = new std::vector<std::uint8_t>(std::move(vec));
+        py::capsule owner(data, [](void *p) { delete static_cast<std::vector<std::uint8_t> *>(p); });
+        return py::array(py::dtype("?"), {static_cast<py::ssize_t>(data->size())},
+                         {static_cast<py::ssize_t>(1)}, data->data(), owner);
+    }
+
+    std::vector<std::string> const &m_keys;
+    std::vector<StringColumn> m_values;
+    std::vector<std::vector<std::uint8_t>> m_valid;
+};
+
+
+class ColumnCollector : public pyosmium::BaseHandler
+{
+public:
+    ColumnCollector(py::iterable const &tags, bool all_tags)
+    : m_all_tags(all_tags)
+    {
+        for (auto const &t: tags) {
+            m_keys.push_back(t.cast<std::string>());
+        }
+        m_node_tags = std::make_unique<TagColumns>(m_keys);
+        m_way_tags = std::make_unique<TagColumns>(m_keys);
+        m_relation_tags = std::make_unique<TagColumns>(m_keys);
+
+        m_enabled_for = osmium::osm_entity_bits::nwr;
+        m_way_offsets.push_back(0);
+        m_member_offsets.push_back(0);
+    }
+
+    bool node(pyosmium::PyOSMNode &o) override
+    {
+        auto const *node = o.get();
+        m_node_ids.push_back(node->id());
+        m_node_x.push_back(node->location().x());
+        m_node_y.push_back(node->location().y());
+        m_node_tags->add(node->tags());
+        if (m_all_tags) {
+            m_node_taglists.add(node->tags());
+        }
+        return false;
+    }
+
+    bool way(pyosmium::PyOSMWay &o) override
+    {
+        auto const *way = o.get();
+        m_way_ids.push_back(way->id());
+        for (auto const &nr: way->nodes()) {
+            m_way_refs.push_back(nr.ref());
+        }
+        m_way_offsets.push_back(static_cast<std::int64_t>(m_way_refs.size()));
+        m_way_tags->add(way->tags());
+        if (m_all_tags) {
+            m_way_taglists.add(way->tags());
+        }
+        return false;
+    }
+
+    bool relation(pyosmium::PyOSMRelation &o) override
+    {
+        auto const *rel = o.get();
+        m_relation_ids.push_back(rel->id());
+        for (auto const &member: rel->members()) {
+            m_member_types.push_back(osmium::item_type_to_char(member.type()));
+            m_member_refs.push_back(member.ref());
+            m_member_roles.add(member.role());
+        }
+        m_member_offsets.push_back(static_cast<std::int64_t>(m_member_refs.size()));
+        m_relation_tags->add(rel->tags());
+        if (m_all_tags) {
+            m_relation_taglists.add(rel->tags());
+        }
+        return false;
+    }
+
+    std::size_t size() const
+    {
+        return m_node_ids.size() + m_way_ids.size() + m_relation_ids.size();
+    }
+
+    py::dict take_columns()
+    {
+        using namespace pybind11::literals;
+
+        py::dict nodes{"id"_a=to_array(std::move(m_node_ids)),
+                       "x"_a=to_array(std::move(m_node_x)),
+                       "y"_a=to_array(std::move(m_node_y)),
+                       "tags"_a=m_node_tags->take()};
+
+        py::dict ways{"id"_a=to_array(std::move(m_way_ids)),
+                      "node_offsets"_a=to_array(std::move(m_way_offsets)),
+                      "node_refs"_a=to_array(std::move(m_way_refs)),
+                      "tags"_a=m_way_tags->take()};
+
+        auto *types = new std::vector<char>(std::move(m_member_types));
+        py::capsule owner(types, [](void *p) { delete static_cast<std::vector<char> *>(p); });
+        py::array member_types(py::dtype("S1"),
+                               {static_cast<py::ssize_t>(types->size())},
+                               {static_cast<py::ssize_t>(1)},
+                               types->data(), owner);
+
+        py::dict relations{"id"_a=to_array(std::move(m_relation_ids)),
+                           "member_offsets"_a=to_array(std::move(m_member_offsets)),
+                           "member_types"_a=member_types,
+                           "member_refs"_a=to_array(std::move(m_member_refs)),
+                           "tags"_a=m_relation_tags->take()};
+        m_member_roles.take(relations, "member_role");
+
+        if (m_all_tags) {
+            m_node_taglists.take(nodes);
+            m_way_taglists.take(ways);
+            m_relation_taglists.take(relations);
+        }
+
+        reset();
+
+        return py::dict("nodes"_a=nodes, "ways"_a=ways, "relations"_a=relations);
+    }
+
+private:
+    void reset()
+    {
+        m_node_ids.clear();
+        m_node_x.clear();
+        m_node_y.clear();
+        m_way_ids.clear();
+        m_way_offsets.assign(1, 0);
+        m_way_refs.clear();
+        m_relation_ids.clear();
+        m_member_offsets.assign(1, 0);
+        m_member_types.clear();
+        m_member_refs.clear();
+    }
+
+    std::vector<std::string> m_keys;
+    bool m_all_tags;
+
+    std::vector<std::int64_t> m_node_ids;
+    std::vector<std::int32_t> m_node_x;
+    std::vector<std::int32_t> m_node_y;
+    std::unique_ptr<TagColumns> m_node_tags;
+    TagListColumn m_node_taglists;
+
+    std::vector<std::int64_t> m_way_ids;
+    std::vector<std::int64_t> m_way_offsets;
+    std::vector<std::int64_t> m_way_refs;
+    std::unique_ptr<TagColumns> m_way_tags;
+    TagListColumn m_way_taglists;
+
+    std::vector<std::int64_t> m_relation_ids;
+    std::vector<std::int64_t> m_member_offsets;
+    std::vector<char> m_member_types;
+    std::vector<std::int64_t> m_member_refs;
+    StringColumn m_member_roles;
+    std::unique_ptr<TagColumns> m_relation_tags;
+    TagListColumn m_relation_taglists;
+};
+
+} // namespace
+
+namespace pyosmium {
+
+void init_column_collector(py::module &m)
+{
+    py::class_<ColumnCollector, BaseHandler>(m, "ColumnCollector")
+        .def(py::init<py::iterable const &, bool>(),
+             py::arg("tags") = py::tuple(), py::arg("all_tags") = false)
+        .def("take_columns", &ColumnCollector::take_columns)
+        .def("__len__", &ColumnCollector::size)
+    ;
+}
+
+} // namespace
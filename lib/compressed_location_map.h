@@ -0,0 +1,268 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#ifndef PYOSMIUM_COMPRESSED_LOCATION_MAP_H
+#define PYOSMIUM_COMPRESSED_LOCATION_MAP_H
+
+#include <array>
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+#include <mutex>
+#include <vector>
+
+#include <osmium/osm/location.hpp>
+#include <osmium/osm/types.hpp>
+#include <osmium/index/index.hpp>
+#include <osmium/index/map.hpp>
+
+namespace pyosmium {
+
+/**
+ * In-memory location store which keeps the locations in compressed blocks.
+ *
+ * The ID space is divided into blocks of 4096 IDs. Each block saves the
+ * locations it contains as a sequence of varints: the number of entries,
+ * followed by the difference to the previous ID and the zigzag-encoded
+ * differences of the x and y coordinates for each location.
+ *
+ * Writing happens into a decoded block, which is compressed when a
+ * location outside the block is set. Writing locations in order of
+ * their IDs is therefore cheap. A small cache of decoded blocks
+ * speeds up lookups of locations with nearby IDs.
+ */
+class CompressedLocationMap
+: public osmium::index::map::Map<osmium::unsigned_object_id_type, osmium::Location>
+{
+    using id_type = osmium::unsigned_object_id_type;
+
+    static constexpr unsigned block_bits = 12;
+    static constexpr std::size_t block_size = std::size_t{1} << block_bits;
+    static constexpr std::size_t cache_size = 8;
+    static constexpr id_type no_block = ~id_type{0};
+
+    using DecodedBlock = std::array<osmium::Location, block_size>;
+
+    struct CacheEntry
+    {
+        id_type block = no_block;
+        std::unique_ptr<DecodedBlock> data = std::make_unique<DecodedBlock>();
+    };
+
+public:
+    void set(id_type id, osmium::Location value) override
+    {
+        std::lock_guard<std::mutex> lock{m_mutex};
+        auto const block = id >> block_bits;
+        if (block != m_write_block) {
+            flush();
+            decode(block, *m_write_data);
+            m_write_block = block;
+            m_write_count = count(*m_write_data);
+            // The cache must not keep a stale copy of the block.
+            for (auto &entry: m_cache) {
+                if (entry.block == block) {
+                    entry.block = no_block;
+                }
+            }
+        }
+        (*m_write_data)[id & (block_size - 1)] = value;
+    }
+
+    osmium::Location get(id_type id) const override
+    {
+        auto const loc = get_noexcept(id);
+        if (loc.is_undefined()) {
+            throw osmium::not_found{id};
+        }
+        return loc;
+    }
+
+    osmium::Location get_noexcept(id_type id) const noexcept override
+    {
+        std::lock_guard<std::mutex> lock{m_mutex};
+        auto const block = id >> block_bits;
+        auto const offset = id & (block_size - 1);
+
+        if (block == m_write_block) {
+            return (*m_write_data)[offset];
+        }
+        if (block >= m_blocks.size() || m_blocks[block].empty()) {
+            return osmium::Location{};
+        }
+
+        for (auto const &entry: m_cache) {
+            if (entry.block == block) {
+                return (*entry.data)[offset];
+            }
+        }
+
+        auto &entry = m_cache[m_cache_next];
+        m_cache_next = (m_cache_next + 1) % cache_size;
+        decode(block, *entry.data);
+        entry.block = block;
+
+        return (*entry.data)[offset];
+    }
+
+    std::size_t size() const override
+    {
+        std::lock_guard<std::mutex> lock{m_mutex};
+        if (m_write_block == no_block) {
+            return m_size;
+        }
+        return m_size - m_write_count + count(*m_write_data);
+    }
+
+    std::size_t used_memory() const override
+    {
+        std::lock_guard<std::mutex> lock{m_mutex};
+        return m_blocks.capacity() * sizeof(Block) + m_encoded_bytes
+               + (cache_size + 1) * sizeof(DecodedBlock);
+    }
+
+    void clear() override
+    {
+        std::lock_guard<std::mutex> lock{m_mutex};
+        m_blocks.clear();
+        m_blocks.shrink_to_fit();
+        m_size = 0;
+        m_encoded_bytes = 0;
+        m_write_block = no_block;
+        for (auto &entry: m_cache) {
+            entry.block = no_block;
+        }
+    }
+
+private:
+    using Block = std::vector<unsigned char>;
+
+    static void add_varint(Block &out, std::uint64_t value)
+    {
+        while (value >= 0x80U) {
+            out.push_back(static_cast<unsigned char>((value & 0x7fU) | 0x80U));
+            value >>= 7U;
+        }
+        out.push_back(static_cast<unsigned char>(value));
+    }
+
+    static std::uint64_t read_varint(unsigned char const *&data) noexcept
+    {
+        std::uint64_t value = 0;
+        unsigned shift = 0;
+        while (*data & 0x80U) {
+            value |= static_cast<std::uint64_t>(*data & 0x7fU) << shift;
+            shift += 7;
+            ++data;
+        }
+        value |= static_cast<std::uint64_t>(*data) << shift;
+        ++data;
+        return value;
+    }
+
+    static std::uint64_t zigzag(std::int64_t value) noexcept
+    {
+        return (static_cast<std::uint64_t>(value) << 1U) ^ static_cast<std::uint64_t>(value >> 63);
+    }
+
+    static std::int64_t unzigzag(std::uint64_t value) noexcept
+    {
+        return static_cast<std::int64_t>(value >> 1U) ^ -static_cast<std::int64_t>(value & 1U);
+    }
+
+    static std::size_t count(DecodedBlock const &data) noexcept
+    {
+        std::size_t num = 0;
+        for (auto const &loc: data) {
+            if (!loc.is_undefined()) {
+                ++num;
+            }
+        }
+        return num;
+    }
+
+    void decode(id_type block, DecodedBlock &out) const noexcept
+    {
+        out.fill(osmium::Location{});
+        if (block >= m_blocks.size() || m_blocks[block].empty()) {
+            return;
+        }
+
+        unsigned char const *data = m_blocks[block].data();
+        auto const num = read_varint(data);
+        std::uint64_t offset = 0;
+        std::int64_t x = 0;
+        std::int64_t y = 0;
+        for (std::uint64_t i = 0; i < num; ++i) {
+            offset += read_varint(data);
+            x += unzigzag(read_varint(data));
+            y += unzigzag(read_varint(data));
+            out[offset] = osmium::Location{static_cast<std::int32_t>(x),
+                                           static_cast<std::int32_t>(y)};
+        }
+    }
+
+    void flush()
+    {
+        if (m_write_block == no_block) {
+            return;
+        }
+
+        auto const num = count(*m_write_data);
+        if (m_write_block >= m_blocks.size()) {
+            if (num == 0) {
+                m_write_block = no_block;
+                return;
+            }
+            m_blocks.resize(m_write_block + 1);
+        }
+
+        m_scratch.clear();
+        if (num > 0) {
+            add_varint(m_scratch, num);
+            std::uint64_t prev_offset = 0;
+            std::int64_t prev_x = 0;
+            std::int64_t prev_y = 0;
+            for (std::size_t i = 0; i < block_size; ++i) {
+                auto const &loc = (*m_write_data)[i];
+                if (!loc.is_undefined()) {
+                    add_varint(m_scratch, i - prev_offset);
+                    add_varint(m_scratch, zigzag(loc.x() - prev_x));
+                    add_varint(m_scratch, zigzag(loc.y() - prev_y));
+                    prev_offset = i;
+                    prev_x = loc.x();
+                    prev_y = loc.y();
+                }
+            }
+        }
+
+        auto &stored = m_blocks[m_write_block];
+        m_encoded_bytes -= stored.size();
+        Block(m_scratch.begin(), m_scratch.end()).swap(stored);
+        m_encoded_bytes += stored.size();
+
+        m_size = m_size - m_write_count + num;
+        m_write_block = no_block;
+    }
+
+    std::vector<Block> m_blocks;
+    std::size_t m_size = 0;
+    std::size_t m_encoded_bytes = 0;
+
+    id_type m_write_block = no_block;
+    std::size_t m_write_count = 0;
+    std::unique_ptr<DecodedBlock> m_write_data = std::make_unique<DecodedBlock>();
+    Block m_scratch;
+
+    mutable std::array<CacheEntry, cache_size> m_cache;
+    mutable std::size_t m_cache_next = 0;
+    mutable std::mutex m_mutex;
+};
+
+} // namespace pyosmium
+
+#endif // PYOSMIUM_COMPRESSED_LOCATION_MAP_H
@@ -15,8 +15,12 @@
 #include "osm_base_objects.h"
 #include "handler_chain.h"
 #include "python_handler.h"
+#include "object_batch.h"
 #include "io.h"
 
+#include <memory>
+#include <optional>
+
 namespace py = pybind11;
 
 namespace {
@@ -27,10 +31,14 @@ public:
     OsmFileIterator(pyosmium::PyReader &reader, py::args args)
     : m_reader(reader.get()), m_handler(args)
     {
-        m_buffer = m_reader->read();
+        {
+            // The input may be fed by another Python thread.
+            py::gil_scoped_release release;
+            m_buffer = std::make_shared<osmium::memory::Buffer>(m_reader->read());
+        }
 
-        if (m_buffer) {
-            m_buffer_it = m_buffer.begin();
+        if (*m_buffer) {
+            m_buffer_it = m_buffer->begin();
         }
     }
 
@@ -39,17 +47,14 @@ public:
         while (true) {
             m_current.emplace<bool>(false);
 
-            if (!m_buffer) {
+            if (!*m_buffer) {
                 throw pybind11::stop_iteration();
             }
 
-            while (m_buffer_it == m_buffer.end()) {
-                m_buffer = m_reader->read();
-                if (!m_buffer) {
-                    m_handler.flush();
+            while (m_buffer_it == m_buffer->end()) {
+                if (!read_next_buffer()) {
                     throw pybind11::stop_iteration();
                 }
-                m_buffer_it = m_buffer.begin();
             }
 
             osmium::OSMEntity *entity = &*m_buffer_it;
@@ -58,7 +63,7 @@ public:
             switch (entity->type()) {
                 case osmium::item_type::node:
                 {
-                    auto &obj = m_current.emplace<pyosmium::PyOSMNode>(entity);
+                    auto &obj = m_current.emplace<pyosmium::PyOSMNode>(entity, m_pool.get());
                     if (!m_handler.node(obj)) {
                         return obj.get_or_create_python_object();
                     } else if (m_filtered_handler) {
@@ -68,7 +73,7 @@ public:
                 }
                 case osmium::item_type::way:
                 {
-                    auto &obj = m_current.emplace<pyosmium::PyOSMWay>(entity);
+                    auto &obj = m_current.emplace<pyosmium::PyOSMWay>(entity, m_pool.get());
                     if (!m_handler.way(obj)) {
                         return obj.get_or_create_python_object();
                     } else if (m_filtered_handler) {
@@ -78,7 +83,7 @@ public:
                 }
                 case osmium::item_type::relation:
                 {
-                    auto &obj = m_current.emplace<pyosmium::PyOSMRelation>(entity);
+                    auto &obj = m_current.emplace<pyosmium::PyOSMRelation>(entity, m_pool.get());
                     if (!m_handler.relation(obj)) {
                         return obj.get_or_create_python_object();
                     } else if (m_filtered_handler) {
@@ -88,7 +93,7 @@ public:
                 }
                 case osmium::item_type::area:
                 {
-                    auto &obj = m_current.emplace<pyosmium::PyOSMArea>(entity);
+                    auto &obj = m_current.emplace<pyosmium::PyOSMArea>(entity, m_pool.get());
                     if (!m_handler.area(obj)) {
                         return obj.get_or_create_python_object();
                     } else if (m_filtered_handler) {
@@ -98,7 +103,7 @@ public:
                 }
                 case osmium::item_type::changeset:
                 {
-                    auto &obj = m_current.emplace<pyosmium::PyOSMChangeset>(entity);
+                    auto &obj = m_current.emplace<pyosmium::PyOSMChangeset>(entity, m_pool.get());
                     if (!m_handler.changeset(obj)) {
                         return obj.get_or_create_python_object();
                     } else if (m_filtered_handler) {
@@ -114,6 +119,77 @@ public:
        return pybind11::object();
     }
 
+    std::shared_ptr<pyosmium::ObjectBatch> next_batch(std::size_t max_size,
+                                                      bool invalidate_previous)
+    {
+        m_current.emplace<bool>(false);
+        if (m_batch) {
+            m_batch->invalidate();
+            m_batch.reset();
+        }
+
+        if (!*m_buffer) {
+            return nullptr;
+        }
+
+        // Without any Python handlers involved, decoding and filtering
+        // can run without holding the GIL.
+        bool const native = !m_handler.needs_python()
+                            && !(m_filtered_handler && m_filtered_handler->needs_python());
+        std::optional<py::gil_scoped_release> release;
+        if (native) {
+            release.emplace();
+        }
+
+        auto batch = std::make_shared<pyosmium::ObjectBatch>(m_buffer);
+        while (true) {
+            if (m_buffer_it == m_buffer->end()) {
+                if (batch->size() > 0) {
+                    break;
+                }
+                if (!read_next_buffer(!native)) {
+                    return nullptr;
+                }
+                batch = std::make_shared<pyosmium::ObjectBatch>(m_buffer);
+                continue;
+            }
+
+            osmium::OSMEntity *entity = &*m_buffer_it;
+            ++m_buffer_it;
+
+            auto *obj = batch->add(entity);
+            if (!obj) {
+                continue;
+            }
+
+            if (pyosmium::handle_object(*obj, m_handler)) {
+                if (m_filtered_handler) {
+                    pyosmium::handle_object(*obj, *m_filtered_handler);
+                }
+                batch->remove_last();
+            } else if (max_size > 0 && batch->size() >= max_size) {
+                break;
+            }
+        }
+
+        if (invalidate_previous) {
+            m_batch = batch;
+        }
+        return batch;
+    }
+
+    void set_recycle_objects(bool enable)
+    {
+        m_current.emplace<bool>(false);
+        if (enable) {
+            if (!m_pool) {
+                m_pool = std::make_unique<pyosmium::WrapperPool>();
+            }
+        } else {
+            m_pool.reset();
+        }
+    }
+
     void set_filtered_handler(pyosmium::BaseHandler *handler) {
         m_filtered_handler = handler;
     }
@@ -124,10 +200,29 @@ public:
     }
 
 private:
+    bool read_next_buffer(bool release_gil = true)
+    {
+        if (release_gil) {
+            py::gil_scoped_release release;
+            m_buffer = std::make_shared<osmium::memory::Buffer>(m_reader->read());
+        } else {
+            m_buffer = std::make_shared<osmium::memory::Buffer>(m_reader->read());
+        }
+        if (!*m_buffer) {
+            m_handler.flush();
+            return false;
+        }
+        m_buffer_it = m_buffer->begin();
+        return true;
+    }
+
     osmium::io::Reader *m_reader;
-    osmium::memory::Buffer m_buffer;
+    std::shared_ptr<osmium::memory::Buffer> m_buffer;
     osmium::memory::Buffer::iterator m_buffer_it;
+    // The pool must be destroyed after the current object.
+    std::unique_ptr<pyosmium::WrapperPool> m_pool;
     pyosmium::PyOSMAny m_current;
+    std::shared_ptr<pyosmium::ObjectBatch> m_batch;
 
     pyosmium::HandlerChain m_handler;
     pyosmium::BaseHandler *m_filtered_handler = nullptr;
@@ -147,8 +242,12 @@ void init_osm_file_iterator(py::module &m)
              py::keep_alive<1, 2>())
         .def("set_filtered_handler", &OsmFileIterator::set_filtered_python_handler,
              py::keep_alive<1, 2>())
+        .def("set_recycle_objects", &OsmFileIterator::set_recycle_objects,
+             py::arg("enable") = true)
         .def("__iter__", [](py::object const &self) { return self; })
         .def("__next__", &OsmFileIterator::next)
+        .def("next_batch", &OsmFileIterator::next_batch,
+             py::arg("max_size") = 0, py::arg("invalidate_previous") = true)
         ;
 }
 
@@ -24,5 +24,8 @@ PYBIND11_MODULE(filter, m)
     pyosmium::init_entity_filter(m);
     pyosmium::init_id_filter(m);
     pyosmium::init_geo_interface_filter(m);
+    pyosmium::init_tag_expression_filter(m);
+    pyosmium::init_geometry_filter(m);
+    pyosmium::init_attribute_filter(m);
 };
 
@@ -0,0 +1,124 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#include <pybind11/pybind11.h>
+
+#include <chrono>
+#include <string>
+#include <vector>
+
+#include "base_handler.h"
+#include "handler_chain.h"
+#include "osmium_module.h"
+
+namespace py = pybind11;
+
+namespace {
+
+/**
+ * Handler that runs a chain of handlers and reorders the native filters
+ * in the chain according to their observed cost and selectivity.
+ */
+class FilterOptimizer : public pyosmium::BaseHandler
+{
+public:
+    FilterOptimizer(py::args args, std::size_t sample_size)
+    : m_handler(args)
+    {
+        if (sample_size == 0) {
+            throw py::value_error{"'sample_size' must be at least 1."};
+        }
+
+        for (auto const &arg: args) {
+            m_names.push_back(arg.get_type().attr("__name__").cast<std::string>());
+        }
+        m_handler.enable_reordering(sample_size);
+    }
+
+    bool node(pyosmium::PyOSMNode &o) override
+    { return m_handler.node(o); }
+
+    bool way(pyosmium::PyOSMWay &o) override
+    { return m_handler.way(o); }
+
+    bool relation(pyosmium::PyOSMRelation &o) override
+    { return m_handler.relation(o); }
+
+    bool area(pyosmium::PyOSMArea &o) override
+    { return m_handler.area(o); }
+
+    bool changeset(pyosmium::PyOSMChangeset &o) override
+    { return m_handler.changeset(o); }
+
+    void flush() override
+    { m_handler.flush(); }
+
+    bool needs_python() const override
+    { return m_handler.needs_python(); }
+
+    py::dict report() const
+    {
+        using namespace pybind11::literals;
+        using seconds = std::chrono::duration<double>;
+        static char const *types[] = {"node", "way", "relation", "area", "changeset"};
+
+        py::dict out;
+        for (std::size_t t = 0; t < 5; ++t) {
+            auto const &state = m_handler.handler_order(t);
+            if (state.sampled == 0) {
+                continue;
+            }
+
+            py::list handlers;
+            for (std::size_t i = 0; i < m_names.size(); ++i) {
+                auto const &counter = state.samples[i];
+                py::dict entry{"name"_a=m_names[i],
+                               "reorderable"_a=m_handler.is_reorderable(i)};
+                if (counter.calls > 0) {
+                    entry["calls"] = counter.calls;
+                    entry["rejected"] = counter.rejected;
+                    entry["time"] = std::chrono::duration_cast<seconds>(counter.time).count();
+                }
+                handlers.append(entry);
+            }
+
+            py::object order = py::none();
+            if (!state.order.empty()) {
+                py::list names;
+                for (auto const i: state.order) {
+                    names.append(m_names[i]);
+                }
+                order = names;
+            }
+
+            out[types[t]] = py::dict{"sampled"_a=state.sampled,
+                                     "order"_a=order,
+                                     "handlers"_a=handlers};
+        }
+
+        return out;
+    }
+
+private:
+    pyosmium::HandlerChain m_handler;
+    std::vector<std::string> m_names;
+};
+
+} // namespace
+
+namespace pyosmium {
+
+void init_filter_optimizer(py::module &m)
+{
+    py::class_<FilterOptimizer, BaseHandler>(m, "FilterOptimizer")
+        .def(py::init<py::args, std::size_t>(), py::keep_alive<1, 2>(),
+             py::arg("sample_size") = 10000)
+        .def("report", &FilterOptimizer::report)
+    ;
+}
+
+} // namespace
@@ -9,25 +9,56 @@
 #include <vector>
 
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
 
 #include <osmium/osm/tag.hpp>
-#include <osmium/geom/geojson.hpp>
+#include <osmium/geom/factory.hpp>
 
 #include "base_filter.h"
 
 namespace {
 
+/**
+ * Collect the locations of a node list, dropping consecutive duplicates.
+ * Throws an invalid_location error when a location is missing.
+ */
+void collect_locations(osmium::NodeRefList const &nodes,
+                       std::vector<osmium::Location> &out)
+{
+    out.clear();
+    for (auto const &nr: nodes) {
+        auto const &loc = nr.location();
+        if (!loc.valid()) {
+            throw osmium::invalid_location{"invalid location"};
+        }
+        if (out.empty() || out.back() != loc) {
+            out.push_back(loc);
+        }
+    }
+}
+
 class GeoInterfaceFilter : public pyosmium::BaseFilter
 {
 public:
-    GeoInterfaceFilter(bool drop_invalid_geometries, pybind11::iterable const &tags)
+    GeoInterfaceFilter(bool drop_invalid_geometries, pybind11::iterable const &tags,
+                       std::string const &coordinates)
     : m_drop_invalid_geometries(drop_invalid_geometries)
     {
         for (auto &t: pybind11::iter(tags)) {
             m_tags.push_back(t.cast<std::string>());
         }
+
+        if (coordinates == "numpy") {
+            // Fail early when numpy is not available.
+            pybind11::module_::import("numpy");
+            m_numpy = true;
+        } else if (coordinates != "list") {
+            throw pybind11::value_error{"'coordinates' must be one of 'list' or 'numpy'."};
+        }
     }
 
+    bool needs_python() const override { return true; }
+
 protected:
     bool filter_node(pyosmium::PyOSMNode &o) override
     {
@@ -47,7 +78,14 @@ protected:
     bool filter_way(pyosmium::PyOSMWay &o) override
     {
         try {
-            auto geom = json_loads(m_factory.create_linestring(*(o.get())));
+            collect_locations(o.get()->nodes(), m_locations);
+            if (m_locations.size() < 2) {
+                throw osmium::geometry_error{"need at least two points for linestring"};
+            }
+
+            using namespace pybind11::literals;
+            pybind11::dict geom{"type"_a="LineString",
+                                "coordinates"_a=make_coordinates()};
 
             set_geoif(o.get_or_create_python_object(), o.get()->tags(), geom);
         } catch (const osmium::geometry_error& e) {
@@ -64,7 +102,25 @@ protected:
     bool filter_area(pyosmium::PyOSMArea &o) override
     {
         try {
-            auto geom = json_loads(m_factory.create_multipolygon(*(o.get())));
+            auto const *area = o.get();
+            pybind11::list polygons;
+            for (auto const &outer: area->outer_rings()) {
+                pybind11::list rings;
+                collect_locations(outer, m_locations);
+                rings.append(make_coordinates());
+                for (auto const &inner: area->inner_rings(outer)) {
+                    collect_locations(inner, m_locations);
+                    rings.append(make_coordinates());
+                }
+                polygons.append(rings);
+            }
+            if (polygons.empty()) {
+                throw osmium::geometry_error{"invalid area"};
+            }
+
+            using namespace pybind11::literals;
+            pybind11::dict geom{"type"_a="MultiPolygon",
+                                "coordinates"_a=polygons};
 
             set_geoif(o.get_or_create_python_object(), o.get()->tags(), geom);
         } catch (const osmium::geometry_error& e) {
@@ -74,6 +130,32 @@ protected:
     }
 
 private:
+    // Coordinate sequence of the collected locations, either as a list
+    // of [lon, lat] lists or as a numpy array of shape (n, 2).
+    pybind11::object make_coordinates() const
+    {
+        auto const num = static_cast<pybind11::ssize_t>(m_locations.size());
+
+        if (m_numpy) {
+            pybind11::array_t<double> coords({num, pybind11::ssize_t(2)});
+            auto data = coords.mutable_unchecked<2>();
+            for (pybind11::ssize_t i = 0; i < num; ++i) {
+                data(i, 0) = m_locations[i].lon_without_check();
+                data(i, 1) = m_locations[i].lat_without_check();
+            }
+            return std::move(coords);
+        }
+
+        pybind11::list coords(num);
+        for (pybind11::ssize_t i = 0; i < num; ++i) {
+            pybind11::list pt(2);
+            pt[0] = pybind11::float_(m_locations[i].lon_without_check());
+            pt[1] = pybind11::float_(m_locations[i].lat_without_check());
+            coords[i] = std::move(pt);
+        }
+        return std::move(coords);
+    }
+
     void set_geoif(pybind11::object obj, osmium::TagList const &tags, pybind11::object &geom)
     {
         using namespace pybind11::literals;
@@ -101,8 +183,8 @@ private:
 
     bool m_drop_invalid_geometries;
     std::vector<std::string> m_tags;
-    osmium::geom::GeoJSONFactory<> m_factory;
-    pybind11::object json_loads = pybind11::module_::import("json").attr("loads");
+    bool m_numpy = false;
+    std::vector<osmium::Location> m_locations;
 };
 
 } // namespace
@@ -112,9 +194,10 @@ namespace pyosmium {
 void init_geo_interface_filter(pybind11::module &m)
 {
     pybind11::class_<GeoInterfaceFilter, pyosmium::BaseFilter, pyosmium::BaseHandler>(m, "GeoInterfaceFilter")
-        .def(pybind11::init<bool, pybind11::iterable const &>(),
+        .def(pybind11::init<bool, pybind11::iterable const &, std::string const &>(),
              pybind11::arg("drop_invalid_geometries") = true,
-             pybind11::arg("tags") = pybind11::list())
+             pybind11::arg("tags") = pybind11::list(),
+             pybind11::arg("coordinates") = "list")
     ;
 }
 
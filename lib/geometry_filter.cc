@@ -0,0 +1,672 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+#include <algorithm>
+#include <cctype>
+#include <cmath>
+#include <cstdint>
+#include <cstdlib>
+#include <cstring>
+#include <optional>
+#include <string>
+#include <string_view>
+#include <vector>
+
+#include <osmium/osm.hpp>
+#include <osmium/osm/box.hpp>
+
+#include "base_filter.h"
+
+namespace py = pybind11;
+
+namespace {
+
+struct Point
+{
+    double x;
+    double y;
+};
+
+using Ring = std::vector<Point>;
+using Polygon = std::vector<Ring>;
+
+
+double cross(Point o, Point a, Point b)
+{
+    return (a.x - o.x) * (b.y - o.y) - (a.y - o.y) * (b.x - o.x);
+}
+
+
+bool in_box(Point a, Point b, Point p)
+{
+    return std::min(a.x, b.x) <= p.x && p.x <= std::max(a.x, b.x)
+           && std::min(a.y, b.y) <= p.y && p.y <= std::max(a.y, b.y);
+}
+
+
+bool segments_intersect(Point p1, Point p2, Point q1, Point q2)
+{
+    double const d1 = cross(q1, q2, p1);
+    double const d2 = cross(q1, q2, p2);
+    double const d3 = cross(p1, p2, q1);
+    double const d4 = cross(p1, p2, q2);
+
+    if (((d1 > 0 && d2 < 0) || (d1 < 0 && d2 > 0))
+        && ((d3 > 0 && d4 < 0) || (d3 < 0 && d4 > 0))) {
+        return true;
+    }
+
+    return (d1 == 0 && in_box(q1, q2, p1)) || (d2 == 0 && in_box(q1, q2, p2))
+           || (d3 == 0 && in_box(p1, p2, q1)) || (d4 == 0 && in_box(p1, p2, q2));
+}
+
+
+/**
+ * A single polygon (outer ring with holes) with a grid index for fast
+ * point-in-polygon and segment intersection tests.
+ *
+ * The bounding box of the polygon is split into a grid. Every row keeps
+ * the list of edges that cross its band, so that a point test only needs
+ * to look at the edges of a single row. Cells which are not touched by any
+ * edge are classified as completely inside or outside in advance.
+ */
+class PolygonIndex
+{
+    enum class Cell : std::uint8_t { Outside, Inside, Border };
+
+    struct Edge
+    {
+        Point a;
+        Point b;
+    };
+
+public:
+    explicit PolygonIndex(Polygon const &polygon)
+    {
+        double area = 0;
+        for (auto const &ring: polygon) {
+            for (std::size_t i = 0; i < ring.size(); ++i) {
+                auto const &a = ring[i];
+                auto const &b = ring[(i + 1) % ring.size()];
+                if (a.x != b.x || a.y != b.y) {
+                    area += a.x * b.y - b.x * a.y;
+                    m_edges.push_back({a, b});
+                    m_min = {std::min({m_min.x, a.x, b.x}), std::min({m_min.y, a.y, b.y})};
+                    m_max = {std::max({m_max.x, a.x, b.x}), std::max({m_max.y, a.y, b.y})};
+                }
+            }
+        }
+
+        if (m_edges.size() < 3 || area == 0) {
+            throw py::value_error{"Polygon geometry has no area."};
+        }
+
+        int const dim = std::clamp(static_cast<int>(2 * std::sqrt(m_edges.size())), 16, 1024);
+        m_cols = m_rows = dim;
+        m_cell_width = (m_max.x - m_min.x) / m_cols;
+        m_cell_height = (m_max.y - m_min.y) / m_rows;
+
+        m_row_edges.resize(m_rows);
+        m_cells.assign(static_cast<std::size_t>(m_rows) * m_cols, Cell::Outside);
+
+        for (std::size_t i = 0; i < m_edges.size(); ++i) {
+            auto const &e = m_edges[i];
+            int const r0 = row_of(std::min(e.a.y, e.b.y));
+            int const r1 = row_of(std::max(e.a.y, e.b.y));
+            for (int r = r0; r <= r1; ++r) {
+                m_row_edges[r].push_back(i);
+
+                // Mark the cells the edge passes through in this row.
+                double x0 = std::min(e.a.x, e.b.x);
+                double x1 = std::max(e.a.x, e.b.x);
+                if (e.a.y != e.b.y) {
+                    double const ylo = std::max(m_min.y + r * m_cell_height,
+                                                std::min(e.a.y, e.b.y));
+                    double const yhi = std::min(m_min.y + (r + 1) * m_cell_height,
+                                                std::max(e.a.y, e.b.y));
+                    double const xa = x_at(e, ylo);
+                    double const xb = x_at(e, yhi);
+                    x0 = std::min(xa, xb);
+                    x1 = std::max(xa, xb);
+                }
+                for (int c = col_of(x0); c <= col_of(x1); ++c) {
+                    cell(r, c) = Cell::Border;
+                }
+            }
+        }
+
+        for (int r = 0; r < m_rows; ++r) {
+            for (int c = 0; c < m_cols; ++c) {
+                if (cell(r, c) != Cell::Border) {
+                    Point const center{m_min.x + (c + 0.5) * m_cell_width,
+                                       m_min.y + (r + 0.5) * m_cell_height};
+                    cell(r, c) = crossing_test(r, center) ? Cell::Inside : Cell::Outside;
+                }
+            }
+        }
+    }
+
+    bool contains(Point p) const
+    {
+        if (p.x < m_min.x || p.x > m_max.x || p.y < m_min.y || p.y > m_max.y) {
+            return false;
+        }
+
+        int const r = row_of(p.y);
+        switch (cell(r, col_of(p.x))) {
+            case Cell::Inside: return true;
+            case Cell::Outside: return false;
+            default: return crossing_test(r, p);
+        }
+    }
+
+    bool intersects(Point a, Point b) const
+    {
+        if (std::max(a.x, b.x) < m_min.x || std::min(a.x, b.x) > m_max.x
+            || std::max(a.y, b.y) < m_min.y || std::min(a.y, b.y) > m_max.y) {
+            return false;
+        }
+
+        int const r1 = row_of(std::max(a.y, b.y));
+        for (int r = row_of(std::min(a.y, b.y)); r <= r1; ++r) {
+            for (auto const i: m_row_edges[r]) {
+                if (segments_intersect(a, b, m_edges[i].a, m_edges[i].b)) {
+                    return true;
+                }
+            }
+        }
+
+        return false;
+    }
+
+    Point some_point() const { return m_edges.front().a; }
+
+private:
+    static double x_at(Edge const &e, double y)
+    {
+        return e.a.x + (y - e.a.y) * (e.b.x - e.a.x) / (e.b.y - e.a.y);
+    }
+
+    int row_of(double y) const
+    {
+        return std::clamp(static_cast<int>((y - m_min.y) / m_cell_height), 0, m_rows - 1);
+    }
+
+    int col_of(double x) const
+    {
+        return std::clamp(static_cast<int>((x - m_min.x) / m_cell_width), 0, m_cols - 1);
+    }
+
+    Cell &cell(int r, int c) { return m_cells[static_cast<std::size_t>(r) * m_cols + c]; }
+    Cell cell(int r, int c) const { return m_cells[static_cast<std::size_t>(r) * m_cols + c]; }
+
+    // Even-odd rule with a ray in positive x direction. All edges that
+    // can cross the ray are in the row of the point.
+    bool crossing_test(int row, Point p) const
+    {
+        bool inside = false;
+        for (auto const i: m_row_edges[row]) {
+            auto const &e = m_edges[i];
+            if ((e.a.y > p.y) != (e.b.y > p.y) && p.x < x_at(e, p.y)) {
+                inside = !inside;
+            }
+        }
+
+        return inside;
+    }
+
+    std::vector<Edge> m_edges;
+    Point m_min{HUGE_VAL, HUGE_VAL};
+    Point m_max{-HUGE_VAL, -HUGE_VAL};
+
+    int m_rows;
+    int m_cols;
+    double m_cell_width;
+    double m_cell_height;
+    std::vector<std::vector<std::size_t>> m_row_edges;
+    std::vector<Cell> m_cells;
+};
+
+
+class WKTParser
+{
+public:
+    explicit WKTParser(std::string const &wkt) : m_wkt(wkt) {}
+
+    std::vector<Polygon> parse()
+    {
+        skip_space();
+        if (m_wkt.compare(m_pos, 5, "SRID=") == 0) {
+            m_pos = m_wkt.find(';', m_pos);
+            if (m_pos == std::string::npos) {
+                error("missing ';' after SRID");
+            }
+            ++m_pos;
+        }
+
+        auto const type = read_word();
+        auto const dims = peek_word();
+        if (dims == "Z" || dims == "M" || dims == "ZM") {
+            read_word();
+        }
+
+        std::vector<Polygon> result;
+        if (type == "POLYGON") {
+            result.push_back(read_polygon());
+        } else if (type == "MULTIPOLYGON") {
+            expect('(');
+            do {
+                result.push_back(read_polygon());
+            } while (accept(','));
+            expect(')');
+        } else {
+            error("only POLYGON and MULTIPOLYGON are supported");
+        }
+
+        skip_space();
+        if (m_pos != m_wkt.size()) {
+            error("unexpected data at end of geometry");
+        }
+
+        return result;
+    }
+
+private:
+    [[noreturn]] void error(std::string const &msg) const
+    {
+        throw py::value_error{"Invalid WKT geometry: " + msg};
+    }
+
+    void skip_space()
+    {
+        while (m_pos < m_wkt.size() && std::isspace(static_cast<unsigned char>(m_wkt[m_pos]))) {
+            ++m_pos;
+        }
+    }
+
+    std::string peek_word()
+    {
+        skip_space();
+        std::string word;
+        for (auto pos = m_pos;
+             pos < m_wkt.size() && std::isalpha(static_cast<unsigned char>(m_wkt[pos]));
+             ++pos) {
+            word += static_cast<char>(std::toupper(static_cast<unsigned char>(m_wkt[pos])));
+        }
+        return word;
+    }
+
+    std::string read_word()
+    {
+        auto word = peek_word();
+        m_pos += word.size();
+        return word;
+    }
+
+    bool accept(char c)
+    {
+        skip_space();
+        if (m_pos < m_wkt.size() && m_wkt[m_pos] == c) {
+            ++m_pos;
+            return true;
+        }
+        return false;
+    }
+
+    void expect(char c)
+    {
+        if (!accept(c)) {
+            error(std::string("expected '") + c + "'");
+        }
+    }
+
+    bool read_number(double &value)
+    {
+        skip_space();
+        char const *start = m_wkt.c_str() + m_pos;
+        char *end;
+        value = std::strtod(start, &end);
+        if (end == start) {
+            return false;
+        }
+        m_pos += static_cast<std::size_t>(end - start);
+        return true;
+    }
+
+    Polygon read_polygon()
+    {
+        Polygon polygon;
+        expect('(');
+        do {
+            Ring ring;
+            expect('(');
+            do {
+                Point pt;
+                if (!read_number(pt.x) || !read_number(pt.y)) {
+                    error("expected coordinates");
+                }
+                double extra;
+                while (read_number(extra)) {} // ignore Z and M values
+                ring.push_back(pt);
+            } while (accept(','));
+            expect(')');
+            polygon.push_back(std::move(ring));
+        } while (accept(','));
+        expect(')');
+
+        return polygon;
+    }
+
+    std::string const &m_wkt;
+    std::size_t m_pos = 0;
+};
+
+
+class WKBParser
+{
+public:
+    explicit WKBParser(std::string_view wkb) : m_wkb(wkb) {}
+
+    std::vector<Polygon> parse()
+    {
+        std::vector<Polygon> result;
+
+        auto const type = read_header();
+        if (type == 3) {
+            result.push_back(read_polygon());
+        } else if (type == 6) {
+            auto const num = read_uint();
+            for (std::uint32_t i = 0; i < num; ++i) {
+                if (read_header() != 3) {
+                    error("MultiPolygon may only contain polygons");
+                }
+                result.push_back(read_polygon());
+            }
+        } else {
+            error("only Polygon and MultiPolygon are supported");
+        }
+
+        if (m_pos != m_wkb.size()) {
+            error("unexpected data at end of geometry");
+        }
+
+        return result;
+    }
+
+private:
+    [[noreturn]] void error(std::string const &msg) const
+    {
+        throw py::value_error{"Invalid WKB geometry: " + msg};
+    }
+
+    void need(std::size_t size) const
+    {
+        if (m_wkb.size() - m_pos < size) {
+            error("unexpected end of data");
+        }
+    }
+
+    template <typename T>
+    T read_raw()
+    {
+        need(sizeof(T));
+        unsigned char buf[sizeof(T)];
+        std::memcpy(buf, m_wkb.data() + m_pos, sizeof(T));
+        m_pos += sizeof(T);
+        if (m_swap) {
+            std::reverse(buf, buf + sizeof(T));
+        }
+        T value;
+        std::memcpy(&value, buf, sizeof(T));
+        return value;
+    }
+
+    std::uint32_t read_uint() { return read_raw<std::uint32_t>(); }
+
+    std::uint32_t read_header()
+    {
+        need(1);
+        auto const order = static_cast<unsigned char>(m_wkb[m_pos++]);
+        if (order > 1) {
+            error("bad byte order marker");
+        }
+        std::uint16_t const probe = 1;
+        bool const host_little = *reinterpret_cast<unsigned char const *>(&probe) == 1;
+        m_swap = (order == 1) != host_little;
+
+        auto type = read_uint();
+
+        // EWKB flags
+        m_dims = 2 + ((type & 0x80000000U) ? 1 : 0) + ((type & 0x40000000U) ? 1 : 0);
+        if (type & 0x20000000U) {
+            read_uint(); // SRID
+        }
+        type &= 0x0fffffffU;
+
+        // ISO WKB dimension codes
+        switch (type / 1000) {
+            case 0: break;
+            case 1:
+            case 2: m_dims = 3; break;
+            case 3: m_dims = 4; break;
+            default: error("unknown geometry type");
+        }
+
+        return type % 1000;
+    }
+
+    Polygon read_polygon()
+    {
+        Polygon polygon;
+        auto const num_rings = read_uint();
+        for (std::uint32_t i = 0; i < num_rings; ++i) {
+            auto const num_points = read_uint();
+            need(static_cast<std::size_t>(num_points) * m_dims * sizeof(double));
+            Ring ring;
+            ring.reserve(num_points);
+            for (std::uint32_t j = 0; j < num_points; ++j) {
+                Point pt;
+                pt.x = read_raw<double>();
+                pt.y = read_raw<double>();
+                for (unsigned k = 2; k < m_dims; ++k) {
+                    read_raw<double>();
+                }
+                ring.push_back(pt);
+            }
+            polygon.push_back(std::move(ring));
+        }
+
+        return polygon;
+    }
+
+    std::string_view m_wkb;
+    std::size_t m_pos = 0;
+    bool m_swap = false;
+    unsigned m_dims = 2;
+};
+
+
+Polygon box_polygon(double minx, double miny, double maxx, double maxy)
+{
+    if (!(minx < maxx && miny < maxy)) {
+        throw py::value_error{"Bounding box must have min coordinates smaller than max coordinates."};
+    }
+
+    return {{{minx, miny}, {maxx, miny}, {maxx, maxy}, {minx, maxy}}};
+}
+
+
+class GeometryFilter : public pyosmium::BaseFilter
+{
+public:
+    GeometryFilter(py::args args)
+    {
+        if (args.empty()) {
+            throw py::type_error{"Need geometries to filter on."};
+        }
+
+        for (auto const &arg: args) {
+            if (py::isinstance<py::str>(arg)) {
+                add(WKTParser(arg.cast<std::string>()).parse());
+            } else if (py::isinstance<py::bytes>(arg)) {
+                add(WKBParser(arg.cast<std::string_view>()).parse());
+            } else if (py::isinstance<osmium::Box>(arg)) {
+                auto const &box = arg.cast<osmium::Box const &>();
+                if (!box.valid()) {
+                    throw py::value_error{"Bounding box is not valid."};
+                }
+                add({box_polygon(box.bottom_left().lon(), box.bottom_left().lat(),
+                                 box.top_right().lon(), box.top_right().lat())});
+            } else if (py::isinstance<py::sequence>(arg) && py::len(arg) == 4) {
+                auto const coords = arg.cast<std::vector<double>>();
+                add({box_polygon(coords[0], coords[1], coords[2], coords[3])});
+            } else {
+                throw py::type_error{"Geometries must be WKT strings, WKB bytes, "
+                                     "Box objects or tuples of (min_lon, min_lat, max_lon, max_lat)."};
+            }
+        }
+    }
+
+protected:
+    bool filter_node(pyosmium::PyOSMNode &o) override
+    {
+        auto const &loc = o.get()->location();
+        return !loc.valid() || !contains(Point{loc.lon(), loc.lat()});
+    }
+
+    bool filter_way(pyosmium::PyOSMWay &o) override
+    {
+        return !matches_line(o.get()->nodes());
+    }
+
+    bool filter_relation(pyosmium::PyOSMRelation &) override
+    {
+        return true;
+    }
+
+    bool filter_area(pyosmium::PyOSMArea &o) override
+    {
+        auto const *area = o.get();
+        for (auto const &outer: area->outer_rings()) {
+            if (matches_line(outer)) {
+                return false;
+            }
+            for (auto const &inner: area->inner_rings(outer)) {
+                if (matches_line(inner)) {
+                    return false;
+                }
+            }
+        }
+
+        // No boundary crossing, so a filter polygon can only be inside
+        // the area as a whole.
+        for (auto const &poly: m_polygons) {
+            if (area_contains(*area, poly.some_point())) {
+                return false;
+            }
+        }
+
+        return true;
+    }
+
+    bool filter_changeset(pyosmium::PyOSMChangeset &) override
+    {
+        return true;
+    }
+
+private:
+    void add(std::vector<Polygon> const &polygons)
+    {
+        for (auto const &poly: polygons) {
+            m_polygons.emplace_back(poly);
+        }
+    }
+
+    bool contains(Point p) const
+    {
+        for (auto const &poly: m_polygons) {
+            if (poly.contains(p)) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    bool intersects(Point a, Point b) const
+    {
+        for (auto const &poly: m_polygons) {
+            if (poly.intersects(a, b)) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    bool matches_line(osmium::NodeRefList const &nodes) const
+    {
+        std::optional<Point> prev;
+        for (auto const &nr: nodes) {
+            auto const &loc = nr.location();
+            if (!loc.valid()) {
+                prev.reset();
+                continue;
+            }
+            Point const p{loc.lon(), loc.lat()};
+            if (contains(p) || (prev && intersects(*prev, p))) {
+                return true;
+            }
+            prev = p;
+        }
+
+        return false;
+    }
+
+    static bool area_contains(osmium::Area const &area, Point p)
+    {
+        bool inside = false;
+        auto const crossing = [&inside, p](osmium::NodeRefList const &ring) {
+            for (std::size_t i = 1; i < ring.size(); ++i) {
+                auto const &a = ring[i - 1].location();
+                auto const &b = ring[i].location();
+                if (!a.valid() || !b.valid()) {
+                    continue;
+                }
+                if ((a.lat() > p.y) != (b.lat() > p.y)
+                    && p.x < a.lon() + (p.y - a.lat()) * (b.lon() - a.lon()) / (b.lat() - a.lat())) {
+                    inside = !inside;
+                }
+            }
+        };
+
+        for (auto const &outer: area.outer_rings()) {
+            crossing(outer);
+            for (auto const &inner: area.inner_rings(outer)) {
+                crossing(inner);
+            }
+        }
+
+        return inside;
+    }
+
+    std::vector<PolygonIndex> m_polygons;
+};
+
+} // namespace
+
+namespace pyosmium {
+
+void init_geometry_filter(pybind11::module &m)
+{
+    py::class_<GeometryFilter, pyosmium::BaseFilter, BaseHandler>(m, "GeometryFilter")
+        .def(py::init<py::args>())
+    ;
+}
+
+} // namespace
@@ -8,12 +8,18 @@
 #ifndef PYOSMIUM_HANDLER_CHAIN_H
 #define PYOSMIUM_HANDLER_CHAIN_H
 
+#include <algorithm>
+#include <chrono>
+#include <limits>
+#include <numeric>
+#include <string>
 #include <vector>
 
 #include <pybind11/pybind11.h>
 
 #include <osmium/handler.hpp>
 
+#include "base_filter.h"
 #include "base_handler.h"
 #include "python_handler.h"
 
@@ -21,10 +27,43 @@ namespace py = pybind11;
 
 namespace pyosmium {
 
+/**
+ * Statistics about the calls of a single handler in a handler chain.
+ */
+struct HandlerStats
+{
+    struct Counter
+    {
+        std::size_t calls = 0;
+        std::size_t rejected = 0;
+        std::chrono::steady_clock::duration time{0};
+    };
+
+    std::string name;
+    bool python = false;
+    // one counter for each OSM type: node, way, relation, area, changeset
+    Counter counters[5];
+};
+
+
+/**
+ * State of the adaptive reordering for a single OSM type.
+ */
+struct HandlerOrder
+{
+    // Number of objects sampled so far.
+    std::size_t sampled = 0;
+    // Statistics for each handler in the original order.
+    std::vector<HandlerStats::Counter> samples;
+    // Order in which the handlers are called once sampling is done.
+    std::vector<std::size_t> order;
+};
+
+
 class HandlerChain : public BaseHandler
 {
 public:
-    HandlerChain(py::args args)
+    HandlerChain(py::args args, bool profile = false)
     {
         m_handlers.reserve(args.size());
         m_python_handlers.reserve(args.size());
@@ -43,9 +82,25 @@ public:
                 throw py::type_error{"Argument must be a handler-like object."};
             }
         }
+
+        if (profile) {
+            m_stats.resize(m_handlers.size());
+            for (std::size_t i = 0; i < m_handlers.size(); ++i) {
+                m_stats[i].name = args[i].get_type().attr("__name__").cast<std::string>();
+                m_stats[i].python = m_handlers[i]->needs_python();
+            }
+        }
     }
 
     bool node(PyOSMNode &o) override {
+        if (!m_stats.empty()) {
+            return profiled(osmium::osm_entity_bits::node, 0,
+                            [&o](BaseHandler *h) { return h->node(o); });
+        }
+        if (m_sample_size > 0) {
+            return reordered(osmium::osm_entity_bits::node, 0,
+                             [&o](BaseHandler *h) { return h->node(o); });
+        }
         for (auto const &handler : m_handlers) {
             if (handler->is_enabled_for(osmium::osm_entity_bits::node)
                 && handler->node(o)) {
@@ -56,6 +111,14 @@ public:
     }
 
     bool way(PyOSMWay &w) override {
+        if (!m_stats.empty()) {
+            return profiled(osmium::osm_entity_bits::way, 1,
+                            [&w](BaseHandler *h) { return h->way(w); });
+        }
+        if (m_sample_size > 0) {
+            return reordered(osmium::osm_entity_bits::way, 1,
+                             [&w](BaseHandler *h) { return h->way(w); });
+        }
         for (auto const &handler : m_handlers) {
             if (handler->is_enabled_for(osmium::osm_entity_bits::way)
                 && handler->way(w)) {
@@ -66,6 +129,14 @@ public:
     }
 
     bool relation(PyOSMRelation &o) override {
+        if (!m_stats.empty()) {
+            return profiled(osmium::osm_entity_bits::relation, 2,
+                            [&o](BaseHandler *h) { return h->relation(o); });
+        }
+        if (m_sample_size > 0) {
+            return reordered(osmium::osm_entity_bits::relation, 2,
+                             [&o](BaseHandler *h) { return h->relation(o); });
+        }
         for (auto const &handler : m_handlers) {
             if (handler->is_enabled_for(osmium::osm_entity_bits::relation)
                 && handler->relation(o)) {
@@ -76,6 +147,14 @@ public:
     }
 
     bool changeset(PyOSMChangeset &o) override {
+        if (!m_stats.empty()) {
+            return profiled(osmium::osm_entity_bits::changeset, 4,
+                            [&o](BaseHandler *h) { return h->changeset(o); });
+        }
+        if (m_sample_size > 0) {
+            return reordered(osmium::osm_entity_bits::changeset, 4,
+                             [&o](BaseHandler *h) { return h->changeset(o); });
+        }
         for (auto const &handler : m_handlers) {
             if (handler->is_enabled_for(osmium::osm_entity_bits::changeset)
                 && handler->changeset(o)) {
@@ -86,6 +165,14 @@ public:
     }
 
     bool area(PyOSMArea &o) override {
+        if (!m_stats.empty()) {
+            return profiled(osmium::osm_entity_bits::area, 3,
+                            [&o](BaseHandler *h) { return h->area(o); });
+        }
+        if (m_sample_size > 0) {
+            return reordered(osmium::osm_entity_bits::area, 3,
+                             [&o](BaseHandler *h) { return h->area(o); });
+        }
         for (auto const &handler : m_handlers) {
             if (handler->is_enabled_for(osmium::osm_entity_bits::area)
                 && handler->area(o)) {
@@ -101,9 +188,164 @@ public:
         }
     }
 
+    bool needs_python() const override {
+        for (auto const &handler : m_handlers) {
+            if (handler->needs_python()) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    bool is_profiling() const noexcept { return !m_stats.empty(); }
+
+    std::vector<HandlerStats> const &stats() const noexcept { return m_stats; }
+
+    /**
+     * Switch on adaptive reordering of filters. The first _sample_size_
+     * objects of each type are passed through all native filters to
+     * measure their cost and selectivity. Afterwards, consecutive native
+     * filters are reordered so that the filters which reject most
+     * objects per time spent come first. Other handlers keep their
+     * position in the chain.
+     */
+    void enable_reordering(std::size_t sample_size)
+    {
+        m_sample_size = sample_size;
+        m_reorderable.resize(m_handlers.size());
+        for (std::size_t i = 0; i < m_handlers.size(); ++i) {
+            m_reorderable[i] = dynamic_cast<BaseFilter *>(m_handlers[i]) != nullptr
+                               && !m_handlers[i]->needs_python();
+        }
+        for (auto &order: m_order) {
+            order.sampled = 0;
+            order.samples.assign(m_handlers.size(), {});
+            order.order.clear();
+        }
+    }
+
+    bool is_reorderable(std::size_t idx) const { return m_reorderable[idx]; }
+
+    HandlerOrder const &handler_order(std::size_t type_idx) const
+    { return m_order[type_idx]; }
+
 private:
+    template <typename Func>
+    bool profiled(osmium::osm_entity_bits::type bit, std::size_t type_idx, Func const &func)
+    {
+        for (std::size_t i = 0; i < m_handlers.size(); ++i) {
+            if (!m_handlers[i]->is_enabled_for(bit)) {
+                continue;
+            }
+            auto &counter = m_stats[i].counters[type_idx];
+            auto const start = std::chrono::steady_clock::now();
+            bool const stop = func(m_handlers[i]);
+            counter.time += std::chrono::steady_clock::now() - start;
+            ++counter.calls;
+            if (stop) {
+                ++counter.rejected;
+                return true;
+            }
+        }
+        return false;
+    }
+
+    template <typename Func>
+    bool reordered(osmium::osm_entity_bits::type bit, std::size_t type_idx, Func const &func)
+    {
+        auto &state = m_order[type_idx];
+
+        if (state.order.empty()) {
+            bool const stop = sampled(bit, state, func);
+            if (++state.sampled >= m_sample_size) {
+                compute_order(state);
+            }
+            return stop;
+        }
+
+        for (auto const i: state.order) {
+            if (m_handlers[i]->is_enabled_for(bit) && func(m_handlers[i])) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    // Run the chain with all filters of a reorderable group being
+    // called, so that selectivity is measured independently of the order.
+    template <typename Func>
+    bool sampled(osmium::osm_entity_bits::type bit, HandlerOrder &state, Func const &func)
+    {
+        std::size_t i = 0;
+        while (i < m_handlers.size()) {
+            if (!m_reorderable[i]) {
+                if (m_handlers[i]->is_enabled_for(bit) && func(m_handlers[i])) {
+                    return true;
+                }
+                ++i;
+                continue;
+            }
+
+            bool stop = false;
+            for (; i < m_handlers.size() && m_reorderable[i]; ++i) {
+                if (!m_handlers[i]->is_enabled_for(bit)) {
+                    continue;
+                }
+                auto &counter = state.samples[i];
+                auto const start = std::chrono::steady_clock::now();
+                bool const rejected = func(m_handlers[i]);
+                counter.time += std::chrono::steady_clock::now() - start;
+                ++counter.calls;
+                if (rejected) {
+                    ++counter.rejected;
+                    stop = true;
+                }
+            }
+            if (stop) {
+                return true;
+            }
+        }
+
+        return false;
+    }
+
+    void compute_order(HandlerOrder &state) const
+    {
+        // Expected time spent per rejected object. Filters that never
+        // reject go to the end of their group.
+        auto const rank = [&state](std::size_t i) {
+            auto const &c = state.samples[i];
+            if (c.rejected == 0) {
+                return std::numeric_limits<double>::infinity();
+            }
+            return std::chrono::duration<double>(c.time).count() / c.rejected;
+        };
+
+        state.order.resize(m_handlers.size());
+        std::iota(state.order.begin(), state.order.end(), 0);
+
+        auto start = state.order.begin();
+        while (start != state.order.end()) {
+            if (!m_reorderable[*start]) {
+                ++start;
+                continue;
+            }
+            auto end = std::find_if(start, state.order.end(),
+                                    [this](std::size_t i) { return !m_reorderable[i]; });
+            std::stable_sort(start, end, [&rank](std::size_t a, std::size_t b) {
+                return rank(a) < rank(b);
+            });
+            start = end;
+        }
+    }
+
     std::vector<BaseHandler *> m_handlers;
     std::vector<PythonHandler> m_python_handlers;
+    std::vector<HandlerStats> m_stats;
+
+    std::size_t m_sample_size = 0;
+    std::vector<bool> m_reorderable;
+    HandlerOrder m_order[5];
 };
 
 } // namespace
@@ -0,0 +1,105 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#include <pybind11/pybind11.h>
+
+#include <chrono>
+
+#include "base_handler.h"
+#include "handler_chain.h"
+#include "osmium_module.h"
+
+namespace py = pybind11;
+
+namespace {
+
+/**
+ * Handler that runs a chain of handlers and records call counts and
+ * run times for each handler in the chain.
+ */
+class HandlerProfiler : public pyosmium::BaseHandler
+{
+public:
+    explicit HandlerProfiler(py::args args)
+    : m_handler(args, true)
+    {}
+
+    bool node(pyosmium::PyOSMNode &o) override
+    { return m_handler.node(o); }
+
+    bool way(pyosmium::PyOSMWay &o) override
+    { return m_handler.way(o); }
+
+    bool relation(pyosmium::PyOSMRelation &o) override
+    { return m_handler.relation(o); }
+
+    bool area(pyosmium::PyOSMArea &o) override
+    { return m_handler.area(o); }
+
+    bool changeset(pyosmium::PyOSMChangeset &o) override
+    { return m_handler.changeset(o); }
+
+    void flush() override
+    { m_handler.flush(); }
+
+    bool needs_python() const override
+    { return m_handler.needs_python(); }
+
+    py::dict stats() const
+    {
+        using namespace pybind11::literals;
+        using seconds = std::chrono::duration<double>;
+        static char const *types[] = {"node", "way", "relation", "area", "changeset"};
+
+        std::chrono::steady_clock::duration native_time{0};
+        std::chrono::steady_clock::duration python_time{0};
+        py::list handlers;
+
+        for (auto const &hstats : m_handler.stats()) {
+            py::dict entry{"name"_a=hstats.name, "python"_a=hstats.python};
+            for (std::size_t i = 0; i < 5; ++i) {
+                auto const &counter = hstats.counters[i];
+                if (counter.calls == 0) {
+                    continue;
+                }
+                entry[types[i]] = py::dict{
+                    "calls"_a=counter.calls,
+                    "accepted"_a=counter.calls - counter.rejected,
+                    "rejected"_a=counter.rejected,
+                    "time"_a=std::chrono::duration_cast<seconds>(counter.time).count()};
+                if (hstats.python) {
+                    python_time += counter.time;
+                } else {
+                    native_time += counter.time;
+                }
+            }
+            handlers.append(entry);
+        }
+
+        return py::dict{
+            "handlers"_a=handlers,
+            "native_time"_a=std::chrono::duration_cast<seconds>(native_time).count(),
+            "python_time"_a=std::chrono::duration_cast<seconds>(python_time).count()};
+    }
+
+private:
+    pyosmium::HandlerChain m_handler;
+};
+
+} // namespace
+
+namespace pyosmium {
+
+void init_handler_profiler(py::module &m)
+{
+    py::class_<HandlerProfiler, BaseHandler>(m, "HandlerProfiler")
+        .def(py::init<py::args>(), py::keep_alive<1, 2>())
+        .def("stats", &HandlerProfiler::stats)
+    ;
+}
+
+} // namespace
@@ -7,38 +7,46 @@
  */
 #include <pybind11/pybind11.h>
 
-#include <osmium/index/id_set.hpp>
+#include <memory>
 
 #include "base_filter.h"
+#include "id_set.h"
 
 namespace py = pybind11;
 
 namespace {
 
-using IdSet = osmium::index::IdSetDense<osmium::unsigned_object_id_type>;
-
 class IdFilter : public pyosmium::BaseFilter
 {
 public:
-    IdFilter(py::iterable const &ids)
+    IdFilter(py::object const &ids)
     {
-        for (auto &i: py::iter(ids)) {
-            m_ids.set(i.cast<osmium::unsigned_object_id_type>());
+        // Memory-mapped sets are used directly instead of copying them.
+        if (py::isinstance<pyosmium::MappedIdSet>(ids)) {
+            m_mapped = ids.cast<std::shared_ptr<pyosmium::MappedIdSet>>();
+        } else {
+            pyosmium::add_ids(m_ids, ids);
         }
     }
 
     bool filter(osmium::OSMObject const *o) override
     {
-        return !m_ids.get(o->id());
+        return !contains(o->id());
     }
 
     bool filter_changeset(pyosmium::PyOSMChangeset &o) override
     {
-        return !m_ids.get(o.get()->id());
+        return !contains(o.get()->id());
     }
 
 private:
-    IdSet m_ids;
+    bool contains(osmium::unsigned_object_id_type id) const
+    {
+        return m_mapped ? m_mapped->get(id) : m_ids.get(id);
+    }
+
+    pyosmium::IdSet m_ids;
+    std::shared_ptr<pyosmium::MappedIdSet> m_mapped;
 };
 
 } // namespace
@@ -48,7 +56,7 @@ namespace pyosmium {
 void init_id_filter(pybind11::module &m)
 {
     py::class_<IdFilter, pyosmium::BaseFilter, pyosmium::BaseHandler>(m, "IdFilter")
-        .def(py::init<py::iterable const &>())
+        .def(py::init<py::object const &>())
     ;
 }
 
@@ -0,0 +1,107 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#include <pybind11/pybind11.h>
+
+#include <osmium/osm.hpp>
+
+#include <cstddef>
+
+#include "base_handler.h"
+#include "osmium_module.h"
+
+namespace py = pybind11;
+
+namespace {
+
+/**
+ * Handler that records the smallest and largest ID and the number
+ * of objects for each OSM type.
+ */
+class IdRangeCollector : public pyosmium::BaseHandler
+{
+    struct Range
+    {
+        osmium::object_id_type first = 0;
+        osmium::object_id_type last = 0;
+        std::size_t count = 0;
+
+        void add(osmium::object_id_type id)
+        {
+            if (count == 0 || id < first) {
+                first = id;
+            }
+            if (count == 0 || id > last) {
+                last = id;
+            }
+            ++count;
+        }
+    };
+
+public:
+    IdRangeCollector()
+    {
+        m_enabled_for = osmium::osm_entity_bits::nwr | osmium::osm_entity_bits::changeset;
+    }
+
+    bool node(pyosmium::PyOSMNode &o) override
+    {
+        m_ranges[0].add(o.get()->id());
+        return false;
+    }
+
+    bool way(pyosmium::PyOSMWay &o) override
+    {
+        m_ranges[1].add(o.get()->id());
+        return false;
+    }
+
+    bool relation(pyosmium::PyOSMRelation &o) override
+    {
+        m_ranges[2].add(o.get()->id());
+        return false;
+    }
+
+    bool changeset(pyosmium::PyOSMChangeset &o) override
+    {
+        m_ranges[3].add(o.get()->id());
+        return false;
+    }
+
+    py::list take_ranges()
+    {
+        static char const *types[] = {"n", "w", "r", "c"};
+
+        py::list out;
+        for (std::size_t i = 0; i < 4; ++i) {
+            if (m_ranges[i].count > 0) {
+                out.append(py::make_tuple(types[i], m_ranges[i].first,
+                                          m_ranges[i].last, m_ranges[i].count));
+            }
+            m_ranges[i] = Range{};
+        }
+
+        return out;
+    }
+
+private:
+    Range m_ranges[4];
+};
+
+} // namespace
+
+namespace pyosmium {
+
+void init_id_range_collector(py::module &m)
+{
+    py::class_<IdRangeCollector, BaseHandler>(m, "IdRangeCollector")
+        .def(py::init<>())
+        .def("take_ranges", &IdRangeCollector::take_ranges)
+    ;
+}
+
+} // namespace
@@ -0,0 +1,509 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#ifndef PYOSMIUM_ID_SET_H
+#define PYOSMIUM_ID_SET_H
+
+#include <cctype>
+#include <cerrno>
+#include <cstdint>
+#include <cstdlib>
+#include <cstring>
+#include <filesystem>
+#include <algorithm>
+#include <fstream>
+#include <memory>
+#include <numeric>
+#include <string>
+#include <system_error>
+#include <type_traits>
+#include <utility>
+#include <vector>
+
+#include <pybind11/pybind11.h>
+
+#include <osmium/osm/types.hpp>
+#include <osmium/index/id_set.hpp>
+#include <osmium/io/detail/read_write.hpp>
+#include <osmium/util/file.hpp>
+#include <osmium/util/memory_mapping.hpp>
+
+namespace pyosmium {
+
+using IdSet = osmium::index::IdSetDense<osmium::unsigned_object_id_type>;
+
+/**
+ * Read-only view of an ID set saved to disk. The file is memory-mapped,
+ * so that different processes share the same pages.
+ *
+ * A file may contain several sets, each of which is identified by
+ * a type character ('n', 'w', 'r' for sets of an IdTracker or '\0' for
+ * a plain IdSet). Each set is saved as a sorted list of bitmap chunks,
+ * each covering 2^16 IDs, followed by the list of chunk numbers:
+ *
+ *   header:  magic (8 bytes), version (u32), chunk bits (u32),
+ *            number of sets (u32), reserved (u32)
+ *   per set: type (u8), padding (7 bytes), number of IDs (u64),
+ *            number of chunks (u64), offset of the chunks (u64)
+ *   data:    chunk bitmaps, chunk numbers (u64) for each set
+ *
+ * All integers are little endian.
+ */
+class MappedIdSet
+{
+public:
+    static constexpr char magic[8] = {'P', 'Y', 'O', 'I', 'D', 'S', 'E', 'T'};
+    static constexpr std::uint32_t version = 1;
+    static constexpr unsigned chunk_bits = 16;
+    static constexpr std::size_t chunk_bytes = (std::size_t{1} << chunk_bits) / 8;
+    static constexpr std::size_t header_size = 24;
+    static constexpr std::size_t entry_size = 32;
+
+    static std::uint64_t read_le(char const *data, std::size_t bytes)
+    {
+        std::uint64_t value = 0;
+        for (std::size_t b = 0; b < bytes; ++b) {
+            value |= static_cast<std::uint64_t>(static_cast<unsigned char>(data[b])) << (8 * b);
+        }
+        return value;
+    }
+
+    static void write_le(std::ostream &out, std::uint64_t value, std::size_t bytes)
+    {
+        for (std::size_t b = 0; b < bytes; ++b) {
+            out.put(static_cast<char>((value >> (8 * b)) & 0xffU));
+        }
+    }
+
+    /**
+     * Save the given sets into a new file. To not disturb processes that
+     * still have the old version of the file mapped, the file is first
+     * written to a temporary file and then moved into place.
+     */
+    static void save(std::filesystem::path const &filename,
+                     std::vector<std::pair<char, IdSet const *>> const &sets)
+    {
+        auto tmpname = filename;
+        tmpname += ".tmp";
+
+        {
+            std::ofstream out{tmpname, std::ios::binary | std::ios::trunc};
+            if (!out) {
+                throw std::system_error{errno, std::system_category(),
+                                        "Cannot open ID set file '" + tmpname.string() + "'"};
+            }
+
+            out.write(magic, sizeof(magic));
+            write_le(out, version, 4);
+            write_le(out, chunk_bits, 4);
+            write_le(out, sets.size(), 4);
+            write_le(out, 0, 4);
+            std::vector<char> const table(entry_size * sets.size(), 0);
+            out.write(table.data(), static_cast<std::streamsize>(table.size()));
+
+            std::vector<std::uint64_t> offsets;
+            std::vector<std::uint64_t> chunk_counts;
+            std::vector<std::uint64_t> chunks;
+            std::vector<char> bitmap(chunk_bytes);
+            for (auto const &set: sets) {
+                offsets.push_back(static_cast<std::uint64_t>(out.tellp()));
+                chunks.clear();
+                for (auto const id: *set.second) {
+                    auto const chunk = static_cast<std::uint64_t>(id) >> chunk_bits;
+                    if (chunks.empty() || chunks.back() != chunk) {
+                        if (!chunks.empty()) {
+                            out.write(bitmap.data(), static_cast<std::streamsize>(chunk_bytes));
+                            std::fill(bitmap.begin(), bitmap.end(), 0);
+                        }
+                        chunks.push_back(chunk);
+                    }
+                    auto const offset = id & ((std::uint64_t{1} << chunk_bits) - 1);
+                    bitmap[offset >> 3] |= static_cast<char>(1U << (offset & 7U));
+                }
+                if (!chunks.empty()) {
+                    out.write(bitmap.data(), static_cast<std::streamsize>(chunk_bytes));
+                    std::fill(bitmap.begin(), bitmap.end(), 0);
+                }
+                for (auto const chunk: chunks) {
+                    write_le(out, chunk, 8);
+                }
+                chunk_counts.push_back(chunks.size());
+            }
+
+            out.seekp(header_size);
+            for (std::size_t i = 0; i < sets.size(); ++i) {
+                out.put(sets[i].first);
+                write_le(out, 0, 7);
+                write_le(out, sets[i].second->size(), 8);
+                write_le(out, chunk_counts[i], 8);
+                write_le(out, offsets[i], 8);
+            }
+
+            out.close();
+            if (!out) {
+                throw std::system_error{errno, std::system_category(),
+                                        "Error writing ID set file '" + tmpname.string() + "'"};
+            }
+        }
+
+        std::filesystem::rename(tmpname, filename);
+    }
+
+    /// Return the types of all sets contained in the given file.
+    static std::vector<char> types(std::filesystem::path const &filename)
+    {
+        auto const mapping = map_file(filename);
+        std::vector<char> result;
+        auto const *data = mapping.get_addr<char>();
+        auto const num_sets = read_header(data, mapping.size());
+        for (std::size_t i = 0; i < num_sets; ++i) {
+            result.push_back(data[header_size + i * entry_size]);
+        }
+        return result;
+    }
+
+    /**
+     * Open the set with the given type from the file. When _type_ is '\0'
+     * and the file contains a single set only, this set is opened.
+     */
+    MappedIdSet(std::filesystem::path const &filename, char type)
+    : m_mapping(map_file(filename))
+    {
+        auto const *data = m_mapping.get_addr<char>();
+        auto const file_size = static_cast<std::uint64_t>(m_mapping.size());
+        auto const num_sets = read_header(data, m_mapping.size());
+
+        char const *entry = nullptr;
+        if (type == '\0' && num_sets == 1) {
+            entry = data + header_size;
+        } else {
+            for (std::size_t i = 0; i < num_sets; ++i) {
+                if (data[header_size + i * entry_size] == type) {
+                    entry = data + header_size + i * entry_size;
+                    break;
+                }
+            }
+        }
+        if (!entry) {
+            if (type == '\0') {
+                throw pybind11::value_error{"ID set file '" + filename.string()
+                                            + "' contains several sets. Select one by type."};
+            }
+            throw pybind11::value_error{"ID set file '" + filename.string()
+                                        + "' does not contain the requested set."};
+        }
+
+        m_size = read_le(entry + 8, 8);
+        auto const num_chunks = read_le(entry + 16, 8);
+        auto const offset = read_le(entry + 24, 8);
+        if (offset > file_size || num_chunks > (file_size - offset) / (chunk_bytes + 8)) {
+            throw pybind11::value_error{"ID set file '" + filename.string() + "' is truncated."};
+        }
+
+        m_chunks = data + offset;
+        auto const *index = m_chunks + num_chunks * chunk_bytes;
+        m_index.reserve(num_chunks);
+        for (std::uint64_t i = 0; i < num_chunks; ++i) {
+            m_index.push_back(read_le(index + i * 8, 8));
+        }
+    }
+
+    bool get(osmium::unsigned_object_id_type id) const noexcept
+    {
+        auto const it = std::lower_bound(m_index.begin(), m_index.end(),
+                                         static_cast<std::uint64_t>(id) >> chunk_bits);
+        if (it == m_index.end() || *it != (static_cast<std::uint64_t>(id) >> chunk_bits)) {
+            return false;
+        }
+        auto const offset = id & ((std::uint64_t{1} << chunk_bits) - 1);
+        auto const byte = static_cast<unsigned char>(
+            m_chunks[static_cast<std::size_t>(it - m_index.begin()) * chunk_bytes + (offset >> 3)]);
+        return (byte >> (offset & 7U)) & 1U;
+    }
+
+    /// Check if the set contains any ID in the range [first, last].
+    bool contains_any(osmium::unsigned_object_id_type first,
+                      osmium::unsigned_object_id_type last) const noexcept
+    {
+        auto constexpr chunk_mask = (std::uint64_t{1} << chunk_bits) - 1;
+        auto it = std::lower_bound(m_index.begin(), m_index.end(),
+                                   static_cast<std::uint64_t>(first) >> chunk_bits);
+        for (; it != m_index.end() && *it <= (static_cast<std::uint64_t>(last) >> chunk_bits); ++it) {
+            auto const base = *it << chunk_bits;
+            auto const lo = std::max<std::uint64_t>(first, base) - base;
+            auto const hi = std::min<std::uint64_t>(last, base + chunk_mask) - base;
+            auto const *chunk = m_chunks + static_cast<std::size_t>(it - m_index.begin()) * chunk_bytes;
+            for (auto b = lo >> 3; b <= hi >> 3; ++b) {
+                unsigned byte = static_cast<unsigned char>(chunk[b]);
+                if (b == lo >> 3) {
+                    byte &= 0xffU << (lo & 7U);
+                }
+                if (b == hi >> 3) {
+                    byte &= 0xffU >> (7U - (hi & 7U));
+                }
+                if (byte != 0) {
+                    return true;
+                }
+            }
+        }
+        return false;
+    }
+
+    std::size_t size() const noexcept { return m_size; }
+
+    bool empty() const noexcept { return m_size == 0; }
+
+    /// Call _func_ for every ID in the set in ascending order.
+    template <typename Func>
+    void for_each(Func &&func) const
+    {
+        for (std::size_t i = 0; i < m_index.size(); ++i) {
+            auto const base = m_index[i] << chunk_bits;
+            auto const *chunk = m_chunks + i * chunk_bytes;
+            for (std::size_t b = 0; b < chunk_bytes; ++b) {
+                auto const byte = static_cast<unsigned char>(chunk[b]);
+                for (unsigned bit = 0; byte >> bit; ++bit) {
+                    if ((byte >> bit) & 1U) {
+                        func(static_cast<osmium::unsigned_object_id_type>(base + b * 8 + bit));
+                    }
+                }
+            }
+        }
+    }
+
+private:
+    static osmium::util::MemoryMapping map_file(std::filesystem::path const &filename)
+    {
+        if (filename.empty()) {
+            throw pybind11::value_error{"Empty file name for ID set file."};
+        }
+        int const fd = osmium::io::detail::open_for_reading(filename.string());
+        try {
+            auto const size = osmium::file_size(fd);
+            if (size < header_size) {
+                throw pybind11::value_error{"'" + filename.string()
+                                            + "' is not an ID set file."};
+            }
+            osmium::util::MemoryMapping mapping{
+                size, osmium::util::MemoryMapping::mapping_mode::readonly, fd};
+            osmium::io::detail::reliable_close(fd);
+            return mapping;
+        } catch (...) {
+            osmium::io::detail::reliable_close(fd);
+            throw;
+        }
+    }
+
+    static std::size_t read_header(char const *data, std::size_t size)
+    {
+        if (!std::equal(magic, magic + sizeof(magic), data)) {
+            throw pybind11::value_error{"Not an ID set file."};
+        }
+        if (read_le(data + 8, 4) != version || read_le(data + 12, 4) != chunk_bits) {
+            throw pybind11::value_error{"Unsupported version of ID set file."};
+        }
+        auto const num_sets = static_cast<std::size_t>(read_le(data + 16, 4));
+        if (num_sets > (size - header_size) / entry_size) {
+            throw pybind11::value_error{"ID set file is truncated."};
+        }
+        return num_sets;
+    }
+
+    osmium::util::MemoryMapping m_mapping;
+    char const *m_chunks = nullptr;
+    std::vector<std::uint64_t> m_index;
+    std::uint64_t m_size = 0;
+};
+
+
+using IdRanges = std::vector<std::pair<osmium::unsigned_object_id_type,
+                                       osmium::unsigned_object_id_type>>;
+
+/**
+ * Check for each of the given ranges of IDs if the set contains
+ * any ID in the range.
+ */
+inline std::vector<bool> contains_any(IdSet const &ids, IdRanges const &ranges)
+{
+    // Walk through the ranges sorted by their start and
+    // the (sorted) IDs in parallel.
+    std::vector<std::size_t> order(ranges.size());
+    std::iota(order.begin(), order.end(), 0);
+    std::sort(order.begin(), order.end(), [&ranges](auto a, auto b) {
+        return ranges[a].first < ranges[b].first;
+    });
+
+    std::vector<bool> result(ranges.size(), false);
+    auto it = ids.begin();
+    auto const end = ids.end();
+    for (auto const idx : order) {
+        while (it != end && *it < ranges[idx].first) {
+            ++it;
+        }
+        if (it == end) {
+            break;
+        }
+        result[idx] = *it <= ranges[idx].second;
+    }
+
+    return result;
+}
+
+namespace detail {
+
+template <typename T>
+void add_buffer_ids(IdSet &ids, pybind11::buffer_info const &info)
+{
+    auto const *data = static_cast<char const *>(info.ptr);
+    for (pybind11::ssize_t i = 0; i < info.shape[0]; ++i) {
+        T value;
+        std::memcpy(&value, data + i * info.strides[0], sizeof(T));
+        if constexpr (std::is_signed_v<T>) {
+            if (value < 0) {
+                throw pybind11::value_error{"IDs must not be negative."};
+            }
+        }
+        ids.set(static_cast<osmium::unsigned_object_id_type>(value));
+    }
+}
+
+} // namespace detail
+
+/**
+ * Add IDs to the set. _data_ may either be another IdSet or MappedIdSet,
+ * an object implementing the buffer protocol with a one-dimensional array
+ * of integers (for example a numpy array) or any iterable over Python ints.
+ */
+inline void add_ids(IdSet &ids, pybind11::handle const &data)
+{
+    if (pybind11::isinstance<IdSet>(data)) {
+        for (auto const id: data.cast<IdSet const &>()) {
+            ids.set(id);
+        }
+        return;
+    }
+
+    if (pybind11::isinstance<MappedIdSet>(data)) {
+        data.cast<MappedIdSet const &>().for_each([&ids](auto id) { ids.set(id); });
+        return;
+    }
+
+    if (!pybind11::isinstance<pybind11::buffer>(data)
+        || pybind11::isinstance<pybind11::bytes>(data)) {
+        for (auto const &i: pybind11::iter(data)) {
+            if (!PyIndex_Check(i.ptr())) {
+                throw pybind11::type_error{"IDs must be integers."};
+            }
+            if (i.cast<std::int64_t>() < 0) {
+                throw pybind11::value_error{"IDs must not be negative."};
+            }
+            ids.set(i.cast<osmium::unsigned_object_id_type>());
+        }
+        return;
+    }
+
+    auto const info = pybind11::reinterpret_borrow<pybind11::buffer>(data).request();
+    if (info.ndim != 1) {
+        throw pybind11::value_error{"ID array must be one-dimensional."};
+    }
+
+    // Only native byte order is supported.
+    auto format = info.format;
+    if (!format.empty() && (format[0] == '@' || format[0] == '=' || format[0] == '<')) {
+        format.erase(0, 1);
+    }
+    if (format.size() != 1 || std::strchr("bhilqBHILQ", format[0]) == nullptr) {
+        throw pybind11::type_error{"ID array must contain integers."};
+    }
+
+    bool const is_signed = std::islower(static_cast<unsigned char>(format[0]));
+    switch (info.itemsize) {
+        case 1:
+            is_signed ? detail::add_buffer_ids<std::int8_t>(ids, info)
+                      : detail::add_buffer_ids<std::uint8_t>(ids, info);
+            break;
+        case 2:
+            is_signed ? detail::add_buffer_ids<std::int16_t>(ids, info)
+                      : detail::add_buffer_ids<std::uint16_t>(ids, info);
+            break;
+        case 4:
+            is_signed ? detail::add_buffer_ids<std::int32_t>(ids, info)
+                      : detail::add_buffer_ids<std::uint32_t>(ids, info);
+            break;
+        case 8:
+            is_signed ? detail::add_buffer_ids<std::int64_t>(ids, info)
+                      : detail::add_buffer_ids<std::uint64_t>(ids, info);
+            break;
+        default:
+            throw pybind11::type_error{"ID array must contain integers."};
+    }
+}
+
+
+/**
+ * Add IDs from a file. Text files contain one ID per line, empty lines
+ * and lines starting with '#' are ignored. Binary files contain
+ * the IDs as 64-bit little-endian integers.
+ */
+inline void add_ids_from_file(IdSet &ids, std::filesystem::path const &filename,
+                              bool binary)
+{
+    std::ifstream file{filename, binary ? std::ios::binary : std::ios::in};
+    if (!file) {
+        throw std::system_error{errno, std::system_category(),
+                                "Cannot open ID file '" + filename.string() + "'"};
+    }
+
+    if (binary) {
+        std::vector<unsigned char> chunk(8 * 65536);
+        while (file) {
+            file.read(reinterpret_cast<char *>(chunk.data()),
+                      static_cast<std::streamsize>(chunk.size()));
+            auto const num = static_cast<std::size_t>(file.gcount());
+            if (num % 8 != 0) {
+                throw pybind11::value_error{"Binary ID file has a size that is not "
+                                            "a multiple of 8 bytes."};
+            }
+            for (std::size_t i = 0; i < num; i += 8) {
+                std::uint64_t value = 0;
+                for (std::size_t b = 0; b < 8; ++b) {
+                    value |= static_cast<std::uint64_t>(chunk[i + b]) << (8 * b);
+                }
+                if (static_cast<std::int64_t>(value) < 0) {
+                    throw pybind11::value_error{"IDs must not be negative."};
+                }
+                ids.set(value);
+            }
+        }
+        return;
+    }
+
+    std::string line;
+    std::size_t lineno = 0;
+    while (std::getline(file, line)) {
+        ++lineno;
+        auto const start = line.find_first_not_of(" \t\r");
+        if (start == std::string::npos || line[start] == '#') {
+            continue;
+        }
+        char const *begin = line.c_str() + start;
+        char *end;
+        errno = 0;
+        auto const value = std::strtoull(begin, &end, 10);
+        if (end == begin || *begin == '-' || errno == ERANGE
+            || line.find_first_not_of(" \t\r", static_cast<std::size_t>(end - line.c_str()))
+                   != std::string::npos) {
+            throw pybind11::value_error{"Invalid ID in line " + std::to_string(lineno)
+                                        + " of '" + filename.string() + "'."};
+        }
+        ids.set(value);
+    }
+}
+
+} // namespace pyosmium
+
+#endif // PYOSMIUM_ID_SET_H
@@ -6,6 +6,7 @@
  * For a full list of authors see the git log.
  */
 #include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
 #include <pybind11/stl/filesystem.h>
 
 #include <osmium/osm.hpp>
@@ -15,16 +16,19 @@
 #include <osmium/thread/pool.hpp>
 
 #include "base_filter.h"
+#include "id_set.h"
 #include "osmium_module.h"
 
 #include <filesystem>
+#include <memory>
+#include <vector>
 
 namespace py = pybind11;
 
 namespace {
 
 using IdType = osmium::unsigned_object_id_type;
-using IdSet = osmium::index::IdSetDense<IdType>;
+using pyosmium::IdSet;
 
 class IdTracker
 {
@@ -35,8 +39,8 @@ public:
             auto const nlist = py::getattr(obj, "nodes");
             for (auto const ref : nlist) {
                 auto const attr = py::getattr(ref, "ref", py::none());
-                m_ids.nodes().set(attr.is_none() ? ref.cast<IdType>()
-                                                 : attr.cast<IdType>());
+                m_ids(osmium::item_type::node).set(attr.is_none() ? ref.cast<IdType>()
+                                                                 : attr.cast<IdType>());
             }
         } else if (py::hasattr(obj, "members")) {
             auto const mlist = py::getattr(obj, "members");
@@ -68,8 +72,8 @@ public:
             auto const nlist = py::getattr(obj, "nodes");
             for (auto const ref : nlist) {
                 auto const attr = py::getattr(ref, "ref", py::none());
-                if (m_ids.nodes().get(attr.is_none() ? ref.cast<IdType>()
-                                                     : attr.cast<IdType>())) {
+                if (contains(osmium::item_type::node, attr.is_none() ? ref.cast<IdType>()
+                                                                     : attr.cast<IdType>())) {
                     return true;
                 }
             }
@@ -89,7 +93,7 @@ public:
                     mtype = member.attr("type").cast<std::string>();
                     id = member.attr("ref").cast<IdType>();
                 }
-                if (m_ids(osmium::char_to_item_type(mtype.front())).get(id)) {
+                if (contains(osmium::char_to_item_type(mtype.front()), id)) {
                     return true;
                 }
             }
@@ -103,15 +107,15 @@ public:
     {
         osmium::thread::Pool thread_pool{};
         // first pass: relations
-        while (relation_depth > 0 && !m_ids.relations().empty()) {
+        while (relation_depth > 0 && has_ids(osmium::item_type::relation)) {
             bool need_recurse = false;
             osmium::io::Reader rd{file, osmium::osm_entity_bits::relation, thread_pool};
             while (auto const buffer = rd.read()) {
                 for (auto const &rel: buffer.select<osmium::Relation>()) {
-                    if (m_ids.relations().get(rel.id())) {
+                    if (contains(osmium::item_type::relation, rel.id())) {
                         for (auto const &member: rel.members()) {
                             if (member.type() == osmium::item_type::relation
-                                && !m_ids.relations().get(member.ref())) {
+                                && !contains(osmium::item_type::relation, member.ref())) {
                                 need_recurse = true;
                             }
                             m_ids(member.type()).set(member.ref());
@@ -126,11 +130,11 @@ public:
         }
 
         // second pass: ways
-        if (!m_ids.ways().empty()) {
+        if (has_ids(osmium::item_type::way)) {
             osmium::io::Reader rd{file, osmium::osm_entity_bits::way, thread_pool};
             while (auto const buffer = rd.read()) {
                 for (auto const &way: buffer.select<osmium::Way>()) {
-                    if (m_ids.ways().get(way.id())) {
+                    if (contains(osmium::item_type::way, way.id())) {
                         for (auto const &nd: way.nodes()) {
                             m_ids.nodes().set(nd.ref());
                         }
@@ -156,7 +160,7 @@ public:
                     if (object.type() == osmium::item_type::way) {
                         const auto& way = static_cast<const osmium::Way&>(object);
                         for (const auto& nr : way.nodes()) {
-                            if (m_ids(osmium::item_type::node).get(nr.positive_ref())) {
+                            if (contains(osmium::item_type::node, nr.positive_ref())) {
                                 m_ids(osmium::item_type::way).set(way.id());
                                 break;
                             }
@@ -165,7 +169,7 @@ public:
                         const auto& relation = static_cast<const osmium::Relation&>(object);
                         for (const auto& member : relation.members()) {
                             if (member.type() != osmium::item_type::relation) {
-                                if (m_ids(member.type()).get(member.positive_ref())) {
+                                if (contains(member.type(), member.positive_ref())) {
                                     m_ids(osmium::item_type::relation).set(relation.id());
                                     break;
                                 }
@@ -177,15 +181,15 @@ public:
         }
 
         // recursive passes: find additional referenced relations
-        while (relation_depth > 0 && !m_ids.relations().empty()) {
+        while (relation_depth > 0 && has_ids(osmium::item_type::relation)) {
             bool need_recurse = false;
             osmium::io::Reader rd{file, osmium::osm_entity_bits::relation, thread_pool};
             while (auto const buffer = rd.read()) {
                 for (auto const &rel: buffer.select<osmium::Relation>()) {
-                    if (!m_ids.relations().get(rel.id())) {
+                    if (!contains(osmium::item_type::relation, rel.id())) {
                         for (auto const &member: rel.members()) {
                             if (member.type() == osmium::item_type::relation
-                                && m_ids.relations().get(member.ref())) {
+                                && contains(osmium::item_type::relation, member.ref())) {
                                 need_recurse = true;
                                 m_ids(member.type()).set(rel.id());
                                 break;
@@ -203,21 +207,119 @@ public:
     }
 
 
-    IdSet const &node_ids() const { return m_ids.nodes(); }
-    IdSet const &way_ids() const { return m_ids.ways(); }
-    IdSet const &relation_ids() const { return m_ids.relations(); }
+    void save(std::filesystem::path const &filename)
+    {
+        make_writable();
+        pyosmium::MappedIdSet::save(filename, {{'n', &m_ids.nodes()},
+                                               {'w', &m_ids.ways()},
+                                               {'r', &m_ids.relations()}});
+    }
+
+    void load(std::filesystem::path const &filename, bool mmap)
+    {
+        for (char const type: pyosmium::MappedIdSet::types(filename)) {
+            if (type == 'n' || type == 'w' || type == 'r') {
+                auto const itype = osmium::char_to_item_type(type);
+                if (mmap) {
+                    writable(itype);
+                    m_mapped(itype) = std::make_shared<pyosmium::MappedIdSet>(filename, type);
+                } else {
+                    pyosmium::MappedIdSet const mapped{filename, type};
+                    auto &ids = writable(itype);
+                    mapped.for_each([&ids](auto id) { ids.set(id); });
+                }
+            }
+        }
+    }
+
+    void add(osmium::item_type itype, IdType id)
+    {
+        m_ids(itype).set(id);
+    }
+
+    bool contains(osmium::item_type itype, IdType id) const
+    {
+        auto const &mapped = m_mapped(itype);
+        return m_ids(itype).get(id) || (mapped && mapped->get(id));
+    }
 
-    IdSet const &ids(osmium::item_type itype) const { return m_ids(itype); }
+    bool has_ids(osmium::item_type itype) const
+    {
+        auto const &mapped = m_mapped(itype);
+        return !m_ids(itype).empty() || (mapped && !mapped->empty());
+    }
 
-    IdSet &node_ids() { return m_ids.nodes(); }
-    IdSet &way_ids() { return m_ids.ways(); }
-    IdSet &relation_ids() { return m_ids.relations(); }
+    std::size_t num_ids(osmium::item_type itype) const
+    {
+        auto const &ids = m_ids(itype);
+        auto const &mapped = m_mapped(itype);
+        if (!mapped) {
+            return ids.size();
+        }
+        auto num = mapped->size();
+        for (auto const id: ids) {
+            if (!mapped->get(id)) {
+                ++num;
+            }
+        }
+        return num;
+    }
+
+    std::vector<bool> contains_any(osmium::item_type itype, pyosmium::IdRanges const &ranges) const
+    {
+        auto result = pyosmium::contains_any(m_ids(itype), ranges);
+        if (auto const &mapped = m_mapped(itype)) {
+            for (std::size_t i = 0; i < ranges.size(); ++i) {
+                if (!result[i]) {
+                    result[i] = mapped->contains_any(ranges[i].first, ranges[i].second);
+                }
+            }
+        }
+        return result;
+    }
+
+    IdSet &node_ids() { return writable(osmium::item_type::node); }
+    IdSet &way_ids() { return writable(osmium::item_type::way); }
+    IdSet &relation_ids() { return writable(osmium::item_type::relation); }
 
 private:
+    /**
+     * Return the in-memory set for the given type. When the IDs are
+     * still memory-mapped, they are copied into the set first.
+     */
+    IdSet &writable(osmium::item_type itype)
+    {
+        auto &ids = m_ids(itype);
+        if (auto &mapped = m_mapped(itype)) {
+            mapped->for_each([&ids](auto id) { ids.set(id); });
+            mapped.reset();
+        }
+        return ids;
+    }
+
+    void make_writable()
+    {
+        writable(osmium::item_type::node);
+        writable(osmium::item_type::way);
+        writable(osmium::item_type::relation);
+    }
+
     osmium::nwr_array<IdSet> m_ids;
+    // Read-only sets loaded from file. They are consulted in addition
+    // to the in-memory sets as long as the IDs are not modified.
+    osmium::nwr_array<std::shared_ptr<pyosmium::MappedIdSet>> m_mapped;
 };
 
 
+osmium::item_type tracker_type(char osm_type)
+{
+    if (osm_type != 'n' && osm_type != 'w' && osm_type != 'r') {
+        throw py::value_error{"Object type must be one of 'n', 'w' or 'r'."};
+    }
+    return osmium::char_to_item_type(osm_type);
+}
+
+
 class IdTrackerFilter : public pyosmium::BaseFilter
 {
 public:
@@ -229,15 +331,15 @@ public:
 
 protected:
     bool filter_node(pyosmium::PyOSMNode &o) override {
-        return !m_tracker.node_ids().get(o.get()->id());
+        return !m_tracker.contains(osmium::item_type::node, o.get()->id());
     }
 
     bool filter_way(pyosmium::PyOSMWay &o) override {
-        return !m_tracker.way_ids().get(o.get()->id());
+        return !m_tracker.contains(osmium::item_type::way, o.get()->id());
     }
 
     bool filter_relation(pyosmium::PyOSMRelation &o) override {
-        return !m_tracker.relation_ids().get(o.get()->id());
+        return !m_tracker.contains(osmium::item_type::relation, o.get()->id());
     }
 
 private:
@@ -257,7 +359,7 @@ public:
 protected:
     bool filter_way(pyosmium::PyOSMWay &o) override {
         for (auto const &node : o.get()->nodes()) {
-            if (m_tracker.node_ids().get(node.ref())) {
+            if (m_tracker.contains(osmium::item_type::node, node.ref())) {
                 return false;
             }
         }
@@ -266,7 +368,7 @@ protected:
 
     bool filter_relation(pyosmium::PyOSMRelation &o) override {
         for (auto const &member: o.get()->members()) {
-            if (m_tracker.ids(member.type()).get(member.ref())) {
+            if (m_tracker.contains(member.type(), member.ref())) {
                 return false;
             }
         }
@@ -291,9 +393,10 @@ void init_id_tracker(pybind11::module &m)
 
     py::class_<IdTracker>(m, "IdTracker")
         .def(py::init<>())
-        .def("add_node", [](IdTracker &self, IdType id) { self.node_ids().set(id); })
-        .def("add_way", [](IdTracker &self, IdType id) { self.way_ids().set(id); })
-        .def("add_relation", [](IdTracker &self, IdType id) { self.relation_ids().set(id); })
+        .def("add_node", [](IdTracker &self, IdType id) { self.add(osmium::item_type::node, id); })
+        .def("add_way", [](IdTracker &self, IdType id) { self.add(osmium::item_type::way, id); })
+        .def("add_relation",
+             [](IdTracker &self, IdType id) { self.add(osmium::item_type::relation, id); })
         .def("add_references", &IdTracker::add_references)
         .def("contains_any_references", &IdTracker::contains_any_references)
         .def("complete_backward_references", &IdTracker::complete_backward_references,
@@ -320,17 +423,29 @@ void init_id_tracker(pybind11::module &m)
                 self.complete_forward_references(osmium::io::File{fname.string()}, relation_depth);
              },
              py::arg("fname"), py::arg("relation_depth") = 0)
+        .def("save", &IdTracker::save, py::arg("filename"))
+        .def("load", &IdTracker::load, py::arg("filename"), py::arg("mmap") = false)
         .def("id_filter",
              [](IdTracker const &self) { return new IdTrackerFilter(self); },
              py::keep_alive<0, 1>())
         .def("contains_filter",
              [](IdTracker const &self) { return new IdContainsFilter(self); },
              py::keep_alive<0, 1>())
-        .def("node_ids", (IdSet& (IdTracker::*)()) &IdTracker::node_ids,
+        .def("num_ids",
+             [](IdTracker const &self, char osm_type) {
+                 return self.num_ids(tracker_type(osm_type));
+             },
+             py::arg("osm_type"))
+        .def("contains_any",
+             [](IdTracker const &self, char osm_type, pyosmium::IdRanges const &ranges) {
+                 return self.contains_any(tracker_type(osm_type), ranges);
+             },
+             py::arg("osm_type"), py::arg("ranges"))
+        .def("node_ids", &IdTracker::node_ids,
              py::return_value_policy::reference_internal)
-        .def("way_ids", (IdSet& (IdTracker::*)()) &IdTracker::way_ids,
+        .def("way_ids", &IdTracker::way_ids,
              py::return_value_policy::reference_internal)
-        .def("relation_ids", (IdSet& (IdTracker::*)()) &IdTracker::relation_ids,
+        .def("relation_ids", &IdTracker::relation_ids,
              py::return_value_policy::reference_internal)
     ;
 }
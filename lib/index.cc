@@ -6,14 +6,139 @@
  * For a full list of authors see the git log.
  */
 #include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+#include <pybind11/stl/filesystem.h>
+#include <pybind11/numpy.h>
 
 #include <osmium/osm.hpp>
 #include <osmium/index/map/all.hpp>
 #include <osmium/index/node_locations_map.hpp>
-#include <osmium/index/id_set.hpp>
+
+#include <algorithm>
+#include <cstdint>
+#include <filesystem>
+#include <memory>
+#include <optional>
+#include <string>
+#include <type_traits>
+#include <utility>
+#include <vector>
+
+#include "cast.h"
+#include "compressed_location_map.h"
+#include "id_set.h"
+#include "location_cache.h"
+#include "shared_location_table.h"
 
 namespace py = pybind11;
 
+namespace {
+
+using pyosmium::IdSet;
+using pyosmium::MappedIdSet;
+
+char osm_type_char(std::optional<std::string> const &osm_type)
+{
+    if (!osm_type) {
+        return '\0';
+    }
+    if (*osm_type != "n" && *osm_type != "w" && *osm_type != "r") {
+        throw py::value_error{"'osm_type' must be one of 'n', 'w' or 'r'."};
+    }
+    return osm_type->front();
+}
+
+template <typename Set>
+py::array_t<std::int64_t> ids_to_array(Set const &ids)
+{
+    py::array_t<std::int64_t> result(static_cast<py::ssize_t>(ids.size()));
+    auto *out = result.mutable_data();
+    if constexpr (std::is_same_v<Set, MappedIdSet>) {
+        ids.for_each([&out](auto id) { *out++ = static_cast<std::int64_t>(id); });
+    } else {
+        for (auto const id: ids) {
+            *out++ = static_cast<std::int64_t>(id);
+        }
+    }
+    return result;
+}
+
+std::unique_ptr<IdSet> id_union(IdSet const &a, IdSet const &b)
+{
+    auto result = std::make_unique<IdSet>();
+    for (auto const id: a) {
+        result->set(id);
+    }
+    for (auto const id: b) {
+        result->set(id);
+    }
+    return result;
+}
+
+std::unique_ptr<IdSet> id_intersection(IdSet const &a, IdSet const &b)
+{
+    auto const &smaller = a.size() <= b.size() ? a : b;
+    auto const &larger = a.size() <= b.size() ? b : a;
+
+    auto result = std::make_unique<IdSet>();
+    for (auto const id: smaller) {
+        if (larger.get(id)) {
+            result->set(id);
+        }
+    }
+    return result;
+}
+
+std::unique_ptr<IdSet> id_difference(IdSet const &a, IdSet const &b)
+{
+    auto result = std::make_unique<IdSet>();
+    for (auto const id: a) {
+        if (!b.get(id)) {
+            result->set(id);
+        }
+    }
+    return result;
+}
+
+IdSet &id_union_update(IdSet &self, IdSet const &other)
+{
+    if (&self != &other) {
+        for (auto const id: other) {
+            self.set(id);
+        }
+    }
+    return self;
+}
+
+IdSet &id_intersection_update(IdSet &self, IdSet const &other)
+{
+    // IDs must not be removed while iterating over the set.
+    std::vector<osmium::unsigned_object_id_type> remove;
+    for (auto const id: self) {
+        if (!other.get(id)) {
+            remove.push_back(id);
+        }
+    }
+    for (auto const id: remove) {
+        self.unset(id);
+    }
+    return self;
+}
+
+IdSet &id_difference_update(IdSet &self, IdSet const &other)
+{
+    if (&self == &other) {
+        self.clear();
+    } else {
+        for (auto const id: other) {
+            self.unset(id);
+        }
+    }
+    return self;
+}
+
+} // namespace
+
 #ifdef Py_GIL_DISABLED
 PYBIND11_MODULE(index, m, py::mod_gil_not_used())
 #else
@@ -24,6 +149,13 @@ PYBIND11_MODULE(index, m)
         osmium::index::map::Map<osmium::unsigned_object_id_type, osmium::Location>;
     using IndexFactory =
         osmium::index::MapFactory<osmium::unsigned_object_id_type, osmium::Location>;
+    using IdArray = py::array_t<std::int64_t, py::array::c_style | py::array::forcecast>;
+    using CoordArray = py::array_t<std::int32_t, py::array::c_style | py::array::forcecast>;
+
+    IndexFactory::instance().register_map("compressed_mem",
+        [](std::vector<std::string> const &) -> LocationTable * {
+            return new pyosmium::CompressedLocationMap();
+        });
 
     py::class_<LocationTable>(m, "LocationTable")
         .def("set", &LocationTable::set, py::arg("id"), py::arg("loc"))
@@ -32,6 +164,139 @@ PYBIND11_MODULE(index, m)
         .def("clear", &LocationTable::clear)
         .def ("__setitem__", &LocationTable::set)
         .def ("__getitem__", &LocationTable::get)
+        .def("get_many",
+             [](LocationTable const &self, IdArray const &ids,
+                std::string const &missing, std::int32_t sentinel) -> py::tuple {
+                 if (missing != "mask" && missing != "sentinel" && missing != "raise") {
+                     throw py::value_error{"'missing' must be one of 'mask', 'sentinel' or 'raise'."};
+                 }
+                 if (ids.ndim() != 1) {
+                     throw py::value_error{"'ids' must be one-dimensional."};
+                 }
+
+                 auto const num = ids.shape(0);
+                 py::array_t<std::int32_t> x(num);
+                 py::array_t<std::int32_t> y(num);
+                 py::array_t<bool> mask(num);
+
+                 auto const in = ids.unchecked<1>();
+                 auto xout = x.mutable_unchecked<1>();
+                 auto yout = y.mutable_unchecked<1>();
+                 auto mout = mask.mutable_unchecked<1>();
+                 py::ssize_t first_missing = -1;
+                 // The GIL is kept like for get(): the tables are not
+                 // thread-safe and may be modified concurrently otherwise.
+                 for (py::ssize_t i = 0; i < num; ++i) {
+                     osmium::Location loc;
+                     if (in(i) >= 0) {
+                         loc = self.get_noexcept(
+                                   static_cast<osmium::unsigned_object_id_type>(in(i)));
+                     }
+                     mout(i) = loc.is_undefined();
+                     if (mout(i)) {
+                         if (first_missing < 0) {
+                             first_missing = i;
+                         }
+                         xout(i) = sentinel;
+                         yout(i) = sentinel;
+                     } else {
+                         xout(i) = loc.x();
+                         yout(i) = loc.y();
+                     }
+                 }
+
+                 if (missing == "raise") {
+                     if (first_missing >= 0) {
+                         throw py::key_error{"No location for node id "
+                                             + std::to_string(in(first_missing))};
+                     }
+                 } else if (missing == "mask") {
+                     auto const masked_array = py::module_::import("numpy.ma").attr("masked_array");
+                     return py::tuple{py::make_tuple(masked_array(x, py::arg("mask") = mask),
+                                                     masked_array(y, py::arg("mask") = mask))};
+                 }
+
+                 return py::tuple{py::make_tuple(x, y)};
+             },
+             py::arg("ids"), py::kw_only(), py::arg("missing") = "mask",
+             py::arg("sentinel") =
+                 static_cast<std::int32_t>(osmium::Location::undefined_coordinate))
+        .def("set_many",
+             [](LocationTable &self, IdArray const &ids, CoordArray const &x, CoordArray const &y) {
+                 if (ids.ndim() != 1 || x.ndim() != 1 || y.ndim() != 1) {
+                     throw py::value_error{"'ids', 'x' and 'y' must be one-dimensional."};
+                 }
+                 auto const num = ids.shape(0);
+                 if (x.shape(0) != num || y.shape(0) != num) {
+                     throw py::value_error{"'ids', 'x' and 'y' must have the same length."};
+                 }
+
+                 auto const in = ids.unchecked<1>();
+                 auto const xin = x.unchecked<1>();
+                 auto const yin = y.unchecked<1>();
+                 for (py::ssize_t i = 0; i < num; ++i) {
+                     if (in(i) < 0) {
+                         throw py::value_error{"Node ids must not be negative."};
+                     }
+                 }
+
+                 for (py::ssize_t i = 0; i < num; ++i) {
+                     self.set(static_cast<osmium::unsigned_object_id_type>(in(i)),
+                              osmium::Location{xin(i), yin(i)});
+                 }
+             },
+             py::arg("ids"), py::arg("x"), py::arg("y"))
+    ;
+
+    using pyosmium::LocationCache;
+
+    py::class_<LocationCache, LocationTable>(m, "LocationCache")
+        .def(py::init<std::filesystem::path const &, std::string const &, bool>(),
+             py::arg("filename"), py::arg("mode") = "r", py::arg("allow_incomplete") = false)
+        .def_property("source", &LocationCache::source, &LocationCache::set_source)
+        .def_property("sequence", &LocationCache::sequence, &LocationCache::set_sequence)
+        .def_property("timestamp", &LocationCache::timestamp, &LocationCache::set_timestamp)
+        .def_property_readonly("complete", &LocationCache::complete)
+        .def_property_readonly("writable", &LocationCache::writable)
+        .def_property_readonly("closed", &LocationCache::closed)
+        .def_property_readonly("filename", &LocationCache::filename)
+        .def("close", &LocationCache::close, py::arg("complete") = true)
+        .def("__enter__", [](LocationCache &self) -> LocationCache & { return self; },
+             py::return_value_policy::reference)
+        .def("__exit__",
+             [](LocationCache &self, py::object const &exc_type, py::object const &,
+                py::object const &) { self.close(exc_type.is_none()); })
+    ;
+
+    using pyosmium::SharedLocationTable;
+
+    py::class_<SharedLocationTable, LocationTable>(m, "SharedLocationTable")
+        .def(py::init(&SharedLocationTable::attach), py::arg("name"))
+        .def_static("create", &SharedLocationTable::create,
+                    py::arg("capacity"), py::arg("name") = py::none())
+        .def_static("required_size", &SharedLocationTable::required_size,
+                    py::arg("capacity"))
+        .def_property_readonly("name", &SharedLocationTable::name)
+        .def_property_readonly("capacity", &SharedLocationTable::capacity)
+        .def_property_readonly("writable", &SharedLocationTable::writable)
+        .def_property_readonly("finished", &SharedLocationTable::finished)
+        .def_property_readonly("closed", &SharedLocationTable::closed)
+        .def("__len__", &SharedLocationTable::size)
+        .def("finish", [](SharedLocationTable &self) {
+                 py::gil_scoped_release release;
+                 self.finish();
+             })
+        .def("close", &SharedLocationTable::close, py::arg("unlink") = true)
+        .def("__enter__",
+             [](SharedLocationTable &self) -> SharedLocationTable & { return self; },
+             py::return_value_policy::reference)
+        .def("__exit__",
+             [](SharedLocationTable &self, py::object const &, py::object const &,
+                py::object const &) { self.close(true); })
+        .def("__reduce__", [](SharedLocationTable const &self) {
+                 return py::make_tuple(py::type::of<SharedLocationTable>(),
+                                       py::make_tuple(self.name()));
+             })
     ;
 
     m.def("create_map", [](const std::string& config_string) {
@@ -50,10 +315,13 @@ PYBIND11_MODULE(index, m)
         return l;
         });
 
-    using IdSet = osmium::index::IdSetDense<osmium::unsigned_object_id_type>;
-
     py::class_<IdSet>(m, "IdSet")
         .def(py::init<>())
+        .def(py::init([](py::object const &ids) {
+                 auto result = std::make_unique<IdSet>();
+                 pyosmium::add_ids(*result, ids);
+                 return result;
+             }), py::arg("ids"))
         .def("set", &IdSet::set)
         .def("unset", &IdSet::unset)
         .def("get", &IdSet::get)
@@ -61,5 +329,57 @@ PYBIND11_MODULE(index, m)
         .def("clear", &IdSet::clear)
         .def("__len__", &IdSet::size)
         .def("__contains__", &IdSet::get)
+        .def("contains_any", &pyosmium::contains_any, py::arg("ranges"))
+        .def("update",
+             [](IdSet &self, py::object const &ids) { pyosmium::add_ids(self, ids); },
+             py::arg("ids"))
+        .def("update_from_file",
+             [](IdSet &self, std::filesystem::path const &filename, std::string const &format) {
+                 if (format != "text" && format != "binary") {
+                     throw py::value_error{"'format' must be one of 'text' or 'binary'."};
+                 }
+                 py::gil_scoped_release release;
+                 pyosmium::add_ids_from_file(self, filename, format == "binary");
+             }, py::arg("filename"), py::arg("format") = "text")
+        .def("to_array", &ids_to_array<IdSet>)
+        .def("save",
+             [](IdSet const &self, std::filesystem::path const &filename) {
+                 py::gil_scoped_release release;
+                 MappedIdSet::save(filename, {{'\0', &self}});
+             }, py::arg("filename"))
+        .def_static("load",
+             [](std::filesystem::path const &filename, std::optional<std::string> const &osm_type) {
+                 auto result = std::make_unique<IdSet>();
+                 MappedIdSet const mapped{filename, osm_type_char(osm_type)};
+                 {
+                     py::gil_scoped_release release;
+                     mapped.for_each([&result](auto id) { result->set(id); });
+                 }
+                 return result;
+             }, py::arg("filename"), py::arg("osm_type") = py::none())
+        .def("union", &id_union, py::arg("other"))
+        .def("intersection", &id_intersection, py::arg("other"))
+        .def("difference", &id_difference, py::arg("other"))
+        .def("__or__", &id_union, py::is_operator())
+        .def("__and__", &id_intersection, py::is_operator())
+        .def("__sub__", &id_difference, py::is_operator())
+        .def("__ior__", &id_union_update, py::is_operator(),
+             py::return_value_policy::reference)
+        .def("__iand__", &id_intersection_update, py::is_operator(),
+             py::return_value_policy::reference)
+        .def("__isub__", &id_difference_update, py::is_operator(),
+             py::return_value_policy::reference)
+    ;
+
+    py::class_<MappedIdSet, std::shared_ptr<MappedIdSet>>(m, "MappedIdSet")
+        .def(py::init([](std::filesystem::path const &filename,
+                         std::optional<std::string> const &osm_type) {
+                 return std::make_shared<MappedIdSet>(filename, osm_type_char(osm_type));
+             }), py::arg("filename"), py::arg("osm_type") = py::none())
+        .def("get", &MappedIdSet::get, py::arg("id"))
+        .def("empty", &MappedIdSet::empty)
+        .def("to_array", &ids_to_array<MappedIdSet>)
+        .def("__len__", &MappedIdSet::size)
+        .def("__contains__", &MappedIdSet::get)
     ;
 }
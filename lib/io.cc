@@ -105,7 +105,8 @@ PYBIND11_MODULE(io, m)
             )
         .def("eof", [](pyosmium::PyReader const &self) { return self.get()->eof(); })
         .def("close", [](pyosmium::PyReader &self) { self.get()->close(); })
-        .def("header", [](pyosmium::PyReader &self) { return self.get()->header(); })
+        .def("header", [](pyosmium::PyReader &self) { return self.get()->header(); },
+             py::call_guard<py::gil_scoped_release>())
         .def("__enter__", [](py::object const &self) { return self; })
         .def("__exit__", [](pyosmium::PyReader &self, py::args args) { self.get()->close(); })
     ;
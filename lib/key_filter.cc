@@ -7,6 +7,11 @@
  */
 #include <pybind11/pybind11.h>
 
+#include <string>
+#include <string_view>
+#include <unordered_set>
+#include <vector>
+
 #include <osmium/osm.hpp>
 
 #include "base_filter.h"
@@ -32,34 +37,38 @@ public:
 
             m_keys.push_back(arg.cast<std::string>());
         }
-    }
 
-    bool filter(osmium::OSMObject const *o) override
-    {
-        auto const &tags = o->tags();
+        // Views must only be taken once m_keys is complete.
+        m_index.reserve(m_keys.size());
         for (auto const &key: m_keys) {
-            if (tags.has_key(key.c_str())) {
-                return false;
-            }
+            m_index.emplace(key);
         }
+    }
 
-        return true;
+    bool filter(osmium::OSMObject const *o) override
+    {
+        return !matches(o->tags());
     }
 
     bool filter_changeset(pyosmium::PyOSMChangeset &o) override
     {
-        auto const &tags = o.get()->tags();
-        for (auto const &key: m_keys) {
-            if (tags.has_key(key.c_str())) {
-                return false;
+        return !matches(o.get()->tags());
+    }
+
+private:
+    bool matches(osmium::TagList const &tags) const
+    {
+        for (auto const &tag: tags) {
+            if (m_index.count(tag.key())) {
+                return true;
             }
         }
 
-        return true;
+        return false;
     }
 
-private:
     std::vector<std::string> m_keys;
+    std::unordered_set<std::string_view> m_index;
 };
 
 } // namespace
@@ -0,0 +1,373 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#ifndef PYOSMIUM_LOCATION_CACHE_H
+#define PYOSMIUM_LOCATION_CACHE_H
+
+#include <fcntl.h>
+
+#include <algorithm>
+#include <cerrno>
+#include <cstdint>
+#include <cstring>
+#include <filesystem>
+#include <memory>
+#include <optional>
+#include <stdexcept>
+#include <string>
+#include <system_error>
+
+#include <pybind11/pybind11.h>
+
+#include <osmium/osm/location.hpp>
+#include <osmium/osm/timestamp.hpp>
+#include <osmium/osm/types.hpp>
+#include <osmium/index/index.hpp>
+#include <osmium/index/map.hpp>
+#include <osmium/io/detail/read_write.hpp>
+#include <osmium/util/file.hpp>
+#include <osmium/util/memory_mapping.hpp>
+
+namespace pyosmium {
+
+/**
+ * Persistent node location store in a single file, which carries
+ * metadata about its content in a header.
+ *
+ * The file starts with a header of 4096 bytes:
+ *
+ *     0  magic (8 bytes)
+ *     8  version (u32)
+ *    12  byte order mark (u32)
+ *    16  number of location slots (u64)
+ *    24  complete flag (u32)
+ *    28  length of source description (u32)
+ *    32  replication sequence (i64, -1 if unknown)
+ *    40  replication timestamp (i64, -1 if unknown)
+ *    48  source description (UTF-8)
+ *
+ * The header is followed by a dense array of locations indexed by node ID.
+ * Coordinates are stored xor'ed with the undefined coordinate, so that
+ * unset slots are all zero and the file can be kept sparse.
+ *
+ * The complete flag is cleared as long as the file is opened for writing.
+ * A file which was not closed properly is therefore recognisable as
+ * incomplete.
+ */
+class LocationCache
+: public osmium::index::map::Map<osmium::unsigned_object_id_type, osmium::Location>
+{
+public:
+    static constexpr char magic[8] = {'P', 'Y', 'O', 'L', 'O', 'C', 'D', 'B'};
+    static constexpr std::uint32_t version = 1;
+    static constexpr std::uint32_t byte_order_mark = 0x01020304;
+    static constexpr std::size_t header_size = 4096;
+    static constexpr std::size_t source_offset = 48;
+    static constexpr std::size_t max_source_length = header_size - source_offset;
+    static constexpr std::size_t min_growth = 1024 * 1024;
+
+    LocationCache(std::filesystem::path const &filename, std::string const &mode,
+                  bool allow_incomplete)
+    : m_filename(filename)
+    {
+        if (mode == "w") {
+            // Remove an existing file first, so that processes which have
+            // the old file still opened are not disturbed.
+            std::filesystem::remove(filename);
+            // The file must be readable as well for a shared mapping.
+            m_fd = open_for_update(filename, O_CREAT | O_TRUNC); // NOLINT(hicpp-signed-bitwise)
+            m_writable = true;
+            map(header_size);
+            std::memcpy(data(), magic, sizeof(magic));
+            write_field<std::uint32_t>(8, version);
+            write_field<std::uint32_t>(12, byte_order_mark);
+            write_field<std::int64_t>(32, -1);
+            write_field<std::int64_t>(40, -1);
+        } else if (mode == "r" || mode == "a") {
+            m_writable = (mode == "a");
+            m_fd = m_writable ? open_for_update(filename)
+                              : osmium::io::detail::open_for_reading(filename.string());
+            auto const size = osmium::file_size(m_fd);
+            if (size < header_size) {
+                close_fd();
+                throw pybind11::value_error{"'" + filename.string()
+                                            + "' is not a location cache."};
+            }
+            map(size);
+            check_header(size);
+            if (!allow_incomplete && !complete()) {
+                unmap();
+                throw std::runtime_error{"Location cache '" + filename.string()
+                                         + "' is incomplete. It was not closed"
+                                           " properly after writing."};
+            }
+            if (!m_writable) {
+                // The mapping stays valid after closing the file.
+                close_fd();
+            }
+        } else {
+            throw pybind11::value_error{"'mode' must be one of 'r', 'w' or 'a'."};
+        }
+
+        if (m_writable) {
+            write_field<std::uint32_t>(24, 0);
+        }
+    }
+
+    LocationCache(LocationCache const &) = delete;
+    LocationCache &operator=(LocationCache const &) = delete;
+
+    ~LocationCache() noexcept override
+    {
+        try {
+            unmap();
+        } catch (...) {
+            // ignore errors on cleanup
+        }
+    }
+
+    void close(bool mark_complete)
+    {
+        if (!m_mapping) {
+            return;
+        }
+        if (m_writable && mark_complete) {
+            write_field<std::uint32_t>(24, 1);
+        }
+        unmap();
+    }
+
+    bool closed() const noexcept { return !m_mapping; }
+    bool writable() const noexcept { return m_writable; }
+    std::filesystem::path const &filename() const noexcept { return m_filename; }
+
+    bool complete() const
+    {
+        check_open();
+        return read_field<std::uint32_t>(24) != 0;
+    }
+
+    std::string source() const
+    {
+        check_open();
+        auto const len = std::min<std::size_t>(read_field<std::uint32_t>(28), max_source_length);
+        return std::string(data() + source_offset, len);
+    }
+
+    void set_source(std::string const &source)
+    {
+        check_writable();
+        if (source.size() > max_source_length) {
+            throw pybind11::value_error{"Source description is too long."};
+        }
+        std::memset(data() + source_offset, 0, max_source_length);
+        std::memcpy(data() + source_offset, source.data(), source.size());
+        write_field<std::uint32_t>(28, static_cast<std::uint32_t>(source.size()));
+    }
+
+    std::optional<std::int64_t> sequence() const
+    {
+        check_open();
+        auto const seq = read_field<std::int64_t>(32);
+        return seq < 0 ? std::nullopt : std::optional<std::int64_t>{seq};
+    }
+
+    void set_sequence(std::optional<std::int64_t> sequence)
+    {
+        check_writable();
+        if (sequence && *sequence < 0) {
+            throw pybind11::value_error{"Sequence must not be negative."};
+        }
+        write_field<std::int64_t>(32, sequence.value_or(-1));
+    }
+
+    std::optional<osmium::Timestamp> timestamp() const
+    {
+        check_open();
+        auto const ts = read_field<std::int64_t>(40);
+        return ts < 0 ? std::nullopt
+                      : std::optional<osmium::Timestamp>{static_cast<std::uint32_t>(ts)};
+    }
+
+    void set_timestamp(std::optional<osmium::Timestamp> timestamp)
+    {
+        check_writable();
+        write_field<std::int64_t>(40, timestamp ? timestamp->seconds_since_epoch() : -1);
+    }
+
+    void set(osmium::unsigned_object_id_type id, osmium::Location value) override
+    {
+        check_writable();
+        if (id >= capacity()) {
+            grow(id);
+        }
+        auto *slot = slots() + id * 2;
+        slot[0] = encode(value.x());
+        slot[1] = encode(value.y());
+    }
+
+    osmium::Location get(osmium::unsigned_object_id_type id) const override
+    {
+        auto const loc = get_noexcept(id);
+        if (loc.is_undefined()) {
+            throw osmium::not_found{id};
+        }
+        return loc;
+    }
+
+    osmium::Location get_noexcept(osmium::unsigned_object_id_type id) const noexcept override
+    {
+        if (!m_mapping || id >= capacity()) {
+            return osmium::Location{};
+        }
+        auto const *slot = slots() + id * 2;
+        return osmium::Location{encode(slot[0]), encode(slot[1])};
+    }
+
+    std::size_t size() const override
+    { return m_mapping ? static_cast<std::size_t>(capacity()) : 0; }
+
+    std::size_t used_memory() const override
+    { return size() * sizeof(osmium::Location); }
+
+    void clear() override
+    {
+        check_writable();
+        m_mapping->resize(header_size);
+        osmium::resize_file(m_fd, header_size);
+        write_field<std::uint64_t>(16, 0);
+        m_capacity = 0;
+    }
+
+private:
+    static std::int32_t encode(std::int32_t coord) noexcept
+    { return coord ^ osmium::Location::undefined_coordinate; }
+
+    static int open_for_update(std::filesystem::path const &filename, int extra_flags = 0)
+    {
+        int flags = O_RDWR | extra_flags; // NOLINT(hicpp-signed-bitwise)
+#ifdef _WIN32
+        flags |= O_BINARY; // NOLINT(hicpp-signed-bitwise)
+#endif
+        int const fd = ::open(filename.string().c_str(), flags, 0644);
+        if (fd < 0) {
+            throw std::system_error{errno, std::system_category(),
+                                    "Open failed for '" + filename.string() + "'"};
+        }
+        return fd;
+    }
+
+    template <typename T>
+    T read_field(std::size_t offset) const noexcept
+    {
+        T value;
+        std::memcpy(&value, data() + offset, sizeof(T));
+        return value;
+    }
+
+    template <typename T>
+    void write_field(std::size_t offset, T value) noexcept
+    { std::memcpy(data() + offset, &value, sizeof(T)); }
+
+    char *data() const noexcept
+    { return m_mapping->get_addr<char>(); }
+
+    std::int32_t *slots() const noexcept
+    { return reinterpret_cast<std::int32_t *>(data() + header_size); }
+
+    /**
+     * Number of location slots in the current mapping. This is not read
+     * from the header on access because another process may have grown
+     * the file while this one still has the old, shorter mapping.
+     */
+    std::uint64_t capacity() const noexcept
+    { return m_capacity; }
+
+    void check_open() const
+    {
+        if (!m_mapping) {
+            throw std::runtime_error{"Location cache is closed."};
+        }
+    }
+
+    void check_writable() const
+    {
+        check_open();
+        if (!m_writable) {
+            throw std::runtime_error{"Location cache is opened read-only."};
+        }
+    }
+
+    void check_header(std::size_t size)
+    {
+        if (!std::equal(magic, magic + sizeof(magic), data())) {
+            unmap();
+            throw pybind11::value_error{"'" + m_filename.string()
+                                        + "' is not a location cache."};
+        }
+        if (read_field<std::uint32_t>(8) != version || read_field<std::uint32_t>(12) != byte_order_mark) {
+            unmap();
+            throw pybind11::value_error{"Location cache '" + m_filename.string()
+                                        + "' has an unsupported format."};
+        }
+        auto const header_capacity = read_field<std::uint64_t>(16);
+        if (header_capacity > (size - header_size) / sizeof(osmium::Location)) {
+            unmap();
+            throw pybind11::value_error{"Location cache '" + m_filename.string()
+                                        + "' is truncated."};
+        }
+        m_capacity = header_capacity;
+    }
+
+    void grow(osmium::unsigned_object_id_type id)
+    {
+        auto const old_capacity = capacity();
+        auto const new_capacity = std::max<std::uint64_t>(
+            {id + 1, old_capacity + old_capacity / 2, min_growth});
+        // The new space is zero-filled, which means undefined locations.
+        m_mapping->resize(header_size + new_capacity * sizeof(osmium::Location));
+        write_field<std::uint64_t>(16, new_capacity);
+        m_capacity = new_capacity;
+    }
+
+    void map(std::size_t size)
+    {
+        m_mapping = std::make_unique<osmium::util::MemoryMapping>(
+            size,
+            m_writable ? osmium::util::MemoryMapping::mapping_mode::write_shared
+                       : osmium::util::MemoryMapping::mapping_mode::readonly,
+            m_fd);
+    }
+
+    void unmap()
+    {
+        if (m_mapping) {
+            m_mapping->unmap();
+            m_mapping.reset();
+        }
+        m_capacity = 0;
+        close_fd();
+    }
+
+    void close_fd()
+    {
+        if (m_fd >= 0) {
+            osmium::io::detail::reliable_close(m_fd);
+            m_fd = -1;
+        }
+    }
+
+    std::filesystem::path m_filename;
+    std::unique_ptr<osmium::util::MemoryMapping> m_mapping;
+    std::uint64_t m_capacity = 0;
+    int m_fd = -1;
+    bool m_writable = false;
+};
+
+} // namespace pyosmium
+
+#endif // PYOSMIUM_LOCATION_CACHE_H
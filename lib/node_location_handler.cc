@@ -31,7 +31,9 @@ public:
 
     bool node(pyosmium::PyOSMNode &o) override
     {
-        handler.node(*(o.get()));
+        if (store_node_locations) {
+            handler.node(*(o.get()));
+        }
         return false;
     }
 
@@ -47,11 +49,15 @@ public:
 
     void set_apply_nodes_to_ways(bool val) { apply_nodes_to_ways = val; }
 
+    bool get_store_node_locations() const { return store_node_locations; }
+    void set_store_node_locations(bool val) { store_node_locations = val; }
+
     void ignore_errors() { handler.ignore_errors(); }
 
 private:
     NodeLocationHandler handler;
     bool apply_nodes_to_ways = true;
+    bool store_node_locations = true;
 };
 
 } // namespace
@@ -68,6 +74,9 @@ void init_node_location_handler(py::module &m)
         .def_property("apply_nodes_to_ways",
                      &NodeLocationsForWays::get_apply_nodes_to_ways,
                      &NodeLocationsForWays::set_apply_nodes_to_ways)
+        .def_property("store_node_locations",
+                     &NodeLocationsForWays::get_store_node_locations,
+                     &NodeLocationsForWays::set_store_node_locations)
     ;
 
 }
@@ -0,0 +1,144 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#ifndef PYOSMIUM_OBJECT_BATCH_H
+#define PYOSMIUM_OBJECT_BATCH_H
+
+#include <deque>
+#include <memory>
+#include <type_traits>
+#include <variant>
+
+#include <pybind11/pybind11.h>
+
+#include <osmium/memory/buffer.hpp>
+#include <osmium/osm.hpp>
+
+#include "base_handler.h"
+#include "osm_base_objects.h"
+
+namespace pyosmium {
+
+/**
+ * Send a single object to the appropriate callback of the handler.
+ * Returns the result of the handler callback.
+ */
+inline bool handle_object(PyOSMAny &obj, BaseHandler &handler)
+{
+    return std::visit([&handler](auto &o) -> bool {
+        using T = std::decay_t<decltype(o)>;
+        if constexpr (std::is_same_v<T, PyOSMNode>) {
+            return handler.node(o);
+        } else if constexpr (std::is_same_v<T, PyOSMWay>) {
+            return handler.way(o);
+        } else if constexpr (std::is_same_v<T, PyOSMRelation>) {
+            return handler.relation(o);
+        } else if constexpr (std::is_same_v<T, PyOSMArea>) {
+            return handler.area(o);
+        } else if constexpr (std::is_same_v<T, PyOSMChangeset>) {
+            return handler.changeset(o);
+        } else {
+            return false;
+        }
+    }, obj);
+}
+
+
+/**
+ * A collection of OSM objects which all live in the same buffer.
+ *
+ * The batch keeps the buffer alive while it is valid. Python objects
+ * are only created when an object is requested from the Python side.
+ * Once the batch is invalidated, all Python objects handed out become
+ * invalid as well.
+ */
+class ObjectBatch
+{
+public:
+    explicit ObjectBatch(std::shared_ptr<osmium::memory::Buffer> buffer)
+    : m_buffer(std::move(buffer))
+    {}
+
+    PyOSMAny *add(osmium::OSMEntity *entity)
+    {
+        switch (entity->type()) {
+            case osmium::item_type::node:
+                return &m_objects.emplace_back(std::in_place_type<PyOSMNode>, entity);
+            case osmium::item_type::way:
+                return &m_objects.emplace_back(std::in_place_type<PyOSMWay>, entity);
+            case osmium::item_type::relation:
+                return &m_objects.emplace_back(std::in_place_type<PyOSMRelation>, entity);
+            case osmium::item_type::area:
+                return &m_objects.emplace_back(std::in_place_type<PyOSMArea>, entity);
+            case osmium::item_type::changeset:
+                return &m_objects.emplace_back(std::in_place_type<PyOSMChangeset>, entity);
+            default:
+                break;
+        }
+
+        return nullptr;
+    }
+
+    void remove_last() { m_objects.pop_back(); }
+
+    std::size_t size() const noexcept { return m_objects.size(); }
+
+    bool is_valid() const noexcept { return static_cast<bool>(m_buffer); }
+
+    // must be called with GIL acquired
+    pybind11::object get(long idx)
+    {
+        if (!m_buffer) {
+            throw std::runtime_error{"Illegal access to removed OSM object batch"};
+        }
+
+        auto const sz = static_cast<long>(m_objects.size());
+        if (idx < 0) {
+            idx += sz;
+        }
+        if (idx < 0 || idx >= sz) {
+            throw pybind11::index_error{"Batch index out of range"};
+        }
+
+        return std::visit([](auto &o) -> pybind11::object {
+            using T = std::decay_t<decltype(o)>;
+            if constexpr (std::is_same_v<T, bool>) {
+                return pybind11::none();
+            } else {
+                return o.get_or_create_python_object();
+            }
+        }, m_objects[static_cast<std::size_t>(idx)]);
+    }
+
+    void apply(BaseHandler &handler)
+    {
+        if (!m_buffer) {
+            throw std::runtime_error{"Illegal access to removed OSM object batch"};
+        }
+
+        for (auto &obj : m_objects) {
+            handle_object(obj, handler);
+        }
+    }
+
+    // must be called with GIL acquired
+    void invalidate()
+    {
+        m_objects.clear();
+        m_buffer.reset();
+    }
+
+private:
+    std::shared_ptr<osmium::memory::Buffer> m_buffer;
+    // A deque is needed because objects must not move in memory
+    // once they are created.
+    std::deque<PyOSMAny> m_objects;
+};
+
+} // namespace
+
+#endif // PYOSMIUM_OBJECT_BATCH_H
@@ -7,9 +7,11 @@
  */
 #ifndef PYOSMIUM_OSM_BASE_OBJECTS_HPP
 #define PYOSMIUM_OSM_BASE_OBJECTS_HPP
+#include <type_traits>
 #include <variant>
 
 #include <pybind11/pybind11.h>
+#include <pybind11/gil_safe_call_once.h>
 
 #include <osmium/osm.hpp>
 
@@ -32,6 +34,8 @@ public:
 
     void invalidate() noexcept { m_obj = nullptr; }
 
+    void reset(T *obj) noexcept { m_obj = obj; }
+
 private:
     T *m_obj;
 };
@@ -42,6 +46,71 @@ using COSMRelation = COSMDerivedObject<osmium::Relation const>;
 using COSMArea = COSMDerivedObject<osmium::Area const>;
 using COSMChangeset = COSMDerivedObject<osmium::Changeset const>;
 
+/**
+ * Storage for Python objects that may be reused for the next OSM object
+ * of the same type. There is one slot per OSM type. Each slot holds the
+ * Python object together with a copy of its attribute dictionary as it
+ * was right after creation. Objects put into the pool must already have
+ * been invalidated.
+ */
+class WrapperPool
+{
+public:
+    struct Entry
+    {
+        pybind11::object obj;
+        pybind11::object init;
+    };
+
+    // must be called with GIL acquired
+    template <typename T>
+    Entry take()
+    { return std::move(slot<T>()); }
+
+    // must be called with GIL acquired
+    template <typename T>
+    void put(Entry &&entry)
+    { slot<T>() = std::move(entry); }
+
+private:
+    template <typename T>
+    Entry &slot()
+    {
+        if constexpr (std::is_same_v<T, osmium::Node>) {
+            return m_node;
+        } else if constexpr (std::is_same_v<T, osmium::Way>) {
+            return m_way;
+        } else if constexpr (std::is_same_v<T, osmium::Relation>) {
+            return m_relation;
+        } else if constexpr (std::is_same_v<T, osmium::Area>) {
+            return m_area;
+        } else {
+            return m_changeset;
+        }
+    }
+
+    Entry m_node;
+    Entry m_way;
+    Entry m_relation;
+    Entry m_area;
+    Entry m_changeset;
+};
+
+/**
+ * Return the Python class in osmium.osm.types with the given name.
+ * The class is looked up only once for each type T.
+ */
+template <typename T>
+pybind11::object const &osm_types_class(char const *name)
+{
+    PYBIND11_CONSTINIT static pybind11::gil_safe_call_once_and_store<pybind11::object> storage;
+    return storage
+        .call_once_and_store_result([name]() {
+            return pybind11::object{pybind11::module_::import("osmium.osm.types").attr(name)};
+        })
+        .get_stored();
+}
+
 /**
  * Storage for a persistent Python object around a osmium object reference.
  *
@@ -52,13 +121,18 @@ template <typename T>
 class PyOSMObject
 {
 public:
-    explicit PyOSMObject(osmium::OSMEntity *obj)
-    : m_obj(static_cast<T *>(obj)) {}
+    explicit PyOSMObject(osmium::OSMEntity *obj, WrapperPool *pool = nullptr)
+    : m_obj(static_cast<T *>(obj)), m_pool(pool) {}
 
     ~PyOSMObject()
     {
         if (has_python_object()) {
-            m_pyobj.attr("_pyosmium_data").template cast<COSMDerivedObject<T const> *>()->invalidate();
+            if (m_pool) {
+                cpp_object(m_init)->invalidate();
+                m_pool->template put<T>({std::move(m_pyobj), std::move(m_init)});
+            } else {
+                m_pyobj.attr("_pyosmium_data").template cast<COSMDerivedObject<T const> *>()->invalidate();
+            }
         }
     }
 
@@ -74,16 +148,41 @@ public:
     {
         if (!m_valid) {
             m_valid = true;
+            if (m_pool) {
+                auto entry = m_pool->template take<T>();
+                if (entry.obj) {
+                    // Point the wrapper to the new object and
+                    // bring its attributes back into the initial state.
+                    cpp_object(entry.init)->reset(m_obj);
+                    auto dict = instance_dict(entry.obj);
+                    PyDict_Clear(dict.ptr());
+                    if (PyDict_Update(dict.ptr(), entry.init.ptr()) < 0) {
+                        throw pybind11::error_already_set();
+                    }
+                    m_pyobj = std::move(entry.obj);
+                    m_init = std::move(entry.init);
+                    return m_pyobj;
+                }
+            }
+
             if constexpr (std::is_same_v<T, osmium::Node>) {
-                m_pyobj = pybind11::module_::import("osmium.osm.types").attr("Node")(COSMNode{m_obj});
+                m_pyobj = osm_types_class<T>("Node")(COSMNode{m_obj});
             } else if constexpr (std::is_same_v<T, osmium::Way>) {
-                m_pyobj = pybind11::module_::import("osmium.osm.types").attr("Way")(COSMWay{m_obj});
+                m_pyobj = osm_types_class<T>("Way")(COSMWay{m_obj});
             } else if constexpr (std::is_same_v<T, osmium::Relation>) {
-                m_pyobj = pybind11::module_::import("osmium.osm.types").attr("Relation")(COSMRelation{m_obj});
+                m_pyobj = osm_types_class<T>("Relation")(COSMRelation{m_obj});
             } else if constexpr (std::is_same_v<T, osmium::Area>) {
-                m_pyobj = pybind11::module_::import("osmium.osm.types").attr("Area")(COSMArea{m_obj});
+                m_pyobj = osm_types_class<T>("Area")(COSMArea{m_obj});
             } else if constexpr (std::is_same_v<T, osmium::Changeset>) {
-                m_pyobj = pybind11::module_::import("osmium.osm.types").attr("Changeset")(COSMChangeset{m_obj});
+                m_pyobj = osm_types_class<T>("Changeset")(COSMChangeset{m_obj});
+            }
+
+            if (m_pool) {
+                auto *init = PyDict_Copy(instance_dict(m_pyobj).ptr());
+                if (!init) {
+                    throw pybind11::error_already_set();
+                }
+                m_init = pybind11::reinterpret_steal<pybind11::object>(init);
             }
         }
 
@@ -91,9 +190,29 @@ public:
     }
 
 private:
+    static pybind11::dict instance_dict(pybind11::handle obj)
+    {
+        auto *dict = PyObject_GenericGetDict(obj.ptr(), nullptr);
+        if (!dict) {
+            throw pybind11::error_already_set();
+        }
+        return pybind11::reinterpret_steal<pybind11::dict>(dict);
+    }
+
+    static COSMDerivedObject<T const> *cpp_object(pybind11::handle init)
+    {
+        auto *data = PyDict_GetItemString(init.ptr(), "_pyosmium_data");
+        if (!data) {
+            throw std::runtime_error{"Recycled OSM object has lost its data"};
+        }
+        return pybind11::handle(data).template cast<COSMDerivedObject<T const> *>();
+    }
+
     T *m_obj;
+    WrapperPool *m_pool;
     bool m_valid = false;
     pybind11::object m_pyobj;
+    pybind11::object m_init;
 };
 
 using PyOSMNode = PyOSMObject<osmium::Node>;
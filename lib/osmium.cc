@@ -20,6 +20,7 @@
 #include "python_handler.h"
 #include "handler_chain.h"
 #include "buffer_iterator.h"
+#include "object_batch.h"
 #include "io.h"
 
 #include <vector>
@@ -67,7 +68,30 @@ namespace {
 
 void pyosmium_apply(pyosmium::PyReader &reader, pyosmium::BaseHandler &handler)
 {
-    while (auto buffer = reader.get()->read()) {
+    if (!handler.needs_python()) {
+        // Purely native handler chain: no Python objects are touched
+        // during processing, so other Python threads may run in parallel.
+        py::gil_scoped_release release;
+        while (auto buffer = reader.get()->read()) {
+            for (auto &obj : buffer.select<osmium::OSMEntity>()) {
+                pyosmium::apply_item(obj, handler);
+            }
+        }
+        handler.flush();
+        return;
+    }
+
+    while (true) {
+        osmium::memory::Buffer buffer;
+        {
+            // Decoding happens in the reader's thread pool. Waiting for
+            // the next buffer does not need the GIL.
+            py::gil_scoped_release release;
+            buffer = reader.get()->read();
+        }
+        if (!buffer) {
+            break;
+        }
         for (auto &obj : buffer.select<osmium::OSMEntity>()) {
             pyosmium::apply_item(obj, handler);
         }
@@ -149,8 +173,36 @@ PYBIND11_MODULE(_osmium, m)
     py::class_<pyosmium::BufferIterator>(m, "BufferIterator")
     .def(py::init<py::args>())
     .def("__bool__", [](pyosmium::BufferIterator const &it) { return !it.empty(); })
+    .def("set_recycle_objects", &pyosmium::BufferIterator::set_recycle_objects,
+         py::arg("enable") = true)
     .def("__iter__", [](py::object const &self) { return self; })
     .def("__next__", &pyosmium::BufferIterator::next)
+    .def("next_batch", &pyosmium::BufferIterator::next_batch,
+         py::arg("max_size") = 0, py::arg("invalidate_previous") = true)
+    ;
+
+    py::class_<pyosmium::ObjectBatch, std::shared_ptr<pyosmium::ObjectBatch>>(m, "ObjectBatch")
+    .def("__len__", &pyosmium::ObjectBatch::size)
+    .def("__getitem__", &pyosmium::ObjectBatch::get, py::arg("idx"))
+    .def("__iter__", [](py::object const &self) {
+             auto *it = PySeqIter_New(self.ptr());
+             if (!it) {
+                 throw py::error_already_set();
+             }
+             return py::reinterpret_steal<py::iterator>(it);
+         })
+    .def("is_valid", &pyosmium::ObjectBatch::is_valid)
+    .def("invalidate", &pyosmium::ObjectBatch::invalidate)
+    .def("apply", [](pyosmium::ObjectBatch &self, py::args args)
+                  {
+                      pyosmium::HandlerChain handler{args};
+                      if (handler.needs_python()) {
+                          self.apply(handler);
+                      } else {
+                          py::gil_scoped_release release;
+                          self.apply(handler);
+                      }
+                  })
     ;
 
     pyosmium::init_merge_input_reader(m);
@@ -158,4 +210,9 @@ PYBIND11_MODULE(_osmium, m)
     pyosmium::init_node_location_handler(m);
     pyosmium::init_osm_file_iterator(m);
     pyosmium::init_id_tracker(m);
+    pyosmium::init_column_collector(m);
+    pyosmium::init_handler_profiler(m);
+    pyosmium::init_filter_optimizer(m);
+    pyosmium::init_tag_transform(m);
+    pyosmium::init_id_range_collector(m);
 };
@@ -17,6 +17,11 @@ void init_simple_writer(pybind11::module &m);
 void init_node_location_handler(pybind11::module &m);
 void init_osm_file_iterator(pybind11::module &m);
 void init_id_tracker(pybind11::module &m);
+void init_column_collector(pybind11::module &m);
+void init_handler_profiler(pybind11::module &m);
+void init_filter_optimizer(pybind11::module &m);
+void init_tag_transform(pybind11::module &m);
+void init_id_range_collector(pybind11::module &m);
 
 } // namespace
 
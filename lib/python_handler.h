@@ -94,6 +94,9 @@ public:
         }
         return false;
     }
+
+    bool needs_python() const override { return true; }
+
 private:
     pybind11::handle m_handler;
 };
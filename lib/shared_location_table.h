@@ -0,0 +1,368 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#ifndef PYOSMIUM_SHARED_LOCATION_TABLE_H
+#define PYOSMIUM_SHARED_LOCATION_TABLE_H
+
+#include <algorithm>
+#include <cstdint>
+#include <cstring>
+#include <memory>
+#include <optional>
+#include <set>
+#include <stdexcept>
+#include <string>
+
+#include <pybind11/pybind11.h>
+
+#include <osmium/osm/location.hpp>
+#include <osmium/osm/types.hpp>
+#include <osmium/index/index.hpp>
+#include <osmium/index/map.hpp>
+
+namespace pyosmium {
+
+/**
+ * Node location store in a shared memory segment, which is created
+ * and filled by one process and then read by any number of other
+ * processes.
+ *
+ * The segment is managed through Python's
+ * multiprocessing.shared_memory.SharedMemory. It starts with a header
+ * of 64 bytes:
+ *
+ *     0  magic (8 bytes)
+ *     8  version (u32)
+ *    12  flags (u32, 1 = sorted, 2 = finished)
+ *    16  maximum number of locations (u64)
+ *    24  number of locations (u64)
+ *
+ * It is followed by an array of (id, x, y) entries. The array is sorted
+ * by ID when the table is finished. Later entries for the same ID win.
+ */
+class SharedLocationTable
+: public osmium::index::map::Map<osmium::unsigned_object_id_type, osmium::Location>
+{
+    struct Entry
+    {
+        std::uint64_t id;
+        std::int32_t x;
+        std::int32_t y;
+    };
+
+    static constexpr std::uint32_t flag_sorted = 1;
+    static constexpr std::uint32_t flag_finished = 2;
+
+public:
+    static constexpr char magic[8] = {'P', 'Y', 'O', 'S', 'H', 'L', 'O', 'C'};
+    static constexpr std::uint32_t version = 1;
+    static constexpr std::size_t header_size = 64;
+
+    static std::size_t required_size(std::size_t capacity) noexcept
+    { return header_size + capacity * sizeof(Entry); }
+
+    static std::unique_ptr<SharedLocationTable>
+    create(std::size_t capacity, std::optional<std::string> const &name)
+    {
+        auto const shm_class = pybind11::module_::import("multiprocessing.shared_memory")
+                                   .attr("SharedMemory");
+        // SharedMemory refuses to create segments of size 0.
+        auto shm = shm_class(name ? pybind11::cast(*name) : pybind11::none(), true,
+                             required_size(std::max<std::size_t>(capacity, 1)));
+        if (legacy_tracking()) {
+            own_segments().insert(shm.attr("_name").cast<std::string>());
+        }
+
+        std::unique_ptr<SharedLocationTable> table{new SharedLocationTable{shm, true}};
+        std::memcpy(table->m_data, magic, sizeof(magic));
+        table->write_field<std::uint32_t>(8, version);
+        table->write_field<std::uint32_t>(12, flag_sorted);
+        table->write_field<std::uint64_t>(16, capacity);
+        table->write_field<std::uint64_t>(24, 0);
+
+        return table;
+    }
+
+    static std::unique_ptr<SharedLocationTable> attach(std::string const &name)
+    {
+        namespace py = pybind11;
+
+        auto const shm_module = py::module_::import("multiprocessing.shared_memory");
+        auto const shm_class = shm_module.attr("SharedMemory");
+        py::object shm;
+        if (!legacy_tracking()) {
+            // Only the creator of the segment may remove it.
+            shm = shm_class(py::arg("name") = name, py::arg("track") = false);
+        } else {
+            // Must be checked before attaching, which starts a tracker
+            // when there is none yet.
+            bool const shared_tracker = inherited_tracker();
+            shm = shm_class(py::arg("name") = name);
+            // Older versions register every attached segment with the
+            // resource tracker, which then removes the segment when this
+            // process exits (bpo-39959). The registration of the creator
+            // must stay, when it attaches to its own segment or when
+            // this process shares the tracker of its parent.
+            auto const shm_name = shm.attr("_name").cast<std::string>();
+            if (shm_module.attr("_USE_POSIX").cast<bool>() && !shared_tracker
+                && own_segments().count(shm_name) == 0) {
+                py::module_::import("multiprocessing.resource_tracker")
+                    .attr("unregister")(shm_name, "shared_memory");
+            }
+        }
+
+        std::unique_ptr<SharedLocationTable> table{new SharedLocationTable{shm, false}};
+        table->check_header(name);
+
+        return table;
+    }
+
+    SharedLocationTable(SharedLocationTable const &) = delete;
+    SharedLocationTable &operator=(SharedLocationTable const &) = delete;
+
+    ~SharedLocationTable() noexcept override = default;
+
+    void set(osmium::unsigned_object_id_type id, osmium::Location value) override
+    {
+        check_writable();
+        auto const num = read_field<std::uint64_t>(24);
+        if (num >= capacity()) {
+            throw std::runtime_error{"Shared location table is full."};
+        }
+        if (num > 0 && entries()[num - 1].id > id) {
+            write_field<std::uint32_t>(12, flags() & ~flag_sorted);
+        }
+        entries()[num] = Entry{id, value.x(), value.y()};
+        write_field<std::uint64_t>(24, num + 1);
+    }
+
+    osmium::Location get(osmium::unsigned_object_id_type id) const override
+    {
+        auto const loc = get_noexcept(id);
+        if (loc.is_undefined()) {
+            throw osmium::not_found{id};
+        }
+        return loc;
+    }
+
+    osmium::Location get_noexcept(osmium::unsigned_object_id_type id) const noexcept override
+    {
+        if (!m_data) {
+            return osmium::Location{};
+        }
+
+        auto const *begin = entries();
+        auto const *end = begin + read_field<std::uint64_t>(24);
+
+        if (flags() & flag_sorted) {
+            auto const *it = std::upper_bound(begin, end, id,
+                                              [](std::uint64_t i, Entry const &e) { return i < e.id; });
+            if (it != begin && (--it)->id == id) {
+                return osmium::Location{it->x, it->y};
+            }
+            return osmium::Location{};
+        }
+
+        // Lookup before the table is sorted. Slow but correct.
+        for (auto const *it = end; it != begin;) {
+            if ((--it)->id == id) {
+                return osmium::Location{it->x, it->y};
+            }
+        }
+        return osmium::Location{};
+    }
+
+    std::size_t size() const override
+    { return m_data ? static_cast<std::size_t>(read_field<std::uint64_t>(24)) : 0; }
+
+    std::size_t used_memory() const override
+    { return m_data ? required_size(capacity()) : 0; }
+
+    void clear() override
+    {
+        check_writable();
+        write_field<std::uint64_t>(24, 0);
+        write_field<std::uint32_t>(12, flag_sorted);
+    }
+
+    void sort() override
+    {
+        if (!m_data || (flags() & flag_sorted)) {
+            return;
+        }
+        check_writable();
+        std::stable_sort(entries(), entries() + read_field<std::uint64_t>(24),
+                         [](Entry const &a, Entry const &b) { return a.id < b.id; });
+        write_field<std::uint32_t>(12, flags() | flag_sorted);
+    }
+
+    /**
+     * Sort the table and mark it as ready for other processes.
+     * The table cannot be changed afterwards.
+     */
+    void finish()
+    {
+        check_writable();
+        sort();
+        write_field<std::uint32_t>(12, flags() | flag_finished);
+        m_writable = false;
+    }
+
+    /**
+     * Detach from the shared memory segment. The creating process
+     * also removes the segment, when _unlink_ is set.
+     */
+    void close(bool unlink)
+    {
+        if (!m_data) {
+            return;
+        }
+        m_data = nullptr;
+        m_writable = false;
+        m_buffer.reset();
+        m_shm.attr("close")();
+        if (unlink && m_owner) {
+            if (legacy_tracking()) {
+                own_segments().erase(m_shm.attr("_name").cast<std::string>());
+            }
+            m_shm.attr("unlink")();
+        }
+    }
+
+    std::string name() const
+    {
+        check_open();
+        return m_shm.attr("name").cast<std::string>();
+    }
+
+    std::uint64_t capacity() const noexcept
+    { return m_data ? read_field<std::uint64_t>(16) : 0; }
+
+    bool writable() const noexcept { return m_writable; }
+    bool finished() const noexcept { return m_data && (flags() & flag_finished); }
+    bool closed() const noexcept { return !m_data; }
+
+private:
+    /**
+     * True when the Python version registers attached segments with
+     * the resource tracker and has no way to switch that off.
+     */
+    static bool legacy_tracking()
+    {
+        static bool const legacy = [] {
+            pybind11::tuple const pyversion = pybind11::module_::import("sys").attr("version_info");
+            return pyversion[0].cast<int>() * 100 + pyversion[1].cast<int>() < 313;
+        }();
+        return legacy;
+    }
+
+    /**
+     * True when this process uses the resource tracker of its parent
+     * process. Worker processes started by multiprocessing inherit the
+     * tracker: spawn and forkserver hand over only its file descriptor,
+     * fork copies the complete state.
+     */
+    static bool inherited_tracker()
+    {
+        auto const tracker = pybind11::module_::import("multiprocessing.resource_tracker")
+                                 .attr("_resource_tracker");
+        if (tracker.attr("_fd").is_none()) {
+            return false;
+        }
+        if (tracker.attr("_pid").is_none()) {
+            return true;
+        }
+        return !pybind11::module_::import("multiprocessing")
+                    .attr("parent_process")().is_none();
+    }
+
+    /**
+     * Segments created by this process and not yet removed. Only used
+     * with legacy tracking, where access is protected by the GIL.
+     */
+    static std::set<std::string> &own_segments()
+    {
+        static std::set<std::string> segments;
+        return segments;
+    }
+
+    SharedLocationTable(pybind11::object shm, bool owner)
+    : m_shm(std::move(shm)),
+      m_buffer(std::make_unique<pybind11::buffer_info>(
+                   pybind11::buffer(m_shm.attr("buf")).request(owner))),
+      m_data(static_cast<char *>(m_buffer->ptr)),
+      m_length(static_cast<std::size_t>(m_buffer->size * m_buffer->itemsize)),
+      m_writable(owner),
+      m_owner(owner)
+    {}
+
+    template <typename T>
+    T read_field(std::size_t offset) const noexcept
+    {
+        T value;
+        std::memcpy(&value, m_data + offset, sizeof(T));
+        return value;
+    }
+
+    template <typename T>
+    void write_field(std::size_t offset, T value) noexcept
+    { std::memcpy(m_data + offset, &value, sizeof(T)); }
+
+    std::uint32_t flags() const noexcept
+    { return read_field<std::uint32_t>(12); }
+
+    Entry *entries() const noexcept
+    { return reinterpret_cast<Entry *>(m_data + header_size); }
+
+    void check_open() const
+    {
+        if (!m_data) {
+            throw std::runtime_error{"Shared location table is closed."};
+        }
+    }
+
+    void check_writable() const
+    {
+        check_open();
+        if (!m_writable) {
+            throw std::runtime_error{"Shared location table is read-only."};
+        }
+    }
+
+    void check_header(std::string const &name)
+    {
+        if (m_length < header_size
+            || !std::equal(magic, magic + sizeof(magic), m_data)) {
+            close(false);
+            throw pybind11::value_error{"Shared memory '" + name
+                                        + "' does not contain a location table."};
+        }
+        if (read_field<std::uint32_t>(8) != version
+            || required_size(capacity()) > m_length
+            || read_field<std::uint64_t>(24) > capacity()) {
+            close(false);
+            throw pybind11::value_error{"Shared location table '" + name
+                                        + "' has an unsupported format."};
+        }
+        if (!finished()) {
+            close(false);
+            throw std::runtime_error{"Shared location table '" + name
+                                     + "' is not finished yet."};
+        }
+    }
+
+    pybind11::object m_shm;
+    std::unique_ptr<pybind11::buffer_info> m_buffer;
+    char *m_data = nullptr;
+    std::size_t m_length = 0;
+    bool m_writable = false;
+    bool m_owner = false;
+};
+
+} // namespace pyosmium
+
+#endif // PYOSMIUM_SHARED_LOCATION_TABLE_H
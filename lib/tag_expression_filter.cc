@@ -0,0 +1,550 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#include <pybind11/pybind11.h>
+
+#include <cctype>
+#include <cstdlib>
+#include <cstring>
+#include <memory>
+#include <regex>
+#include <string>
+#include <vector>
+
+#include <osmium/osm.hpp>
+
+#include "base_filter.h"
+
+namespace py = pybind11;
+
+namespace {
+
+class Expression
+{
+public:
+    virtual ~Expression() = default;
+
+    virtual bool matches(osmium::TagList const &tags) const = 0;
+};
+
+using ExpressionPtr = std::unique_ptr<Expression>;
+
+
+class HasKey : public Expression
+{
+public:
+    explicit HasKey(std::string key) : m_key(std::move(key)) {}
+
+    bool matches(osmium::TagList const &tags) const override
+    {
+        return tags.has_key(m_key.c_str());
+    }
+
+private:
+    std::string m_key;
+};
+
+
+// Condition on the value of a tag. Objects without the key never match.
+class ValueCondition : public Expression
+{
+public:
+    explicit ValueCondition(std::string key) : m_key(std::move(key)) {}
+
+    bool matches(osmium::TagList const &tags) const override
+    {
+        auto const *value = tags.get_value_by_key(m_key.c_str());
+        return value && matches_value(value);
+    }
+
+protected:
+    virtual bool matches_value(char const *value) const = 0;
+
+private:
+    std::string m_key;
+};
+
+
+class ValueIn : public ValueCondition
+{
+public:
+    ValueIn(std::string key, std::vector<std::string> values)
+    : ValueCondition(std::move(key)), m_values(std::move(values))
+    {}
+
+protected:
+    bool matches_value(char const *value) const override
+    {
+        for (auto const &v: m_values) {
+            if (std::strcmp(v.c_str(), value) == 0) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+private:
+    std::vector<std::string> m_values;
+};
+
+
+class ValuePrefix : public ValueCondition
+{
+public:
+    ValuePrefix(std::string key, std::string prefix)
+    : ValueCondition(std::move(key)), m_prefix(std::move(prefix))
+    {}
+
+protected:
+    bool matches_value(char const *value) const override
+    {
+        return std::strncmp(value, m_prefix.c_str(), m_prefix.size()) == 0;
+    }
+
+private:
+    std::string m_prefix;
+};
+
+
+class ValueRegex : public ValueCondition
+{
+public:
+    ValueRegex(std::string key, std::regex re)
+    : ValueCondition(std::move(key)), m_regex(std::move(re))
+    {}
+
+protected:
+    bool matches_value(char const *value) const override
+    {
+        return std::regex_search(value, m_regex);
+    }
+
+private:
+    std::regex m_regex;
+};
+
+
+class ValueCompare : public ValueCondition
+{
+public:
+    enum class Op { LT, LE, GT, GE };
+
+    ValueCompare(std::string key, Op op, double number)
+    : ValueCondition(std::move(key)), m_op(op), m_number(number)
+    {}
+
+protected:
+    bool matches_value(char const *value) const override
+    {
+        char *end;
+        double const number = std::strtod(value, &end);
+        if (end == value || *end != '\0') {
+            return false;
+        }
+
+        switch (m_op) {
+            case Op::LT: return number < m_number;
+            case Op::LE: return number <= m_number;
+            case Op::GT: return number > m_number;
+            case Op::GE: return number >= m_number;
+        }
+        return false;
+    }
+
+private:
+    Op m_op;
+    double m_number;
+};
+
+
+class Not : public Expression
+{
+public:
+    explicit Not(ExpressionPtr child) : m_child(std::move(child)) {}
+
+    bool matches(osmium::TagList const &tags) const override
+    {
+        return !m_child->matches(tags);
+    }
+
+private:
+    ExpressionPtr m_child;
+};
+
+
+class And : public Expression
+{
+public:
+    explicit And(std::vector<ExpressionPtr> children) : m_children(std::move(children)) {}
+
+    bool matches(osmium::TagList const &tags) const override
+    {
+        for (auto const &child: m_children) {
+            if (!child->matches(tags)) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+private:
+    std::vector<ExpressionPtr> m_children;
+};
+
+
+class Or : public Expression
+{
+public:
+    explicit Or(std::vector<ExpressionPtr> children) : m_children(std::move(children)) {}
+
+    bool matches(osmium::TagList const &tags) const override
+    {
+        for (auto const &child: m_children) {
+            if (child->matches(tags)) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+private:
+    std::vector<ExpressionPtr> m_children;
+};
+
+
+/**
+ * Recursive-descent parser for tag expressions.
+ *
+ *   expression := term ('or' term)*
+ *   term       := factor ('and' factor)*
+ *   factor     := 'not' factor | '(' expression ')' | condition
+ *   condition  := key
+ *               | key ('=' | '!=' | '~' | '!~' | '<' | '<=' | '>' | '>=') value
+ *               | key ['not'] 'in' '(' value (',' value)* ')'
+ */
+class Parser
+{
+public:
+    explicit Parser(std::string const &expr) : m_expr(expr)
+    {
+        next();
+    }
+
+    ExpressionPtr parse()
+    {
+        if (m_token.type == Token::End) {
+            error("empty expression");
+        }
+        auto result = parse_or();
+        if (m_token.type != Token::End) {
+            error("unexpected '" + m_token.text + "'");
+        }
+        return result;
+    }
+
+private:
+    struct Token
+    {
+        enum Type { End, Word, String, LParen, RParen, Comma, Op };
+
+        Type type = End;
+        std::string text;
+        std::size_t pos = 0;
+    };
+
+    [[noreturn]] void error(std::string const &msg) const
+    {
+        throw py::value_error{"Invalid tag expression at position "
+                              + std::to_string(m_token.pos) + ": " + msg};
+    }
+
+    static bool is_word_char(char c)
+    {
+        return !std::isspace(static_cast<unsigned char>(c))
+               && std::strchr("()=!<>~,\"'", c) == nullptr;
+    }
+
+    void next()
+    {
+        while (m_pos < m_expr.size() && std::isspace(static_cast<unsigned char>(m_expr[m_pos]))) {
+            ++m_pos;
+        }
+
+        m_token.pos = m_pos;
+        m_token.text.clear();
+
+        if (m_pos >= m_expr.size()) {
+            m_token.type = Token::End;
+            return;
+        }
+
+        char const c = m_expr[m_pos];
+        switch (c) {
+            case '(':
+            case ')':
+            case ',':
+                m_token.type = c == '(' ? Token::LParen
+                                        : (c == ')' ? Token::RParen : Token::Comma);
+                m_token.text = c;
+                ++m_pos;
+                return;
+            case '=':
+            case '~':
+                m_token.type = Token::Op;
+                m_token.text = c;
+                ++m_pos;
+                return;
+            case '!':
+            case '<':
+            case '>':
+                m_token.type = Token::Op;
+                m_token.text = c;
+                ++m_pos;
+                if (m_pos < m_expr.size() && (m_expr[m_pos] == '='
+                                              || (c == '!' && m_expr[m_pos] == '~'))) {
+                    m_token.text += m_expr[m_pos++];
+                } else if (c == '!') {
+                    error("unexpected '!'");
+                }
+                return;
+            case '"':
+            case '\'':
+                m_token.type = Token::String;
+                ++m_pos;
+                while (m_pos < m_expr.size() && m_expr[m_pos] != c) {
+                    if (m_expr[m_pos] == '\\' && m_pos + 1 < m_expr.size()) {
+                        ++m_pos;
+                    }
+                    m_token.text += m_expr[m_pos++];
+                }
+                if (m_pos >= m_expr.size()) {
+                    error("unterminated string");
+                }
+                ++m_pos;
+                return;
+            default:
+                m_token.type = Token::Word;
+                while (m_pos < m_expr.size() && is_word_char(m_expr[m_pos])) {
+                    m_token.text += m_expr[m_pos++];
+                }
+        }
+    }
+
+    bool is_keyword(char const *keyword) const
+    {
+        return m_token.type == Token::Word && m_token.text == keyword;
+    }
+
+    bool is_any_keyword() const
+    {
+        return is_keyword("and") || is_keyword("or")
+               || is_keyword("not") || is_keyword("in");
+    }
+
+    void expect(Token::Type type, char const *what)
+    {
+        if (m_token.type != type) {
+            error(std::string("expected ") + what);
+        }
+        next();
+    }
+
+    std::string take_value()
+    {
+        if (m_token.type != Token::Word && m_token.type != Token::String) {
+            error("expected a value");
+        }
+        auto value = std::move(m_token.text);
+        next();
+        return value;
+    }
+
+    ExpressionPtr parse_or()
+    {
+        std::vector<ExpressionPtr> children;
+        children.push_back(parse_and());
+        while (is_keyword("or")) {
+            next();
+            children.push_back(parse_and());
+        }
+
+        if (children.size() == 1) {
+            return std::move(children.front());
+        }
+        return std::make_unique<Or>(std::move(children));
+    }
+
+    ExpressionPtr parse_and()
+    {
+        std::vector<ExpressionPtr> children;
+        children.push_back(parse_not());
+        while (is_keyword("and")) {
+            next();
+            children.push_back(parse_not());
+        }
+
+        if (children.size() == 1) {
+            return std::move(children.front());
+        }
+        return std::make_unique<And>(std::move(children));
+    }
+
+    ExpressionPtr parse_not()
+    {
+        if (is_keyword("not")) {
+            next();
+            return std::make_unique<Not>(parse_not());
+        }
+
+        if (m_token.type == Token::LParen) {
+            next();
+            auto result = parse_or();
+            expect(Token::RParen, "')'");
+            return result;
+        }
+
+        return parse_condition();
+    }
+
+    ExpressionPtr parse_condition()
+    {
+        if (m_token.type != Token::String
+            && (m_token.type != Token::Word || is_any_keyword())) {
+            error(m_token.type == Token::End ? "unexpected end of expression"
+                                             : "expected a key");
+        }
+        auto key = std::move(m_token.text);
+        next();
+
+        if (is_keyword("in")) {
+            next();
+            return std::make_unique<ValueIn>(std::move(key), parse_value_list());
+        }
+
+        if (is_keyword("not")) {
+            next();
+            if (!is_keyword("in")) {
+                error("expected 'in'");
+            }
+            next();
+            return std::make_unique<Not>(
+                std::make_unique<ValueIn>(std::move(key), parse_value_list()));
+        }
+
+        if (m_token.type != Token::Op) {
+            return std::make_unique<HasKey>(std::move(key));
+        }
+
+        auto const op = std::move(m_token.text);
+        auto const op_pos = m_token.pos;
+        next();
+        auto value = take_value();
+
+        if (op == "=") {
+            return std::make_unique<ValueIn>(std::move(key),
+                                             std::vector<std::string>{std::move(value)});
+        }
+        if (op == "!=") {
+            return std::make_unique<Not>(std::make_unique<ValueIn>(
+                       std::move(key), std::vector<std::string>{std::move(value)}));
+        }
+        if (op == "~") {
+            return make_regex(std::move(key), value);
+        }
+        if (op == "!~") {
+            return std::make_unique<Not>(make_regex(std::move(key), value));
+        }
+
+        char *end;
+        double const number = std::strtod(value.c_str(), &end);
+        if (value.empty() || *end != '\0') {
+            m_token.pos = op_pos;
+            error("comparison needs a number");
+        }
+
+        ValueCompare::Op cmp = ValueCompare::Op::LT;
+        if (op == "<=") {
+            cmp = ValueCompare::Op::LE;
+        } else if (op == ">") {
+            cmp = ValueCompare::Op::GT;
+        } else if (op == ">=") {
+            cmp = ValueCompare::Op::GE;
+        }
+        return std::make_unique<ValueCompare>(std::move(key), cmp, number);
+    }
+
+    std::vector<std::string> parse_value_list()
+    {
+        expect(Token::LParen, "'('");
+        std::vector<std::string> values;
+        values.push_back(take_value());
+        while (m_token.type == Token::Comma) {
+            next();
+            values.push_back(take_value());
+        }
+        expect(Token::RParen, "')'");
+
+        return values;
+    }
+
+    ExpressionPtr make_regex(std::string key, std::string const &pattern)
+    {
+        // Anchored patterns without special characters are simple
+        // prefix matches and do not need the regex engine.
+        if (pattern.size() > 1 && pattern[0] == '^'
+            && pattern.find_first_of(".[]{}()\\*+?|^$", 1) == std::string::npos) {
+            return std::make_unique<ValuePrefix>(std::move(key), pattern.substr(1));
+        }
+
+        try {
+            return std::make_unique<ValueRegex>(
+                       std::move(key),
+                       std::regex(pattern, std::regex::ECMAScript | std::regex::optimize));
+        } catch (std::regex_error const &) {
+            error("invalid regular expression '" + pattern + "'");
+        }
+    }
+
+    std::string const &m_expr;
+    std::size_t m_pos = 0;
+    Token m_token;
+};
+
+
+class TagExpressionFilter : public pyosmium::BaseFilter
+{
+public:
+    explicit TagExpressionFilter(std::string const &expression)
+    : m_expression(Parser(expression).parse())
+    {}
+
+    bool filter(osmium::OSMObject const *o) override
+    {
+        return !m_expression->matches(o->tags());
+    }
+
+    bool filter_changeset(pyosmium::PyOSMChangeset &o) override
+    {
+        return !m_expression->matches(o.get()->tags());
+    }
+
+private:
+    ExpressionPtr m_expression;
+};
+
+} // namespace
+
+namespace pyosmium {
+
+void init_tag_expression_filter(pybind11::module &m)
+{
+    py::class_<TagExpressionFilter, pyosmium::BaseFilter, BaseHandler>(m, "TagExpressionFilter")
+        .def(py::init<std::string const &>(), py::arg("expression"))
+    ;
+}
+
+} // namespace
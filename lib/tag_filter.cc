@@ -7,6 +7,12 @@
  */
 #include <pybind11/pybind11.h>
 
+#include <string>
+#include <string_view>
+#include <unordered_map>
+#include <unordered_set>
+#include <vector>
+
 #include <osmium/osm.hpp>
 
 #include "base_filter.h"
@@ -48,34 +54,38 @@ public:
             m_tags.emplace_back(tag[0].cast<std::string>(),
                                 tag[1].cast<std::string>());
         }
-    }
 
-    bool filter(osmium::OSMObject const *o) override
-    {
-        auto const &tags = o->tags();
+        // Views must only be taken once m_tags is complete.
         for (auto const &tag: m_tags) {
-            if (tags.has_tag(tag.key.c_str(), tag.value.c_str())) {
-                return false;
-            }
+            m_index[tag.key].emplace(tag.value);
         }
+    }
 
-        return true;
+    bool filter(osmium::OSMObject const *o) override
+    {
+        return !matches(o->tags());
     }
 
     bool filter_changeset(pyosmium::PyOSMChangeset &o) override
     {
-        auto const &tags = o.get()->tags();
-        for (auto const &tag: m_tags) {
-            if (tags.has_tag(tag.key.c_str(), tag.value.c_str())) {
-                return false;
+        return !matches(o.get()->tags());
+    }
+
+private:
+    bool matches(osmium::TagList const &tags) const
+    {
+        for (auto const &tag: tags) {
+            auto const values = m_index.find(tag.key());
+            if (values != m_index.end() && values->second.count(tag.value())) {
+                return true;
             }
         }
 
-        return true;
+        return false;
     }
 
-private:
     std::vector<Tag> m_tags;
+    std::unordered_map<std::string_view, std::unordered_set<std::string_view>> m_index;
 };
 
 }
@@ -0,0 +1,304 @@
+/* SPDX-License-Identifier: BSD-2-Clause
+ *
+ * This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+ *
+ * Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+ * For a full list of authors see the git log.
+ */
+#include <pybind11/pybind11.h>
+
+#include <cstddef>
+#include <deque>
+#include <optional>
+#include <string>
+#include <string_view>
+#include <unordered_map>
+#include <unordered_set>
+#include <utility>
+#include <vector>
+
+#include <osmium/osm.hpp>
+#include <osmium/builder/osm_object_builder.hpp>
+#include <osmium/memory/buffer.hpp>
+
+#include "base_handler.h"
+#include "handler_chain.h"
+#include "osmium_module.h"
+
+namespace py = pybind11;
+
+namespace {
+
+/**
+ * Handler that rewrites the tags of OSM objects according to a fixed
+ * set of rules and hands the result to a chain of handlers.
+ *
+ * Objects whose tags are unchanged are passed on as they are. All other
+ * objects are copied with the new tag list into an internal buffer.
+ */
+class TagTransform : public pyosmium::BaseHandler
+{
+    using StringMap = std::unordered_map<std::string_view, std::string_view>;
+
+public:
+    TagTransform(py::args args, py::object const &drop, py::object const &keep,
+                 py::object const &rename, py::object const &values,
+                 py::object const &key_values)
+    : m_handler(args)
+    {
+        if (!drop.is_none()) {
+            for (auto const &key: py::iter(drop)) {
+                m_drop.insert(store(key));
+            }
+        }
+        if (!keep.is_none()) {
+            m_keep.emplace();
+            for (auto const &key: py::iter(keep)) {
+                m_keep->insert(store(key));
+            }
+        }
+        if (!rename.is_none()) {
+            fill_map(rename, m_rename);
+        }
+        if (!values.is_none()) {
+            fill_map(values, m_values);
+        }
+        if (!key_values.is_none()) {
+            for (auto const &item: key_values.cast<py::dict>()) {
+                fill_map(item.second, m_key_values[store(item.first)]);
+            }
+        }
+    }
+
+    bool node(pyosmium::PyOSMNode &o) override
+    {
+        auto const *node = o.get();
+        if (!transform(node->tags())) {
+            return m_handler.node(o);
+        }
+
+        {
+            osmium::builder::NodeBuilder builder{m_buffer};
+            copy_attributes(*node, builder);
+            builder.object().set_location(node->location());
+            add_tags(builder);
+        }
+
+        return forward<osmium::Node>([this](pyosmium::PyOSMNode &n) { return m_handler.node(n); });
+    }
+
+    bool way(pyosmium::PyOSMWay &o) override
+    {
+        auto const *way = o.get();
+        if (!transform(way->tags())) {
+            return m_handler.way(o);
+        }
+
+        {
+            osmium::builder::WayBuilder builder{m_buffer};
+            copy_attributes(*way, builder);
+            add_tags(builder);
+            builder.add_item(way->nodes());
+        }
+
+        return forward<osmium::Way>([this](pyosmium::PyOSMWay &w) { return m_handler.way(w); });
+    }
+
+    bool relation(pyosmium::PyOSMRelation &o) override
+    {
+        auto const *rel = o.get();
+        if (!transform(rel->tags())) {
+            return m_handler.relation(o);
+        }
+
+        {
+            osmium::builder::RelationBuilder builder{m_buffer};
+            copy_attributes(*rel, builder);
+            add_tags(builder);
+            builder.add_item(rel->members());
+        }
+
+        return forward<osmium::Relation>(
+                   [this](pyosmium::PyOSMRelation &r) { return m_handler.relation(r); });
+    }
+
+    bool area(pyosmium::PyOSMArea &o) override
+    { return m_handler.area(o); }
+
+    bool changeset(pyosmium::PyOSMChangeset &o) override
+    { return m_handler.changeset(o); }
+
+    void flush() override
+    { m_handler.flush(); }
+
+    bool needs_python() const override
+    { return m_handler.needs_python(); }
+
+private:
+    std::string_view store(py::handle const &str)
+    {
+        if (!py::isinstance<py::str>(str)) {
+            throw py::type_error{"Keys and values must be strings."};
+        }
+        return m_strings.emplace_back(str.cast<std::string>());
+    }
+
+    void fill_map(py::handle const &mapping, StringMap &out)
+    {
+        if (!py::isinstance<py::dict>(mapping)) {
+            throw py::type_error{"Rules must be given as a dict."};
+        }
+        for (auto const &item: mapping.cast<py::dict>()) {
+            auto const from = store(item.first);
+            out[from] = store(item.second);
+        }
+    }
+
+    // Compute the new tag list in m_tags. Returns false when the tags
+    // are unchanged.
+    bool transform(osmium::TagList const &tags)
+    {
+        m_tags.clear();
+        m_renamed.clear();
+        bool changed = false;
+        std::size_t renamed = 0;
+
+        for (auto const &tag: tags) {
+            std::string_view const key{tag.key()};
+            if ((m_keep && !m_keep->count(key)) || m_drop.count(key)) {
+                changed = true;
+                continue;
+            }
+
+            std::string_view value{tag.value()};
+            std::optional<std::string_view> new_value;
+
+            auto const kv = m_key_values.find(key);
+            if (kv != m_key_values.end()) {
+                auto const it = kv->second.find(value);
+                if (it != kv->second.end()) {
+                    new_value = it->second;
+                }
+            }
+            if (!new_value) {
+                auto const it = m_values.find(value);
+                if (it != m_values.end()) {
+                    new_value = it->second;
+                }
+            }
+
+            auto const rn = m_rename.find(key);
+            if (rn != m_rename.end()) {
+                ++renamed;
+            }
+            if (rn != m_rename.end() || new_value) {
+                changed = true;
+            }
+
+            m_tags.emplace_back(rn == m_rename.end() ? key : rn->second,
+                                new_value ? *new_value : value);
+            m_renamed.push_back(rn != m_rename.end());
+        }
+
+        if (renamed > 0) {
+            remove_duplicate_keys();
+        }
+
+        return changed;
+    }
+
+    // Drop renamed tags whose new key is already taken. A tag that keeps
+    // its key always wins over a renamed one, otherwise the first tag
+    // in the original order is kept.
+    void remove_duplicate_keys()
+    {
+        m_seen_keys.clear();
+        for (std::size_t i = 0; i < m_tags.size(); ++i) {
+            if (!m_renamed[i]) {
+                m_seen_keys.insert(m_tags[i].first);
+            }
+        }
+
+        std::size_t out = 0;
+        for (std::size_t i = 0; i < m_tags.size(); ++i) {
+            if (!m_renamed[i] || m_seen_keys.insert(m_tags[i].first).second) {
+                m_tags[out++] = m_tags[i];
+            }
+        }
+        m_tags.resize(out);
+    }
+
+    template <typename T, typename TBuilder>
+    void copy_attributes(T const &obj, TBuilder &builder)
+    {
+        builder.object().set_id(obj.id())
+                        .set_visible(obj.visible())
+                        .set_version(obj.version())
+                        .set_changeset(obj.changeset())
+                        .set_uid(obj.uid())
+                        .set_timestamp(obj.timestamp());
+        builder.set_user(obj.user());
+    }
+
+    template <typename TBuilder>
+    void add_tags(TBuilder &builder)
+    {
+        if (m_tags.empty()) {
+            return;
+        }
+
+        osmium::builder::TagListBuilder tl{m_buffer, &builder};
+        for (auto const &tag: m_tags) {
+            tl.add_tag(tag.first.data(), tag.first.size(),
+                       tag.second.data(), tag.second.size());
+        }
+    }
+
+    template <typename T, typename Func>
+    bool forward(Func const &func)
+    {
+        m_buffer.commit();
+        bool result;
+        {
+            pyosmium::PyOSMObject<T> obj{&m_buffer.get<T>(0)};
+            result = func(obj);
+        }
+        m_buffer.clear();
+
+        return result;
+    }
+
+    pyosmium::HandlerChain m_handler;
+
+    // Storage for all strings of the rules. A deque keeps the strings
+    // in place, so that the maps below can refer to them with views.
+    std::deque<std::string> m_strings;
+    std::unordered_set<std::string_view> m_drop;
+    std::optional<std::unordered_set<std::string_view>> m_keep;
+    StringMap m_rename;
+    StringMap m_values;
+    std::unordered_map<std::string_view, StringMap> m_key_values;
+
+    std::vector<std::pair<std::string_view, std::string_view>> m_tags;
+    std::vector<bool> m_renamed;
+    std::unordered_set<std::string_view> m_seen_keys;
+    osmium::memory::Buffer m_buffer{4096, osmium::memory::Buffer::auto_grow::yes};
+};
+
+} // namespace
+
+namespace pyosmium {
+
+void init_tag_transform(py::module &m)
+{
+    py::class_<TagTransform, BaseHandler>(m, "TagTransform")
+        .def(py::init<py::args, py::object const &, py::object const &,
+                      py::object const &, py::object const &, py::object const &>(),
+             py::keep_alive<1, 2>(),
+             py::arg("drop") = py::none(), py::arg("keep") = py::none(),
+             py::arg("rename") = py::none(), py::arg("values") = py::none(),
+             py::arg("key_values") = py::none())
+    ;
+}
+
+} // namespace
@@ -10,10 +10,15 @@ from ._osmium import (InvalidLocationError as InvalidLocationError,
                       BaseHandler as BaseHandler,
                       BaseFilter as BaseFilter,
                       BufferIterator as BufferIterator,
+                      ObjectBatch as ObjectBatch,
                       SimpleWriter as SimpleWriter,
                       NodeLocationsForWays as NodeLocationsForWays,
                       OsmFileIterator as OsmFileIterator,
-                      IdTracker as IdTracker)
+                      IdTracker as IdTracker,
+                      ColumnCollector as ColumnCollector,
+                      HandlerProfiler as HandlerProfiler,
+                      FilterOptimizer as FilterOptimizer,
+                      TagTransform as TagTransform)
 from .helper import (make_simple_handler as make_simple_handler,
                      WriteHandler as WriteHandler,
                      MergeInputReader as MergeInputReader)
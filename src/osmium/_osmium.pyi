@@ -4,7 +4,8 @@
 #
 # Copyright (C) 2025 Sarah Hoffmann <lonvia@denofr.de> and others.
 # For a full list of authors see the git log.
-from typing import ByteString, Union, Optional, Any
+from typing import ByteString, Union, Optional, Any, Dict, Iterable, Iterator, List, Mapping, \
+                   Sequence, Tuple
 import os
 
 from .osm import osm_entity_bits
@@ -56,6 +57,11 @@ class BufferIterator:
             object through the filter chain _handlers_ before returning
             it.
         """
+    def set_recycle_objects(self, enable: bool = True) -> None:
+        """ Reuse the Python object of the previously returned OSM object
+            of the same type, see
+            [OsmFileIterator.set_recycle_objects][osmium.OsmFileIterator.set_recycle_objects].
+        """
     def __bool__(self) -> bool:
         """ True if there are any objects left to return.
         """
@@ -65,6 +71,47 @@ class BufferIterator:
     def __next__(self) -> OSMEntity:
         """ Get the next OSM object from the buffer or raise an StopIteration.
         """
+    def next_batch(self, max_size: int = 0,
+                   invalidate_previous: bool = True) -> Optional['ObjectBatch']:
+        """ Get the next batch of OSM objects from the buffer queue or
+            `None` if the queue is exhausted. A batch never spans more
+            than one buffer. When _max_size_ is larger than 0, then the
+            batch contains at most _max_size_ objects. See
+            [OsmFileIterator.next_batch][osmium.OsmFileIterator.next_batch]
+            for the meaning of _invalidate_previous_.
+        """
+
+
+class ObjectBatch:
+    """ A read-only sequence of OSM objects which stem from the same
+        internal data buffer. Python objects are created lazily when an
+        element is accessed.
+
+        A batch is only valid until the iterator that produced it
+        returns the next batch. After that, the batch is empty and
+        all objects retrieved from it become invalid.
+    """
+    def __len__(self) -> int:
+        """ Number of objects in the batch.
+        """
+    def __getitem__(self, idx: int) -> OSMEntity:
+        """ Get the object at position _idx_ in the batch.
+        """
+    def __iter__(self) -> Iterator[OSMEntity]:
+        """ Iterate over the objects in the batch.
+        """
+    def is_valid(self) -> bool:
+        """ Return true if the batch may still be accessed.
+        """
+    def invalidate(self) -> None:
+        """ Release the batch. All objects retrieved from the batch
+            become invalid.
+        """
+    def apply(self, *handlers: HandlerLike) -> None:
+        """ Apply a chain of handlers to all objects in the batch.
+            When all handlers are native handlers, this happens without
+            creating any Python objects.
+        """
 
 
 class MergeInputReader:
@@ -96,12 +143,15 @@ class MergeInputReader:
             be applied verbatim without removing duplicates. This is important
             when using OSM history files as input.
         """
-    def apply(self, *handlers: HandlerLike, idx: str = '', simplify: bool = True) -> None:
+    def apply(self, *handlers: HandlerLike, idx: Union[str, LocationTable] = '',
+              simplify: bool = True) -> None:
         """ Apply collected data to a handler. The data will be sorted first.
             If _simplify_ is true (default) then duplicates will be eliminated
             and only the newest version of each object kept. If _idx_ is given
             a node location cache with the given type will be created and
-            applied when creating the ways. Note that a diff file normally does
+            applied when creating the ways. _idx_ may also be an existing
+            location table, for example a
+            [LocationCache][osmium.index.LocationCache]. Note that a diff file normally does
             not contain all node locations to reconstruct changed ways. If the
             full way geometries are needed, create a persistent node location
             cache during initial import of the area and reuse it when processing
@@ -200,6 +250,15 @@ class NodeLocationsForWays(BaseHandler):
     @apply_nodes_to_ways.setter
     def apply_nodes_to_ways(self, value: bool) -> None:...
 
+    @property
+    def store_node_locations(self) -> bool:
+        """ When set (the default), the locations of nodes are saved
+            in the location table. Unset this when the handler should
+            only look up locations in a prefilled, read-only table.
+        """
+    @store_node_locations.setter
+    def store_node_locations(self, value: bool) -> None:...
+
     def __init__(self, locations: LocationTable) -> None:
         """ Initiate a new handler using the given location table _locations_
             to cache the node coordinates.
@@ -223,12 +282,202 @@ class OsmFileIterator:
         """ Set a fallback handler for objects that have been filtered
             out. The objects will be passed to the single handler.
         """
+    def set_recycle_objects(self, enable: bool = True) -> None:
+        """ When enabled, then the Python object of the previously returned
+            OSM object is reused for the next object of the same type
+            instead of creating a new one. All data attached to the old
+            object, including any references to it, will then point
+            to the new object.
+        """
     def __iter__(self) -> 'OsmFileIterator':
         """ Returns itself.
         """
     def __next__(self) -> OSMEntity:
         """ Get the next OSM object from the file or raise a StopIteration.
         """
+    def next_batch(self, max_size: int = 0,
+                   invalidate_previous: bool = True) -> Optional[ObjectBatch]:
+        """ Get the next batch of OSM objects from the file or `None` when
+            the end of the file has been reached. A batch never spans
+            more than one buffer of the input file. When _max_size_ is
+            larger than 0, then the batch contains at most _max_size_ objects.
+
+            Requesting a new batch invalidates the previous one. When
+            _invalidate_previous_ is false, then the batch stays valid
+            until it is explicitly invalidated or garbage collected.
+
+            When only native handlers are involved, the GIL is released
+            while the batch is assembled.
+        """
+
+
+class HandlerProfiler(BaseHandler):
+    """ Handler that runs a chain of handlers and records, for each
+        handler in the chain, how often it was called and how much
+        time it took.
+    """
+    def __init__(self, *handlers: HandlerLike) -> None:
+        """ Create a new profiler for the chain of _handlers_. The
+            profiler behaves exactly like the handler chain, i.e. an
+            object is passed on to the next handler only when the
+            previous one has not filtered it out.
+        """
+    def stats(self) -> Dict[str, Any]:
+        """ Return the statistics collected so far.
+
+            The result is a dictionary with the following entries:
+
+            * 'handlers': list of dictionaries, one for each handler in
+              the chain, with the 'name' of the handler class, a flag
+              'python' that is true for handlers that need to call into
+              Python, and an entry for each type of OSM object
+              ('node', 'way', 'relation', 'area', 'changeset') the
+              handler has seen. Each of these entries has the number of
+              'calls', the number of 'accepted' and 'rejected' objects
+              and the total 'time' spent in the handler in seconds.
+            * 'native_time': total time in seconds spent in native handlers
+            * 'python_time': total time in seconds spent in handlers
+              that call into Python
+        """
+
+
+class FilterOptimizer(BaseHandler):
+    """ Handler that runs a chain of handlers and adapts the order of
+        the native filters in the chain to the data.
+
+        For the first _sample_size_ objects of each OSM type, all native
+        filters are called and their run time and the number of objects
+        they reject is recorded. Then each group of consecutive native
+        filters is reordered, so that the filters with the lowest time
+        spent per rejected object run first. Python handlers and
+        handlers that are not filters (like the location handler) stay
+        in place and are never moved across. As native filters have no
+        side effects, the result of the chain is the same as with the
+        original order.
+    """
+    def __init__(self, *handlers: HandlerLike, sample_size: int = 10000) -> None:
+        """ Create a new optimizing chain for _handlers_. _sample_size_
+            is the number of objects per type used to measure the filters.
+        """
+    def report(self) -> Dict[str, Any]:
+        """ Return the state of the optimization.
+
+            The result has an entry for each type of OSM object
+            ('node', 'way', 'relation', 'area', 'changeset') seen so far.
+            Each entry is a dictionary with:
+
+            * 'sampled': the number of objects sampled
+            * 'order': the names of the handlers in the chosen order or
+              `None` while sampling is still going on
+            * 'handlers': list of dictionaries, one for each handler in
+              the original order, with the 'name' of the handler class,
+              a flag 'reorderable' and, for reorderable handlers that
+              were called during sampling, the number of 'calls' and
+              'rejected' objects and the 'time' spent in seconds
+        """
+
+
+class TagTransform(BaseHandler):
+    """ Handler that rewrites the tags of nodes, ways and relations
+        and passes the modified objects on to a chain of handlers,
+        usually a [SimpleWriter][osmium.SimpleWriter].
+
+        The rules are applied to each tag in turn. All rules look at the
+        original key and value of the tag:
+
+        * the tag is removed when its key is not in _keep_ (if given)
+          or when the key is in _drop_
+        * the value is replaced when _key_values_ has a mapping for
+          the key containing the value, otherwise when the value
+          appears in _values_
+        * the key is replaced when it appears in _rename_
+
+        When a renamed key collides with a key already present in the
+        result, the renamed tag is dropped. A tag that keeps its original
+        key always wins; when several tags are renamed to the same key,
+        the first one in the original tag list is kept.
+
+        The rewriting is done completely in C++. Objects with
+        unchanged tags are passed on as they are. Areas and
+        changesets are passed on unchanged.
+
+        Example:
+
+            with osmium.SimpleWriter('out.osm.pbf') as writer:
+                osmium.apply('in.osm.pbf',
+                             osmium.TagTransform(writer,
+                                                 drop=['created_by'],
+                                                 values={'yes': '1', 'no': '0'}))
+    """
+    def __init__(self, *handlers: HandlerLike,
+                 drop: Optional[Iterable[str]] = None,
+                 keep: Optional[Iterable[str]] = None,
+                 rename: Optional[Mapping[str, str]] = None,
+                 values: Optional[Mapping[str, str]] = None,
+                 key_values: Optional[Mapping[str, Mapping[str, str]]] = None) -> None:
+        """ Create a new transformation that sends its results to
+            _handlers_.
+        """
+
+
+class IdRangeCollector(BaseHandler):
+    """ (internal) Handler that records the smallest and largest ID
+        and the number of objects for each OSM type it sees.
+    """
+    def __init__(self) -> None: ...
+    def take_ranges(self) -> List[Tuple[str, int, int, int]]:
+        """ Return a list of tuples (type, first id, last id, count)
+            for each OSM type seen and reset the collector. The type
+            is one of 'n', 'w', 'r' or 'c'.
+        """
+
+
+class ColumnCollector(BaseHandler):
+    """ Handler that collects the basic data of nodes, ways and relations
+        in a column-oriented fashion. The data can be retrieved as
+        NumPy arrays. NumPy must be installed to use this handler.
+    """
+    def __init__(self, tags: Iterable[str] = ..., all_tags: bool = False) -> None:
+        """ Create a new collector. _tags_ lists the tag keys for
+            which the tag values should be collected in a column.
+            When _all_tags_ is set, then the complete tag lists are
+            collected as well.
+        """
+    def take_columns(self) -> Dict[str, Dict[str, Any]]:
+        """ Return the data collected so far and reset the collector.
+
+            The result is a dictionary with the keys 'nodes', 'ways' and
+            'relations'. Each contains a dictionary of arrays:
+
+            * nodes: 'id' (int64), 'x' and 'y' (int32, fixed-point coordinates
+              as in [Location.x][osmium.osm.Location.x], nodes without a
+              valid location have the maximum int32 value)
+            * ways: 'id' (int64), 'node_offsets' (int64) and 'node_refs' (int64),
+              where the node ids of the i-th way are
+              `node_refs[node_offsets[i]:node_offsets[i + 1]]`
+            * relations: 'id' (int64), 'member_offsets' (int64),
+              'member_types' (single-character bytes) and 'member_refs' (int64)
+              with the same offset scheme as for ways and the member roles
+              as string column 'member_role' (see below)
+
+            In addition, each type has a 'tags' entry with a dictionary
+            that contains a string column for each requested tag key
+            (see below) and a boolean array '<key>_valid', which is False
+            where the object has no such tag. Missing tags appear as empty
+            strings in the string column.
+
+            When the collector was created with _all_tags_, the complete
+            tag lists are returned as well: 'tag_offsets' points into
+            the string columns 'tag_key' and 'tag_value'.
+
+            String columns are returned in the layout used by Apache Arrow:
+            for a column 'name' there is an array 'name_data' (uint8)
+            with the concatenated UTF-8 strings and an array 'name_offsets'
+            (int64) with the start offset of each string.
+        """
+    def __len__(self) -> int:
+        """ Number of objects collected so far.
+        """
 
 
 class IdTrackerIdFilter(BaseFilter): ...
@@ -340,6 +589,33 @@ class IdTracker:
 
             The filter has no effect on nodes, areas and changesets.
         """
+    def save(self, filename: Union[str, 'os.PathLike[str]']) -> None:
+        """ Save the node, way and relation ids of the tracker into
+            the given file. The file can be loaded again with `load()`
+            or memory-mapped with [MappedIdSet][osmium.index.MappedIdSet],
+            using the type 'n', 'w' or 'r' to select the set.
+        """
+    def load(self, filename: Union[str, 'os.PathLike[str]'], mmap: bool = False) -> None:
+        """ Add all node, way and relation ids from a file written
+            with `save()` to the tracker.
+
+            Per default, the ids are copied into the tracker. When _mmap_
+            is set, the file is memory-mapped read-only instead, so that
+            worker processes loading the same file share its pages.
+            The mapped ids are used by all functions of the tracker.
+            Ids added later are kept in memory. The mapped ids are only
+            copied into memory, when a set is requested with `node_ids()`,
+            `way_ids()` or `relation_ids()` or when the tracker is saved.
+        """
+    def num_ids(self, osm_type: str) -> int:
+        """ Return the number of tracked ids of the given type
+            ('n', 'w' or 'r').
+        """
+    def contains_any(self, osm_type: str, ranges: Sequence[Tuple[int, int]]) -> List[bool]:
+        """ Check for each of the given ranges of ids, if the tracker
+            contains any id of the type _osm_type_ ('n', 'w' or 'r')
+            in the range. The bounds of the range are inclusive.
+        """
     def node_ids(self) -> IdSet:
         """ Return a view of the set of node ids. The returned object is
             mutable. You may call operations like `unset()` and `clear()`
@@ -0,0 +1,52 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+"""
+Internal helpers for parsing the raw structure of PBF files.
+"""
+from typing import Tuple
+
+
+def read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """ Decode the protobuf varint in _data_ at position _pos_. Returns
+        the value and the position after the varint.
+    """
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def parse_blob_header(data: bytes) -> Tuple[str, int]:
+    """ Extract type and data size from a BlobHeader protobuf message.
+    """
+    btype = ''
+    datasize = -1
+    pos = 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        field, wire_type = key >> 3, key & 0x07
+        if wire_type == 0:
+            value, pos = read_varint(data, pos)
+            if field == 3:
+                datasize = value
+        elif wire_type == 2:
+            length, pos = read_varint(data, pos)
+            if field == 1:
+                btype = data[pos:pos + length].decode('utf-8')
+            pos += length
+        else:
+            raise RuntimeError('Unexpected data in PBF blob header.')
+
+    if not btype or datasize < 0:
+        raise RuntimeError('Invalid PBF blob header.')
+
+    return btype, datasize
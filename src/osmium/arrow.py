@@ -0,0 +1,192 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+"""
+Export of OSM data into Apache Arrow record batches and (Geo)Parquet files.
+
+This module needs the optional dependencies `pyarrow` and `numpy`.
+"""
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+import json
+import os
+from pathlib import Path
+
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError as err:  # pragma: no cover
+    raise ImportError("The osmium.arrow module needs 'pyarrow' and 'numpy'.") from err
+
+from ._osmium import ColumnCollector
+from .file_processor import FileProcessor
+
+COORDINATE_PRECISION = 10000000
+
+TAGS_TYPE = pa.map_(pa.large_string(), pa.large_string())
+MEMBER_TYPE = pa.struct([('type', pa.string()), ('ref', pa.int64()),
+                         ('role', pa.large_string())])
+
+SCHEMAS = {
+    'nodes': pa.schema([('id', pa.int64()), ('lon', pa.float64()), ('lat', pa.float64()),
+                        ('tags', TAGS_TYPE)]),
+    'ways': pa.schema([('id', pa.int64()), ('nodes', pa.large_list(pa.int64())),
+                       ('tags', TAGS_TYPE)]),
+    'relations': pa.schema([('id', pa.int64()), ('members', pa.large_list(MEMBER_TYPE)),
+                            ('tags', TAGS_TYPE)])
+}
+
+GEOMETRY_FIELD = pa.field('geometry', pa.large_binary())
+
+GEO_METADATA = {
+    'version': '1.0.0',
+    'primary_column': 'geometry',
+    'columns': {'geometry': {'encoding': 'WKB', 'geometry_types': ['Point']}}
+}
+
+
+def _offsets(arr: Any) -> Any:
+    return pa.array(arr, type=pa.int64())
+
+
+def _map_offsets(arr: Any) -> Any:
+    # Arrow maps only support 32-bit offsets.
+    if len(arr) and arr[-1] > np.iinfo(np.int32).max:
+        raise ValueError("Too many tags in a single record batch. Reduce the batch size.")
+    return pa.array(arr.astype(np.int32), type=pa.int32())
+
+
+def _strings(cols: Dict[str, Any], name: str) -> Any:
+    offsets = cols[name + '_offsets']
+    return pa.LargeStringArray.from_buffers(len(offsets) - 1, pa.py_buffer(offsets),
+                                            pa.py_buffer(cols[name + '_data']))
+
+
+def _tags(cols: Dict[str, Any]) -> Any:
+    return pa.MapArray.from_arrays(_map_offsets(cols['tag_offsets']),
+                                   _strings(cols, 'tag_key'),
+                                   _strings(cols, 'tag_value'))
+
+
+def _wkb_points(x: Any, y: Any) -> Any:
+    """ Create an Arrow array with WKB points from fixed-point coordinates.
+        Invalid locations result in a null geometry.
+    """
+    num = len(x)
+    wkb = np.zeros(num, dtype=np.dtype([('order', 'u1'), ('type', '<u4'),
+                                        ('x', '<f8'), ('y', '<f8')]))
+    wkb['order'] = 1
+    wkb['type'] = 1
+    wkb['x'] = x / COORDINATE_PRECISION
+    wkb['y'] = y / COORDINATE_PRECISION
+    offsets = np.arange(num + 1, dtype=np.int64) * wkb.dtype.itemsize
+    valid = np.packbits(x != np.iinfo(np.int32).max, bitorder='little')
+
+    return pa.LargeBinaryArray.from_buffers(pa.large_binary(), num,
+                                            [pa.py_buffer(valid), pa.py_buffer(offsets),
+                                             pa.py_buffer(wkb)])
+
+
+def _to_record_batches(columns: Dict[str, Dict[str, Any]],
+                       geometry: bool) -> Iterator[Tuple[str, Any]]:
+    nodes = columns['nodes']
+    if len(nodes['id']):
+        invalid = nodes['x'] == np.iinfo(np.int32).max
+        arrays = [pa.array(nodes['id']),
+                  pa.array(np.where(invalid, np.nan, nodes['x'] / COORDINATE_PRECISION)),
+                  pa.array(np.where(invalid, np.nan, nodes['y'] / COORDINATE_PRECISION)),
+                  _tags(nodes)]
+        schema = SCHEMAS['nodes']
+        if geometry:
+            arrays.append(_wkb_points(nodes['x'], nodes['y']))
+            schema = schema.append(GEOMETRY_FIELD)
+        yield 'nodes', pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    ways = columns['ways']
+    if len(ways['id']):
+        yield 'ways', pa.RecordBatch.from_arrays(
+                        [pa.array(ways['id']),
+                         pa.LargeListArray.from_arrays(_offsets(ways['node_offsets']),
+                                                       pa.array(ways['node_refs'])),
+                         _tags(ways)],
+                        schema=SCHEMAS['ways'])
+
+    rels = columns['relations']
+    if len(rels['id']):
+        members = pa.StructArray.from_arrays(
+                    [pa.array(rels['member_types'].astype('U1')),
+                     pa.array(rels['member_refs']),
+                     _strings(rels, 'member_role')],
+                    fields=list(MEMBER_TYPE))
+        yield 'relations', pa.RecordBatch.from_arrays(
+                             [pa.array(rels['id']),
+                              pa.LargeListArray.from_arrays(_offsets(rels['member_offsets']),
+                                                            members),
+                              _tags(rels)],
+                             schema=SCHEMAS['relations'])
+
+
+def record_batches(processor: FileProcessor, batch_size: int = 65536,
+                   geometry: bool = False) -> Iterator[Tuple[str, Any]]:
+    """ Read the data from the given [FileProcessor][osmium.FileProcessor]
+        and return it as a stream of Arrow RecordBatches. The iterator
+        returns tuples of the entity type ('nodes', 'ways' or 'relations')
+        and a record batch for this type. Each record batch contains
+        roughly _batch_size_ objects, not counting the objects of the
+        other types.
+
+        Nodes have the columns `id`, `lon`, `lat` and `tags`. Coordinates
+        of nodes without a valid location are NaN. When
+        _geometry_ is set, then an additional `geometry` column with
+        a WKB point is added. Ways have the columns `id`, `nodes` and `tags`.
+        Relations have the columns `id`, `members` and `tags`. Tags are
+        of type `map<string, string>`, members are a list of structs with
+        the fields `type`, `ref` and `role`. Strings and lists use the
+        large Arrow types with 64-bit offsets.
+
+        The filters of the processor are applied natively. Areas are not
+        exported.
+    """
+    collector = ColumnCollector(all_tags=True)
+
+    for batch in processor.iter_batches():
+        batch.apply(collector)
+        if len(collector) >= batch_size:
+            yield from _to_record_batches(collector.take_columns(), geometry)
+
+    if len(collector):
+        yield from _to_record_batches(collector.take_columns(), geometry)
+
+
+def write_parquet(processor: FileProcessor, directory: Union[str, 'os.PathLike[str]'],
+                  batch_size: int = 65536, **kwargs: Any) -> None:
+    """ Write the data from the given [FileProcessor][osmium.FileProcessor]
+        into Parquet files in _directory_. There will be a separate file
+        for each entity type: `nodes.parquet`, `ways.parquet` and
+        `relations.parquet`. Files are only created when the input contains
+        objects of the respective type.
+
+        The node file is written as a GeoParquet file with point geometries.
+        Any additional keyword arguments are handed to the
+        `pyarrow.parquet.ParquetWriter`.
+    """
+    outdir = Path(directory)
+    writers: Dict[str, Optional[Any]] = {}
+
+    try:
+        for otype, batch in record_batches(processor, batch_size, geometry=True):
+            writer = writers.get(otype)
+            if writer is None:
+                schema = batch.schema
+                if otype == 'nodes':
+                    schema = schema.with_metadata({'geo': json.dumps(GEO_METADATA)})
+                writer = pq.ParquetWriter(str(outdir / f'{otype}.parquet'), schema, **kwargs)
+                writers[otype] = writer
+            writer.write_batch(batch)
+    finally:
+        for writer in writers.values():
+            if writer is not None:
+                writer.close()
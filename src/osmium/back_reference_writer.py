@@ -13,6 +13,8 @@ from osmium._osmium import SimpleWriter
 from osmium.io import File, FileBuffer, ThreadPool
 from osmium.file_processor import FileProcessor, zip_processors
 from osmium import IdTracker
+from osmium.pbf_index import PbfBlockIndex, restricted_input
+from osmium.osm import WAY, RELATION
 
 
 class BackReferenceWriter:
@@ -30,7 +32,8 @@ class BackReferenceWriter:
     def __init__(self, outfile: Union[str, 'os.PathLike[str]', File],
                  ref_src: Union[str, 'os.PathLike[str]', File, FileBuffer],
                  overwrite: bool = False, remove_tags: bool = True,
-                 relation_depth: int = 0, thread_pool: Optional[ThreadPool] = None):
+                 relation_depth: int = 0, thread_pool: Optional[ThreadPool] = None,
+                 block_index: Optional[PbfBlockIndex] = None):
         """ Create a new writer.
 
             `outfile` is the name of the output file to write. The file must
@@ -52,6 +55,11 @@ class BackReferenceWriter:
             [ThreadPool][osmium.io.ThreadPool] which it
             uses to parallelize IO operations. Alternatively you
             may hand in an externally created thread pool.
+
+            When `ref_src` is a PBF file, a
+            [PbfBlockIndex][osmium.pbf_index.PbfBlockIndex] for the file
+            may be given in `block_index`. The writer then only reads the
+            parts of the file that contain referenced objects.
         """
         self.outfile = outfile
         self.tmpdir = TemporaryDirectory()
@@ -63,6 +71,7 @@ class BackReferenceWriter:
         self.id_tracker = IdTracker()
         self.ref_src = ref_src
         self.relation_depth = relation_depth
+        self.block_index = block_index
 
     def __enter__(self) -> 'BackReferenceWriter':
         return self
@@ -106,12 +115,22 @@ class BackReferenceWriter:
             is used as a context manager.
         """
         self.writer.close()
-        self.id_tracker.complete_backward_references(self.ref_src,
-                                                     relation_depth=self.relation_depth)
+        ref_src: Union[str, 'os.PathLike[str]', File, FileBuffer] = self.ref_src
+        if self.block_index is None:
+            # The reference file is read once for each level of relations.
+            with restricted_input(ref_src, WAY | RELATION, stream=False) as src:
+                self.id_tracker.complete_backward_references(src,
+                                                             relation_depth=self.relation_depth)
+        else:
+            self.block_index.complete_backward_references(self.id_tracker,
+                                                          relation_depth=self.relation_depth)
+            ref_src = self.block_index.read(nodes=self.id_tracker.node_ids(),
+                                            ways=self.id_tracker.way_ids(),
+                                            relations=self.id_tracker.relation_ids())
 
         fp1 = FileProcessor(Path(self.tmpdir.name, 'back_writer.osm.pbf'),
                             thread_pool=self.thread_pool)
-        fp2 = FileProcessor(self.ref_src, thread_pool=self.thread_pool
+        fp2 = FileProcessor(ref_src, thread_pool=self.thread_pool
                             ).with_filter(self.id_tracker.id_filter())
 
         with SimpleWriter(self.outfile, overwrite=self.overwrite,
@@ -4,13 +4,23 @@
 #
 # Copyright (C) 2025 Sarah Hoffmann <lonvia@denofr.de> and others.
 # For a full list of authors see the git log.
-from typing import Iterable, Iterator, Tuple, Union, Optional, List
+from typing import AsyncIterator, Iterable, Iterator, Tuple, Union, Optional, List, Dict, Any
+from contextlib import contextmanager
+import asyncio
+import concurrent.futures
+import logging
 import os
+import threading
 
 import osmium
 from osmium.index import LocationTable
 from osmium.io import File, FileBuffer, ThreadPool, Reader
 from osmium.osm.types import OSMEntity
+from osmium._osmium import ObjectBatch
+from osmium.pbf_index import RestrictedInputCache
+from osmium.location_storage import LocationStorageEstimate, estimate_location_storage
+
+LOG = logging.getLogger('pyosmium')
 
 
 class FileProcessor:
@@ -30,7 +40,10 @@ class FileProcessor:
             restricted with the _entities_ parameter. The data will be skipped
             directly at the source file and will never be passed to any filters
             including the location and area processors. You usually should not
-            be restricting objects, when using those.
+            be restricting objects, when using those. When reading from a
+            PBF file and the wanted parts of the file are small enough
+            to be kept in memory, whole blocks of the file with unwanted
+            objects are skipped without decompressing them.
 
             By default, pyosmium will create a private thread pool, which is
             used to parallelize reading of the file. Alternatively you may
@@ -41,12 +54,19 @@ class FileProcessor:
             """
         self._file = indata
         self._entities = entities
+        self._restricted_inputs = RestrictedInputCache()
         self._node_store: Optional[LocationTable] = None
+        self._storage_estimate: Optional[LocationStorageEstimate] = None
         self._area_handler: Optional[osmium.area.AreaManager] = None
         self._filters: List['osmium._osmium.HandlerLike'] = []
         self._area_filters: List['osmium._osmium.HandlerLike'] = []
         self._filtered_handler: Optional['osmium._osmium.HandlerLike'] = None
         self._thread_pool = thread_pool or ThreadPool()
+        self._recycle_objects = False
+        self._profiler: Optional[osmium.HandlerProfiler] = None
+        self._profiling = False
+        self._optimizer: Optional[osmium.FilterOptimizer] = None
+        self._optimize_sample_size = 0
 
     @property
     def header(self) -> osmium.io.Header:
@@ -64,7 +84,15 @@ class FileProcessor:
         """
         return self._node_store
 
-    def with_locations(self, storage: str = 'flex_mem') -> 'FileProcessor':
+    @property
+    def location_storage_estimate(self) -> Optional[LocationStorageEstimate]:
+        """ (read-only) Estimates used for choosing the node location
+            storage, when it was selected with `with_locations('auto')`.
+        """
+        return self._storage_estimate
+
+    def with_locations(self, storage: Union[str, LocationTable, None] = 'flex_mem'
+                       ) -> 'FileProcessor':
         """ Enable caching of node locations. The file processor will keep
             the coordinates of all nodes that are read from the file in
             memory and automatically enhance the node list of ways with
@@ -79,10 +107,33 @@ class FileProcessor:
             can become quite large. See the section on
             [location storage in the user manual][location-storage]
             for more information.
+
+            Set _storage_ to 'auto' to let pyosmium choose a storage
+            type that fits the size of the input file and the memory
+            available on the system. See
+            [estimate_location_storage()][osmium.location_storage.estimate_location_storage]
+            for details. The choice is logged and can be inspected
+            through the [location_storage_estimate]() property before
+            processing starts.
+
+            When _storage_ is a persistent
+            [LocationCache](Indexes.md#osmium.index.LocationCache) opened
+            read-only or a finished
+            [SharedLocationTable](Indexes.md#osmium.index.SharedLocationTable),
+            the locations are only looked up in the storage.
+            Nodes then do not need to be read from the file.
         """
-        if not (self._entities & osmium.osm.NODE):
+        if not _is_read_only(storage) and not (self._entities & osmium.osm.NODE):
             raise RuntimeError('Nodes not read from file. Cannot enable location cache.')
-        if isinstance(storage, str):
+        self._storage_estimate = None
+        if storage == 'auto':
+            self._storage_estimate = estimate_location_storage(self._file)
+            LOG.info("Using location storage '%s' (estimated size: %d MB, %s).",
+                     self._storage_estimate.map_type,
+                     self._storage_estimate.used_memory // (1024 * 1024),
+                     self._storage_estimate.reason)
+            self._node_store = osmium.index.create_map(self._storage_estimate.map_type)
+        elif isinstance(storage, str):
             self._node_store = osmium.index.create_map(storage)
         elif storage is None or isinstance(storage, osmium.index.LocationTable):
             self._node_store = storage
@@ -140,6 +191,68 @@ class FileProcessor:
         self._filtered_handler = handler
         return self
 
+    def with_profiling(self, enable: bool = True) -> 'FileProcessor':
+        """ Record call counts and run times for the location handler
+            and all filters in the filter chain. The statistics of the
+            last run can be retrieved with the [profile]() property.
+        """
+        self._profiling = enable
+        return self
+
+    @property
+    def profile(self) -> Optional[Dict[str, Any]]:
+        """ (read-only) Statistics of the filter chain of the most
+            recently started run, when profiling is enabled. See
+            [HandlerProfiler.stats][osmium.HandlerProfiler.stats]
+            for the format.
+        """
+        if self._profiler is None:
+            return None
+        return self._profiler.stats()
+
+    def with_filter_optimization(self, enable: bool = True,
+                                 sample_size: int = 10000) -> 'FileProcessor':
+        """ Let the order of native filters adapt to the data.
+            The filters added with [with_filter()]() are measured on the
+            first _sample_size_ objects of each type and then reordered,
+            so that cheap filters which reject many objects run first.
+            See [FilterOptimizer][osmium.FilterOptimizer] for details.
+            The chosen order of the last run can be retrieved with the
+            [filter_optimization]() property.
+        """
+        self._optimize_sample_size = sample_size if enable else 0
+        return self
+
+    @property
+    def filter_optimization(self) -> Optional[Dict[str, Any]]:
+        """ (read-only) Report about the filter order of the most
+            recently started run, when filter optimization is enabled. See
+            [FilterOptimizer.report][osmium.FilterOptimizer.report]
+            for the format.
+        """
+        if self._optimizer is None:
+            return None
+        return self._optimizer.report()
+
+    def with_recycled_objects(self, enable: bool = True) -> 'FileProcessor':
+        """ Reuse the Python objects returned by the iterator.
+
+            Normally, the iterator creates a fresh Python object for every
+            OSM object it returns. With recycling enabled, the object
+            returned for the previous OSM object of the same type is reset
+            and reused, which saves a considerable amount of allocations
+            when iterating over large files.
+
+            You must not keep any reference to an object or its attributes
+            (tags, node lists, members) beyond the current iteration step
+            when this mode is enabled. Such references would silently
+            point to the data of a later object. This applies to the
+            normal iterator only. Batches from `iter_batches()` always
+            have their own objects.
+        """
+        self._recycle_objects = enable
+        return self
+
     def __iter__(self) -> Iterator[OSMEntity]:
         """ Create a new iterator for the file processor. It is possible to
             create mulitple iterators from the same processor and even run
@@ -154,32 +267,32 @@ class FileProcessor:
             pass of reading may take a while for large files, so that the
             iterator might block before the first object is returned.
         """
-        handlers: List['osmium._osmium.HandlerLike'] = []
-
-        if self._node_store is not None:
-            lh = osmium.NodeLocationsForWays(self._node_store)
-            lh.ignore_errors()
-            handlers.append(lh)
+        handlers = self._location_handlers()
 
         if self._area_handler is None:
-            with Reader(self._file, self._entities, thread_pool=self._thread_pool) as reader:
-                it = osmium.OsmFileIterator(reader, *handlers, *self._filters)
+            with self._open(self._entities) as reader:
+                it = osmium.OsmFileIterator(reader, *self._filter_chain(handlers))
                 if self._filtered_handler:
                     it.set_filtered_handler(self._filtered_handler)
+                if self._recycle_objects:
+                    it.set_recycle_objects()
                 yield from it
             return
 
         # need areas, do two pass handling
-        with Reader(self._file, osmium.osm.RELATION, thread_pool=self._thread_pool) as rd:
+        with self._open(osmium.osm.RELATION) as rd:
             osmium.apply(rd, *self._area_filters, self._area_handler.first_pass_handler())
 
         buffer_it = osmium.BufferIterator(*self._filters)
         handlers.append(self._area_handler.second_pass_to_buffer(buffer_it))
 
-        with Reader(self._file, self._entities, thread_pool=self._thread_pool) as reader:
-            it = osmium.OsmFileIterator(reader, *handlers, *self._filters)
+        with self._open(self._entities) as reader:
+            it = osmium.OsmFileIterator(reader, *self._filter_chain(handlers))
             if self._filtered_handler:
                 it.set_filtered_handler(self._filtered_handler)
+            if self._recycle_objects:
+                it.set_recycle_objects()
+                buffer_it.set_recycle_objects()
             for obj in it:
                 yield obj
                 if buffer_it:
@@ -189,6 +302,184 @@ class FileProcessor:
         if buffer_it:
             yield from buffer_it
 
+    def iter_batches(self, size: int = 0) -> Iterator[ObjectBatch]:
+        """ Iterate over the processed objects in batches. Each batch
+            contains objects that come from the same internal data buffer,
+            so that objects are only handed over to Python once per buffer
+            instead of once per object. If _size_ is larger than 0, then
+            each batch contains at most _size_ objects.
+
+            A batch is a read-only sequence of OSM objects. The Python
+            objects are created lazily when an element of the batch is
+            accessed. The batch and all objects in it remain valid until
+            the next batch is requested from the iterator. Accessing them
+            later raises an error. Copy any data you need to keep.
+
+            Apart from the batching, the iterator works exactly as the
+            normal iterator over the file processor, including filtering
+            and location and area handling.
+        """
+        yield from self._iter_batches(size, True)
+
+    async def aiter_batches(self, size: int = 0,
+                            queue_size: int = 4) -> AsyncIterator[ObjectBatch]:
+        """ Iterate asynchronously over the processed objects in batches.
+
+            The file is read and filtered in a background thread, which
+            runs up to _queue_size_ batches ahead of the consumer. When
+            the queue is full, reading pauses until the consumer catches up.
+            When only native filters are used, the background thread does
+            not need to hold the GIL, so that the event loop keeps
+            running smoothly while the file is processed.
+
+            Each batch remains valid until the next batch is requested.
+            See [iter_batches()][osmium.FileProcessor.iter_batches] for
+            the meaning of _size_.
+        """
+        loop = asyncio.get_running_loop()
+        queue: 'asyncio.Queue[Any]' = asyncio.Queue(maxsize=queue_size)
+        stop = threading.Event()
+
+        def _put(item: Any) -> None:
+            if stop.is_set():
+                return
+            fut = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            # Wait for space in the queue but give up when the consumer is gone.
+            while not stop.is_set():
+                try:
+                    fut.result(timeout=0.1)
+                    return
+                except concurrent.futures.TimeoutError:
+                    pass
+            fut.cancel()
+
+        def _produce() -> None:
+            try:
+                for batch in self._iter_batches(size, False):
+                    _put(batch)
+                    if stop.is_set():
+                        break
+            except BaseException as exc:
+                _put(exc)
+            else:
+                _put(None)
+
+        producer = threading.Thread(target=_produce, daemon=True)
+        producer.start()
+
+        try:
+            while (item := await queue.get()) is not None:
+                if isinstance(item, BaseException):
+                    raise item
+                try:
+                    yield item
+                finally:
+                    item.invalidate()
+        finally:
+            stop.set()
+            # Unblock the producer, if it is waiting for space in the queue.
+            while not queue.empty():
+                item = queue.get_nowait()
+                if isinstance(item, ObjectBatch):
+                    item.invalidate()
+            await loop.run_in_executor(None, producer.join)
+
+    async def __aiter__(self) -> AsyncIterator[OSMEntity]:
+        """ Iterate asynchronously over the processed objects. This
+            works like [aiter_batches()][osmium.FileProcessor.aiter_batches]
+            with default parameters, returning the objects one by one.
+        """
+        async for batch in self.aiter_batches():
+            for obj in batch:
+                yield obj
+
+    def collect_columns(self, tags: Iterable[str] = ()) -> Dict[str, Dict[str, Any]]:
+        """ Read the file and return the nodes, ways and relations which
+            pass the filter chain as columns of NumPy arrays. The values of
+            the tag keys listed in _tags_ are returned as additional columns.
+            See [ColumnCollector.take_columns][osmium.ColumnCollector.take_columns]
+            for a description of the format.
+
+            The data is collected natively without creating any Python
+            objects for the OSM data. Area processing and the handler
+            for filtered objects are not taken into account.
+            NumPy must be installed to use this function.
+        """
+        collector = osmium.ColumnCollector(tags)
+
+        with self._open(self._entities) as reader:
+            osmium.apply(reader, *self._filter_chain(self._location_handlers()), collector)
+
+        return collector.take_columns()
+
+    def _iter_batches(self, size: int, invalidate: bool) -> Iterator[ObjectBatch]:
+        handlers = self._location_handlers()
+
+        if self._area_handler is None:
+            with self._open(self._entities) as reader:
+                it = osmium.OsmFileIterator(reader, *self._filter_chain(handlers))
+                if self._filtered_handler:
+                    it.set_filtered_handler(self._filtered_handler)
+                while (batch := it.next_batch(size, invalidate)) is not None:
+                    yield batch
+            return
+
+        # need areas, do two pass handling
+        with self._open(osmium.osm.RELATION) as rd:
+            osmium.apply(rd, *self._area_filters, self._area_handler.first_pass_handler())
+
+        buffer_it = osmium.BufferIterator(*self._filters)
+        handlers.append(self._area_handler.second_pass_to_buffer(buffer_it))
+
+        with self._open(self._entities) as reader:
+            it = osmium.OsmFileIterator(reader, *self._filter_chain(handlers))
+            if self._filtered_handler:
+                it.set_filtered_handler(self._filtered_handler)
+            while (batch := it.next_batch(size, invalidate)) is not None:
+                yield batch
+                while (area_batch := buffer_it.next_batch(size, invalidate)) is not None:
+                    yield area_batch
+
+        # catch anything after the final flush
+        while (area_batch := buffer_it.next_batch(size, invalidate)) is not None:
+            yield area_batch
+
+    @contextmanager
+    def _open(self, entities: osmium.osm.osm_entity_bits) -> Iterator[Reader]:
+        with self._restricted_inputs.open(self._file, entities) as src, \
+             Reader(src, entities, thread_pool=self._thread_pool) as reader:
+            yield reader
+
+    def _filter_chain(self, handlers: List['osmium._osmium.HandlerLike']
+                      ) -> List['osmium._osmium.HandlerLike']:
+        filters = self._filters
+        if self._optimize_sample_size > 0 and filters:
+            self._optimizer = osmium.FilterOptimizer(*filters,
+                                                     sample_size=self._optimize_sample_size)
+            filters = [self._optimizer]
+
+        if self._profiling:
+            self._profiler = osmium.HandlerProfiler(*handlers, *filters)
+            return [self._profiler]
+
+        return [*handlers, *filters]
+
+    def _location_handlers(self) -> List['osmium._osmium.HandlerLike']:
+        if self._node_store is None:
+            return []
+
+        lh = osmium.NodeLocationsForWays(self._node_store)
+        lh.ignore_errors()
+        if _is_read_only(self._node_store):
+            lh.store_node_locations = False
+        return [lh]
+
+
+def _is_read_only(storage: Union[str, LocationTable, None]) -> bool:
+    return isinstance(storage, (osmium.index.LocationCache,
+                                osmium.index.SharedLocationTable)) \
+           and not storage.writable
+
 
 def zip_processors(*procs: FileProcessor) -> Iterable[List[Optional[OSMEntity]]]:
     """ Return the data from the FileProcessors in parallel such
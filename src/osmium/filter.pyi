@@ -4,10 +4,51 @@
 #
 # Copyright (C) 2024 Sarah Hoffmann <lonvia@denofr.de> and others.
 # For a full list of authors see the git log.
-from typing import Tuple, Iterable
+from typing import Tuple, Iterable, Optional, Union
+import datetime as dt
 
 from ._osmium import BaseFilter
-from .osm import osm_entity_bits
+from .osm import osm_entity_bits, Box
+from .index import IdSet, MappedIdSet
+
+class AttributeFilter(BaseFilter):
+    """ Filter class which lets objects pass according to their
+        metadata attributes.
+
+        All conditions given must be fulfilled for an object to pass.
+        The attributes are checked natively, no Python object is
+        created for the objects tested.
+
+        Changesets are checked against _since_, _until_ (using the
+        creation time), _changesets_ (using the changeset ID), _uids_
+        and _users_. The other conditions do not apply to changesets.
+    """
+    def __init__(self, *, since: Optional[Union[dt.datetime, str]] = None,
+                 until: Optional[Union[dt.datetime, str]] = None,
+                 min_version: Optional[int] = None, max_version: Optional[int] = None,
+                 changesets: Optional[Iterable[int]] = None,
+                 uids: Optional[Iterable[int]] = None,
+                 users: Optional[Iterable[str]] = None,
+                 visible: Optional[bool] = None) -> None:
+        """ Create a new filter object. At least one condition is required.
+
+            * _since_, _until_ - only let pass objects with a timestamp
+              of _since_ or later and before _until_. Timestamps may be
+              given as timezone-aware datetime objects or ISO strings
+              like `2024-01-01T00:00:00Z`.
+            * _min_version_, _max_version_ - only let pass objects whose
+              version is in the given range (inclusive)
+            * _changesets_ - only let pass objects from one of the
+              given changeset IDs
+            * _uids_ - only let pass objects last edited by one of the
+              given user IDs
+            * _users_ - only let pass objects last edited by one of the
+              given user names
+            * _visible_ - only let pass visible (`True`) or deleted
+              (`False`) objects. Deleted objects only appear in history
+              and change files.
+        """
+
 
 class EmptyTagFilter(BaseFilter):
     """ Filter class which only lets pass objects which have at least one tag.
@@ -24,6 +65,9 @@ class KeyFilter(BaseFilter):
         This filter functions like an OR filter. To create an AND filter
         (a filter that lets object pass that have tags with all the listed
         keys) you need to chain multiple KeyFilter objects.
+
+        The keys are kept in a hash index, so that the filter stays fast
+        even with a large number of keys.
     """
     def __init__(self, *keys: str) -> None:
         """ Create a new filter object. The parameters list the keys
@@ -39,6 +83,9 @@ class TagFilter(BaseFilter):
         This filter functions like an OR filter. To create an AND filter
         (a filter that lets object pass that have tags with all the listed
         key-value pairs) you need to chain multiple TagFilter objects.
+
+        The key-value pairs are kept in a hash index, so that the filter
+        stays fast even with a large number of pairs.
     """
     def __init__(self, *tags: Tuple[str, str]) -> None:
         """ Create a new filter object. The parameters list the key-value
@@ -47,6 +94,39 @@ class TagFilter(BaseFilter):
         """
 
 
+class TagExpressionFilter(BaseFilter):
+    """ Filter class which lets objects pass whose tags match a
+        tag expression.
+
+        The expression is parsed once when the filter is created and
+        then evaluated natively for each object. It consists of
+        conditions on single tags, which may be combined with `and`,
+        `or`, `not` and parentheses:
+
+        | Condition | Matches objects ... |
+        |-----------|---------------------|
+        | `key` | with a tag _key_ |
+        | `key=value` | where _key_ has the given value |
+        | `key!=value` | where _key_ is missing or has a different value |
+        | `key in (v1, v2)` | where _key_ has one of the listed values |
+        | `key not in (v1, v2)` | where _key_ is missing or has none of the values |
+        | `key~regex` | where the value of _key_ matches the regular expression |
+        | `key!~regex` | where _key_ is missing or does not match the expression |
+        | `key<number` | where the value of _key_ is a number less than the given one (also `<=`, `>`, `>=`) |
+
+        Keys and values which contain spaces, special characters or
+        one of the keywords `and`, `or`, `not` and `in` must be put
+        in single or double quotes. Regular expressions use ECMAScript
+        syntax and match anywhere in the value unless anchored.
+
+        Example: `highway in (primary, secondary) and not access=private`
+    """
+    def __init__(self, expression: str) -> None:
+        """ Create a new filter object for the given expression.
+            Raises a ValueError when the expression cannot be parsed.
+        """
+
+
 class EntityFilter(BaseFilter):
     """ Filter class which lets pass objects according to their type.
     """
@@ -62,9 +142,39 @@ class IdFilter(BaseFilter):
         This filter usually only makes sense when used together with
         a type restriction, set using `enable_for()`.
     """
-    def __init__(self, ids: Iterable[int]) -> None:
+    def __init__(self, ids: Union[Iterable[int], IdSet, MappedIdSet]) -> None:
         """ Create a new filter object. _ids_ contains the IDs the filter
-            should let pass. It can be any iterable over ints.
+            should let pass. It can be any iterable over ints. Large
+            numbers of IDs are loaded much faster, when they are given
+            as an [IdSet][osmium.index.IdSet] or as a one-dimensional
+            integer array implementing the buffer protocol. A
+            [MappedIdSet][osmium.index.MappedIdSet] is used directly
+            without copying the IDs.
+        """
+
+
+class GeometryFilter(BaseFilter):
+    """ Filter class which only lets pass objects which are located
+        within one of the given geometries.
+
+        Nodes pass when their location is inside a geometry. Ways pass
+        when one of their nodes is inside or one of their segments
+        crosses the boundary of a geometry. This needs node locations
+        on the ways, so the location cache must be enabled. Areas pass
+        when they intersect with a geometry. Relations and changesets
+        have no location and are always dropped. Use `enable_for()`
+        to restrict the filter to the object types that should be
+        checked.
+
+        The geometries are indexed with a grid when the filter is
+        created, so that tests are fast even for complex polygons.
+    """
+    def __init__(self, *geometries: Union[str, bytes, Box, Tuple[float, float, float, float]]) -> None:
+        """ Create a new filter object. Each geometry may be a Polygon
+            or MultiPolygon in WKT (str) or WKB (bytes) format, a
+            [Box][osmium.osm.Box] or a tuple of
+            `(min_lon, min_lat, max_lon, max_lat)`. Coordinates must be
+            in WGS84. At least one geometry is required.
         """
 
 
@@ -73,10 +183,13 @@ class GeoInterfaceFilter(BaseFilter):
 
         The filter can process node, way and area types. All other types
         will be dropped. To create geometries for ways, the location cache needs
-        to be enabled. Relations and closed ways can only be transformed
-        to polygons when the area handler is enabled.
+        to be enabled, otherwise an
+        [InvalidLocationError][osmium.InvalidLocationError] is raised.
+        Relations and closed ways can only be transformed to polygons when
+        the area handler is enabled.
     """
-    def __init__(self, drop_invalid_geometries: bool= ..., tags: Iterable[str] = ...) -> None:
+    def __init__(self, drop_invalid_geometries: bool= ..., tags: Iterable[str] = ...,
+                 coordinates: str = ...) -> None:
         """ Create a new filter object. The filter will usually drop all
             objects that do not have a geometry. Set _drop_invalid_geometries_
             to `False` to just let them pass.
@@ -84,4 +197,11 @@ class GeoInterfaceFilter(BaseFilter):
             The filter will normally add all tags it finds as properties to
             the GeoInterface output. To filter the tags to relevant ones, set
             _tags_ to the desired list.
+
+            _coordinates_ chooses the representation of coordinate sequences
+            in line strings and polygon rings. With the default `list`, each
+            sequence is a list of `[lon, lat]` lists. With `numpy`, each
+            sequence is a numpy array of shape (n, 2). This is considerably
+            faster when the geometries are handed on to libraries like
+            shapely or geopandas. Point coordinates are always a tuple.
         """
@@ -13,6 +13,8 @@ from osmium._osmium import SimpleWriter
 from osmium import IdTracker
 from osmium.io import File, FileBuffer, ThreadPool
 from osmium.file_processor import FileProcessor, zip_processors
+from osmium.pbf_index import restricted_input
+from osmium.osm import WAY, RELATION
 
 
 class ForwardReferenceWriter:
@@ -113,13 +115,16 @@ class ForwardReferenceWriter:
         if self.tmpdir is not None:
             self.writer.close()
 
-            self.id_tracker.complete_forward_references(
-                self.ref_src,
-                relation_depth=self.forward_relation_depth)
-            if self.back_references:
-                self.id_tracker.complete_backward_references(
-                    self.ref_src,
-                    relation_depth=self.backward_relation_depth)
+            # Nodes are not needed to complete the references. The input
+            # is read several times, so it cannot be streamed.
+            with restricted_input(self.ref_src, WAY | RELATION, stream=False) as src:
+                self.id_tracker.complete_forward_references(
+                    src,
+                    relation_depth=self.forward_relation_depth)
+                if self.back_references:
+                    self.id_tracker.complete_backward_references(
+                        src,
+                        relation_depth=self.backward_relation_depth)
 
             fp1 = FileProcessor(Path(self.tmpdir.name, 'forward_writer.osm.pbf'),
                                 thread_pool=self.thread_pool)
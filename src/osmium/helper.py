@@ -4,11 +4,11 @@
 #
 # Copyright (C) 2025 Sarah Hoffmann <lonvia@denofr.de> and others.
 # For a full list of authors see the git log.
-from typing import Optional, Callable, TypeVar, TYPE_CHECKING
+from typing import Optional, Callable, TypeVar, Union, TYPE_CHECKING
 
 from .simple_handler import SimpleHandler
 from .osm import Node, Way, Relation, Area, Changeset
-from .index import create_map
+from .index import create_map, LocationTable, LocationCache
 from ._osmium import SimpleWriter, NodeLocationsForWays
 
 from ._osmium import MergeInputReader as MergeInputReader
@@ -61,13 +61,19 @@ class WriteHandler(SimpleWriter):
 
 
 def _merge_apply(self: MergeInputReader, *handlers: 'HandlerLike',
-                 idx: str = '', simplify: bool = True) -> None:
-    if idx:
+                 idx: Union[str, LocationTable] = '', simplify: bool = True) -> None:
+    if isinstance(idx, LocationTable):
+        lh = NodeLocationsForWays(idx)
+        lh.ignore_errors()
+        if isinstance(idx, LocationCache) and not idx.writable:
+            lh.store_node_locations = False
+        self._apply_internal(lh, *handlers, simplify=simplify)
+    elif idx:
         lh = NodeLocationsForWays(create_map(idx))
         lh.ignore_errors()
         self._apply_internal(lh, *handlers, simplify=simplify)
-
-    self._apply_internal(*handlers, simplify=simplify)
+    else:
+        self._apply_internal(*handlers, simplify=simplify)
 
 
 MergeInputReader.apply = _merge_apply  # type: ignore[method-assign]
@@ -4,7 +4,9 @@
 #
 # Copyright (C) 2024 Sarah Hoffmann <lonvia@denofr.de> and others.
 # For a full list of authors see the git log.
-from typing import List
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+import os
+import datetime as dt
 
 import osmium.osm
 
@@ -26,16 +28,195 @@ class LocationTable:
     def used_memory(self) -> int:
         """ Return the size (in bytes) currently allocated by this location table.
         """
+    def get_many(self, ids: Any, *, missing: str = 'mask',
+                 sentinel: int = ...) -> Tuple[Any, Any]:
+        """ Look up the locations for an array of node IDs in a single
+            call. _ids_ may be a numpy array or any sequence of ints.
+            Returns a tuple of two numpy arrays of type int32 with the
+            x and y coordinates of the locations in fixed-point format.
+            Divide them by 10,000,000 to get degrees.
+
+            The _missing_ parameter decides what happens with IDs which
+            have no location. With 'mask' (the default), the results are
+            numpy masked arrays, where the coordinates of missing
+            locations are masked. With 'sentinel', plain arrays are
+            returned and missing coordinates are set to _sentinel_. The
+            default sentinel is the coordinate value osmium uses for an
+            undefined location. With 'raise', a `KeyError` is raised when
+            any of the IDs has no location.
+
+            Needs numpy to be installed.
+        """
+    def set_many(self, ids: Any, x: Any, y: Any) -> None:
+        """ Set the locations for an array of node IDs in a single call.
+            _x_ and _y_ contain the coordinates in fixed-point format
+            as returned by `get_many()`. All three parameters may be
+            numpy arrays or sequences of ints of the same length.
+
+            Needs numpy to be installed.
+        """
     def __getitem__(self, id: int) -> osmium.osm.Location: ...
     def __setitem__(self, id: int, loc: osmium.osm.Location) -> None: ...
 
 
+class LocationCache(LocationTable):
+    """ Persistent location table in a single file, which carries
+        metadata about its content: a description of the source, the
+        replication sequence and timestamp the data corresponds to and
+        whether the file has been completely written.
+
+        The locations are saved in a dense array indexed by node ID,
+        which is memory-mapped. When opened read-only, any number of
+        processes may use the same cache concurrently and share the
+        same memory pages.
+
+        The cache is marked as incomplete while it is open for writing.
+        When the writing process does not call `close()`, for example
+        because it crashed, the file stays incomplete and opening it
+        again will fail. Use the cache as a context manager to
+        make sure it is closed properly:
+
+            with osmium.index.LocationCache('nodes.cache', mode='w') as cache:
+                cache.source = 'planet-250101.osm.pbf'
+                for o in osmium.FileProcessor(...).with_locations(cache):
+                    ...
+
+        When leaving the context because of an exception, the cache is
+        closed but not marked complete.
+    """
+    def __init__(self, filename: Union[str, 'os.PathLike[str]'], mode: str = 'r',
+                 allow_incomplete: bool = False) -> None:
+        """ Open the location cache in the given file. With _mode_ 'r'
+            (the default), the cache is opened read-only. Mode 'a' opens
+            an existing cache for updates and mode 'w' creates a new, empty
+            cache. An existing file is replaced in the latter case.
+
+            Opening an incomplete cache raises a RuntimeError unless
+            _allow_incomplete_ is set.
+        """
+    source: str
+    """ Free-form description of the data source of the cache.
+        Can only be set when the cache is writable.
+    """
+    sequence: Optional[int]
+    """ Replication sequence number the data in the cache corresponds to
+        or None, if unknown. Can only be set when the cache is writable.
+    """
+    timestamp: Optional[dt.datetime]
+    """ Timestamp of the data in the cache or None, if unknown.
+        Can only be set when the cache is writable.
+    """
+    @property
+    def complete(self) -> bool:
+        """ (read-only) True, if the file was completely written
+            and properly closed.
+        """
+    @property
+    def writable(self) -> bool:
+        """ (read-only) True, if the cache was opened for writing.
+        """
+    @property
+    def closed(self) -> bool:
+        """ (read-only) True, if the cache has been closed.
+        """
+    @property
+    def filename(self) -> 'os.PathLike[str]':
+        """ (read-only) File name of the cache.
+        """
+    def close(self, complete: bool = True) -> None:
+        """ Close the cache. When the cache is writable and _complete_
+            is true, the file is marked as complete. Any further access
+            to the cache raises an error.
+        """
+    def __enter__(self) -> 'LocationCache': ...
+    def __exit__(self, *args: Any) -> None: ...
+
+
+class SharedLocationTable(LocationTable):
+    """ Location table in shared memory, which is filled by one process
+        and then used read-only by any number of other processes, for
+        example, the workers of a multiprocessing pool. The memory is
+        managed with Python's `multiprocessing.shared_memory`.
+
+        The locations are saved in an array of fixed size sorted by
+        node ID. The creating process sets the locations and calls
+        `finish()`. Afterwards the table can no longer be changed. Other
+        processes attach to the table by creating a new
+        SharedLocationTable with its name. When a table is
+        pickled, only the name is transferred, so that tables can be
+        handed directly to workers:
+
+            with osmium.index.SharedLocationTable.create(num_nodes) as table:
+                for _ in osmium.FileProcessor('data.osm.pbf', osmium.osm.NODE)\\
+                               .with_locations(table):
+                    pass
+                table.finish()
+
+                with multiprocessing.Pool() as pool:
+                    pool.map(process_ways, [(table, part) for part in parts])
+
+        On Python versions before 3.13, processes which attach to a
+        table are registered with the resource tracker of
+        `multiprocessing`. The table then gets removed when such a
+        process ends, unless it is a child of the creating process.
+    """
+    def __init__(self, name: str) -> None:
+        """ Attach read-only to the finished table with the given _name_.
+        """
+    @staticmethod
+    def create(capacity: int, name: Optional[str] = None) -> 'SharedLocationTable':
+        """ Create a new shared memory segment for up to _capacity_
+            locations and return a writable table for it. When _name_ is
+            not given, a unique name is chosen. The segment is removed
+            when the creating process closes the table.
+        """
+    @staticmethod
+    def required_size(capacity: int) -> int:
+        """ Return the size in bytes of the shared memory needed for
+            a table with _capacity_ locations.
+        """
+    @property
+    def name(self) -> str:
+        """ (read-only) Name of the shared memory segment.
+        """
+    @property
+    def capacity(self) -> int:
+        """ (read-only) Maximum number of locations the table can hold.
+        """
+    @property
+    def writable(self) -> bool:
+        """ (read-only) True, if locations may still be added to the table.
+        """
+    @property
+    def finished(self) -> bool:
+        """ (read-only) True, if the table has been finished.
+        """
+    @property
+    def closed(self) -> bool:
+        """ (read-only) True, if the table has been closed.
+        """
+    def __len__(self) -> int: ...
+    def finish(self) -> None:
+        """ Sort the locations and mark the table as ready for use by
+            other processes. The table becomes read-only.
+        """
+    def close(self, unlink: bool = True) -> None:
+        """ Detach from the shared memory. When _unlink_ is true and
+            this process created the table, the shared memory segment is
+            removed as well. Processes which are still attached can go on
+            using it.
+        """
+    def __enter__(self) -> 'SharedLocationTable': ...
+    def __exit__(self, *args: Any) -> None: ...
+
+
 
 class IdSet:
     """ Compact storage for a set of IDs.
     """
-    def __init__(self) -> None:
-        """ Initialise an empty set.
+    def __init__(self, ids: 'Union[Iterable[int], IdSet]' = ...) -> None:
+        """ Initialise a new set. When _ids_ are given, the set is
+            filled with them in the same way as `update()` does.
         """
     def set(self, id: int) -> None:
         """ Add an ID to the storage.
@@ -54,6 +235,89 @@ class IdSet:
     def clear(self) -> None:
         """ Remove all IDs from the set.
         """
+    def contains_any(self, ranges: Sequence[Tuple[int, int]]) -> List[bool]:
+        """ Check for each of the given ID _ranges_ if the set contains
+            any ID in the range. The ranges are tuples of the first and
+            the last ID of the range (inclusive).
+        """
+    def update(self, ids: 'Union[Iterable[int], IdSet, MappedIdSet]') -> None:
+        """ Add all IDs from _ids_ to the set. _ids_ may be another IdSet
+            or MappedIdSet, a one-dimensional array of integers implementing the buffer
+            protocol (like a numpy array) or any iterable over ints.
+            Arrays and ID sets are read natively without creating
+            Python objects for the single IDs.
+        """
+    def update_from_file(self, filename: Union[str, 'os.PathLike[str]'],
+                         format: str = 'text') -> None:
+        """ Add all IDs from the given file to the set. With _format_
+            'text', the file must contain one ID per line. Empty lines and
+            lines starting with '#' are ignored. With _format_ 'binary',
+            the file must contain the IDs as 64-bit little-endian integers.
+        """
+    def to_array(self) -> Any:
+        """ Return all IDs of the set as a sorted numpy array of int64.
+            Needs numpy to be installed.
+        """
+    def save(self, filename: Union[str, 'os.PathLike[str]']) -> None:
+        """ Save the set into a file in a compact bitmap format. The file
+            can be loaded again with `IdSet.load()` or memory-mapped with
+            [MappedIdSet][osmium.index.MappedIdSet].
+        """
+    @staticmethod
+    def load(filename: Union[str, 'os.PathLike[str]'],
+             osm_type: Optional[str] = None) -> 'IdSet':
+        """ Create a new set from a file written with `save()`. Use
+            _osm_type_ ('n', 'w' or 'r') to choose the set to load
+            from a file saved by an [IdTracker][osmium.IdTracker].
+        """
+    def union(self, other: 'IdSet') -> 'IdSet':
+        """ Return a new set with the IDs from this and the _other_ set.
+        """
+    def intersection(self, other: 'IdSet') -> 'IdSet':
+        """ Return a new set with the IDs that are in this and
+            the _other_ set.
+        """
+    def difference(self, other: 'IdSet') -> 'IdSet':
+        """ Return a new set with the IDs from this set that are not
+            in the _other_ set.
+        """
+    def __len__(self) -> int: ...
+    def __contains__(self, id: int) -> bool: ...
+    def __or__(self, other: 'IdSet') -> 'IdSet': ...
+    def __and__(self, other: 'IdSet') -> 'IdSet': ...
+    def __sub__(self, other: 'IdSet') -> 'IdSet': ...
+    def __ior__(self, other: 'IdSet') -> 'IdSet': ...
+    def __iand__(self, other: 'IdSet') -> 'IdSet': ...
+    def __isub__(self, other: 'IdSet') -> 'IdSet': ...
+
+
+class MappedIdSet:
+    """ Read-only set of IDs that is memory-mapped from a file written
+        with [IdSet.save()][osmium.index.IdSet.save] or
+        [IdTracker.save()][osmium.IdTracker.save].
+
+        The data is not copied into memory, so that different processes
+        opening the same file share the same memory pages. The set can
+        be used in an [IdFilter][osmium.filter.IdFilter] directly.
+        The file must not be changed while it is mapped. Saving a set
+        under the same file name is safe, because a new file is created.
+    """
+    def __init__(self, filename: Union[str, 'os.PathLike[str]'],
+                 osm_type: Optional[str] = None) -> None:
+        """ Open the set in the given file. When the file was written
+            by an IdTracker, _osm_type_ must be set to one of
+            'n', 'w' or 'r' to choose the set.
+        """
+    def get(self, id: int) -> bool:
+        """ Check if the given ID is in the set.
+        """
+    def empty(self) -> bool:
+        """ Check if the set contains no IDs.
+        """
+    def to_array(self) -> Any:
+        """ Return all IDs of the set as a sorted numpy array of int64.
+            Needs numpy to be installed.
+        """
     def __len__(self) -> int: ...
     def __contains__(self, id: int) -> bool: ...
 
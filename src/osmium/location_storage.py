@@ -0,0 +1,153 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+"""
+Selection of a suitable node location storage for an input file.
+"""
+from typing import NamedTuple, Optional, Union
+import os
+
+from .io import File, FileBuffer, Reader
+from .osm import NOTHING
+from .pbf_index import PbfBlockIndex
+
+# Rough number of bytes per node in OSM files. Nodes make up the
+# bulk of a file, so the size of the file gives a good upper bound for
+# the number of nodes.
+_BYTES_PER_NODE = {'pbf': 8, 'compressed': 15, 'text': 80}
+# Largest node ID to expect, when the input does not tell.
+_MAX_NODE_ID = 14_000_000_000
+# Memory needed per location by the different storage types.
+_SPARSE_BYTES = 16
+_DENSE_BYTES = 8
+_COMPRESSED_BYTES = 6
+_COMPRESSED_BLOCK_BYTES = 24 / 4096
+# Share of the available memory the location storage may take.
+_MEMORY_SHARE = 0.75
+
+
+class LocationStorageEstimate(NamedTuple):
+    """ Choice of a location storage for an input file
+        together with the estimates it is based on.
+    """
+    map_type: str
+    "Type of location storage as accepted by `osmium.index.create_map()`."
+    used_memory: int
+    "Estimated size of the storage in bytes after reading the file."
+    num_nodes: Optional[int]
+    "Estimated number of nodes in the file or None if unknown."
+    max_node_id: Optional[int]
+    "Estimated largest node ID in the file or None if unknown."
+    memory_limit: Optional[int]
+    "Amount of memory the storage was allowed to use or None if unlimited."
+    reason: str
+    "Short explanation of the choice."
+
+
+def available_memory() -> Optional[int]:
+    """ Return the amount of memory in bytes that is available for new
+        processes without swapping or None if it cannot be determined.
+    """
+    try:
+        with open('/proc/meminfo', encoding='ascii') as fd:
+            for line in fd:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _format_of(filename: str) -> str:
+    if filename.endswith('.pbf'):
+        return 'pbf'
+    if filename.endswith(('.gz', '.bz2', '.o5m', '.o5c')):
+        return 'compressed'
+    return 'text'
+
+
+def _is_extract(source: Union[str, 'os.PathLike[str]', File, FileBuffer]) -> bool:
+    """ Check the bounding box in the header of the file. Node IDs of
+        extracts are spread over the whole ID range.
+    """
+    try:
+        with Reader(source, NOTHING) as reader:
+            box = reader.header().box()
+    except RuntimeError:
+        return False
+    if not box.valid():
+        return False
+    return box.size() < 0.5 * 360 * 180
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / 1024 / 1024:.0f} MB"
+
+
+def estimate_location_storage(source: Union[str, 'os.PathLike[str]', File, FileBuffer],
+                              memory_limit: Optional[int] = None
+                              ) -> LocationStorageEstimate:
+    """ Choose a location storage for reading the nodes of _source_.
+
+        The number of nodes and the largest node ID are taken from the
+        [block index][osmium.pbf_index.PbfBlockIndex] of a PBF file,
+        if one has been saved next to the file. Otherwise they are
+        estimated from the size of the file and its bounding box.
+
+        The storage may use up to _memory_limit_ bytes. Per default,
+        this is three quarters of the memory currently available on
+        the system. When the locations do not fit into memory, not even
+        in compressed form, then a file-backed storage in a
+        temporary file is chosen.
+    """
+    if memory_limit is None:
+        avail = available_memory()
+        if avail is not None:
+            memory_limit = int(avail * _MEMORY_SHARE)
+
+    if not isinstance(source, (str, os.PathLike)):
+        return LocationStorageEstimate('flex_mem', 0, None, None, memory_limit,
+                                       'size of input unknown')
+
+    max_id: Optional[int] = None
+    try:
+        node_blocks = [b for b in PbfBlockIndex.load(source).blocks if b.type == 'n']
+        num_nodes = sum(b.num_objects for b in node_blocks)
+        max_id = max((b.last_id for b in node_blocks), default=0)
+    except (OSError, RuntimeError):
+        num_nodes = os.stat(source).st_size // _BYTES_PER_NODE[_format_of(str(source))]
+
+    sparse = _SPARSE_BYTES * num_nodes
+    if max_id is not None:
+        dense: Optional[int] = _DENSE_BYTES * (max_id + 1)
+    elif _is_extract(source):
+        dense = None
+    else:
+        dense = _DENSE_BYTES * (_MAX_NODE_ID + 1)
+    compressed = _COMPRESSED_BYTES * num_nodes \
+        + int(_COMPRESSED_BLOCK_BYTES * (_MAX_NODE_ID if max_id is None else max_id))
+
+    if dense is not None and dense < sparse:
+        kind, size = 'dense', dense
+    else:
+        kind, size = 'sparse', sparse
+
+    if memory_limit is None:
+        map_type, reason = f'{kind}_mem_array', 'available memory unknown'
+    elif size <= memory_limit:
+        map_type, reason = f'{kind}_mem_array', f'fits into {_megabytes(memory_limit)}'
+    elif compressed <= memory_limit:
+        map_type, size = 'compressed_mem', compressed
+        reason = f'fits into {_megabytes(memory_limit)} only when compressed'
+    else:
+        map_type, reason = f'{kind}_file_array', \
+                           f'does not fit into {_megabytes(memory_limit)}'
+
+    return LocationStorageEstimate(map_type, size, num_nodes, max_id, memory_limit, reason)
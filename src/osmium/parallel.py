@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+"""
+Parallel processing of OSM PBF files with multiple processes.
+"""
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple, TypeVar, Union
+import functools
+import multiprocessing
+import os
+import struct
+
+from .io import FileBuffer
+from ._pbf import parse_blob_header
+
+T = TypeVar('T')
+
+
+class PbfBlob(NamedTuple):
+    """ Position of a single blob in a PBF file.
+    """
+    type: str
+    "Type of the blob, either 'OSMHeader' or 'OSMData'."
+    offset: int
+    "Start of the blob in the file, including the blob header."
+    size: int
+    "Total size of the blob in bytes, including the blob header."
+
+
+def pbf_blobs(filename: Union[str, 'os.PathLike[str]']) -> Iterator[PbfBlob]:
+    """ Iterate over the blobs of the PBF file _filename_. Only the
+        blob headers are read, the blob content is skipped.
+    """
+    with open(filename, 'rb') as fd:
+        offset = 0
+        while True:
+            raw_len = fd.read(4)
+            if not raw_len:
+                break
+            if len(raw_len) < 4:
+                raise RuntimeError('Truncated PBF file.')
+            header_len = struct.unpack('!I', raw_len)[0]
+            btype, datasize = parse_blob_header(fd.read(header_len))
+            size = 4 + header_len + datasize
+            yield PbfBlob(btype, offset, size)
+            offset += size
+            fd.seek(offset)
+
+
+def _read_ranges(filename: Union[str, 'os.PathLike[str]'],
+                 ranges: List[Tuple[int, int]]) -> bytes:
+    parts = []
+    with open(filename, 'rb') as fd:
+        for offset, size in ranges:
+            fd.seek(offset)
+            parts.append(fd.read(size))
+
+    return b''.join(parts)
+
+
+def _run_task(map_func: Callable[[FileBuffer], T],
+              filename: Union[str, 'os.PathLike[str]'],
+              ranges: List[Tuple[int, int]]) -> T:
+    return map_func(FileBuffer(_read_ranges(filename, ranges), 'pbf'))
+
+
+def map_reduce(filename: Union[str, 'os.PathLike[str]'],
+               map_func: Callable[[FileBuffer], T],
+               reduce_func: Callable[[T, T], T],
+               num_workers: Optional[int] = None,
+               blobs_per_task: int = 16) -> Optional[T]:
+    """ Process the PBF file _filename_ in parallel using multiple processes.
+
+        The data blobs of the file are split into tasks of _blobs_per_task_
+        blobs each. Every task is handed to _map_func_ in one of
+        _num_workers_ worker processes (default: number of CPUs).
+        _map_func_ receives the data of its task as a
+        [FileBuffer][osmium.io.FileBuffer] in PBF format, which can be
+        read with any of the usual pyosmium functions like
+        [apply()][osmium.apply] or a [FileProcessor][osmium.FileProcessor].
+        The results are combined with _reduce_func_ in the calling process
+        in no particular order, so that _reduce_func_ should be commutative.
+        Returns the reduced result or `None` when the file has no data.
+
+        The worker processes are started with the 'spawn' method.
+        _map_func_ must therefore be a function defined at the top level
+        of an importable module. It and its results must be picklable.
+        Each task only sees a part of the file. In particular, node
+        locations for ways and area assembly only work for objects that
+        are contained in the same task.
+    """
+    blobs = pbf_blobs(filename)
+    first = next(blobs, None)
+    if first is None or first.type != 'OSMHeader':
+        raise RuntimeError(f"'{filename}' is not a PBF file.")
+    header = (first.offset, first.size)
+
+    tasks: List[List[Tuple[int, int]]] = []
+    current: List[Tuple[int, int]] = []
+    for blob in blobs:
+        if blob.type != 'OSMData':
+            continue
+        current.append((blob.offset, blob.size))
+        if len(current) >= blobs_per_task:
+            tasks.append([header, *current])
+            current = []
+    if current:
+        tasks.append([header, *current])
+
+    if not tasks:
+        return None
+
+    worker = functools.partial(_run_task, map_func, filename)
+    result: Optional[T] = None
+    # Forking is not safe once the reader threads of osmium are running.
+    with multiprocessing.get_context('spawn').Pool(num_workers) as pool:
+        for i, res in enumerate(pool.imap_unordered(worker, tasks)):
+            result = res if i == 0 else reduce_func(result, res)  # type: ignore[arg-type]
+
+    return result
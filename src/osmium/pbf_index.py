@@ -0,0 +1,681 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+"""
+Block index for PBF files, which allows to read only those parts of a
+file that contain objects with given IDs.
+"""
+from typing import BinaryIO, Callable, Iterable, Iterator, List, NamedTuple, Optional, \
+                   Sequence, Set, Tuple, Union
+from collections import OrderedDict
+from contextlib import contextmanager
+import functools
+import multiprocessing
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+
+from ._osmium import IdRangeCollector, IdTracker, apply
+from .index import IdSet
+from .io import File, FileBuffer
+from .osm import osm_entity_bits, NODE, WAY, RELATION, CHANGESET
+from .parallel import PbfBlob, pbf_blobs
+from ._pbf import read_varint
+
+INDEX_MAGIC = b'PYOSMBIX'
+INDEX_VERSION = 1
+_HEADER = struct.Struct('<8sIQqQQI')
+_RECORD = struct.Struct('<QQcqqQ')
+
+IdSource = Union[IdSet, Iterable[int]]
+
+
+class PbfBlock(NamedTuple):
+    """ Information about the objects of one type in a blob of a PBF file.
+        A blob that contains objects of multiple types has one entry
+        for each type.
+    """
+    offset: int
+    "Start of the blob in the file, including the blob header."
+    size: int
+    "Total size of the blob in bytes, including the blob header."
+    type: str
+    "Type of the objects: 'n', 'w', 'r' or 'c'."
+    first_id: int
+    "Smallest ID of the objects of this type in the blob."
+    last_id: int
+    "Largest ID of the objects of this type in the blob."
+    num_objects: int
+    "Number of objects of this type in the blob."
+
+
+# Field numbers of the primitive groups in a PBF PrimitiveGroup message.
+_GROUP_TYPES = {1: 'n', 2: 'n', 3: 'w', 4: 'r', 5: 'c'}
+# Field numbers of the settings for granularity and offsets in a
+# PrimitiveBlock and the maximum size they can have when all are present.
+_SETTINGS_FIELDS = {17, 18, 19, 20}
+_MAX_SETTINGS_SIZE = 4 * (2 + 10)
+_ENTITY_TYPES = (('n', NODE), ('w', WAY), ('r', RELATION), ('c', CHANGESET))
+# Number of bytes to read for the fields in front of the data of a blob.
+_BLOB_PREFIX_SIZE = 64
+_CHUNK_SIZE = 4096
+
+
+class _PartialDecoder:
+    """ Incremental decoding of the content of a PBF blob, which is read
+        in small chunks with the function _read_. The content is
+        decompressed with zlib, if _compressed_ is set.
+    """
+
+    def __init__(self, read: Callable[[int], bytes], compressed: bool = True) -> None:
+        self.read = read
+        self.decompressor = zlib.decompressobj() if compressed else None
+        self.buffer = b''
+        # Position of the start of the buffer in the decoded content.
+        self.offset = 0
+
+    def _decode_more(self, size: int) -> bool:
+        if self.decompressor is None:
+            data = self.read(max(size, _CHUNK_SIZE))
+            if not data:
+                return False
+        elif self.decompressor.eof:
+            return False
+        else:
+            src = self.decompressor.unconsumed_tail or self.read(_CHUNK_SIZE)
+            if src:
+                data = self.decompressor.decompress(src, max(size, _CHUNK_SIZE))
+            else:
+                data = self.decompressor.flush()
+                if not data:
+                    return False
+        self.buffer += data
+        return True
+
+    def ensure(self, size: int) -> bool:
+        """ Make sure that the content is decoded up to position _size_.
+            Returns false if the content is shorter.
+        """
+        while self.offset + len(self.buffer) < size:
+            if not self._decode_more(size - self.offset - len(self.buffer)):
+                return False
+        return True
+
+    def skip(self, pos: int) -> None:
+        """ Decode the content up to position _pos_ and throw away
+            everything before it.
+        """
+        while self.offset + len(self.buffer) < pos:
+            self.offset += len(self.buffer)
+            self.buffer = b''
+            if not self._decode_more(pos - self.offset):
+                break
+        self.buffer = self.buffer[pos - self.offset:]
+        self.offset = pos
+
+    def byte(self, pos: int) -> int:
+        return self.buffer[pos - self.offset]
+
+    def read_varint(self, pos: int) -> Tuple[int, int]:
+        self.ensure(pos + 10)
+        value, end = read_varint(self.buffer, pos - self.offset)
+        return value, end + self.offset
+
+
+def _only_block_settings(block: _PartialDecoder, pos: int, raw_size: int) -> bool:
+    """ Check that the PrimitiveBlock continues from _pos_ to its end with
+        nothing but the optional settings for granularity and offsets.
+    """
+    if pos == raw_size:
+        return True
+    if pos > raw_size or raw_size - pos > _MAX_SETTINGS_SIZE:
+        return False
+
+    block.skip(pos)
+    while pos < raw_size:
+        key, pos = block.read_varint(pos)
+        if key & 0x07 != 0 or key >> 3 not in _SETTINGS_FIELDS:
+            return False
+        _, pos = block.read_varint(pos)
+
+    return pos == raw_size
+
+
+def _primitive_block_type(block: _PartialDecoder, raw_size: int) -> Optional[str]:
+    """ Find the type of objects in a PrimitiveBlock by looking at the
+        first primitive group. Only the parts of the block up to the start
+        of the group are decompressed, unless the group is followed by
+        more data. Returns None, when the type cannot be determined or
+        the block contains more than one group.
+    """
+    pos = 0
+    while pos < raw_size:
+        key, pos = block.read_varint(pos)
+        if key & 0x07 != 2:
+            return None
+        length, pos = block.read_varint(pos)
+        if key >> 3 == 2:
+            if length == 0 or not block.ensure(pos + 1):
+                return None
+            group_type = _GROUP_TYPES.get(block.byte(pos) >> 3)
+            # Only the block settings may follow the first group,
+            # otherwise there are more groups, possibly of another type.
+            if group_type is None or not _only_block_settings(block, pos + length, raw_size):
+                return None
+            return group_type
+        pos += length
+
+    return None
+
+
+def _section_reader(fd: BinaryIO, prefix: bytes, size: int) -> Callable[[int], bytes]:
+    """ Return a function for reading a section of _size_ bytes in
+        chunks. The section starts with the already read _prefix_ and
+        continues at the current position of _fd_.
+    """
+    remaining = size - len(prefix)
+
+    def _read(chunk_size: int) -> bytes:
+        nonlocal prefix, remaining
+        if prefix:
+            data, prefix = prefix, b''
+            return data
+        data = fd.read(min(chunk_size, remaining))
+        remaining -= len(data)
+        return data
+
+    return _read
+
+
+def _blob_type(fd: BinaryIO, blob: PbfBlob) -> Optional[str]:
+    fd.seek(blob.offset)
+    header_len = struct.unpack('!I', fd.read(4))[0]
+    fd.seek(blob.offset + 4 + header_len)
+    # The fields in front of the data of the blob are short.
+    data = fd.read(min(blob.size - 4 - header_len, _BLOB_PREFIX_SIZE))
+
+    raw_size = 0
+    pos = 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        field, wire_type = key >> 3, key & 0x07
+        if wire_type == 0:
+            value, pos = read_varint(data, pos)
+            if field == 2:
+                raw_size = value
+        elif wire_type == 2:
+            length, pos = read_varint(data, pos)
+            read = _section_reader(fd, data[pos:pos + length], length)
+            if field == 1:
+                return _primitive_block_type(_PartialDecoder(read, compressed=False), length)
+            if field == 3:
+                return _primitive_block_type(_PartialDecoder(read), raw_size)
+            # unsupported compression
+            return None
+        else:
+            return None
+
+    return None
+
+
+@functools.lru_cache(maxsize=16)
+def _blob_types_cached(filename: str, size: int, mtime: int
+                       ) -> Tuple[PbfBlob, Tuple[Tuple[PbfBlob, Optional[str]], ...]]:
+    blobs = pbf_blobs(filename)
+    header = next(blobs, None)
+    if header is None or header.type != 'OSMHeader':
+        raise RuntimeError(f"'{filename}' is not a PBF file.")
+
+    with open(filename, 'rb') as fd:
+        return header, tuple((b, _blob_type(fd, b)) for b in blobs if b.type == 'OSMData')
+
+
+def pbf_blob_types(filename: Union[str, 'os.PathLike[str]']
+                   ) -> Tuple[PbfBlob, List[Tuple[PbfBlob, Optional[str]]]]:
+    """ Determine the type of objects in each data blob of the PBF file
+        _filename_. Only the start of each blob is read and decompressed,
+        which is much faster than reading the file. Returns the header blob and a
+        list of data blobs together with their type ('n', 'w', 'r', 'c').
+        The type is None, if it cannot be determined cheaply, for
+        example, because the blob contains objects of different types.
+
+        The result is cached as long as the file does not change.
+    """
+    header, blobs = _blob_types_cached(str(filename), *_file_stamp(filename))
+    return header, list(blobs)
+
+
+InputSource = Union[str, 'os.PathLike[str]', File, FileBuffer]
+
+# Default limit for the size of restricted inputs kept in memory.
+_MAX_MEMORY_INPUT = 64 * 1024 * 1024
+# Larger selections are streamed to the reader through a pipe, which
+# it can only open by name where /dev/fd is available.
+_CAN_STREAM = os.name == 'posix' and os.path.isdir('/dev/fd')
+_STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def _wanted_types(source: InputSource, entities: osm_entity_bits) -> Optional[Set[str]]:
+    """ Return the blob types to read from _source_ or None if the source
+        cannot be restricted at all.
+    """
+    if not isinstance(source, (str, os.PathLike)) or not str(source).endswith('.pbf'):
+        return None
+
+    wanted = {t for t, bit in _ENTITY_TYPES if entities & bit}
+    if len(wanted) == len(_ENTITY_TYPES):
+        return None
+
+    return wanted
+
+
+def _restricted_blobs(source: Union[str, 'os.PathLike[str]'], wanted: Set[str]
+                      ) -> Optional[List[PbfBlob]]:
+    """ Return the header and the data blobs of _source_ that may contain
+        objects of the _wanted_ types or None if restricting the input is
+        not worth it.
+    """
+    try:
+        header, blobs = pbf_blob_types(source)
+    except (RuntimeError, IndexError, zlib.error):
+        return None
+
+    selected = [b for b, btype in blobs if btype is None or btype in wanted]
+    if sum(b.size for b in selected) * 2 > sum(b.size for b, _ in blobs):
+        return None
+
+    return [header, *selected]
+
+
+def _read_blobs(source: Union[str, 'os.PathLike[str]'], blobs: Sequence[PbfBlob]
+                ) -> FileBuffer:
+    parts = []
+    with open(source, 'rb') as fin:
+        for blob in blobs:
+            fin.seek(blob.offset)
+            parts.append(fin.read(blob.size))
+    return FileBuffer(b''.join(parts), 'pbf')
+
+
+def _blob_ranges(blobs: Sequence[PbfBlob]) -> List[Tuple[int, int]]:
+    """ Merge directly adjacent blobs into a single range.
+    """
+    ranges: List[Tuple[int, int]] = []
+    for blob in blobs:
+        if ranges and sum(ranges[-1]) == blob.offset:
+            ranges[-1] = (ranges[-1][0], ranges[-1][1] + blob.size)
+        else:
+            ranges.append((blob.offset, blob.size))
+    return ranges
+
+
+@contextmanager
+def _stream_blobs(source: Union[str, 'os.PathLike[str]'], blobs: Sequence[PbfBlob]
+                  ) -> Iterator[File]:
+    """ Return a file, from which the given _blobs_ of _source_ can be
+        read once. The blobs are written into a pipe by a background thread.
+    """
+    rfd, wfd = os.pipe()
+    stop = threading.Event()
+
+    def _write() -> None:
+        try:
+            with open(wfd, 'wb') as fout, open(source, 'rb') as fin:
+                for offset, size in _blob_ranges(blobs):
+                    fin.seek(offset)
+                    while size > 0 and not stop.is_set():
+                        data = fin.read(min(size, _STREAM_CHUNK_SIZE))
+                        if not data:
+                            return
+                        fout.write(data)
+                        size -= len(data)
+        except BrokenPipeError:
+            pass
+
+    writer = threading.Thread(target=_write, daemon=True)
+    writer.start()
+    try:
+        yield File(f'/dev/fd/{rfd}', 'pbf')
+    finally:
+        # The reader may have stopped early and libosmium keeps its end
+        # of the pipe open until the reader is destroyed. Throw away the
+        # rest, so that the writer cannot get stuck.
+        stop.set()
+        with open(rfd, 'rb', buffering=0) as rest:
+            while rest.read(_STREAM_CHUNK_SIZE):
+                pass
+        writer.join()
+
+
+# A restricted input is either the input source itself or the list of
+# blobs, which need to be streamed from the source.
+_Restriction = Union[InputSource, List[PbfBlob]]
+
+
+def _restrict_source(source: InputSource, entities: osm_entity_bits,
+                     max_memory: int, stream: bool) -> Tuple[_Restriction, int]:
+    """ Return the restricted input for reading _entities_ from _source_
+        together with the number of bytes it keeps in memory.
+    """
+    wanted = _wanted_types(source, entities)
+    if wanted is None:
+        return source, 0
+
+    assert isinstance(source, (str, os.PathLike))
+    blobs = _restricted_blobs(source, wanted)
+    if blobs is None:
+        return source, 0
+
+    size = sum(b.size for b in blobs)
+    if size <= max_memory:
+        return _read_blobs(source, blobs), size
+
+    return (blobs if stream and _CAN_STREAM else source), 0
+
+
+@contextmanager
+def _open_restricted(source: InputSource, restriction: _Restriction) -> Iterator[InputSource]:
+    if isinstance(restriction, list):
+        assert isinstance(source, (str, os.PathLike))
+        with _stream_blobs(source, restriction) as stream:
+            yield stream
+    else:
+        yield restriction
+
+
+@contextmanager
+def restricted_input(source: InputSource, entities: osm_entity_bits,
+                     max_memory: int = _MAX_MEMORY_INPUT,
+                     stream: bool = True) -> Iterator[InputSource]:
+    """ Context manager that returns an input source for reading only the
+        given _entities_ from _source_.
+
+        When _source_ is a PBF file and a substantial part of the file can
+        be skipped, only the blobs with the requested types of objects
+        are handed to the reader. Up to _max_memory_ bytes of blobs are
+        collected in memory and returned as a
+        [FileBuffer][osmium.io.FileBuffer]. Larger selections are streamed
+        from the file through a pipe, which is returned as a
+        [File][osmium.io.File] that can be read only once and only while
+        the context is active. Set _stream_ to False, when the input needs
+        to be read more than once. Without streaming and on systems without
+        `/dev/fd`, the original source is returned for large selections.
+        In any case, the data still needs to be read with the appropriate
+        entity restriction.
+    """
+    restriction, _ = _restrict_source(source, entities, max_memory, stream)
+    with _open_restricted(source, restriction) as src:
+        yield src
+
+
+class RestrictedInputCache:
+    """ Remembers the inputs created by [restricted_input()][osmium.pbf_index.restricted_input],
+        so that reading the same entities from the same file again
+        does not need to scan the file again. The cache keeps up to
+        _max_memory_ bytes of blobs in memory in total. When the limit
+        is exceeded, the inputs that have not been used for the longest
+        time are dropped. For selections larger than _max_memory_ only
+        the positions of the blobs are kept and the blobs are streamed
+        from the file each time. Inputs for a file are dropped as soon as
+        the file has changed.
+    """
+
+    def __init__(self, max_memory: int = _MAX_MEMORY_INPUT) -> None:
+        self.max_memory = max_memory
+        self._inputs: 'OrderedDict[Tuple[str, int], Tuple[Tuple[int, int], _Restriction, int]]' \
+            = OrderedDict()
+        self._memory = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def open(self, source: InputSource, entities: osm_entity_bits) -> Iterator[InputSource]:
+        """ Context manager that returns an input source for reading only
+            the given _entities_ from _source_. See
+            [restricted_input()][osmium.pbf_index.restricted_input].
+        """
+        if _wanted_types(source, entities) is None:
+            yield source
+            return
+
+        assert isinstance(source, (str, os.PathLike))
+        key = (str(source), entities.value)
+        stamp = _file_stamp(source)
+        with self._lock:
+            cached = self._inputs.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._inputs.move_to_end(key)
+            else:
+                for k in [k for k, v in self._inputs.items() if k[0] == key[0] and v[0] != stamp]:
+                    self._drop(k)
+                restriction, size = _restrict_source(source, entities, self.max_memory, True)
+                cached = (stamp, restriction, size)
+                self._inputs[key] = cached
+                self._memory += size
+                while self._memory > self.max_memory and len(self._inputs) > 1:
+                    self._drop(next(iter(self._inputs)))
+
+        with _open_restricted(source, cached[1]) as src:
+            yield src
+
+    def clear(self) -> None:
+        """ Forget all inputs.
+        """
+        with self._lock:
+            self._inputs.clear()
+            self._memory = 0
+
+    def _drop(self, key: Tuple[str, int]) -> None:
+        self._memory -= self._inputs.pop(key)[2]
+
+
+def _file_stamp(filename: Union[str, 'os.PathLike[str]']) -> Tuple[int, int]:
+    stat = os.stat(filename)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _scan_blobs(filename: Union[str, 'os.PathLike[str]'], header: PbfBlob,
+                blobs: List[PbfBlob]) -> List[PbfBlock]:
+    collector = IdRangeCollector()
+    result: List[PbfBlock] = []
+    with open(filename, 'rb') as fd:
+        fd.seek(header.offset)
+        header_data = fd.read(header.size)
+        for blob in blobs:
+            fd.seek(blob.offset)
+            apply(FileBuffer(header_data + fd.read(blob.size), 'pbf'), collector)
+            result.extend(PbfBlock(blob.offset, blob.size, *r)
+                          for r in collector.take_ranges())
+
+    return result
+
+
+class PbfBlockIndex:
+    """ Index of the data blobs of a PBF file with the range of object IDs
+        contained in each blob.
+
+        The index makes it possible to read only those blobs of a file that
+        may contain a given set of objects. This is much faster than scanning
+        the full file, when only a few objects are needed from a large file.
+        The index is most effective for files sorted by type and ID, like the
+        planet and the usual extracts.
+    """
+
+    def __init__(self, filename: Union[str, 'os.PathLike[str]'],
+                 header: PbfBlob, blocks: Sequence[PbfBlock]) -> None:
+        self.filename = filename
+        self.header = header
+        self.blocks = list(blocks)
+
+    @classmethod
+    def build(cls, filename: Union[str, 'os.PathLike[str]'],
+              num_workers: Optional[int] = 1) -> 'PbfBlockIndex':
+        """ Create a new index for the PBF file _filename_. This needs to
+            read the whole file once. When _num_workers_ is larger than 1
+            or None (use all CPUs), then the file is scanned in parallel.
+        """
+        blobs = pbf_blobs(filename)
+        header = next(blobs, None)
+        if header is None or header.type != 'OSMHeader':
+            raise RuntimeError(f"'{filename}' is not a PBF file.")
+        data_blobs = [b for b in blobs if b.type == 'OSMData']
+
+        if num_workers == 1:
+            return cls(filename, header, _scan_blobs(filename, header, data_blobs))
+
+        tasks = [data_blobs[i:i + 64] for i in range(0, len(data_blobs), 64)]
+        worker = functools.partial(_scan_blobs, filename, header)
+        blocks: List[PbfBlock] = []
+        # Forking is not safe once the reader threads of osmium are running.
+        with multiprocessing.get_context('spawn').Pool(num_workers) as pool:
+            for res in pool.imap(worker, tasks):
+                blocks.extend(res)
+
+        return cls(filename, header, blocks)
+
+    @staticmethod
+    def index_file(filename: Union[str, 'os.PathLike[str]']) -> Path:
+        """ Return the default name of the sidecar index file for
+            the PBF file _filename_.
+        """
+        return Path(str(filename) + '.blockidx')
+
+    def save(self, index_file: Union[str, 'os.PathLike[str]', None] = None) -> None:
+        """ Save the index to _index_file_. Per default, the index is saved
+            next to the PBF file with an additional suffix '.blockidx'.
+        """
+        size, mtime = _file_stamp(self.filename)
+        target = Path(index_file or self.index_file(self.filename))
+        # Replace the file only once it is complete, so that processes
+        # loading the index concurrently never see a partial file.
+        tmpfile = target.with_name(f'{target.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            with open(tmpfile, 'wb') as fd:
+                fd.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, size, mtime,
+                                      self.header.offset, self.header.size, len(self.blocks)))
+                for block in self.blocks:
+                    fd.write(_RECORD.pack(block.offset, block.size, block.type.encode('ascii'),
+                                          block.first_id, block.last_id, block.num_objects))
+            os.replace(tmpfile, target)
+        except BaseException:
+            tmpfile.unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, filename: Union[str, 'os.PathLike[str]'],
+             index_file: Union[str, 'os.PathLike[str]', None] = None) -> 'PbfBlockIndex':
+        """ Load the index for the PBF file _filename_ from _index_file_,
+            by default the sidecar file next to the PBF file.
+            Raises a RuntimeError when the index does not fit the file,
+            for example, because the file has been changed since the index
+            was created.
+        """
+        data = Path(index_file or cls.index_file(filename)).read_bytes()
+        if len(data) < _HEADER.size:
+            raise RuntimeError('Invalid block index file.')
+        magic, version, size, mtime, hoffset, hsize, num = _HEADER.unpack_from(data)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise RuntimeError('Invalid block index file.')
+        if len(data) != _HEADER.size + num * _RECORD.size:
+            raise RuntimeError('Truncated block index file.')
+        if (size, mtime) != _file_stamp(filename):
+            raise RuntimeError(f"Block index is outdated for '{filename}'.")
+
+        blocks = [PbfBlock(off, sz, otype.decode('ascii'), first, last, cnt)
+                  for off, sz, otype, first, last, cnt
+                  in _RECORD.iter_unpack(data[_HEADER.size:])]
+
+        return cls(filename, PbfBlob('OSMHeader', hoffset, hsize), blocks)
+
+    @classmethod
+    def open(cls, filename: Union[str, 'os.PathLike[str]'],
+             num_workers: Optional[int] = 1) -> 'PbfBlockIndex':
+        """ Load the sidecar index of the PBF file _filename_. When there
+            is no index yet or the index is outdated, then a new one is
+            built and saved.
+        """
+        try:
+            return cls.load(filename)
+        except (OSError, RuntimeError):
+            pass
+
+        index = cls.build(filename, num_workers=num_workers)
+        index.save()
+        return index
+
+    def select(self, otype: str, ids: IdSource) -> List[PbfBlock]:
+        """ Return the blocks of type _otype_ ('n', 'w', 'r') that
+            may contain objects with one of the given _ids_.
+        """
+        if not isinstance(ids, IdSet):
+            idset = IdSet()
+            for i in ids:
+                idset.set(i)
+            ids = idset
+
+        if ids.empty():
+            return []
+
+        return self._select(otype, ids.contains_any)
+
+    def _select(self, otype: str,
+                contains_any: Callable[[List[Tuple[int, int]]], List[bool]]) -> List[PbfBlock]:
+        candidates = [b for b in self.blocks if b.type == otype]
+        # Negative IDs cannot be looked up in an IdSet. Always include them.
+        hits = contains_any([(b.first_id, b.last_id) for b in candidates if b.first_id >= 0])
+        hit_iter = iter(hits)
+        return [b for b in candidates if b.first_id < 0 or next(hit_iter)]
+
+    def read(self, nodes: IdSource = (), ways: IdSource = (),
+             relations: IdSource = ()) -> FileBuffer:
+        """ Return a PBF buffer with all blobs of the file that may contain
+            one of the given _nodes_, _ways_ or _relations_. The buffer can
+            be used as input for any of the usual reading functions. Note
+            that the buffer will usually contain other objects, too.
+            Use an [IdFilter][osmium.filter.IdFilter] to get only the
+            requested objects.
+        """
+        blocks = {b.offset: b for b in self.select('n', nodes)}
+        blocks.update((b.offset, b) for b in self.select('w', ways))
+        blocks.update((b.offset, b) for b in self.select('r', relations))
+
+        return self._read_blocks(sorted(blocks.values(), key=lambda b: b.offset))
+
+    def complete_backward_references(self, tracker: IdTracker,
+                                     relation_depth: int = 0) -> None:
+        """ Add all objects referenced by the objects in the
+            [IdTracker][osmium.IdTracker] _tracker_. This works exactly like
+            `IdTracker.complete_backward_references()` but only reads the
+            blobs of the file that contain relevant objects.
+        """
+        # The tracker is only queried, so that memory-mapped ids
+        # are not copied into memory.
+        while relation_depth > 0 and tracker.num_ids('r') > 0:
+            num_relations = tracker.num_ids('r')
+            blocks = self._select('r', functools.partial(tracker.contains_any, 'r'))
+            tracker.complete_backward_references(self._read_blocks(blocks), relation_depth=1)
+            if tracker.num_ids('r') == num_relations:
+                break
+            relation_depth -= 1
+
+        if tracker.num_ids('w') > 0:
+            blocks = self._select('w', functools.partial(tracker.contains_any, 'w'))
+            tracker.complete_backward_references(self._read_blocks(blocks), relation_depth=0)
+
+    def _read_blocks(self, blocks: Sequence[PbfBlock]) -> FileBuffer:
+        parts = []
+        with open(self.filename, 'rb') as fd:
+            fd.seek(self.header.offset)
+            parts.append(fd.read(self.header.size))
+            last = -1
+            for block in blocks:
+                if block.offset != last:
+                    fd.seek(block.offset)
+                    parts.append(fd.read(block.size))
+                    last = block.offset
+
+        return FileBuffer(b''.join(parts), 'pbf')
@@ -6,7 +6,7 @@
 # For a full list of authors see the git log.
 """ Helper functions to communicate with replication servers.
 """
-from typing import NamedTuple, Optional, Any, Iterator, cast, Mapping, Tuple, Dict
+from typing import NamedTuple, Optional, Any, Iterator, cast, Mapping, Tuple, Dict, Union
 import urllib.request as urlrequest
 from urllib.error import URLError
 import datetime as dt
@@ -19,6 +19,7 @@ from urllib3.util import Retry
 
 from osmium import MergeInputReader, BaseHandler
 from osmium import io as oio
+from osmium.index import LocationTable, LocationCache
 from osmium import version
 
 import logging
@@ -206,7 +207,7 @@ class ReplicationServer:
 
     def apply_diffs(self, handler: BaseHandler, start_id: int,
                     max_size: Optional[int] = None,
-                    idx: str = "", simplify: bool = True,
+                    idx: Union[str, LocationTable] = "", simplify: bool = True,
                     end_id: Optional[int] = None) -> Optional[int]:
         """ Download diffs starting with sequence id `start_id`, merge them
             together and then apply them to handler `handler`. `end_id`
@@ -229,6 +230,14 @@ class ReplicationServer:
             obtain a full set of node locations and then reuse this location
             cache here when applying diffs.
 
+            `idx` may either be a string with the type of location cache
+            to create or an existing location table. The recommended way
+            is to hand in a persistent
+            [LocationCache][osmium.index.LocationCache] opened in append
+            mode. The cache is then updated with the node locations from
+            the diffs and its replication sequence and timestamp are set
+            to the state of the last diff applied.
+
             Diffs may contain multiple versions of the same object when it was
             changed multiple times during the period covered by the diff. If
             `simplify` is set to False then all versions are returned. If it
@@ -245,6 +254,11 @@ class ReplicationServer:
 
         diffs.reader.apply(handler, idx=idx, simplify=simplify)
 
+        if isinstance(idx, LocationCache) and idx.writable:
+            state = self.get_state_info(diffs.id)
+            idx.sequence = diffs.id
+            idx.timestamp = state.timestamp if state is not None else None
+
         return diffs.id
 
     def apply_diffs_to_file(self, infile: str, outfile: str, start_id: int,
@@ -16,6 +16,7 @@ from .io import Reader, File, FileBuffer, ThreadPool
 from .osm import osm_entity_bits
 from .area import AreaManager
 from .index import create_map
+from .pbf_index import restricted_input
 
 
 class SimpleHandler:
@@ -77,7 +78,8 @@ class SimpleHandler:
         entities = self.enabled_for()
         if entities & osm_entity_bits.AREA:
             area = AreaManager()
-            with Reader(obj, osm_entity_bits.RELATION, thread_pool=thread_pool) as rd:
+            with restricted_input(obj, osm_entity_bits.RELATION) as src, \
+                 Reader(src, osm_entity_bits.RELATION, thread_pool=thread_pool) as rd:
                 apply(rd, *filters, area.first_pass_handler())
 
             entities |= osm_entity_bits.OBJECT
@@ -92,5 +94,6 @@ class SimpleHandler:
         else:
             handlers = [*filters, self]
 
-        with Reader(obj, entities, thread_pool=thread_pool) as rd:
+        with restricted_input(obj, entities) as src, \
+             Reader(src, entities, thread_pool=thread_pool) as rd:
             apply(rd, *handlers)
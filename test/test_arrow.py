@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+import json
+
+import pytest
+
+import osmium
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+oarrow = pytest.importorskip("osmium.arrow")
+
+TEST_DATA = """\
+            n1 x1.5 y-2 Tname=A,amenity=bench
+            n2 x2 y3
+            w10 Nn1,n2 Thighway=path
+            r20 Mn1@,w10@outer Ttype=multipolygon
+            """
+
+
+def test_record_batches(opl_buffer):
+    batches = dict(oarrow.record_batches(osmium.FileProcessor(opl_buffer(TEST_DATA))))
+
+    assert set(batches) == {'nodes', 'ways', 'relations'}
+
+    nodes = batches['nodes'].to_pydict()
+    assert nodes['id'] == [1, 2]
+    assert nodes['lon'] == [pytest.approx(1.5), pytest.approx(2)]
+    assert nodes['lat'] == [pytest.approx(-2), pytest.approx(3)]
+    assert nodes['tags'] == [[('name', 'A'), ('amenity', 'bench')], []]
+
+    ways = batches['ways'].to_pydict()
+    assert ways['id'] == [10]
+    assert ways['nodes'] == [[1, 2]]
+    assert ways['tags'] == [[('highway', 'path')]]
+
+    rels = batches['relations'].to_pydict()
+    assert rels['id'] == [20]
+    assert rels['members'] == [[{'type': 'n', 'ref': 1, 'role': ''},
+                                {'type': 'w', 'ref': 10, 'role': 'outer'}]]
+
+
+def test_record_batches_large_offsets(opl_buffer):
+    batches = dict(oarrow.record_batches(osmium.FileProcessor(opl_buffer(TEST_DATA)),
+                                         geometry=True))
+
+    assert batches['nodes'].schema.field('geometry').type == pa.large_binary()
+    assert batches['ways'].schema.field('nodes').type == pa.large_list(pa.int64())
+    assert batches['relations'].schema.field('members').type.value_type['role'].type \
+        == pa.large_string()
+
+
+def test_tag_offsets_overflow():
+    np = pytest.importorskip("numpy")
+
+    with pytest.raises(ValueError, match='batch size'):
+        oarrow._map_offsets(np.array([0, 2**31], dtype=np.int64))
+
+
+def test_record_batches_with_filter(opl_buffer):
+    fp = osmium.FileProcessor(opl_buffer(TEST_DATA))\
+               .with_filter(osmium.filter.KeyFilter('amenity', 'highway'))
+
+    batches = list(oarrow.record_batches(fp))
+
+    assert [b[0] for b in batches] == ['nodes', 'ways']
+    assert batches[0][1].num_rows == 1
+
+
+def test_record_batches_batch_size(opl_buffer):
+    data = '\n'.join(f"n{i} x1 y1" for i in range(1, 11))
+
+    batches = list(oarrow.record_batches(osmium.FileProcessor(opl_buffer(data)),
+                                         batch_size=4))
+
+    assert sum(b.num_rows for _, b in batches) == 10
+
+
+def test_write_parquet(opl_buffer, tmp_path):
+    oarrow.write_parquet(osmium.FileProcessor(opl_buffer(TEST_DATA)), tmp_path)
+
+    nodes = pq.read_table(tmp_path / 'nodes.parquet')
+    assert nodes.column('id').to_pylist() == [1, 2]
+    assert 'geometry' in nodes.column_names
+    assert json.loads(nodes.schema.metadata[b'geo'])['primary_column'] == 'geometry'
+
+    assert pq.read_table(tmp_path / 'ways.parquet').num_rows == 1
+    assert pq.read_table(tmp_path / 'relations.parquet').num_rows == 1
@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+from datetime import datetime, timezone
+
+import pytest
+
+import osmium
+from helpers import IDCollector
+
+DATA = """\
+       n1 v1 dV c10 t2020-01-01T00:00:00Z i1 ualice
+       n1 v2 dD c11 t2021-06-01T00:00:00Z i2 ubob
+       n2 v1 dV c11 t2021-06-01T00:00:00Z i2 ubob
+       n3 v5 dV c12 t2023-03-01T12:00:00Z i3 ucarol
+       w4 v3 dV c10 t2022-01-01T00:00:00Z i1 ualice
+       r5 v1 dD c12 t2023-03-01T12:00:00Z i3 ucarol
+       c10 k1 s2020-01-01T00:00:00Z i1 ualice
+       c12 k1 s2023-03-01T12:00:00Z i3 ucarol
+       """
+
+
+class VersionCollector:
+
+    def __init__(self):
+        self.objects = []
+
+    def node(self, o):
+        self.objects.append(f"n{o.id}v{o.version}")
+
+    def way(self, o):
+        self.objects.append(f"w{o.id}v{o.version}")
+
+    def relation(self, o):
+        self.objects.append(f"r{o.id}v{o.version}")
+
+    def changeset(self, o):
+        self.objects.append(f"c{o.id}")
+
+
+@pytest.mark.parametrize('kwargs,expected', [
+    (dict(since=datetime(2021, 6, 1, tzinfo=timezone.utc)),
+     ['n1v2', 'n2v1', 'n3v5', 'w4v3', 'r5v1', 'c12']),
+    (dict(until='2021-06-01T00:00:00Z'), ['n1v1', 'c10']),
+    (dict(since='2021-01-01T00:00:00Z', until='2023-01-01T00:00:00Z'),
+     ['n1v2', 'n2v1', 'w4v3']),
+    (dict(min_version=2), ['n1v2', 'n3v5', 'w4v3', 'c10', 'c12']),
+    (dict(min_version=2, max_version=3), ['n1v2', 'w4v3', 'c10', 'c12']),
+    (dict(changesets=[10, 12]), ['n1v1', 'n3v5', 'w4v3', 'r5v1', 'c10', 'c12']),
+    (dict(uids={2, 3}), ['n1v2', 'n2v1', 'n3v5', 'r5v1', 'c12']),
+    (dict(users=['alice']), ['n1v1', 'w4v3', 'c10']),
+    (dict(visible=False), ['n1v2', 'r5v1', 'c10', 'c12']),
+    (dict(visible=True, uids=[3]), ['n3v5', 'c12']),
+    (dict(users=[]), []),
+])
+def test_attribute_filter(opl_reader, kwargs, expected):
+    objects = VersionCollector()
+
+    osmium.apply(opl_reader(DATA), osmium.filter.AttributeFilter(**kwargs), objects)
+
+    assert objects.objects == expected
+
+
+def test_attribute_filter_with_file_processor(opl_buffer):
+    fp = osmium.FileProcessor(opl_buffer(DATA), osmium.osm.NODE)\
+               .with_filter(osmium.filter.AttributeFilter(users=['bob'], visible=True))
+
+    assert [(o.id, o.version) for o in fp] == [(2, 1)]
+
+
+def test_attribute_filter_enable_for(opl_reader):
+    ids = IDCollector()
+
+    osmium.apply(opl_reader(DATA),
+                 osmium.filter.AttributeFilter(uids=[3]).enable_for(osmium.osm.NODE), ids)
+
+    assert ids.nodes == [3]
+    assert ids.ways == [4]
+    assert ids.relations == [5]
+
+
+def test_attribute_filter_no_attributes():
+    with pytest.raises(TypeError, match="attributes to filter"):
+        osmium.filter.AttributeFilter()
+
+
+@pytest.mark.parametrize('kwargs', [dict(since=3), dict(uids=['a']), dict(users=[1]),
+                                    dict(min_version='x')])
+def test_attribute_filter_bad_arguments(kwargs):
+    with pytest.raises(TypeError):
+        osmium.filter.AttributeFilter(**kwargs)
+
+
+def test_attribute_filter_positional_arguments():
+    with pytest.raises(TypeError):
+        osmium.filter.AttributeFilter('2020-01-01T00:00:00Z')
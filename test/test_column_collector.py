@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+import pytest
+
+import osmium
+
+np = pytest.importorskip("numpy")
+
+
+def test_collect_nodes(opl_reader):
+    collector = osmium.ColumnCollector(['name'])
+
+    osmium.apply(opl_reader("""\
+                            n1 x1.5 y-2 Tname=A
+                            n23 x0 y0 Tfoo=bar
+                            """), collector)
+
+    assert len(collector) == 2
+
+    cols = collector.take_columns()['nodes']
+
+    assert cols['id'].dtype == np.int64
+    assert cols['id'].tolist() == [1, 23]
+    assert cols['x'].dtype == np.int32
+    assert cols['x'].tolist() == [15000000, 0]
+    assert cols['y'].tolist() == [-20000000, 0]
+    assert cols['tags']['name_valid'].tolist() == [True, False]
+    assert cols['tags']['name_offsets'].tolist() == [0, 1, 1]
+    assert cols['tags']['name_data'].tobytes() == b'A'
+
+    assert len(collector) == 0
+
+
+def test_collect_ways(opl_reader):
+    collector = osmium.ColumnCollector()
+
+    osmium.apply(opl_reader("""\
+                            w1 Nn1,n2,n3
+                            w2 Nn4,n5
+                            w3
+                            """), collector)
+
+    cols = collector.take_columns()['ways']
+
+    assert cols['id'].tolist() == [1, 2, 3]
+    assert cols['node_offsets'].tolist() == [0, 3, 5, 5]
+    assert cols['node_refs'].tolist() == [1, 2, 3, 4, 5]
+    assert cols['tags'] == {}
+
+
+def test_collect_relations(opl_reader):
+    collector = osmium.ColumnCollector(['type'])
+
+    osmium.apply(opl_reader("""\
+                            r1 Mn1@,w3@outer Ttype=multipolygon
+                            r2 Mr1@
+                            """), collector)
+
+    cols = collector.take_columns()['relations']
+
+    assert cols['id'].tolist() == [1, 2]
+    assert cols['member_offsets'].tolist() == [0, 2, 3]
+    assert cols['member_types'].tolist() == [b'n', b'w', b'r']
+    assert cols['member_refs'].tolist() == [1, 3, 1]
+    assert cols['tags']['type_valid'].tolist() == [True, False]
+    assert cols['tags']['type_data'].tobytes() == b'multipolygon'
+
+
+def test_file_processor_collect_columns(opl_buffer):
+    data = opl_buffer("""\
+                      n1 x1 y1 Tamenity=bench
+                      n2 x2 y2
+                      w10 Nn1,n2 Tamenity=parking
+                      """)
+
+    cols = osmium.FileProcessor(data)\
+                 .with_filter(osmium.filter.KeyFilter('amenity'))\
+                 .collect_columns(tags=['amenity'])
+
+    assert cols['nodes']['id'].tolist() == [1]
+    assert cols['nodes']['tags']['amenity_data'].tobytes() == b'bench'
+    assert cols['ways']['id'].tolist() == [10]
+    assert cols['relations']['id'].tolist() == []
+
+
+def test_collect_empty_tag_value(opl_reader):
+    collector = osmium.ColumnCollector(['name'])
+
+    osmium.apply(opl_reader("n1 Tname=\nn2"), collector)
+
+    tags = collector.take_columns()['nodes']['tags']
+
+    assert tags['name_valid'].tolist() == [True, False]
+    assert tags['name_offsets'].tolist() == [0, 0, 0]
+
+
+def test_collect_all_tags(opl_reader):
+    collector = osmium.ColumnCollector(all_tags=True)
+
+    osmium.apply(opl_reader("""\
+                            n1 Ta=1,bb=22
+                            n2
+                            """), collector)
+
+    cols = collector.take_columns()['nodes']
+
+    assert cols['tag_offsets'].tolist() == [0, 2, 2]
+    assert cols['tag_key_offsets'].tolist() == [0, 1, 3]
+    assert cols['tag_key_data'].tobytes() == b'abb'
+    assert cols['tag_value_data'].tobytes() == b'122'
+
+
+def test_batch_apply(opl_buffer):
+    collector = osmium.ColumnCollector()
+
+    for batch in osmium.FileProcessor(opl_buffer('n1\nn2\nw3')).iter_batches():
+        batch.apply(collector)
+
+    assert collector.take_columns()['nodes']['id'].tolist() == [1, 2]
@@ -4,6 +4,7 @@
 #
 # Copyright (C) 2025 Sarah Hoffmann <lonvia@denofr.de> and others.
 # For a full list of authors see the git log.
+import asyncio
 import pytest
 import uuid
 
@@ -255,3 +256,227 @@ def test_filtered_handler_basehandler(opl_buffer, tmp_path):
     assert ids.nodes == [3]
     assert ids.ways == [2]
     assert ids.relations == [4]
+
+
+def test_batches_simple(opl_buffer):
+    data = opl_buffer("""\
+            n1 x1 y1
+            n2 x2 y2 Tfoo=bar
+            w3 Nn1,n2
+            r4 Mw3@
+            """)
+
+    ids = []
+    for batch in osmium.FileProcessor(data).iter_batches():
+        assert batch.is_valid()
+        ids.extend(f"{obj.type_str()}{obj.id}" for obj in batch)
+
+    assert ids == ['n1', 'n2', 'w3', 'r4']
+
+
+@pytest.mark.parametrize('size,expected', [(1, [1, 1, 1]), (2, [2, 1]), (0, [3])])
+def test_batches_max_size(opl_buffer, size, expected):
+    data = opl_buffer('n1\nn2\nn3')
+
+    lengths = [len(b) for b in osmium.FileProcessor(data).iter_batches(size)]
+
+    assert lengths == expected
+
+
+def test_batches_item_access(opl_buffer):
+    for batch in osmium.FileProcessor(opl_buffer('n1\nn2\nn3')).iter_batches():
+        assert batch[0].id == 1
+        assert batch[-1].id == 3
+        assert batch[1] is batch[1]
+        with pytest.raises(IndexError):
+            batch[3]
+
+
+def test_batches_invalid_after_next(opl_buffer):
+    batches = []
+    objects = []
+    for batch in osmium.FileProcessor(opl_buffer('n1\nn2\nn3')).iter_batches(1):
+        batches.append(batch)
+        objects.append(batch[0])
+
+    assert not batches[0].is_valid()
+    assert len(batches[0]) == 0
+    with pytest.raises(RuntimeError, match='Illegal access'):
+        batches[0][0]
+    with pytest.raises(RuntimeError, match='Illegal access'):
+        objects[0].id
+
+
+def test_batches_with_filter(opl_buffer):
+    data = opl_buffer("""\
+            n1 Tamenity=foo
+            n3
+            w1 Thighway=residential
+            w2
+            """)
+
+    ids = IDCollector()
+    fp = osmium.FileProcessor(data)\
+               .handler_for_filtered(ids)\
+               .with_filter(osmium.filter.EmptyTagFilter())
+
+    processed = [f"{o.type_str()}{o.id}" for b in fp.iter_batches() for o in b]
+
+    assert processed == ['n1', 'w1']
+    assert ids.nodes == [3]
+    assert ids.ways == [2]
+
+
+def test_batches_propagate_data_from_filters(opl_buffer):
+    class MyFilter:
+        def node(self, n):
+            n.saved = 'test'
+            return False
+
+    fp = osmium.FileProcessor(opl_buffer('n56 x3 y-3')).with_filter(MyFilter())
+
+    for batch in fp.iter_batches():
+        assert batch[0].saved == 'test'
+
+
+def test_batches_with_areas(opl_buffer):
+    data = opl_buffer("""\
+            n10 x3 y3
+            n11 x3 y3.01
+            n12 x3.01 y3.01
+            n13 x3.01 y3
+            w12 Nn10,n11,n12,n13,n10 Tbuilding=yes
+            """)
+
+    types = [o.type_str() for b in osmium.FileProcessor(data).with_areas().iter_batches()
+             for o in b]
+
+    assert types.count('a') == 1
+    assert types.count('w') == 1
+    assert types.count('n') == 4
+
+
+def test_recycled_objects(opl_buffer):
+    data = opl_buffer("""\
+            n1 x1 y1 Tfoo=bar
+            n2 x2 y2
+            w3 Nn1,n2 Thighway=primary
+            w4 Nn2,n1
+            """)
+
+    seen = []
+    ids = []
+    for obj in osmium.FileProcessor(data).with_recycled_objects():
+        seen.append(obj)
+        ids.append(obj.id)
+        if obj.id in (1, 3):
+            assert len(obj.tags) == 1
+        else:
+            assert not obj.tags
+        if obj.is_way():
+            assert [n.ref for n in obj.nodes] == ([1, 2] if obj.id == 3 else [2, 1])
+
+    assert ids == [1, 2, 3, 4]
+    assert seen[0] is seen[1]
+    assert seen[2] is seen[3]
+    assert seen[0] is not seen[2]
+
+
+def test_recycled_objects_reset_attributes(opl_buffer):
+    class MyFilter:
+        def node(self, n):
+            if n.id == 1:
+                n.saved = 'test'
+            return False
+
+    fp = osmium.FileProcessor(opl_buffer('n1 x3 y-3\nn2 x4 y-4'))\
+               .with_filter(MyFilter())\
+               .with_recycled_objects()
+
+    results = [(obj.id, getattr(obj, 'saved', None), obj.location.lon) for obj in fp]
+
+    assert results == [(1, 'test', 3), (2, None, 4)]
+
+
+def test_recycled_objects_with_areas(opl_buffer):
+    data = opl_buffer("""\
+            n10 x3 y3
+            n11 x3 y3.01
+            n12 x3.01 y3.01
+            n13 x3.01 y3
+            w12 Nn10,n11,n12,n13,n10 Tbuilding=yes
+            w13 Nn10,n11,n12,n13,n10 Tbuilding=no
+            """)
+
+    areas = [obj.orig_id() for obj in osmium.FileProcessor(data)
+                                            .with_areas().with_recycled_objects()
+             if obj.is_area()]
+
+    assert areas == [12, 13]
+
+
+def test_async_iteration(opl_buffer):
+    data = opl_buffer("""\
+            n1 x1 y1
+            n2 x2 y2 Tfoo=bar
+            w3 Nn1,n2
+            r4 Mw3@
+            """)
+
+    async def collect():
+        return [f"{obj.type_str()}{obj.id}" async for obj in osmium.FileProcessor(data)]
+
+    assert asyncio.run(collect()) == ['n1', 'n2', 'w3', 'r4']
+
+
+def test_async_batches_invalid_after_next(opl_buffer):
+    async def collect():
+        batches = []
+        async for batch in osmium.FileProcessor(opl_buffer('n1\nn2\nn3'))\
+                                 .aiter_batches(1, queue_size=1):
+            assert batch.is_valid()
+            batches.append((batch, batch[0].id))
+        return batches
+
+    batches = asyncio.run(collect())
+
+    assert [b[1] for b in batches] == [1, 2, 3]
+    assert not any(b[0].is_valid() for b in batches)
+
+
+def test_async_batches_with_filter(opl_buffer):
+    data = opl_buffer("""\
+            n1 Tamenity=foo
+            n3
+            w1 Thighway=residential
+            w2
+            """)
+
+    async def collect():
+        fp = osmium.FileProcessor(data).with_filter(osmium.filter.EmptyTagFilter())
+        return [f"{o.type_str()}{o.id}" async for b in fp.aiter_batches() for o in b]
+
+    assert asyncio.run(collect()) == ['n1', 'w1']
+
+
+def test_async_batches_early_exit(opl_buffer):
+    data = opl_buffer('\n'.join(f"n{i}" for i in range(1, 1001)))
+
+    async def first():
+        async for batch in osmium.FileProcessor(data).aiter_batches(10, queue_size=2):
+            return batch[0].id
+
+    assert asyncio.run(first()) == 1
+
+
+def test_async_batches_error_in_filter(opl_buffer):
+    class BadFilter:
+        def node(self, n):
+            raise ValueError('bad filter')
+
+    async def collect():
+        fp = osmium.FileProcessor(opl_buffer('n1')).with_filter(BadFilter())
+        return [b async for b in fp.aiter_batches()]
+
+    with pytest.raises(ValueError, match='bad filter'):
+        asyncio.run(collect())
@@ -0,0 +1,103 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+import pytest
+
+import osmium
+
+from helpers import IDCollector
+
+
+def make_data(opl_buffer):
+    lines = [f"n{i} Tfoo=bar,x={i % 4}" for i in range(1, 41)]
+    lines += [f"w{i} Tfoo=bar,x={i % 2}" for i in range(1, 11)]
+    return opl_buffer('\n'.join(lines) + '\n')
+
+
+def filters():
+    return [osmium.filter.KeyFilter('foo'), osmium.filter.TagFilter(('x', '1'))]
+
+
+def test_optimizer_reorders_filters(opl_buffer):
+    ids = IDCollector()
+    opt = osmium.FilterOptimizer(*filters(), ids, sample_size=5)
+
+    osmium.apply(make_data(opl_buffer), opt)
+
+    assert ids.nodes == list(range(1, 41, 4))
+    assert ids.ways == list(range(1, 11, 2))
+
+    report = opt.report()
+    assert set(report) == {'node', 'way'}
+
+    nodes = report['node']
+    assert nodes['sampled'] == 5
+    assert nodes['order'] == ['TagFilter', 'KeyFilter', 'IDCollector']
+    kf, tf, coll = nodes['handlers']
+    assert kf['name'] == 'KeyFilter'
+    assert kf['reorderable']
+    assert kf['calls'] == 5
+    assert kf['rejected'] == 0
+    assert tf['calls'] == 5
+    assert tf['rejected'] == 3
+    assert not coll['reorderable']
+    assert 'calls' not in coll
+
+
+def test_optimizer_still_sampling(opl_buffer):
+    opt = osmium.FilterOptimizer(*filters(), sample_size=1000)
+
+    osmium.apply(make_data(opl_buffer), opt)
+
+    report = opt.report()
+    assert report['node']['sampled'] == 40
+    assert report['node']['order'] is None
+
+
+def test_optimizer_keeps_python_handler_position(opl_buffer):
+    seen = []
+
+    class Recorder:
+        def node(self, n):
+            seen.append(n.id)
+
+    kf, tf = filters()
+    opt = osmium.FilterOptimizer(kf, Recorder(), tf, sample_size=2)
+
+    osmium.apply(make_data(opl_buffer), opt)
+
+    assert seen == list(range(1, 41))
+    assert opt.report()['node']['order'] == ['KeyFilter', 'Recorder', 'TagFilter']
+
+
+def test_optimizer_bad_sample_size():
+    with pytest.raises(ValueError, match="sample_size"):
+        osmium.FilterOptimizer(*filters(), sample_size=0)
+
+
+def test_optimizer_file_processor(opl_buffer):
+    fp = osmium.FileProcessor(make_data(opl_buffer))\
+               .with_filter(osmium.filter.KeyFilter('foo'))\
+               .with_filter(osmium.filter.TagFilter(('x', '1')))\
+               .with_filter_optimization(sample_size=3)
+
+    assert fp.filter_optimization is None
+
+    ids = [o.id for o in fp if o.is_node()]
+
+    assert ids == list(range(1, 41, 4))
+    assert fp.filter_optimization['node']['order'] == ['TagFilter', 'KeyFilter']
+
+
+def test_optimizer_file_processor_with_profiling(opl_buffer):
+    fp = osmium.FileProcessor(make_data(opl_buffer))\
+               .with_filter(osmium.filter.KeyFilter('foo'))\
+               .with_filter_optimization()\
+               .with_profiling()
+
+    assert len(list(fp)) == 50
+    assert [h['name'] for h in fp.profile['handlers']] == ['FilterOptimizer']
+    assert fp.filter_optimization['way']['sampled'] == 10
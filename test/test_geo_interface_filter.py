@@ -113,3 +113,97 @@ def test_property_tag_filter(opl_buffer):
             assert k in ['a', 'b']
 
     assert count == 3
+
+
+def test_way_geometry_invalid_location(opl_buffer):
+    data = """\
+            n1 x0.001 y0
+            w1 Nn1,n2
+           """
+
+    fp = osmium.FileProcessor(opl_buffer(data), osmium.osm.WAY)\
+               .with_filter(osmium.filter.GeoInterfaceFilter())
+
+    with pytest.raises(osmium.InvalidLocationError):
+        list(fp)
+
+
+def test_way_geometry_degenerate(opl_buffer):
+    data = """\
+            n1 x0.001 y0
+            w2 Nn1,n1
+           """
+
+    fp = osmium.FileProcessor(opl_buffer(data))\
+               .with_locations()\
+               .with_filter(osmium.filter.GeoInterfaceFilter())
+
+    assert [o.id for o in fp] == [1]
+
+
+def test_area_geometry_with_hole(opl_buffer):
+    data = """\
+            n1 x0 y0
+            n2 x1 y0
+            n3 x1 y1
+            n4 x0 y1
+            n5 x0.2 y0.2
+            n6 x0.4 y0.2
+            n7 x0.4 y0.4
+            w1 Nn1,n2,n3,n4,n1
+            w2 Nn5,n6,n7,n5
+            r1 Ttype=multipolygon Mw1@outer,w2@inner
+           """
+
+    fp = osmium.FileProcessor(opl_buffer(data))\
+               .with_areas()\
+               .with_filter(osmium.filter.EntityFilter(osmium.osm.AREA))\
+               .with_filter(osmium.filter.GeoInterfaceFilter())
+
+    areas = [a.__geo_interface__['geometry'] for a in fp if not a.from_way()]
+
+    assert len(areas) == 1
+    assert areas[0]['type'] == 'MultiPolygon'
+    assert len(areas[0]['coordinates']) == 1
+    outer, inner = areas[0]['coordinates'][0]
+    assert len(outer) == 5
+    assert len(inner) == 4
+    assert outer[0] == outer[-1]
+    assert all(isinstance(pt, list) and len(pt) == 2 for pt in outer + inner)
+
+
+def test_numpy_coordinates(opl_buffer):
+    np = pytest.importorskip("numpy")
+
+    data = """\
+            n1 x0.001 y0
+            n2 x0.002 y0
+            n3 x0.001 y0.001
+            w1 Nn1,n2,n3
+            w2 Nn3,n1
+            r1 Ttype=multipolygon Mw1@,w2@
+           """
+
+    fp = osmium.FileProcessor(opl_buffer(data))\
+               .with_locations()\
+               .with_areas()\
+               .with_filter(osmium.filter.GeoInterfaceFilter(coordinates='numpy'))
+
+    geoms = {(o.type_str(), o.id): o.__geo_interface__['geometry'] for o in fp}
+
+    assert geoms[('n', 1)]['coordinates'] == (pytest.approx(0.001), pytest.approx(0))
+
+    line = geoms[('w', 1)]['coordinates']
+    assert isinstance(line, np.ndarray)
+    assert line.shape == (3, 2)
+    np.testing.assert_allclose(line, [[0.001, 0], [0.002, 0], [0.001, 0.001]])
+
+    ring = geoms[('a', 3)]['coordinates'][0][0]
+    assert isinstance(ring, np.ndarray)
+    assert ring.shape == (4, 2)
+    np.testing.assert_allclose(ring[0], ring[-1])
+
+
+def test_bad_coordinates_mode():
+    with pytest.raises(ValueError, match="coordinates"):
+        osmium.filter.GeoInterfaceFilter(coordinates='flat')
@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+import struct
+import textwrap
+
+import pytest
+
+import osmium
+from helpers import IDCollector
+
+SQUARE_WKT = 'POLYGON((0 0, 10 0, 10 10, 0 10, 0 0), (4 4, 6 4, 6 6, 4 6, 4 4))'
+
+NODES = """\
+        n1 x1 y1
+        n2 x5 y5
+        n3 x9.5 y0.5
+        n4 x11 y5
+        n5 x-3 y5
+        n6 x13 y5
+        n7
+        """
+
+
+def square_wkb(little_endian=True):
+    order = '<' if little_endian else '>'
+    ring = [(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)]
+    hole = [(4, 4), (6, 4), (6, 6), (4, 6), (4, 4)]
+    data = struct.pack(order + 'BII', 1 if little_endian else 0, 3, 2)
+    for r in (ring, hole):
+        data += struct.pack(order + 'I', len(r))
+        for x, y in r:
+            data += struct.pack(order + 'dd', x, y)
+    return data
+
+
+@pytest.mark.parametrize('geom', [SQUARE_WKT,
+                                  'SRID=4326;multipolygon (((0 0,10 0,10 10,0 10,0 0),'
+                                  '(4 4,6 4,6 6,4 6,4 4)))',
+                                  square_wkb(), square_wkb(False)])
+def test_geometry_filter_polygon_nodes(opl_reader, geom):
+    ids = IDCollector()
+
+    osmium.apply(opl_reader(NODES), osmium.filter.GeometryFilter(geom), ids)
+
+    assert ids.nodes == [1, 3]
+
+
+@pytest.mark.parametrize('geom', [(0, 0, 10, 10), [0, 0, 10, 10],
+                                  osmium.osm.Box(0, 0, 10, 10)])
+def test_geometry_filter_bbox_nodes(opl_reader, geom):
+    ids = IDCollector()
+
+    osmium.apply(opl_reader(NODES), osmium.filter.GeometryFilter(geom), ids)
+
+    assert ids.nodes == [1, 2, 3]
+
+
+def test_geometry_filter_multiple_geometries(opl_reader):
+    ids = IDCollector()
+
+    osmium.apply(opl_reader(NODES),
+                 osmium.filter.GeometryFilter(SQUARE_WKT, (10.5, 4, 11.5, 6)), ids)
+
+    assert ids.nodes == [1, 3, 4]
+
+
+def test_geometry_filter_ways(opl_buffer):
+    data = textwrap.dedent(NODES) + textwrap.dedent("""\
+        w10 Nn1,n4
+        w11 Nn5,n6
+        w12 Nn4,n6
+        w13 Nn2
+        w14 Nn7,n4
+        """)
+
+    fp = osmium.FileProcessor(opl_buffer(data))\
+               .with_locations()\
+               .with_filter(osmium.filter.GeometryFilter(SQUARE_WKT))
+
+    assert [o.id for o in fp if o.is_way()] == [10, 11]
+
+
+def test_geometry_filter_areas(opl_buffer):
+    data = """\
+        n1 x1 y1
+        n2 x2 y1
+        n3 x2 y2
+        n4 x-5 y-5
+        n5 x15 y-5
+        n6 x15 y15
+        n7 x-5 y15
+        n8 x20 y20
+        n9 x21 y20
+        n10 x21 y21
+        w1 Tbuilding=yes Nn1,n2,n3,n1
+        w2 Tbuilding=yes Nn4,n5,n6,n7,n4
+        w3 Tbuilding=yes Nn8,n9,n10,n8
+        """
+
+    fp = osmium.FileProcessor(opl_buffer(data))\
+               .with_areas()\
+               .with_filter(osmium.filter.GeometryFilter(SQUARE_WKT)
+                                         .enable_for(osmium.osm.AREA))
+
+    assert [o.orig_id() for o in fp if o.is_area()] == [1, 2]
+
+
+def test_geometry_filter_drops_relations(opl_reader):
+    ids = IDCollector()
+
+    osmium.apply(opl_reader("r1 Mn1@"), osmium.filter.GeometryFilter(SQUARE_WKT), ids)
+
+    assert ids.relations == []
+
+
+def test_geometry_filter_no_geometries():
+    with pytest.raises(TypeError, match="geometries to filter"):
+        osmium.filter.GeometryFilter()
+
+
+@pytest.mark.parametrize('geom', [None, 3, (1, 2, 3), {'a': 1}])
+def test_geometry_filter_bad_argument_types(geom):
+    with pytest.raises(TypeError):
+        osmium.filter.GeometryFilter(geom)
+
+
+@pytest.mark.parametrize('geom', ['POINT(1 2)', 'POLYGON((0 0, 1 1)', 'POLYGON((0 0, 1 1, 2 2))',
+                                  'POLYGON((0 0, 1 0, 1 1, 0 0)) x', b'\x01\x03\x00',
+                                  square_wkb()[:-3], (10, 10, 0, 0)])
+def test_geometry_filter_bad_geometry(geom):
+    with pytest.raises(ValueError):
+        osmium.filter.GeometryFilter(geom)
@@ -0,0 +1,63 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+import osmium
+
+from helpers import IDCollector
+
+
+def test_profiler_native_and_python(opl_buffer):
+    data = opl_buffer("""\
+            n1 Tamenity=foo
+            n2
+            w1 Thighway=residential
+            w2 Tbuilding=yes
+            r4
+            """)
+
+    ids = IDCollector()
+    prof = osmium.HandlerProfiler(osmium.filter.KeyFilter('amenity', 'highway'), ids)
+
+    osmium.apply(data, prof)
+
+    assert ids.nodes == [1]
+    assert ids.ways == [1]
+    assert ids.relations == []
+
+    stats = prof.stats()
+    assert [h['name'] for h in stats['handlers']] == ['KeyFilter', 'IDCollector']
+
+    kf, coll = stats['handlers']
+    assert not kf['python']
+    assert kf['node'] == {'calls': 2, 'accepted': 1, 'rejected': 1, 'time': kf['node']['time']}
+    assert kf['way']['rejected'] == 1
+    assert kf['relation']['accepted'] == 0
+    assert 'area' not in kf
+
+    assert coll['python']
+    assert coll['node']['calls'] == 1
+    assert coll['way']['calls'] == 1
+    assert 'relation' not in coll
+
+    assert stats['native_time'] >= 0
+    assert stats['python_time'] > 0
+
+
+def test_profiler_file_processor(opl_buffer):
+    fp = osmium.FileProcessor(opl_buffer('n1 x1 y1 Tfoo=bar\nn2 x2 y2\nw1 Nn1,n2'))\
+               .with_locations()\
+               .with_filter(osmium.filter.EmptyTagFilter())\
+               .with_profiling()
+
+    assert fp.profile is None
+
+    ids = [o.id for o in fp]
+
+    assert ids == [1]
+    stats = fp.profile
+    assert [h['name'] for h in stats['handlers']] == ['NodeLocationsForWays', 'EmptyTagFilter']
+    assert stats['handlers'][0]['node']['calls'] == 2
+    assert stats['handlers'][1]['way']['rejected'] == 1
@@ -4,6 +4,8 @@
 #
 # Copyright (C) 2025 Sarah Hoffmann <lonvia@denofr.de> and others.
 # For a full list of authors see the git log.
+from array import array
+
 import pytest
 
 import osmium
@@ -28,3 +30,48 @@ def test_id_filter_simple(opl_reader):
     osmium.apply(opl_reader(data), osmium.filter.IdFilter([2, 5, 200, 201]), ids)
 
     assert ids.nodes == [2, 200]
+
+
+def test_id_filter_negative_id():
+    with pytest.raises(ValueError):
+        osmium.filter.IdFilter([1, -3])
+
+
+@pytest.mark.parametrize('make_ids', [lambda ids: osmium.index.IdSet(ids),
+                                      lambda ids: array('q', ids)])
+def test_id_filter_bulk(opl_reader, make_ids):
+    data = """\
+           n1
+           n2
+           n4
+           n200
+           """
+
+    ids = IDCollector()
+
+    osmium.apply(opl_reader(data), osmium.filter.IdFilter(make_ids([2, 5, 200, 201])), ids)
+
+    assert ids.nodes == [2, 200]
+
+
+def test_id_filter_numpy(opl_reader):
+    np = pytest.importorskip("numpy")
+
+    ids = IDCollector()
+
+    osmium.apply(opl_reader("n1\nn2\nn3\n"),
+                 osmium.filter.IdFilter(np.array([3, 1], dtype=np.int64)), ids)
+
+    assert ids.nodes == [1, 3]
+
+
+def test_id_filter_mapped(opl_reader, tmp_path):
+    fn = tmp_path / 'filter.ids'
+    osmium.index.IdSet([1, 4, 5]).save(fn)
+
+    ids = IDCollector()
+
+    osmium.apply(opl_reader("n1\nn2\nn4\n"),
+                 osmium.filter.IdFilter(osmium.index.MappedIdSet(fn)), ids)
+
+    assert ids.nodes == [1, 4]
@@ -219,3 +219,103 @@ def test_clear_node_id_set():
     ids.node_ids().clear()
 
     assert len(ids.node_ids()) == 0
+
+
+def test_save_and_load(tmp_path):
+    fn = tmp_path / 'tracker.ids'
+    ids = osmium.IdTracker()
+    for n in (1, 70000, 5000000000):
+        ids.add_node(n)
+    ids.add_way(3)
+    ids.add_relation(17)
+
+    ids.save(fn)
+
+    loaded = osmium.IdTracker()
+    loaded.add_node(2)
+    loaded.load(fn)
+
+    assert_tracker_content(loaded, [1, 2, 70000, 5000000000], [3], [17])
+
+
+def test_load_mapped(tmp_path, opl_buffer):
+    fn = tmp_path / 'tracker.ids'
+    ids = osmium.IdTracker()
+    ids.add_node(1)
+    ids.add_way(10)
+    ids.save(fn)
+
+    loaded = osmium.IdTracker()
+    loaded.load(fn, mmap=True)
+    loaded.add_node(3)
+
+    data = opl_buffer("""\
+                      n1
+                      n2
+                      n3
+                      w10 Nn2
+                      w11 Nn3
+                      w12 Nn4
+                      """)
+
+    fp = osmium.FileProcessor(data).with_filter(loaded.id_filter())
+    found = [o.type_str() + str(o.id) for o in fp]
+    assert found == ['n1', 'n3', 'w10']
+
+    found = [o.id for o in osmium.FileProcessor(data, osmium.osm.WAY)
+                                 .with_filter(loaded.contains_filter())]
+    assert found == [11]
+
+    assert_tracker_content(loaded, [1, 3], [10], [])
+
+
+def test_query_mapped(tmp_path, opl_buffer):
+    fn = tmp_path / 'tracker.ids'
+    ids = osmium.IdTracker()
+    for n in (1, 70000, 70010):
+        ids.add_node(n)
+    ids.add_way(10)
+    ids.add_relation(5)
+    ids.save(fn)
+
+    loaded = osmium.IdTracker()
+    loaded.load(fn, mmap=True)
+    loaded.add_node(3)
+    loaded.add_node(70000)
+
+    assert loaded.num_ids('n') == 4
+    assert loaded.num_ids('w') == 1
+    assert loaded.contains_any('n', [(2, 2), (3, 3), (4, 69999), (70001, 70010),
+                                     (70011, 200000)]) == [False, True, False, True, False]
+
+    with pytest.raises(ValueError):
+        loaded.num_ids('x')
+
+    loaded.complete_backward_references(opl_buffer("""\
+                                                   w10 Nn20,n21
+                                                   r5 Mw11@
+                                                   """), relation_depth=1)
+
+    assert_tracker_content(loaded, [1, 3, 20, 21, 70000, 70010], [10, 11], [5])
+
+
+def test_save_and_map_single_sets(tmp_path):
+    fn = tmp_path / 'tracker.ids'
+    ids = osmium.IdTracker()
+    ids.add_node(12)
+    ids.add_way(13)
+
+    ids.save(str(fn))
+
+    nodes = osmium.index.MappedIdSet(fn, osm_type='n')
+    assert len(nodes) == 1
+    assert 12 in nodes
+    assert 13 not in nodes
+
+    ways = osmium.index.IdSet.load(fn, 'w')
+    assert len(ways) == 1
+    assert 13 in ways
+    assert osmium.index.MappedIdSet(fn, 'r').empty()
+
+    with pytest.raises(ValueError):
+        osmium.index.MappedIdSet(fn)
@@ -4,6 +4,8 @@
 #
 # Copyright (C) 2025 Sarah Hoffmann <lonvia@denofr.de> and others.
 # For a full list of authors see the git log.
+import pytest
+
 import osmium
 
 
@@ -46,3 +48,267 @@ def test_clear_and_size():
     ids.clear()
 
     assert len(ids) == 0
+
+
+def test_init_with_ids():
+    ids = osmium.index.IdSet([5, 1, 5, 1000000])
+
+    assert len(ids) == 3
+    assert 1000000 in ids
+
+
+def test_update_from_iterable():
+    ids = osmium.index.IdSet()
+    ids.update(range(10, 20))
+    ids.update(x * 2 for x in range(10))
+
+    assert len(ids) == 15
+    assert 19 in ids
+    assert 18 in ids
+    assert 3 not in ids
+
+
+def test_update_bad_argument():
+    ids = osmium.index.IdSet()
+
+    with pytest.raises(TypeError):
+        ids.update(None)
+
+    with pytest.raises(TypeError):
+        ids.update(['a'])
+
+
+@pytest.mark.parametrize('dtype', ['int64', 'uint64', 'int32', 'uint16'])
+def test_update_from_array(dtype):
+    np = pytest.importorskip("numpy")
+
+    ids = osmium.index.IdSet()
+    ids.update(np.array([3, 1, 200, 3], dtype=dtype))
+
+    assert len(ids) == 3
+    assert 200 in ids
+
+
+def test_update_from_array_strided():
+    np = pytest.importorskip("numpy")
+
+    ids = osmium.index.IdSet(np.arange(20, dtype=np.int64)[::5])
+
+    assert ids.to_array().tolist() == [0, 5, 10, 15]
+
+
+def test_update_from_array_bad():
+    np = pytest.importorskip("numpy")
+
+    ids = osmium.index.IdSet()
+
+    with pytest.raises(ValueError, match='negative'):
+        ids.update(np.array([1, -1]))
+
+    with pytest.raises(ValueError, match='one-dimensional'):
+        ids.update(np.array([[1, 2], [3, 4]]))
+
+    with pytest.raises(TypeError, match='integers'):
+        ids.update(np.array([1.0, 2.0]))
+
+
+def test_update_from_stdlib_array():
+    from array import array
+
+    ids = osmium.index.IdSet(array('q', [7, 8, 9]))
+
+    assert len(ids) == 3
+    assert 8 in ids
+
+
+def test_to_array():
+    np = pytest.importorskip("numpy")
+
+    ids = osmium.index.IdSet([100, 3, 5000000000, 7])
+    arr = ids.to_array()
+
+    assert arr.dtype == np.int64
+    assert arr.tolist() == [3, 7, 100, 5000000000]
+
+    assert osmium.index.IdSet().to_array().tolist() == []
+
+
+def test_update_from_text_file(tmp_path):
+    fn = tmp_path / 'ids.txt'
+    fn.write_text('# some IDs\n12\n\n  400  \n12\n')
+
+    ids = osmium.index.IdSet()
+    ids.update_from_file(fn)
+
+    assert len(ids) == 2
+    assert 400 in ids
+
+
+@pytest.mark.parametrize('content,line', [('1\nx\n', 2), ('1\n-4\n', 2), ('1 2\n', 1)])
+def test_update_from_text_file_bad(tmp_path, content, line):
+    fn = tmp_path / 'ids.txt'
+    fn.write_text(content)
+
+    with pytest.raises(ValueError, match=f'line {line}'):
+        osmium.index.IdSet().update_from_file(fn)
+
+
+def test_update_from_binary_file(tmp_path):
+    fn = tmp_path / 'ids.bin'
+    fn.write_bytes(b''.join(i.to_bytes(8, 'little') for i in (3, 1, 70000, 3)))
+
+    ids = osmium.index.IdSet()
+    ids.update_from_file(str(fn), format='binary')
+
+    assert len(ids) == 3
+    assert 70000 in ids
+
+
+def test_update_from_binary_file_bad_size(tmp_path):
+    fn = tmp_path / 'ids.bin'
+    fn.write_bytes(b'\x01\x00\x00\x00')
+
+    with pytest.raises(ValueError):
+        osmium.index.IdSet().update_from_file(fn, format='binary')
+
+
+def test_update_from_file_bad_format(tmp_path):
+    fn = tmp_path / 'ids.txt'
+    fn.write_text('1\n')
+
+    with pytest.raises(ValueError, match='format'):
+        osmium.index.IdSet().update_from_file(fn, format='csv')
+
+
+def test_update_from_missing_file(tmp_path):
+    with pytest.raises(RuntimeError, match='nothere'):
+        osmium.index.IdSet().update_from_file(tmp_path / 'nothere.txt')
+
+
+def test_set_algebra():
+    a = osmium.index.IdSet([1, 2, 3, 100000])
+    b = osmium.index.IdSet([3, 4, 100000])
+
+    def as_list(ids):
+        return [i for i in range(100001) if i in ids]
+
+    assert as_list(a.union(b)) == [1, 2, 3, 4, 100000]
+    assert as_list(a | b) == [1, 2, 3, 4, 100000]
+    assert as_list(a.intersection(b)) == [3, 100000]
+    assert as_list(a & b) == [3, 100000]
+    assert as_list(a.difference(b)) == [1, 2]
+    assert as_list(a - b) == [1, 2]
+
+    # the operands are unchanged
+    assert len(a) == 4
+    assert len(b) == 3
+
+
+def test_set_algebra_inplace():
+    a = osmium.index.IdSet([1, 2, 3])
+    orig = a
+
+    a |= osmium.index.IdSet([4])
+    assert a is orig
+    assert len(a) == 4
+
+    a &= osmium.index.IdSet([2, 3, 4, 5])
+    assert a is orig
+    assert [i for i in range(6) if i in a] == [2, 3, 4]
+
+    a -= osmium.index.IdSet([3])
+    assert a is orig
+    assert [i for i in range(6) if i in a] == [2, 4]
+
+    a -= a
+    assert len(a) == 0
+
+
+def test_set_algebra_bad_argument():
+    a = osmium.index.IdSet([1])
+
+    with pytest.raises(TypeError):
+        a | {1, 2}
+
+    with pytest.raises(TypeError):
+        a.union([1, 2])
+
+
+def test_save_and_load(tmp_path):
+    fn = tmp_path / 'test.ids'
+    ids = osmium.index.IdSet([0, 7, 65535, 65536, 12345678901])
+
+    ids.save(fn)
+    loaded = osmium.index.IdSet.load(str(fn))
+
+    assert len(loaded) == 5
+    assert all(i in loaded for i in (0, 7, 65535, 65536, 12345678901))
+    assert 8 not in loaded
+
+
+def test_save_empty(tmp_path):
+    fn = tmp_path / 'test.ids'
+    osmium.index.IdSet().save(fn)
+
+    assert osmium.index.IdSet.load(fn).empty()
+    assert osmium.index.MappedIdSet(fn).empty()
+
+
+def test_save_overwrite(tmp_path):
+    fn = tmp_path / 'test.ids'
+    osmium.index.IdSet([1, 2]).save(fn)
+    mapped = osmium.index.MappedIdSet(fn)
+
+    osmium.index.IdSet([3]).save(fn)
+
+    # The old mapping still sees the previous content.
+    assert len(mapped) == 2
+    assert 1 in mapped
+    assert 3 in osmium.index.MappedIdSet(fn)
+
+
+def test_mapped_id_set(tmp_path):
+    fn = tmp_path / 'test.ids'
+    osmium.index.IdSet(range(100, 200000, 3)).save(fn)
+
+    mapped = osmium.index.MappedIdSet(fn)
+
+    assert not mapped.empty()
+    assert len(mapped) == len(range(100, 200000, 3))
+    assert mapped.get(103)
+    assert 199998 not in mapped
+    assert 1000000000 not in mapped
+
+    ids = osmium.index.IdSet()
+    ids.update(mapped)
+    assert len(ids) == len(mapped)
+
+
+def test_mapped_id_set_to_array(tmp_path):
+    pytest.importorskip("numpy")
+    fn = tmp_path / 'test.ids'
+    osmium.index.IdSet([5, 1, 99999999]).save(fn)
+
+    assert osmium.index.MappedIdSet(fn).to_array().tolist() == [1, 5, 99999999]
+
+
+def test_mapped_id_set_bad_file(tmp_path):
+    fn = tmp_path / 'test.ids'
+    fn.write_text('this is not an ID set, just some text')
+
+    with pytest.raises(ValueError):
+        osmium.index.MappedIdSet(fn)
+
+    with pytest.raises(ValueError):
+        osmium.index.IdSet.load(fn)
+
+
+def test_mapped_id_set_bad_type(tmp_path):
+    fn = tmp_path / 'test.ids'
+    osmium.index.IdSet([1]).save(fn)
+
+    with pytest.raises(ValueError):
+        osmium.index.MappedIdSet(fn, osm_type='x')
+
+    with pytest.raises(ValueError):
+        osmium.index.MappedIdSet(fn, osm_type='n')
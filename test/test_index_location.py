@@ -68,3 +68,156 @@ def test_clear():
     table.clear()
     with pytest.raises(KeyError):
         table.get(593)
+
+
+def _make_table():
+    table = osmium.index.create_map("flex_mem")
+    table.set(4, osmium.osm.Location(3.4, -5.6))
+    table.set(100, osmium.osm.Location(-170.0, 80.5))
+    return table
+
+
+def test_get_many_mask():
+    np = pytest.importorskip("numpy")
+    x, y = _make_table().get_many(np.array([100, 5, 4], dtype=np.int64))
+
+    assert x.dtype == np.int32
+    assert list(x.mask) == [False, True, False]
+    assert list(y.mask) == [False, True, False]
+    assert x[0] == -1700000000
+    assert y[0] == 805000000
+    assert x[2] == 34000000
+    assert y[2] == -56000000
+
+
+def test_get_many_sentinel():
+    np = pytest.importorskip("numpy")
+    x, y = _make_table().get_many([4, -1, 7], missing='sentinel', sentinel=-99)
+
+    assert not isinstance(x, np.ma.MaskedArray)
+    assert x.tolist() == [34000000, -99, -99]
+    assert y.tolist() == [-56000000, -99, -99]
+
+
+def test_get_many_default_sentinel():
+    pytest.importorskip("numpy")
+    x, y = _make_table().get_many([7], missing='sentinel')
+
+    assert x.tolist() == [osmium.osm.Location().x]
+    assert y.tolist() == [osmium.osm.Location().y]
+
+
+def test_get_many_raise():
+    pytest.importorskip("numpy")
+    table = _make_table()
+
+    x, y = table.get_many([4, 100], missing='raise')
+    assert x.tolist() == [34000000, -1700000000]
+
+    with pytest.raises(KeyError, match='56'):
+        table.get_many([4, 56], missing='raise')
+
+
+def test_get_many_bad_arguments():
+    np = pytest.importorskip("numpy")
+    table = _make_table()
+
+    with pytest.raises(ValueError):
+        table.get_many([4], missing='ignore')
+
+    with pytest.raises(ValueError):
+        table.get_many(np.array([[4, 100]]))
+
+
+def test_get_many_empty():
+    pytest.importorskip("numpy")
+    x, y = _make_table().get_many([])
+
+    assert len(x) == 0
+    assert len(y) == 0
+
+
+def test_set_many():
+    np = pytest.importorskip("numpy")
+    table = osmium.index.create_map("flex_mem")
+
+    table.set_many(np.array([3, 1000000], dtype=np.int64),
+                   np.array([10000000, -20000000], dtype=np.int32),
+                   np.array([-5000000, 15000000], dtype=np.int32))
+
+    loc = table.get(1000000)
+    assert loc.lon == pytest.approx(-2.0)
+    assert loc.lat == pytest.approx(1.5)
+
+    x, y = table.get_many([3], missing='raise')
+    assert x.tolist() == [10000000]
+    assert y.tolist() == [-5000000]
+
+
+def test_set_many_bad_arguments():
+    pytest.importorskip("numpy")
+    table = osmium.index.create_map("flex_mem")
+
+    with pytest.raises(ValueError):
+        table.set_many([1, 2], [1, 2], [1])
+
+    with pytest.raises(ValueError):
+        table.set_many([-1], [1], [1])
+
+
+def test_compressed_mem_registered():
+    assert 'compressed_mem' in osmium.index.map_types()
+
+
+def test_compressed_mem_set_get():
+    table = osmium.index.create_map("compressed_mem")
+    locs = {i: osmium.osm.Location(i * 0.001 - 90.0, 45.0 - i * 0.0007)
+            for i in range(1, 20000, 3)}
+
+    for i, loc in locs.items():
+        table.set(i, loc)
+
+    # sequential and random access, including overwriting a finished block
+    table.set(4, osmium.osm.Location(-179.9, 89.9))
+    locs[4] = osmium.osm.Location(-179.9, 89.9)
+    for i in list(locs)[::-1] + list(locs):
+        assert table.get(i).x == locs[i].x
+        assert table.get(i).y == locs[i].y
+
+    with pytest.raises(KeyError):
+        table.get(2)
+    with pytest.raises(KeyError):
+        table.get(10000000)
+
+
+def test_compressed_mem_extreme_coordinates():
+    table = osmium.index.create_map("compressed_mem")
+    table.set(1, osmium.osm.Location(-180.0, -90.0))
+    table.set(2, osmium.osm.Location(180.0, 90.0))
+    table.set(100000, osmium.osm.Location(0, 0))
+
+    assert table.get(1).lon == pytest.approx(-180.0)
+    assert table.get(2).lat == pytest.approx(90.0)
+    assert table.get(100000).x == 0
+
+
+def test_compressed_mem_used_memory():
+    compressed = osmium.index.create_map("compressed_mem")
+    flex = osmium.index.create_map("flex_mem")
+    for i in range(1, 500000):
+        loc = osmium.osm.Location(10.0 + i * 0.00001, 50.0 - i * 0.00001)
+        compressed.set(i, loc)
+        flex.set(i, loc)
+
+    assert 0 < compressed.used_memory() < flex.used_memory()
+
+
+def test_compressed_mem_clear():
+    table = osmium.index.create_map("compressed_mem")
+    table.set(593, osmium.osm.Location(0.35, 45.3))
+    table.set(100593, osmium.osm.Location(0.35, 45.3))
+    table.clear()
+    with pytest.raises(KeyError):
+        table.get(593)
+    with pytest.raises(KeyError):
+        table.get(100593)
@@ -40,3 +40,21 @@ def test_filter_simple(opl_reader, key, nodes, changesets):
 
     assert post.nodes == nodes
     assert post.changesets == changesets
+
+
+def test_filter_many_keys(opl_reader):
+    data = """\
+           n1 Tfoo=bar,name=loo
+           n2 Tname=else
+           n3 x9 y0
+           n4 Tkey99=fr
+           n5 Tkey=fr
+           """
+
+    post = IDCollector()
+
+    osmium.apply(opl_reader(data),
+                 osmium.filter.KeyFilter(*(f"key{i}" for i in range(500)), 'foo', 'foo'),
+                 post)
+
+    assert post.nodes == [1, 4]
@@ -0,0 +1,242 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+import datetime as dt
+import sys
+
+import pytest
+
+import osmium
+
+# The tests modify a shared cache file.
+pytestmark = [pytest.mark.thread_unsafe, pytest.mark.iterations(1)]
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    fn = tmp_path / 'nodes.cache'
+    with osmium.index.LocationCache(fn, mode='w') as cache:
+        cache.source = 'test.opl'
+        cache.sequence = 1234
+        cache.timestamp = dt.datetime(2025, 1, 5, 10, 0, 0, tzinfo=dt.timezone.utc)
+        cache.set(4, osmium.osm.Location(3.4, -5.6))
+        cache.set(10, osmium.osm.Location(0.0, 0.0))
+        cache[3000000] = osmium.osm.Location(-45.1, 12.0)
+
+    return fn
+
+
+def test_read_cache(cache_file):
+    cache = osmium.index.LocationCache(cache_file)
+
+    assert not cache.writable
+    assert cache.complete
+    assert cache.source == 'test.opl'
+    assert cache.sequence == 1234
+    assert cache.timestamp == dt.datetime(2025, 1, 5, 10, 0, 0, tzinfo=dt.timezone.utc)
+
+    assert cache.get(4).lon == pytest.approx(3.4)
+    assert cache.get(4).lat == pytest.approx(-5.6)
+    assert cache.get(10).x == 0
+    assert cache.get(10).y == 0
+    assert cache[3000000].lon == pytest.approx(-45.1)
+
+    with pytest.raises(KeyError):
+        cache.get(5)
+
+    with pytest.raises(KeyError):
+        cache.get(3000001000)
+
+    cache.close()
+    assert cache.closed
+
+
+def test_new_cache_without_metadata(tmp_path):
+    fn = tmp_path / 'nodes.cache'
+    osmium.index.LocationCache(fn, mode='w').close()
+
+    cache = osmium.index.LocationCache(fn)
+    assert cache.complete
+    assert cache.source == ''
+    assert cache.sequence is None
+    assert cache.timestamp is None
+    with pytest.raises(KeyError):
+        cache.get(1)
+
+
+def test_read_only_cache_refuses_changes(cache_file):
+    with osmium.index.LocationCache(cache_file) as cache:
+        with pytest.raises(RuntimeError):
+            cache.set(5, osmium.osm.Location(1, 1))
+
+        with pytest.raises(RuntimeError):
+            cache.sequence = 5
+
+        with pytest.raises(RuntimeError):
+            cache.clear()
+
+
+def test_closed_cache(cache_file):
+    cache = osmium.index.LocationCache(cache_file)
+    cache.close()
+
+    with pytest.raises(RuntimeError):
+        cache.source
+
+    with pytest.raises(KeyError):
+        cache.get(4)
+
+
+def test_update_cache(cache_file):
+    with osmium.index.LocationCache(cache_file, mode='a') as cache:
+        assert cache.writable
+        assert not cache.complete
+        assert cache.get(4).lon == pytest.approx(3.4)
+        cache.set(4, osmium.osm.Location(1.0, 2.0))
+        cache.sequence = None
+
+    cache = osmium.index.LocationCache(cache_file)
+    assert cache.complete
+    assert cache.sequence is None
+    assert cache.source == 'test.opl'
+    assert cache.get(4).lon == pytest.approx(1.0)
+
+
+def test_clear_cache(cache_file):
+    with osmium.index.LocationCache(cache_file, mode='a') as cache:
+        cache.clear()
+        with pytest.raises(KeyError):
+            cache.get(4)
+        cache.set(5, osmium.osm.Location(1.0, 2.0))
+
+    cache = osmium.index.LocationCache(cache_file)
+    with pytest.raises(KeyError):
+        cache.get(4)
+    assert cache.get(5).lat == pytest.approx(2.0)
+
+
+def test_incomplete_cache(cache_file):
+    with pytest.raises(ValueError):
+        with osmium.index.LocationCache(cache_file, mode='a') as cache:
+            cache.set(5, osmium.osm.Location(1.0, 2.0))
+            raise ValueError("processing failed")
+
+    with pytest.raises(RuntimeError, match='incomplete'):
+        osmium.index.LocationCache(cache_file)
+
+    cache = osmium.index.LocationCache(cache_file, allow_incomplete=True)
+    assert not cache.complete
+    assert cache.get(5).lon == pytest.approx(1.0)
+
+
+def test_close_without_complete(cache_file):
+    cache = osmium.index.LocationCache(cache_file, mode='a')
+    cache.close(complete=False)
+
+    with pytest.raises(RuntimeError):
+        osmium.index.LocationCache(cache_file)
+
+
+@pytest.mark.skipif(sys.platform == 'win32',
+                    reason='Mapped files cannot be removed on Windows.')
+def test_rewrite_cache_while_reading(cache_file):
+    reader = osmium.index.LocationCache(cache_file)
+
+    with osmium.index.LocationCache(cache_file, mode='w') as cache:
+        cache.set(7, osmium.osm.Location(1.0, 2.0))
+
+    assert reader.get(4).lon == pytest.approx(3.4)
+    with pytest.raises(KeyError):
+        reader.get(7)
+
+
+@pytest.mark.skipif(sys.platform == 'win32',
+                    reason='Mapped files cannot be resized on Windows.')
+def test_grow_cache_while_reading(cache_file):
+    reader = osmium.index.LocationCache(cache_file)
+
+    with osmium.index.LocationCache(cache_file, mode='a') as cache:
+        cache.set(50000000, osmium.osm.Location(1.0, 2.0))
+
+    assert reader.get(4).lon == pytest.approx(3.4)
+    with pytest.raises(KeyError):
+        reader.get(50000000)
+    x, _ = reader.get_many([4, 50000000])
+    assert x.mask.tolist() == [False, True]
+
+    assert osmium.index.LocationCache(cache_file).get(50000000).lat == pytest.approx(2.0)
+
+
+def test_bad_mode(tmp_path):
+    with pytest.raises(ValueError):
+        osmium.index.LocationCache(tmp_path / 'nodes.cache', mode='x')
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(RuntimeError):
+        osmium.index.LocationCache(tmp_path / 'nodes.cache')
+
+
+def test_not_a_cache(tmp_path):
+    fn = tmp_path / 'nodes.cache'
+    fn.write_bytes(b'x' * 5000)
+
+    with pytest.raises(ValueError):
+        osmium.index.LocationCache(fn)
+
+
+def test_source_too_long(tmp_path):
+    with osmium.index.LocationCache(tmp_path / 'nodes.cache', mode='w') as cache:
+        with pytest.raises(ValueError):
+            cache.source = 'x' * 5000
+
+
+def test_file_processor_build_and_use(tmp_path, opl_buffer):
+    fn = tmp_path / 'nodes.cache'
+    data = """\
+           n1 x1 y2
+           n2 x3 y4
+           w1 Nn1,n2
+           """
+
+    with osmium.index.LocationCache(fn, mode='w') as cache:
+        for _ in osmium.FileProcessor(opl_buffer(data), osmium.osm.NODE)\
+                       .with_locations(cache):
+            pass
+
+    cache = osmium.index.LocationCache(fn)
+    ways = [[(n.lon, n.lat) for n in o.nodes]
+            for o in osmium.FileProcessor(opl_buffer(data), osmium.osm.WAY)
+                           .with_locations(cache)]
+
+    assert ways == [[(1.0, 2.0), (3.0, 4.0)]]
+
+
+def test_file_processor_read_only_does_not_store(tmp_path, opl_buffer):
+    fn = tmp_path / 'nodes.cache'
+    osmium.index.LocationCache(fn, mode='w').close()
+
+    cache = osmium.index.LocationCache(fn)
+    for _ in osmium.FileProcessor(opl_buffer('n1 x1 y2')).with_locations(cache):
+        pass
+
+    with pytest.raises(KeyError):
+        cache.get(1)
+
+
+def test_file_processor_writable_needs_nodes(tmp_path, opl_buffer):
+    with osmium.index.LocationCache(tmp_path / 'nodes.cache', mode='w') as cache:
+        with pytest.raises(RuntimeError):
+            osmium.FileProcessor(opl_buffer('w1 Nn1'), osmium.osm.WAY).with_locations(cache)
+
+
+def test_bulk_access(cache_file):
+    pytest.importorskip("numpy")
+    cache = osmium.index.LocationCache(cache_file)
+
+    x, y = cache.get_many([4, 5, 3000000], missing='sentinel', sentinel=0)
+
+    assert x.tolist() == [34000000, 0, -451000000]
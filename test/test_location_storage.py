@@ -0,0 +1,83 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+import shutil
+
+import pytest
+
+import osmium
+from osmium.location_storage import available_memory, estimate_location_storage
+from osmium.parallel import PbfBlob
+from osmium.pbf_index import PbfBlock, PbfBlockIndex
+
+
+@pytest.fixture
+def indexed_file(tmp_path):
+    """ A fake PBF file with an index claiming 10 million nodes
+        with IDs from 1 to 10 million.
+    """
+    fn = tmp_path / 'large.osm.pbf'
+    fn.write_bytes(b'x' * 100)
+    PbfBlockIndex(fn, PbfBlob('OSMHeader', 0, 10),
+                  [PbfBlock(10, 90, 'n', 1, 10_000_000, 10_000_000)]).save()
+    return fn
+
+
+def test_available_memory():
+    mem = available_memory()
+    assert mem is None or mem > 0
+
+
+def test_estimate_from_file_size(test_data_dir, tmp_path):
+    fn = tmp_path / 'example.osm.pbf'
+    shutil.copy(test_data_dir / 'example-test.pbf', fn)
+
+    est = estimate_location_storage(fn, memory_limit=10**12)
+
+    assert est.map_type == 'sparse_mem_array'
+    assert est.num_nodes == fn.stat().st_size // 8
+    assert est.used_memory == 16 * est.num_nodes
+    assert est.max_node_id is None
+    assert est.memory_limit == 10**12
+
+
+@pytest.mark.parametrize('limit,map_type', [(100_000_000, 'dense_mem_array'),
+                                            (70_000_000, 'compressed_mem'),
+                                            (1_000_000, 'dense_file_array')])
+def test_estimate_from_block_index(indexed_file, limit, map_type):
+    est = estimate_location_storage(indexed_file, memory_limit=limit)
+
+    assert est.map_type == map_type
+    assert est.num_nodes == 10_000_000
+    assert est.max_node_id == 10_000_000
+    assert est.used_memory <= 80_000_008
+
+
+def test_estimate_unknown_size(opl_buffer):
+    est = estimate_location_storage(opl_buffer('n1 x4 y5'))
+
+    assert est.map_type == 'flex_mem'
+    assert est.num_nodes is None
+
+
+@pytest.mark.thread_unsafe  # changes the level of the 'pyosmium' logger
+def test_file_processor_auto_storage(test_data_dir, caplog):
+    fp = osmium.FileProcessor(test_data_dir / 'example-test.pbf')
+    assert fp.location_storage_estimate is None
+
+    with caplog.at_level('INFO', logger='pyosmium'):
+        fp.with_locations('auto')
+
+    est = fp.location_storage_estimate
+    assert est is not None
+    assert est.map_type in osmium.index.map_types()
+    assert est.map_type in caplog.text
+    assert fp.node_location_storage is not None
+
+    assert any(obj.is_way() for obj in fp)
+
+    fp.with_locations()
+    assert fp.location_storage_estimate is None
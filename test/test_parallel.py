@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+import operator
+
+import pytest
+
+import osmium
+import osmium.parallel
+from helpers import CountingHandler
+
+
+def count_objects(data):
+    handler = CountingHandler()
+    osmium.apply(data, handler)
+    return handler.counts
+
+
+def add_counts(a, b):
+    return list(map(operator.add, a, b))
+
+
+def test_pbf_blobs(test_data_dir):
+    blobs = list(osmium.parallel.pbf_blobs(test_data_dir / 'example-test.pbf'))
+
+    assert blobs[0].type == 'OSMHeader'
+    assert blobs[0].offset == 0
+    assert all(b.type == 'OSMData' for b in blobs[1:])
+    assert sum(b.size for b in blobs) == (test_data_dir / 'example-test.pbf').stat().st_size
+
+
+@pytest.mark.parametrize('blobs_per_task', [1, 7, 100])
+def test_map_reduce(test_data_dir, blobs_per_task):
+    fn = test_data_dir / 'example-test.pbf'
+
+    expected = CountingHandler()
+    expected.apply_file(fn)
+
+    result = osmium.parallel.map_reduce(fn, count_objects, add_counts,
+                                        num_workers=2, blobs_per_task=blobs_per_task)
+
+    # Areas are never assembled on blob level.
+    assert result[:3] == expected.counts[:3]
+
+
+def test_map_reduce_not_pbf(tmp_path):
+    fn = tmp_path / 'test.opl'
+    fn.write_text('n1')
+
+    with pytest.raises(RuntimeError):
+        osmium.parallel.map_reduce(fn, count_objects, add_counts)
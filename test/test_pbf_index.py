@@ -0,0 +1,431 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+import os
+import random
+import shutil
+import struct
+import uuid
+import zlib
+
+import pytest
+
+import osmium
+import osmium.pbf_index
+from osmium.pbf_index import PbfBlockIndex, RestrictedInputCache, \
+                             pbf_blob_types, restricted_input
+from helpers import CountingHandler, IDCollector
+
+
+@pytest.fixture
+def pbf_file(test_data_dir, tmp_path):
+    fn = tmp_path / 'example.pbf'
+    shutil.copy(test_data_dir / 'example-test.pbf', fn)
+    return fn
+
+
+def first_way(fn):
+    for obj in osmium.FileProcessor(fn, osmium.osm.WAY):
+        return obj.id, [n.ref for n in obj.nodes]
+
+
+def test_build_index(pbf_file):
+    index = PbfBlockIndex.build(pbf_file)
+
+    counts = CountingHandler()
+    counts.apply_file(pbf_file)
+
+    assert index.header.offset == 0
+    assert sum(b.num_objects for b in index.blocks if b.type == 'n') == counts.counts[0]
+    assert sum(b.num_objects for b in index.blocks if b.type == 'w') == counts.counts[1]
+    assert sum(b.num_objects for b in index.blocks if b.type == 'r') == counts.counts[2]
+    assert all(b.first_id <= b.last_id for b in index.blocks)
+
+
+def test_build_index_parallel(pbf_file):
+    assert PbfBlockIndex.build(pbf_file, num_workers=2).blocks \
+           == PbfBlockIndex.build(pbf_file).blocks
+
+
+def test_save_and_load_index(pbf_file):
+    index = PbfBlockIndex.build(pbf_file)
+    index.save()
+
+    loaded = PbfBlockIndex.load(pbf_file)
+
+    assert loaded.header == index.header
+    assert loaded.blocks == index.blocks
+
+
+@pytest.mark.thread_unsafe  # changes the modification time of the file
+def test_load_outdated_index(pbf_file):
+    PbfBlockIndex.build(pbf_file).save()
+    stat = pbf_file.stat()
+    os.utime(pbf_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    with pytest.raises(RuntimeError, match='outdated'):
+        PbfBlockIndex.load(pbf_file)
+
+    # open() silently rebuilds the index
+    assert PbfBlockIndex.open(pbf_file).blocks
+    assert PbfBlockIndex.load(pbf_file).blocks
+
+
+def test_select_and_read(pbf_file):
+    index = PbfBlockIndex.build(pbf_file)
+    wid, nodes = first_way(pbf_file)
+
+    assert len(index.select('w', [wid])) == 1
+    assert index.select('w', []) == []
+
+    ids = IDCollector()
+    osmium.apply(index.read(nodes=nodes, ways=[wid]), ids)
+
+    assert wid in ids.ways
+    assert set(nodes) <= set(ids.nodes)
+    assert not ids.relations
+
+    counts = CountingHandler()
+    counts.apply_file(pbf_file)
+    assert len(ids.nodes) < counts.counts[0]
+
+
+def test_complete_backward_references(pbf_file):
+    wid, _ = first_way(pbf_file)
+    rid = next(r.id for r in osmium.FileProcessor(pbf_file, osmium.osm.RELATION))
+
+    expected = osmium.IdTracker()
+    expected.add_way(wid)
+    expected.add_relation(rid)
+    expected.complete_backward_references(pbf_file, relation_depth=2)
+
+    tracker = osmium.IdTracker()
+    tracker.add_way(wid)
+    tracker.add_relation(rid)
+    PbfBlockIndex.build(pbf_file).complete_backward_references(tracker, relation_depth=2)
+
+    for otype in ('node', 'way', 'relation'):
+        assert len(getattr(tracker, f'{otype}_ids')()) \
+               == len(getattr(expected, f'{otype}_ids')())
+
+
+def test_back_reference_writer_with_index(pbf_file, tmp_path):
+    wid, nodes = first_way(pbf_file)
+    index = PbfBlockIndex.build(pbf_file)
+
+    class TestWay:
+        id = wid
+        nodes = []
+
+    TestWay.nodes = nodes
+
+    results = []
+    for block_index in (None, index):
+        outfile = tmp_path / f'{uuid.uuid4()}.opl'
+        with osmium.BackReferenceWriter(outfile, pbf_file, block_index=block_index) as writer:
+            writer.add_way(TestWay())
+        results.append(outfile.read_text())
+
+    assert results[0] == results[1]
+
+
+def test_pbf_blob_types(pbf_file):
+    header, blobs = pbf_blob_types(pbf_file)
+    index = PbfBlockIndex.build(pbf_file)
+
+    assert header == index.header
+    assert [(b.offset, t) for b, t in blobs] == [(b.offset, b.type) for b in index.blocks]
+
+
+@pytest.mark.parametrize('entities', [osmium.osm.RELATION, osmium.osm.WAY,
+                                      osmium.osm.WAY | osmium.osm.RELATION])
+def test_restricted_input(pbf_file, entities):
+    expected = IDCollector()
+    osmium.apply(osmium.io.Reader(str(pbf_file), entities), expected)
+
+    with restricted_input(pbf_file, entities) as src:
+        assert isinstance(src, osmium.io.FileBuffer)
+        ids = IDCollector()
+        osmium.apply(osmium.io.Reader(src, entities), ids)
+
+    assert ids.ways == expected.ways
+    assert ids.relations == expected.relations
+
+
+@pytest.mark.skipif(not osmium.pbf_index._CAN_STREAM, reason='needs /dev/fd')
+@pytest.mark.parametrize('entities', [osmium.osm.RELATION, osmium.osm.WAY])
+def test_restricted_input_streamed(pbf_file, entities):
+    expected = IDCollector()
+    osmium.apply(osmium.io.Reader(str(pbf_file), entities), expected)
+
+    with restricted_input(pbf_file, entities, max_memory=0) as src:
+        assert isinstance(src, osmium.io.File)
+        ids = IDCollector()
+        osmium.apply(osmium.io.Reader(src, entities), ids)
+
+    assert ids.ways == expected.ways
+    assert ids.relations == expected.relations
+
+
+@pytest.mark.skipif(not osmium.pbf_index._CAN_STREAM, reason='needs /dev/fd')
+def test_restricted_input_streamed_stop_early(pbf_file):
+    class _Stop(Exception):
+        pass
+
+    class _StopAtFirstWay:
+        def way(self, w):
+            raise _Stop()
+
+    with restricted_input(pbf_file, osmium.osm.WAY, max_memory=0) as src:
+        with pytest.raises(_Stop):
+            osmium.apply(osmium.io.Reader(src, osmium.osm.WAY), _StopAtFirstWay())
+
+    with restricted_input(pbf_file, osmium.osm.WAY, max_memory=0):
+        pass
+
+
+def test_restricted_input_too_large_without_stream(pbf_file, monkeypatch):
+    with restricted_input(pbf_file, osmium.osm.WAY, max_memory=0, stream=False) as src:
+        assert src == pbf_file
+
+    monkeypatch.setattr(osmium.pbf_index, '_CAN_STREAM', False)
+
+    with restricted_input(pbf_file, osmium.osm.WAY, max_memory=0) as src:
+        assert src == pbf_file
+
+
+@pytest.mark.skipif(not osmium.pbf_index._CAN_STREAM, reason='needs /dev/fd')
+def test_file_processor_streamed_input(pbf_file):
+    expected = [o.id for o in osmium.FileProcessor(pbf_file, osmium.osm.WAY)]
+
+    fp = osmium.FileProcessor(pbf_file, osmium.osm.WAY)
+    fp._restricted_inputs = RestrictedInputCache(max_memory=0)
+    for obj in fp:
+        assert obj.id == expected[0]
+        break
+
+    assert [o.id for o in fp] == expected
+
+
+@pytest.mark.parametrize('entities', [osmium.osm.ALL, osmium.osm.NODE])
+def test_restricted_input_unchanged(pbf_file, entities):
+    with restricted_input(pbf_file, entities) as src:
+        assert src == pbf_file
+
+
+def test_restricted_input_other_formats(test_data):
+    fn = test_data('n1\nw1 Nn1')
+    with restricted_input(fn, osmium.osm.WAY) as src:
+        assert src == fn
+
+
+def test_file_processor_restricted_entities(pbf_file):
+    ids = [o.id for o in osmium.FileProcessor(pbf_file, osmium.osm.RELATION)]
+    expected = [o.id for o in osmium.FileProcessor(pbf_file) if o.is_relation()]
+
+    assert ids == expected
+
+
+def test_restricted_input_cache(pbf_file):
+    cache = RestrictedInputCache()
+
+    with cache.open(pbf_file, osmium.osm.WAY) as src:
+        assert isinstance(src, osmium.io.FileBuffer)
+    with cache.open(pbf_file, osmium.osm.WAY) as other:
+        assert other is src
+    with cache.open(pbf_file, osmium.osm.RELATION) as other:
+        assert other is not src
+    with cache.open(pbf_file, osmium.osm.ALL) as other:
+        assert other == pbf_file
+
+    cache.clear()
+    with cache.open(pbf_file, osmium.osm.WAY) as other:
+        assert other is not src
+
+
+@pytest.mark.skipif(not osmium.pbf_index._CAN_STREAM, reason='needs /dev/fd')
+def test_restricted_input_cache_too_large(pbf_file):
+    cache = RestrictedInputCache(max_memory=0)
+
+    for _ in range(2):
+        with cache.open(pbf_file, osmium.osm.WAY) as src:
+            assert isinstance(src, osmium.io.File)
+            ids = IDCollector()
+            osmium.apply(osmium.io.Reader(src, osmium.osm.WAY), ids)
+        assert ids.ways
+
+
+def test_restricted_input_cache_no_rescan(pbf_file, monkeypatch):
+    scans = []
+    blob_types = osmium.pbf_index.pbf_blob_types
+
+    def _count_scans(*args):
+        scans.append(args)
+        return blob_types(*args)
+
+    monkeypatch.setattr(osmium.pbf_index, 'pbf_blob_types', _count_scans)
+    cache = RestrictedInputCache(max_memory=0)
+
+    for _ in range(2):
+        with cache.open(pbf_file, osmium.osm.WAY):
+            pass
+    assert len(scans) == 1
+
+
+@pytest.mark.thread_unsafe  # changes the modification time of the file
+def test_restricted_input_cache_file_changed(pbf_file):
+    cache = RestrictedInputCache()
+
+    with cache.open(pbf_file, osmium.osm.WAY) as src:
+        pass
+    with cache.open(pbf_file, osmium.osm.RELATION):
+        pass
+
+    stat = os.stat(pbf_file)
+    os.utime(pbf_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    with cache.open(pbf_file, osmium.osm.WAY) as other:
+        assert other is not src
+
+    assert len(cache._inputs) == 1
+
+
+def test_restricted_input_cache_total_memory(pbf_file):
+    header, blobs = pbf_blob_types(pbf_file)
+    way_size = header.size + sum(b.size for b, t in blobs if t == 'w')
+    cache = RestrictedInputCache(max_memory=way_size)
+
+    with cache.open(pbf_file, osmium.osm.WAY) as src:
+        assert isinstance(src, osmium.io.FileBuffer)
+    with cache.open(pbf_file, osmium.osm.RELATION) as rel_src:
+        assert isinstance(rel_src, osmium.io.FileBuffer)
+    with cache.open(pbf_file, osmium.osm.RELATION) as other:
+        assert other is rel_src
+    with cache.open(pbf_file, osmium.osm.WAY) as other:
+        assert other is not src
+
+    assert cache._memory <= way_size
+
+
+def test_file_processor_reuses_restricted_input(pbf_file, monkeypatch):
+    created = []
+    read_blobs = osmium.pbf_index._read_blobs
+
+    def _count_reads(*args):
+        created.append(args)
+        return read_blobs(*args)
+
+    monkeypatch.setattr(osmium.pbf_index, '_read_blobs', _count_reads)
+
+    fp = osmium.FileProcessor(pbf_file, osmium.osm.WAY)
+    first = [o.id for o in fp]
+    second = [o.id for o in fp]
+
+    assert first and first == second
+    assert len(created) == 1
+
+
+def _pbf_key(field, wire_type):
+    return bytes([field << 3 | wire_type])
+
+
+def _pbf_varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _pbf_message(field, content):
+    return _pbf_key(field, 2) + _pbf_varint(len(content)) + content
+
+
+def _pbf_blob(blob_type, blob):
+    header = _pbf_message(1, blob_type) + _pbf_key(3, 0) + _pbf_varint(len(blob))
+    return struct.pack('!I', len(header)) + header + blob
+
+
+def _primitive_block(groups, stringtable, settings):
+    block = _pbf_message(1, stringtable)
+    for group in groups:
+        block += _pbf_message(2, group)
+    return block + settings
+
+
+def _raw_block(*groups, stringtable=b'', settings=b''):
+    return _pbf_message(1, _primitive_block(groups, stringtable, settings))
+
+
+def _zlib_block(*groups, stringtable=b'', settings=b''):
+    block = _primitive_block(groups, stringtable, settings)
+    return _pbf_key(2, 0) + _pbf_varint(len(block)) + _pbf_message(3, zlib.compress(block))
+
+
+@pytest.fixture
+def crafted_pbf(tmp_path):
+    """ PBF file with blobs that can only partially be typed: a large
+        node blob, a blob with a group of ways followed by a group of nodes,
+        a zstd-compressed blob and a blob with only ways.
+    """
+    zstd_blob = _pbf_key(2, 0) + _pbf_varint(100) + _pbf_message(7, b'z' * 20)
+    blobs = [_pbf_blob(b'OSMHeader', _raw_block()),
+             _pbf_blob(b'OSMData', _raw_block(_pbf_message(2, b'x'),
+                                              stringtable=b'n' * 10000)),
+             _pbf_blob(b'OSMData', _raw_block(_pbf_message(3, b'w'),
+                                              _pbf_message(1, b'n' * 40))),
+             _pbf_blob(b'OSMData', zstd_blob),
+             _pbf_blob(b'OSMData', _raw_block(_pbf_message(3, b'w')))]
+    fn = tmp_path / 'crafted.osm.pbf'
+    fn.write_bytes(b''.join(blobs))
+
+    return fn, blobs
+
+
+def test_pbf_blob_types_undetermined(crafted_pbf):
+    fn, _ = crafted_pbf
+    _, blobs = pbf_blob_types(fn)
+
+    assert [t for _, t in blobs] == ['n', None, None, 'w']
+
+
+@pytest.mark.parametrize('make_block', [_raw_block, _zlib_block])
+def test_pbf_blob_types_second_group(tmp_path, make_block):
+    # Incompressible string table, so that the blob is read in several chunks.
+    rng = random.Random(42)
+    stringtable = bytes(rng.getrandbits(8) for _ in range(50000))
+    settings = _pbf_varint(17 << 3) + _pbf_varint(100) \
+        + _pbf_varint(19 << 3) + _pbf_varint(2 ** 64 - 1)
+    blocks = [make_block(_pbf_message(3, b'w'), stringtable=stringtable),
+              make_block(_pbf_message(3, b'w'), stringtable=stringtable, settings=settings),
+              # A dense node group with a single node is shorter than the settings.
+              make_block(_pbf_message(3, b'w'), _pbf_message(2, _pbf_message(1, b'\x02')),
+                         stringtable=stringtable),
+              make_block(_pbf_message(4, b'r'), _pbf_message(2, b'd'), settings=settings),
+              make_block(_pbf_message(4, b'r'), settings=settings + _pbf_message(2, b'd'))]
+    fn = tmp_path / 'groups.osm.pbf'
+    fn.write_bytes(_pbf_blob(b'OSMHeader', _raw_block())
+                   + b''.join(_pbf_blob(b'OSMData', b) for b in blocks))
+
+    _, blobs = pbf_blob_types(fn)
+
+    assert [t for _, t in blobs] == ['w', 'w', None, None, None]
+
+
+def test_restricted_input_keeps_undetermined_blobs(crafted_pbf, monkeypatch):
+    fn, blobs = crafted_pbf
+    read = []
+    monkeypatch.setattr(osmium.pbf_index, '_read_blobs',
+                        lambda src, selected: read.append(selected) or src)
+
+    with restricted_input(fn, osmium.osm.WAY):
+        pass
+
+    assert [b.size for b in read[0]] == [len(b) for b in (blobs[0], *blobs[2:])]
+
+    with restricted_input(fn, osmium.osm.NODE) as src:
+        assert src == fn
@@ -500,3 +500,40 @@ def test_apply_diffs_transient_error_permanent(httpserver, caplog):
             assert h.counts == [1, 1, 0, 0]
 
     assert 'Error during diff download' in caplog.text
+
+
+def test_apply_with_location_cache(httpserver, tmp_path):
+    httpserver.expect_ordered_request('/state.txt').respond_with_data("""\
+        sequenceNumber=100
+        timestamp=2017-08-26T11\\:04\\:02Z
+    """)
+    httpserver.expect_ordered_request('/000/000/100.opl').respond_with_data(dedent("""\
+        n1 x10.0 y23.0
+        w1 Nn1,n2
+    """))
+    httpserver.expect_ordered_request('/000/000/100.state.txt').respond_with_data("""\
+        sequenceNumber=100
+        timestamp=2017-08-26T11\\:04\\:02Z
+    """)
+
+    fn = tmp_path / 'nodes.cache'
+    with osmium.index.LocationCache(fn, mode='w') as cache:
+        cache.set(2, osmium.osm.Location(5.0, 6.0))
+
+    class Handler(CountingHandler):
+        def way(self, w):
+            self.counts[1] += 1
+            assert 10 == w.nodes[0].location.lon
+            assert 5 == w.nodes[1].location.lon
+
+    h = Handler()
+    with osmium.index.LocationCache(fn, mode='a') as cache:
+        with rserv.ReplicationServer(httpserver.url_for(''), "opl") as svr:
+            assert 100 == svr.apply_diffs(h, 100, 10000, idx=cache)
+
+    assert h.counts == [1, 1, 0, 0]
+
+    cache = osmium.index.LocationCache(fn)
+    assert cache.sequence == 100
+    assert cache.timestamp == mkdate(2017, 8, 26, 11, 4, 2)
+    assert cache.get(1).lat == 23
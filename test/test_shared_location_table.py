@@ -0,0 +1,223 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import uuid
+
+import pytest
+
+import osmium
+from osmium.index import SharedLocationTable
+
+# The tests modify a shared memory segment.
+pytestmark = [pytest.mark.thread_unsafe, pytest.mark.iterations(1)]
+
+
+@pytest.fixture
+def table():
+    with SharedLocationTable.create(100, name=f"pyosmium_{uuid.uuid4().hex[:16]}") as table:
+        yield table
+
+
+def _lookup(args):
+    table, node_id = args
+    return table.get(node_id).x
+
+
+def test_create(table):
+    assert table.name.startswith('pyosmium_')
+    assert table.capacity == 100
+    assert table.writable
+    assert not table.finished
+    assert not table.closed
+    assert len(table) == 0
+    assert table.used_memory() == SharedLocationTable.required_size(100)
+
+
+def test_set_get(table):
+    table.set(10, osmium.osm.Location(1.5, 2.5))
+    table.set(3, osmium.osm.Location(-1.5, -2.5))
+
+    assert len(table) == 2
+    assert table.get(10).lon == pytest.approx(1.5)
+    assert table[3].lat == pytest.approx(-2.5)
+
+    table.finish()
+
+    assert table.finished
+    assert not table.writable
+    assert table.get(10).lat == pytest.approx(2.5)
+    assert table.get(3).lon == pytest.approx(-1.5)
+    with pytest.raises(KeyError):
+        table.get(4)
+    with pytest.raises(RuntimeError, match='read-only'):
+        table.set(4, osmium.osm.Location(0, 0))
+
+
+def test_later_location_wins(table):
+    table.set(5, osmium.osm.Location(1, 1))
+    table.set(2, osmium.osm.Location(2, 2))
+    table.set(5, osmium.osm.Location(3, 3))
+    table.finish()
+
+    assert table.get(5).lon == pytest.approx(3)
+    assert table.get(2).lon == pytest.approx(2)
+
+
+def test_table_full():
+    with SharedLocationTable.create(1) as table:
+        table.set(1, osmium.osm.Location(1, 1))
+        with pytest.raises(RuntimeError, match='full'):
+            table.set(2, osmium.osm.Location(1, 1))
+
+
+def test_attach(table):
+    table.set(7, osmium.osm.Location(4, 5))
+
+    with pytest.raises(RuntimeError, match='not finished'):
+        SharedLocationTable(table.name)
+
+    table.finish()
+
+    with SharedLocationTable(table.name) as other:
+        assert not other.writable
+        assert other.finished
+        assert len(other) == 1
+        assert other.get(7).lat == pytest.approx(5)
+        with pytest.raises(RuntimeError):
+            other.set(8, osmium.osm.Location(1, 1))
+
+    assert other.closed
+    assert table.get(7).lon == pytest.approx(4)
+
+
+def test_attach_foreign_memory():
+    from multiprocessing.shared_memory import SharedMemory
+
+    shm = SharedMemory(create=True, size=1024)
+    try:
+        with pytest.raises(ValueError):
+            SharedLocationTable(shm.name)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_pickle(table):
+    table.set(7, osmium.osm.Location(4, 5))
+    table.finish()
+
+    other = pickle.loads(pickle.dumps(table))
+    assert other.name == table.name
+    assert other.get(7).lon == pytest.approx(4)
+    other.close()
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+def test_use_in_pool(table):
+    for i in range(1, 50):
+        table.set(i, osmium.osm.Location(i / 10, 0))
+    table.finish()
+
+    with multiprocessing.get_context('fork').Pool(2) as pool:
+        result = pool.map(_lookup, [(table, i) for i in (4, 40, 17)])
+
+    assert result == [4000000, 40000000, 17000000]
+
+
+POOL_SCRIPT = """\
+import multiprocessing
+import sys
+
+import osmium
+from osmium.index import SharedLocationTable
+
+
+def lookup(args):
+    table, node_id = args
+    return table.get(node_id).x
+
+
+if __name__ == '__main__':
+    with SharedLocationTable.create(100) as table:
+        for i in range(1, 50):
+            table.set(i, osmium.osm.Location(i / 10, 0))
+        table.finish()
+        print(table.name)
+
+        with multiprocessing.get_context(sys.argv[1]).Pool(2) as pool:
+            print(pool.map(lookup, [(table, i) for i in (4, 40, 17, 4)]))
+"""
+
+
+@pytest.mark.parametrize('method', [m for m in ('spawn', 'forkserver')
+                                    if m in multiprocessing.get_all_start_methods()])
+def test_use_in_pool_without_fork(tmp_path, method):
+    script = tmp_path / 'pool.py'
+    script.write_text(POOL_SCRIPT)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, str(script), method], env=env,
+                            capture_output=True, text=True, check=True)
+
+    name, values = result.stdout.splitlines()
+    assert values == '[4000000, 40000000, 17000000, 4000000]'
+    assert result.stderr == ''
+    with pytest.raises(FileNotFoundError):
+        SharedLocationTable(name)
+
+
+def test_attach_from_other_interpreter(table):
+    table.set(7, osmium.osm.Location(4, 5))
+    table.finish()
+
+    script = ("import osmium.index\n"
+              f"t = osmium.index.SharedLocationTable({table.name!r})\n"
+              "print(t.get(7).x)\n")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, '-c', script], env=env,
+                            capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == '40000000'
+    assert 'leaked' not in result.stderr
+    with SharedLocationTable(table.name) as other:
+        assert other.get(7).lon == pytest.approx(4)
+
+
+def test_close_removes_segment():
+    table = SharedLocationTable.create(10)
+    name = table.name
+    table.finish()
+    table.close()
+
+    assert table.closed
+    with pytest.raises(FileNotFoundError):
+        SharedLocationTable(name)
+
+
+def test_file_processor(test_data_dir):
+    with SharedLocationTable.create(1000000) as table:
+        for _ in osmium.FileProcessor(test_data_dir / 'example-test.pbf', osmium.osm.NODE)\
+                       .with_locations(table):
+            pass
+        table.finish()
+
+        reader = SharedLocationTable(table.name)
+        fp = osmium.FileProcessor(test_data_dir / 'example-test.pbf', osmium.osm.WAY)\
+                   .with_locations(reader)
+
+        num_valid = 0
+        for way in fp:
+            for n in way.nodes:
+                if n.location.valid():
+                    assert n.location.x == table.get(n.ref).x
+                    num_valid += 1
+
+        assert num_valid > 0
+        reader.close()
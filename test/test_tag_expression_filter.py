@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+import pytest
+
+import osmium
+from helpers import IDCollector
+
+DATA = """\
+       n1 Thighway=primary,access=private
+       n2 Thighway=secondary,lanes=2
+       n3 Thighway=residential,lanes=4,name=Hauptstraße
+       n4 Tamenity=bench
+       w5 Thighway=primary,name=Nebenweg
+       r6 Ttype=route,route=bus
+       c7 Thighway=primary
+       """
+
+
+@pytest.mark.parametrize('expr,nodes', [
+    ('highway', [1, 2, 3]),
+    ('highway=primary', [1]),
+    ('highway!=primary', [2, 3, 4]),
+    ('highway in (primary, secondary)', [1, 2]),
+    ('highway not in (primary,secondary)', [3, 4]),
+    ('highway in (primary,secondary) and not access=private', [2]),
+    ('amenity or access', [1, 4]),
+    ('not (amenity or access)', [2, 3]),
+    ('highway and (lanes > 2 or access)', [1, 3]),
+    ('lanes>=2 and lanes<4', [2]),
+    ('lanes <= 4', [2, 3]),
+    ('name~^Haupt', [3]),
+    ("name ~ 'stra.*e$'", [3]),
+    ("highway !~ '^(primary|secondary)$'", [3, 4]),
+    ('"highway" = \'residential\'', [3]),
+    ('foo', []),
+])
+def test_tag_expression_nodes(opl_reader, expr, nodes):
+    ids = IDCollector()
+
+    osmium.apply(opl_reader(DATA), osmium.filter.TagExpressionFilter(expr), ids)
+
+    assert ids.nodes == nodes
+
+
+def test_tag_expression_all_types(opl_reader):
+    ids = IDCollector()
+
+    osmium.apply(opl_reader(DATA),
+                 osmium.filter.TagExpressionFilter('highway=primary or route'), ids)
+
+    assert ids.nodes == [1]
+    assert ids.ways == [5]
+    assert ids.relations == [6]
+    assert ids.changesets == [7]
+
+
+def test_tag_expression_enable_for(opl_reader):
+    ids = IDCollector()
+
+    osmium.apply(opl_reader(DATA),
+                 osmium.filter.TagExpressionFilter('amenity').enable_for(osmium.osm.NODE),
+                 ids)
+
+    assert ids.nodes == [4]
+    assert ids.ways == [5]
+    assert ids.relations == [6]
+
+
+def test_tag_expression_with_file_processor(opl_buffer):
+    fp = osmium.FileProcessor(opl_buffer(DATA))\
+               .with_filter(osmium.filter.TagExpressionFilter('name and highway'))
+
+    assert [o.id for o in fp] == [3, 5]
+
+
+@pytest.mark.parametrize('expr', ['', '  ', 'and', 'a and', 'a or (b', 'a = ',
+                                  'a in b', 'a in (b,)', 'a not b', 'a < b',
+                                  'a ~ "("', 'a ! b', 'a = "b', 'a=b)'])
+def test_tag_expression_bad_expression(expr):
+    with pytest.raises(ValueError, match='Invalid tag expression'):
+        osmium.filter.TagExpressionFilter(expr)
+
+
+def test_tag_expression_bad_argument():
+    with pytest.raises(TypeError):
+        osmium.filter.TagExpressionFilter(None)
@@ -64,3 +64,21 @@ def test_tag_filter_fail(opl_reader, tags, filt):
     assert ids.ways == []
     assert ids.relations == []
     assert ids.changesets == []
+
+
+def test_tag_filter_many_tags(opl_reader):
+    data = """\
+           n1 Tamenity=bench
+           n2 Tamenity=cafe,name=x
+           n3 Tshop=bakery
+           n4 Tshop=other
+           n5 Tname=bench
+           """
+    tags = [(k, f"v{i}") for i in range(200) for k in ('amenity', 'shop', 'name')]
+    tags += [('amenity', 'cafe'), ('shop', 'bakery'), ('amenity', 'cafe')]
+
+    ids = IDCollector()
+
+    osmium.apply(opl_reader(data), osmium.filter.TagFilter(*tags), ids)
+
+    assert ids.nodes == [2, 3]
@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: BSD-2-Clause
+#
+# This file is part of pyosmium. (https://osmcode.org/pyosmium/)
+#
+# Copyright (C) 2026 Sarah Hoffmann <lonvia@denofr.de> and others.
+# For a full list of authors see the git log.
+import pytest
+
+import osmium
+
+
+DATA = ('n1 v3 dV c7 t2020-01-01T00:00:00Z i5 ufoo x1.5 y2.5'
+        ' Tamenity=bench,backrest=yes,created_by=JOSM',
+        'n2 v1 dV c7 t2020-01-01T00:00:00Z i5 ufoo x1 y2 Tname=x',
+        'w3 v2 dV c8 t2021-01-01T00:00:00Z i6 ubar Thighway=residential,oneway=no Nn1,n2',
+        'r4 v1 dV c9 t2022-01-01T00:00:00Z i6 ubar Ttype=route,name=yes Mn1@stop,w3@')
+
+
+def transform(opl_buffer, tmp_path, **kwargs):
+    fn = tmp_path / 'out.opl'
+    with osmium.SimpleWriter(fn) as writer:
+        osmium.apply(opl_buffer(DATA), osmium.TagTransform(writer, **kwargs))
+
+    return [line.split(' ') for line in fn.read_text().splitlines()]
+
+
+def tags(line):
+    return next(f[1:] for f in line if f.startswith('T'))
+
+
+def test_no_rules(opl_buffer, tmp_path):
+    out = transform(opl_buffer, tmp_path)
+
+    assert [tags(line) for line in out] == \
+        ['amenity=bench,backrest=yes,created_by=JOSM', 'name=x',
+         'highway=residential,oneway=no', 'type=route,name=yes']
+
+
+def test_drop(opl_buffer, tmp_path):
+    out = transform(opl_buffer, tmp_path, drop=['created_by', 'name'])
+
+    assert [tags(line) for line in out] == \
+        ['amenity=bench,backrest=yes', '', 'highway=residential,oneway=no', 'type=route']
+
+
+def test_keep(opl_buffer, tmp_path):
+    out = transform(opl_buffer, tmp_path, keep={'amenity', 'highway', 'type'})
+
+    assert [tags(line) for line in out] == \
+        ['amenity=bench', '', 'highway=residential', 'type=route']
+
+
+def test_rename(opl_buffer, tmp_path):
+    out = transform(opl_buffer, tmp_path, rename={'amenity': 'poi', 'name': 'label'})
+
+    assert [tags(line) for line in out] == \
+        ['poi=bench,backrest=yes,created_by=JOSM', 'label=x',
+         'highway=residential,oneway=no', 'type=route,label=yes']
+
+
+def test_rename_onto_existing_key(opl_buffer, tmp_path):
+    out = transform(opl_buffer, tmp_path, rename={'type': 'name', 'amenity': 'backrest'})
+
+    assert [tags(line) for line in out] == \
+        ['backrest=yes,created_by=JOSM', 'name=x',
+         'highway=residential,oneway=no', 'name=yes']
+
+
+def test_rename_to_same_key(opl_buffer, tmp_path):
+    out = transform(opl_buffer, tmp_path, rename={'highway': 'kind', 'oneway': 'kind'})
+
+    assert [tags(line) for line in out] == \
+        ['amenity=bench,backrest=yes,created_by=JOSM', 'name=x',
+         'kind=residential', 'type=route,name=yes']
+
+
+def test_values(opl_buffer, tmp_path):
+    out = transform(opl_buffer, tmp_path, values={'yes': '1', 'no': '0'},
+                    key_values={'name': {'yes': 'Yes'}, 'oneway': {'-1': 'reverse'}})
+
+    assert [tags(line) for line in out] == \
+        ['amenity=bench,backrest=1,created_by=JOSM', 'name=x',
+         'highway=residential,oneway=0', 'type=route,name=Yes']
+
+
+def test_attributes_are_kept(opl_buffer, tmp_path):
+    out = transform(opl_buffer, tmp_path, drop=['created_by', 'oneway', 'type'])
+
+    assert out[0][:7] == ['n1', 'v3', 'dV', 'c7', 't2020-01-01T00:00:00Z', 'i5', 'ufoo']
+    assert out[0][8:] == ['x1.5', 'y2.5']
+    assert out[2][:7] == ['w3', 'v2', 'dV', 'c8', 't2021-01-01T00:00:00Z', 'i6', 'ubar']
+    assert out[2][8] == 'Nn1,n2'
+    assert out[3][8] == 'Mn1@stop,w3@'
+
+
+def test_python_handler(opl_buffer):
+    seen = []
+
+    class Collector:
+        def node(self, n):
+            seen.append(dict(n.tags))
+
+    osmium.apply(opl_buffer(DATA),
+                 osmium.TagTransform(Collector(), rename={'amenity': 'poi'}))
+
+    assert seen == [{'poi': 'bench', 'backrest': 'yes', 'created_by': 'JOSM'}, {'name': 'x'}]
+
+
+@pytest.mark.parametrize('kwargs', [dict(drop=[1]), dict(rename={'a': 1}),
+                                    dict(values=[('a', 'b')]),
+                                    dict(key_values={'a': 'b'})])
+def test_bad_rules(kwargs):
+    with pytest.raises(TypeError):
+        osmium.TagTransform(osmium.filter.EmptyTagFilter(), **kwargs)
@@ -6,6 +6,9 @@
 # For a full list of authors see the git log.
 import threading
 
+import pytest
+import osmium
+
 from helpers import CountingHandler
 
 
@@ -26,3 +29,40 @@ def test_threaded_processing():
 
     assert function_complete.is_set()
     assert c.counts == [1, 0, 0, 0]
+
+
+def test_threaded_native_apply(tmp_path):
+    """ Run a purely native handler chain in parallel threads. apply()
+        releases the GIL in this case, so the threads run concurrently.
+    """
+    fn = tmp_path / 'test.opl'
+    fn.write_text('\n'.join(f"n{i} x{i % 90}.1 y{i % 45}.2 Tamenity={'a' if i % 2 else 'b'}"
+                            for i in range(1, 1000)))
+
+    results = [None] * 4
+
+    def import_data(num):
+        idx = osmium.index.create_map('flex_mem')
+        osmium.apply(fn, osmium.filter.TagFilter(('amenity', 'a')),
+                     osmium.NodeLocationsForWays(idx))
+        results[num] = (idx.get(1).lon, idx.get(999).lat)
+
+    threads = [threading.Thread(target=import_data, args=(i, )) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+
+    assert results == [(pytest.approx(1.1), pytest.approx(9.2))] * 4
+
+
+def test_threaded_mixed_apply(opl_reader):
+    """ A chain with Python handlers still gets called for each object.
+    """
+    c = CountingHandler()
+    idx = osmium.index.create_map('flex_mem')
+
+    osmium.apply(opl_reader('n1 x1 y2\nn2 x3 y4\nw1 Nn1,n2'),
+                 osmium.NodeLocationsForWays(idx), c)
+
+    assert c.counts == [2, 1, 0, 0]